@@ -12,9 +12,11 @@ import base64  # noqa: E402
 import streamlit as st  # noqa: E402
 import streamlit_nested_layout  # noqa: E402
 
-from tempfile import NamedTemporaryFile  # noqa: E402
-
+from app.utils.credentials import ClientCredentials  # noqa: E402
+from app.utils.session_pool import current_session_id  # noqa: E402
 from app.utils.streamlit_utils import init, display_config  # noqa: E402
+from app.utils.warmup import WARMER  # noqa: E402
+from app.utils.shadow import enable_shadow_traffic  # noqa: E402
 from app.utils.verify import Validators  # noqa: E402
 from app.core.system.cleaner import start_schedule  # noqa: E402
 from app.core.system.logger import Logger  # noqa: E402
@@ -54,6 +56,15 @@ st.session_state["url"] = st.selectbox(label="Select an API Endpoint to send you
                                        options=Endpoints,
                                        format_func=lambda endpoint: endpoint.name)
 
+st.markdown("Optionally, select a second endpoint to mirror your read requests to. Only the responses of the endpoint "
+            "above are shown; the latencies and responses of both endpoints are compared in the `Configs` dialog.")
+st.session_state["shadow_url"] = st.selectbox(label="Select an API Endpoint to shadow your read requests to",
+                                              options=[None, *Endpoints],
+                                              format_func=lambda endpoint: endpoint.name if endpoint else "None")
+
+if isinstance(st.session_state["shadow_url"], Endpoints):
+    enable_shadow_traffic()
+
 st.subheader("UEN and Keys")
 st.markdown("Key in your UEN number, as well as your encryption keys, certificate key (`.pem`) and private key "
             "(`.pem`) below!")
@@ -114,27 +125,21 @@ with st.form(key="init_config"):
         else:
             try:
                 LOGGER.info("Verifying configurations...")
-                # save the byte stream into a temp file to give it a path for passing it to requests
-                st.session_state["cert_pem"] = NamedTemporaryFile(delete=False, delete_on_close=False, suffix=".pem")
-                st.session_state["cert_pem"].write(cert_pem.read())
-                st.session_state["cert_pem"] = st.session_state["cert_pem"].name
-                LOGGER.info("Certificate loaded!")
-
-                st.session_state["key_pem"] = NamedTemporaryFile(delete=False, delete_on_close=False, suffix=".pem")
-                st.session_state["key_pem"].write(key_pem.read())
-                st.session_state["key_pem"] = st.session_state["key_pem"].name
-                LOGGER.info("Private key loaded!")
-
-                LOGGER.info("Verifying certificate and key...")
-                if not Validators.verify_cert_private_key(st.session_state["cert_pem"], st.session_state["key_pem"]):
-                    LOGGER.error("Certificate and private key are not valid!")
-                    raise AssertionError("Certificate and private key are not valid! Are you sure that you "
-                                         "have uploaded your certificates and private keys properly?")
+                # the pair is kept in memory and parsed once into the SSL context used for every request
+                st.session_state["credentials"] = None
+                credentials = ClientCredentials(cert_pem.getvalue(), key_pem.getvalue())
                 LOGGER.info("Certificate and key verified!")
+                st.session_state["credentials"] = credentials
                 st.success("**Certificate and Key loaded successfully!**\n\n", icon="✅")
             except base64.binascii.Error:
                 LOGGER.error("Certificate/Private key is not encoded in Base64, or that the cert/key is invalid!")
                 st.error("Certificate or private key is invalid!", icon="🚨")
-            except AssertionError as ex:
+            except ValueError as ex:
                 LOGGER.error(ex)
-                st.error(ex, icon="🚨")
+                st.error("Certificate and private key are not valid! Are you sure that you have uploaded your "
+                         "certificates and private keys properly?", icon="🚨")
+
+# open the pooled connections to the selected endpoint in the background, so that the first request is not slowed
+# down by the DNS lookup and the mTLS handshake; this does nothing if they are already warm
+if st.session_state["credentials"] is not None and isinstance(st.session_state["url"], Endpoints):
+    WARMER.warm(st.session_state["url"].value, st.session_state["credentials"], owner=current_session_id())
@@ -5,6 +5,9 @@ This file contains different abstract base classes that form the basis for other
 import requests
 
 from abc import ABC, abstractmethod
+from typing import Awaitable
+
+from app.core.constants import HttpMethod
 
 
 class AbstractRequest(ABC):
@@ -34,6 +37,23 @@ class AbstractRequest(ABC):
 
         pass
 
+    def execute_async(self) -> Awaitable[requests.Response]:
+        """
+        Executes the request asynchronously and returns an awaitable resolving to the response.
+
+        By default, this mirrors execute() through the HTTPRequestBuilder stored in self.req: GET requests are sent
+        with get_async() and POST requests with post_encrypted_async(). Subclasses that send their requests in any
+        other way should override this method.
+        """
+
+        match self._TYPE:
+            case HttpMethod.GET:
+                return self.req.get_async()
+            case HttpMethod.POST:
+                return self.req.post_encrypted_async()
+            case _:
+                raise NotImplementedError(f"{type(self).__name__} does not support asynchronous execution!")
+
 
 class AbstractRequestInfo(ABC):
     """
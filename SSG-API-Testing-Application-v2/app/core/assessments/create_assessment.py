@@ -9,12 +9,14 @@ from app.core.models.assessments import CreateAssessmentInfo
 from app.core.abc.abstract import AbstractRequest
 from app.core.constants import HttpMethod
 from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.retry import RetryPolicy, CONNECT_ONLY_RETRY
 
 
 class CreateAssessment(AbstractRequest):
     """Class used for creating an assessment record for a course run."""
 
     _TYPE: HttpMethod = HttpMethod.POST
+    _RETRY_POLICY: RetryPolicy = CONNECT_ONLY_RETRY
 
     def __init__(self, assessment_info: CreateAssessmentInfo):
         super().__init__()
@@ -36,6 +38,7 @@ class CreateAssessment(AbstractRequest):
         """
 
         self.req = HTTPRequestBuilder() \
+            .with_retry_policy(CreateAssessment._RETRY_POLICY) \
             .with_endpoint(st.session_state["url"].value, direct_argument="/tpg/assessments") \
             .with_header("accept", "application/json") \
             .with_header("Content-Type", "application/json") \
@@ -9,12 +9,14 @@ from app.core.models.assessments import SearchAssessmentInfo
 from app.core.abc.abstract import AbstractRequest
 from app.core.constants import HttpMethod
 from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.retry import RetryPolicy, IDEMPOTENT_RETRY
 
 
 class SearchAssessment(AbstractRequest):
     """Class used for finding/searching for an assessment record."""
 
     _TYPE: HttpMethod = HttpMethod.POST
+    _RETRY_POLICY: RetryPolicy = IDEMPOTENT_RETRY
 
     def __init__(self, search_info: SearchAssessmentInfo):
         super().__init__()
@@ -37,6 +39,7 @@ class SearchAssessment(AbstractRequest):
         """
 
         self.req = HTTPRequestBuilder() \
+            .with_retry_policy(SearchAssessment._RETRY_POLICY) \
             .with_endpoint(st.session_state["url"].value, direct_argument="/tpg/assessments/search") \
             .with_header("accept", "application/json") \
             .with_header("Content-Type", "application/json") \
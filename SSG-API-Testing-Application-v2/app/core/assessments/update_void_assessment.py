@@ -9,12 +9,14 @@ from app.core.models.assessments import UpdateVoidAssessmentInfo
 from app.core.abc.abstract import AbstractRequest
 from app.core.constants import HttpMethod
 from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.retry import RetryPolicy, CONNECT_ONLY_RETRY
 
 
 class UpdateVoidAssessment(AbstractRequest):
     """Class used for updating or voiding a particular assessment record."""
 
     _TYPE: HttpMethod = HttpMethod.POST
+    _RETRY_POLICY: RetryPolicy = CONNECT_ONLY_RETRY
 
     def __init__(self, assessment_reference_number: str, assessment_info: UpdateVoidAssessmentInfo):
         super().__init__()
@@ -37,6 +39,7 @@ class UpdateVoidAssessment(AbstractRequest):
         """
 
         self.req = HTTPRequestBuilder() \
+            .with_retry_policy(UpdateVoidAssessment._RETRY_POLICY) \
             .with_endpoint(
                 st.session_state["url"].value,
                 direct_argument=f"/tpg/assessments/details/{assessment_reference_number}") \
@@ -8,12 +8,14 @@ import streamlit as st
 from app.core.abc.abstract import AbstractRequest
 from app.core.constants import HttpMethod
 from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.retry import RetryPolicy, IDEMPOTENT_RETRY
 
 
 class ViewAssessment(AbstractRequest):
     """Class used for viewing a particular assessment record."""
 
     _TYPE: HttpMethod = HttpMethod.GET
+    _RETRY_POLICY: RetryPolicy = IDEMPOTENT_RETRY
 
     def __init__(self, referenceNumber: str):
         super().__init__()
@@ -34,6 +36,8 @@ class ViewAssessment(AbstractRequest):
         """
 
         self.req = HTTPRequestBuilder() \
+            .with_retry_policy(ViewAssessment._RETRY_POLICY) \
+            .with_cache() \
             .with_endpoint(st.session_state["url"].value,
                            direct_argument=f"/tpg/assessments/details/{referenceNumber}") \
             .with_header("accept", "application/json") \
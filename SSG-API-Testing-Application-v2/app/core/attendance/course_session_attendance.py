@@ -9,12 +9,14 @@ import streamlit as st
 from app.core.abc.abstract import AbstractRequest
 from app.core.constants import HttpMethod
 from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.retry import RetryPolicy, IDEMPOTENT_RETRY
 
 
 class CourseSessionAttendance(AbstractRequest):
     """Class used for retrieving the attendance of a course session."""
 
     _TYPE: HttpMethod = HttpMethod.GET
+    _RETRY_POLICY: RetryPolicy = IDEMPOTENT_RETRY
 
     def __init__(self, runId: int, crn: str, session_id: str):
         super().__init__()
@@ -38,6 +40,9 @@ class CourseSessionAttendance(AbstractRequest):
         """
 
         self.req = HTTPRequestBuilder() \
+            .with_retry_policy(CourseSessionAttendance._RETRY_POLICY) \
+            .with_cache() \
+            .with_hedging() \
             .with_endpoint(st.session_state["url"].value,
                            direct_argument=f"/courses/runs/{runId}/sessions/attendance") \
             .with_header("accept", "application/json") \
@@ -10,12 +10,14 @@ from app.core.abc.abstract import AbstractRequest
 from app.core.constants import HttpMethod
 from app.core.models.attendance import UploadAttendanceInfo
 from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.retry import RetryPolicy, CONNECT_ONLY_RETRY
 
 
 class UploadCourseSessionAttendance(AbstractRequest):
     """Class used for uploading session attendance for a course session."""
 
     _TYPE: HttpMethod = HttpMethod.POST
+    _RETRY_POLICY: RetryPolicy = CONNECT_ONLY_RETRY
 
     def __init__(self, runId: int, attendanceInfo: UploadAttendanceInfo):
         super().__init__()
@@ -39,6 +41,7 @@ class UploadCourseSessionAttendance(AbstractRequest):
         """
 
         self.req = HTTPRequestBuilder() \
+            .with_retry_policy(UploadCourseSessionAttendance._RETRY_POLICY) \
             .with_endpoint(st.session_state["url"].value,
                            direct_argument=f"/courses/runs/{runId}/sessions/attendance") \
             .with_header("accept", "application/json") \
@@ -1,6 +1,20 @@
+import binascii
+import hashlib
+import math
+import multiprocessing
+import os
+import re
+import threading
+
+from typing import Iterable, Iterator
+
 import streamlit as st
 
 from base64 import b64encode, b64decode
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from enum import Enum
 from cryptography.hazmat.primitives.ciphers import Cipher
 from cryptography.hazmat.primitives.ciphers.algorithms import AES
 from cryptography.hazmat.primitives.ciphers.modes import CBC
@@ -8,18 +22,560 @@ from cryptography.hazmat.primitives.padding import PKCS7
 from cryptography.hazmat.backends import default_backend
 
 
+# Initialisation vector used for encryption and decryption
+INITIAL_VECTOR: bytes = "SSGAPIInitVector".encode()
+
+# number of Base64 characters that ciphertexts are decrypted in, when they are decrypted chunk by chunk
+DECRYPT_CHUNK_SIZE: int = 64 * 1024
+
+_BASE64 = re.compile(r"[A-Za-z0-9+/]*={0,2}")
+_NOT_BASE64 = re.compile(r"[^A-Za-z0-9+/=]")
+
+
+class CipherKey:
+    """
+    Class representing an AES-256 key that has been decoded and validated, together with the cipher built from it.
+
+    The cipher is immutable and every call creates its own encryption or decryption context from it, so a key may be
+    used by many threads at once.
+    """
+
+    def __init__(self, key: str):
+        """
+        Decodes and validates a key.
+
+        :param key: Base64-encoded AES-256 key
+        """
+
+        try:
+            decoded = b64decode(key)
+        except (binascii.Error, TypeError):
+            raise ValueError("Encryption key must be Base64-encoded!")
+
+        if len(decoded) != 32:
+            raise ValueError("Encryption key must be a 256-bit key!")
+
+        self.cipher = Cipher(AES(decoded), CBC(INITIAL_VECTOR), backend=default_backend())
+
+    def encrypt(self, plaintext: bytes) -> bytes:
+        """
+        Pads a message with PKCS7 and encrypts it.
+
+        :param plaintext: Message to encrypt
+        :return: Base64-encoded ciphertext
+        """
+
+        padder = PKCS7(AES.block_size).padder()
+        encryptor = self.cipher.encryptor()
+
+        return b64encode(encryptor.update(padder.update(plaintext) + padder.finalize()) + encryptor.finalize())
+
+    def encrypt_stream(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """
+        Pads a message with PKCS7 and encrypts it chunk by chunk, so that neither the message nor its ciphertext are
+        ever held in memory in full. Joining the chunks returned gives the same ciphertext as encrypt().
+
+        :param chunks: Chunks of the message to encrypt
+        :return: Iterator of chunks of the Base64-encoded ciphertext
+        """
+
+        padder = PKCS7(AES.block_size).padder()
+        encryptor = self.cipher.encryptor()
+        carry = b""
+
+        for chunk in chunks:
+            data = carry + encryptor.update(padder.update(chunk))
+            # Base64 encodes groups of 3 bytes, so only whole groups are encoded until the end of the message
+            whole = len(data) - len(data) % 3
+
+            if whole > 0:
+                yield b64encode(data[:whole])
+
+            carry = data[whole:]
+
+        yield b64encode(carry + encryptor.update(padder.finalize()) + encryptor.finalize())
+
+    def decrypt_stream(self, ciphertext: str | bytes, chunk_size: int = DECRYPT_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Decrypts a message chunk by chunk and removes its PKCS7 padding, so that neither the decoded ciphertext nor
+        the plaintext are ever held in memory in full. Joining the chunks returned gives the same plaintext as
+        decrypt().
+
+        :param ciphertext: Base64-encoded ciphertext
+        :param chunk_size: Number of Base64 characters to decrypt at a time
+        :return: Iterator of chunks of the plaintext
+        """
+
+        if isinstance(ciphertext, bytes):
+            ciphertext = ciphertext.decode("latin-1")
+
+        if not _BASE64.fullmatch(ciphertext):
+            # characters outside of the Base64 alphabet are ignored, as b64decode() does, so that the ciphertext
+            # can be split into whole groups of 4 characters
+            ciphertext = _NOT_BASE64.sub("", ciphertext)
+
+        step = max(4, chunk_size - chunk_size % 4)
+        unpadder = PKCS7(AES.block_size).unpadder()
+        decryptor = self.cipher.decryptor()
+
+        for start in range(0, len(ciphertext), step):
+            # the unpadder holds back the last block, which holds the padding, until the whole message is decrypted
+            data = unpadder.update(decryptor.update(b64decode(ciphertext[start:start + step])))
+
+            if data:
+                yield data
+
+        yield unpadder.update(decryptor.finalize()) + unpadder.finalize()
+
+    def decrypt(self, ciphertext: str | bytes) -> bytes:
+        """
+        Decrypts a message and removes its PKCS7 padding.
+
+        :param ciphertext: Base64-encoded ciphertext
+        :return: Plaintext
+        """
+
+        unpadder = PKCS7(AES.block_size).unpadder()
+        decryptor = self.cipher.decryptor()
+        padded = decryptor.update(b64decode(ciphertext)) + decryptor.finalize()
+
+        return unpadder.update(padded) + unpadder.finalize()
+
+
+class KeyRing:
+    """
+    Class holding the keys that messages are encrypted and decrypted with, so that each key is only decoded, validated
+    and turned into a cipher once, rather than on every message.
+
+    Keys are kept in the order that they were last used, and the least recently used key is dropped once more than
+    max_keys keys are held.
+    """
+
+    def __init__(self, max_keys: int = 64):
+        """
+        Initialises the key ring.
+
+        :param max_keys: Maximum number of keys to hold
+        """
+
+        if max_keys < 1:
+            raise ValueError("Maximum number of keys must be positive!")
+
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._keys: OrderedDict[str, CipherKey] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def key(self, key: str) -> CipherKey:
+        """
+        Returns the decoded key, decoding and validating it if it is not held yet.
+
+        :param key: Base64-encoded AES-256 key
+        :return: CipherKey object
+        """
+
+        with self._lock:
+            cipher_key = self._keys.get(key)
+
+            if cipher_key is not None:
+                self._hits += 1
+                self._keys.move_to_end(key)
+                return cipher_key
+
+            self._misses += 1
+
+        # keys are decoded outside of the lock; two threads decoding the same key at once both get a valid key
+        cipher_key = CipherKey(key)
+
+        with self._lock:
+            self._keys[key] = cipher_key
+            self._keys.move_to_end(key)
+
+            while len(self._keys) > self.max_keys:
+                self._keys.popitem(last=False)
+
+        return cipher_key
+
+    def encrypt(self, key: str, plaintext: bytes) -> bytes:
+        """
+        Encrypts a message with a key.
+
+        :param key: Base64-encoded AES-256 key
+        :param plaintext: Message to encrypt
+        :return: Base64-encoded ciphertext
+        """
+
+        return self.key(key).encrypt(plaintext)
+
+    def encrypt_stream(self, key: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """
+        Encrypts a message with a key, chunk by chunk. The key is decoded when this method is called.
+
+        :param key: Base64-encoded AES-256 key
+        :param chunks: Chunks of the message to encrypt
+        :return: Iterator of chunks of the Base64-encoded ciphertext
+        """
+
+        return self.key(key).encrypt_stream(chunks)
+
+    def decrypt_stream(self, key: str, ciphertext: str | bytes) -> Iterator[bytes]:
+        """
+        Decrypts a message with a key, chunk by chunk. The key is decoded when this method is called.
+
+        :param key: Base64-encoded AES-256 key
+        :param ciphertext: Base64-encoded ciphertext
+        :return: Iterator of chunks of the plaintext
+        """
+
+        return self.key(key).decrypt_stream(ciphertext)
+
+    def decrypt(self, key: str, ciphertext: str | bytes) -> bytes:
+        """
+        Decrypts a message with a key.
+
+        :param key: Base64-encoded AES-256 key
+        :param ciphertext: Base64-encoded ciphertext
+        :return: Plaintext
+        """
+
+        return self.key(key).decrypt(ciphertext)
+
+    def clear(self) -> None:
+        """Removes every key held."""
+
+        with self._lock:
+            self._keys.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns the number of keys held and how often they were reused. The keys themselves are never returned.
+
+        :return: Dictionary containing the counters
+        """
+
+        with self._lock:
+            return {"keys": len(self._keys), "hits": self._hits, "misses": self._misses}
+
+
+# keys are shared by every Streamlit session running in this process
+KEY_RING = KeyRing()
+
+
+class CiphertextMemo:
+    """
+    Class remembering the ciphertexts of recently encrypted messages, so that a message encrypted more than once with
+    the same key, such as a request payload that is previewed and then sent, is only encrypted once.
+
+    Messages are encrypted with a fixed initialisation vector, so a message always has the same ciphertext under the
+    same key, and a remembered ciphertext is exactly what encrypting the message again would give. Entries are keyed
+    by a fingerprint of the key and a digest of the message, so neither keys nor messages are held. The least recently
+    used entries are dropped once more than max_entries entries or max_bytes bytes of ciphertext are held.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024):
+        """
+        Initialises the memo.
+
+        :param max_entries: Maximum number of ciphertexts to hold
+        :param max_bytes: Maximum number of bytes of ciphertext to hold. Larger ciphertexts are never held
+        """
+
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("Maximum number of entries and bytes must be positive!")
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[bytes, bytes], bytes] = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def fingerprint(key: str) -> bytes:
+        """
+        Returns a fingerprint identifying a key, which the key cannot be recovered from.
+
+        :param key: Base64-encoded AES-256 key
+        :return: Fingerprint of the key
+        """
+
+        return hashlib.sha256(key.encode()).digest()[:16]
+
+    def get(self, key: str, digest: bytes) -> bytes | None:
+        """
+        Returns the ciphertext of a message if it is held, e.g. to send a message that was encrypted in full before
+        without encrypting it again.
+
+        :param key: Base64-encoded AES-256 key
+        :param digest: SHA-256 digest of the message
+        :return: Base64-encoded ciphertext, or None if it is not held
+        """
+
+        entry = (self.fingerprint(key), digest)
+
+        with self._lock:
+            ciphertext = self._entries.get(entry)
+
+            if ciphertext is None:
+                self._misses += 1
+                return None
+
+            self._hits += 1
+            self._entries.move_to_end(entry)
+            return ciphertext
+
+    def encrypt(self, key: str, plaintext: bytes) -> bytes:
+        """
+        Returns the ciphertext of a message, encrypting it only if it is not held yet.
+
+        :param key: Base64-encoded AES-256 key
+        :param plaintext: Message to encrypt
+        :return: Base64-encoded ciphertext
+        """
+
+        entry = (self.fingerprint(key), hashlib.sha256(plaintext).digest())
+        ciphertext = self.get(key, entry[1])
+
+        if ciphertext is not None:
+            return ciphertext
+
+        ciphertext = KEY_RING.encrypt(key, plaintext)
+
+        if len(ciphertext) > self.max_bytes:
+            return ciphertext
+
+        with self._lock:
+            if entry not in self._entries:
+                self._entries[entry] = ciphertext
+                self._bytes += len(ciphertext)
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._bytes -= len(self._entries.popitem(last=False)[1])
+
+        return ciphertext
+
+    def clear(self) -> None:
+        """Removes every ciphertext held."""
+
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Returns the number of ciphertexts held and how often they were reused.
+
+        :return: Dictionary containing the counters
+        """
+
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "hits": self._hits, "misses": self._misses}
+
+
+# ciphertexts are shared by every Streamlit session running in this process; entries are keyed by key fingerprint,
+# so sessions using different keys never see each other's ciphertexts
+CIPHERTEXT_MEMO = CiphertextMemo()
+
+
+class Parallelism(Enum):
+    """Enum representing where the messages of a batch are encrypted or decrypted."""
+
+    INLINE = "inline"
+    THREADS = "threads"
+    PROCESSES = "processes"
+
+    def __str__(self):
+        return self.value
+
+
+def _cipher_batch(operation: str, key: str, messages: list[bytes | str]) -> list[bytes]:
+    """
+    Encrypts or decrypts a slice of a batch of messages. This runs on worker threads and in worker processes, which
+    each decode the key once into their own key ring.
+
+    :param operation: Either "encrypt" or "decrypt"
+    :param key: Base64-encoded AES-256 key
+    :param messages: Messages to encrypt or decrypt
+    :return: Ciphertexts or plaintexts, in the same order as the messages
+    """
+
+    cipher_key = KEY_RING.key(key)
+    method = cipher_key.encrypt if operation == "encrypt" else cipher_key.decrypt
+    return [method(message) for message in messages]
+
+
+class CipherPool:
+    """
+    Class encrypting and decrypting batches of messages on worker threads or worker processes, which are chosen from
+    the size of each batch.
+
+    AES releases the GIL, so batches of large messages are spread over threads. Encrypting or decrypting a message
+    also has a fixed Python overhead that holds the GIL, so large batches of small messages are spread over processes.
+    Batches too small for either to pay off are run on the calling thread. Batches are split into slices, so that each
+    worker handles many messages per task, and results are returned in the same order as the messages.
+
+    Worker processes are spawned rather than forked, as forking a process running Streamlit's threads is unsafe, and
+    are only started when the first batch needing them is run.
+    """
+
+    # batches up to this many bytes are run on the calling thread
+    INLINE_MAX_BYTES: int = 1024 * 1024
+
+    # batches of at least this many messages, averaging less than THREAD_MIN_MESSAGE_BYTES each, are run in processes
+    PROCESS_MIN_MESSAGES: int = 1000
+    THREAD_MIN_MESSAGE_BYTES: int = 64 * 1024
+
+    # number of slices that every worker is given from each batch, which balances the load between workers
+    SLICES_PER_WORKER: int = 4
+
+    def __init__(self, workers: int | None = None):
+        """
+        Initialises the pool.
+
+        :param workers: Maximum number of worker threads and worker processes, or None to use one per CPU
+        """
+
+        workers = workers if workers is not None else os.cpu_count() or 1
+
+        if workers < 1:
+            raise ValueError("Number of workers must be positive!")
+
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._threads: ThreadPoolExecutor | None = None
+        self._processes: ProcessPoolExecutor | None = None
+        self._batches = {parallelism: 0 for parallelism in Parallelism}
+        self._messages = 0
+
+    def plan(self, count: int, size: int) -> Parallelism:
+        """
+        Chooses where a batch is run.
+
+        :param count: Number of messages in the batch
+        :param size: Total number of bytes of the messages
+        :return: Parallelism to run the batch with
+        """
+
+        if self.workers < 2 or count < 2 or size <= self.INLINE_MAX_BYTES:
+            return Parallelism.INLINE
+
+        if count >= self.PROCESS_MIN_MESSAGES and size < count * self.THREAD_MIN_MESSAGE_BYTES:
+            return Parallelism.PROCESSES
+
+        return Parallelism.THREADS
+
+    def _executor(self, parallelism: Parallelism) -> Executor:
+        with self._lock:
+            if parallelism == Parallelism.PROCESSES:
+                if self._processes is None:
+                    self._processes = ProcessPoolExecutor(max_workers=self.workers,
+                                                          mp_context=multiprocessing.get_context("spawn"))
+
+                return self._processes
+
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="cipher")
+
+            return self._threads
+
+    def map(self, operation: str, key: str, messages: Iterable[bytes | str],
+            parallelism: Parallelism | None = None) -> list[bytes]:
+        """
+        Encrypts or decrypts a batch of messages with a key.
+
+        :param operation: Either "encrypt" or "decrypt"
+        :param key: Base64-encoded AES-256 key
+        :param messages: Messages to encrypt or decrypt
+        :param parallelism: Parallelism to run the batch with, or None to choose it from the size of the batch
+        :return: Ciphertexts or plaintexts, in the same order as the messages
+        """
+
+        if operation not in ("encrypt", "decrypt"):
+            raise ValueError(f"Unknown operation: {operation}!")
+
+        messages = list(messages)
+
+        if parallelism is None:
+            parallelism = self.plan(len(messages), sum(len(message) for message in messages))
+
+        with self._lock:
+            self._batches[parallelism] += 1
+            self._messages += len(messages)
+
+        if parallelism == Parallelism.INLINE or len(messages) == 0:
+            return _cipher_batch(operation, key, messages)
+
+        # the key is validated on the calling thread, so that an invalid key is reported before any work is sent
+        KEY_RING.key(key)
+
+        size = math.ceil(len(messages) / (self.workers * self.SLICES_PER_WORKER))
+        slices = [messages[start:start + size] for start in range(0, len(messages), size)]
+
+        try:
+            results = self._executor(parallelism).map(_cipher_batch, [operation] * len(slices),
+                                                      [key] * len(slices), slices)
+            return [result for batch in results for result in batch]
+        except BrokenProcessPool:
+            # worker processes cannot be started in every environment, so the batch is run on threads instead
+            with self._lock:
+                self._processes = None
+
+            return self.map(operation, key, messages, Parallelism.THREADS)
+
+    def shutdown(self) -> None:
+        """Stops the worker threads and worker processes, which are started again by the next batch needing them."""
+
+        with self._lock:
+            threads, processes = self._threads, self._processes
+            self._threads = self._processes = None
+
+        for executor in (threads, processes):
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        """
+        Returns the number of batches run with each parallelism, for display on a dashboard.
+
+        :return: Dictionary containing the counters
+        """
+
+        with self._lock:
+            return {"workers": self.workers,
+                    "messages": self._messages,
+                    **{str(parallelism): count for parallelism, count in self._batches.items()}}
+
+
+# worker threads and worker processes are shared by every Streamlit session running in this process
+CIPHER_POOL = CipherPool()
+
+
 class Cryptography:
     """
     Class used to encrypt and decrypt a message using AES-256, CBC and PKCS7
 
-    Methods are taken from the SSG-WSG Sample Application.
+    Methods are taken from the SSG-WSG Sample Application. Keys are decoded once and reused from KEY_RING.
     """
 
     # Initialisation vector used for encryption and decryption
-    INITIAL_VECTOR: bytes = "SSGAPIInitVector".encode()
+    INITIAL_VECTOR: bytes = INITIAL_VECTOR
 
     @staticmethod
-    def encrypt(plaintext: bytes | str, return_bytes: bool = True, key: str = None) -> bytes | str | None:
+    def resolve_key(key: str = None) -> str | None:
+        """
+        Returns the key to encrypt or decrypt with.
+
+        :param key: Key to override key stored in session state
+        :return: Key given, else the key stored in session state, or None if there are no keys loaded
+        """
+
+        return key or st.session_state.get("encryption_key") or None
+
+    @staticmethod
+    def encrypt(plaintext: bytes | str, return_bytes: bool = True, key: str = None,
+                memoize: bool = False) -> bytes | str | None:
         """
         Encrypts a message using AES-256/CBC/PKCS7 and returns the ciphertext.
 
@@ -27,33 +583,75 @@ class Cryptography:
                           encoded into a bytes object.
         :param return_bytes: If True, the ciphertext will be returned as a bytes object.
         :param key: Key to override key stored in session state
+        :param memoize: If True, the ciphertext is remembered in CIPHERTEXT_MEMO, and is reused if the same message is
+                        encrypted with the same key again.
         :return: Ciphertext
         """
 
-        if ("encryption_key" not in st.session_state
-                or st.session_state["encryption_key"] is None
-                or len(st.session_state["encryption_key"]) == 0) and not key:
+        key = Cryptography.resolve_key(key)
+
+        if not key:
             # if there are no keys loaded, do not continue
             raise AttributeError("No encryption key loaded!")
 
         if isinstance(plaintext, str):
             plaintext = plaintext.encode()
 
-        enc_key = b64decode(key if key else st.session_state["encryption_key"])
-        cipher_algo = Cipher(AES(enc_key), CBC(Cryptography.INITIAL_VECTOR), backend=default_backend())
-        padding_algo = PKCS7(128).padder()
-
-        encryptor = cipher_algo.encryptor()
-        padded_plaintext = padding_algo.update(plaintext) + padding_algo.finalize()
-        ciphertext = encryptor.update(padded_plaintext) + encryptor.finalize()
-
-        encoded_ciphertext = b64encode(ciphertext)
+        encoded_ciphertext = CIPHERTEXT_MEMO.encrypt(key, plaintext) if memoize else KEY_RING.encrypt(key, plaintext)
 
         if return_bytes:
             return encoded_ciphertext
 
         return encoded_ciphertext.decode()
 
+    @staticmethod
+    def encrypt_stream(chunks: Iterable[bytes], key: str = None) -> Iterator[bytes]:
+        """
+        Encrypts a message chunk by chunk using AES-256/CBC/PKCS7, and returns the chunks of the ciphertext.
+        Joining the chunks gives the same ciphertext as encrypt(). The key is resolved when this method is called,
+        so the chunks may be consumed from any thread.
+
+        :param chunks: Chunks of the plaintext message to be encrypted
+        :param key: Key to override key stored in session state
+        :return: Iterator of chunks of the Base64-encoded ciphertext
+        """
+
+        key = Cryptography.resolve_key(key)
+
+        if not key:
+            # if there are no keys loaded, do not continue
+            raise AttributeError("No encryption key loaded!")
+
+        return KEY_RING.encrypt_stream(key, chunks)
+
+    @staticmethod
+    def encrypt_many(plaintexts: Iterable[bytes | str], return_bytes: bool = True, key: str = None,
+                     parallelism: Parallelism | None = None) -> list[bytes | str]:
+        """
+        Encrypts a batch of messages, on worker threads or worker processes if the batch is large enough, and returns
+        the ciphertexts in the same order as the messages.
+
+        :param plaintexts: Plaintext Messages to be encrypted. Strings are encoded into bytes objects.
+        :param return_bytes: If True, the ciphertexts will be returned as bytes objects.
+        :param key: Key to override key stored in session state
+        :param parallelism: Parallelism to encrypt the batch with, or None to choose it from the size of the batch
+        :return: List of Ciphertexts
+        """
+
+        key = Cryptography.resolve_key(key)
+
+        if not key:
+            # if there are no keys loaded, do not continue
+            raise AttributeError("No encryption key loaded!")
+
+        ciphertexts = CIPHER_POOL.map("encrypt", key, (plaintext.encode() if isinstance(plaintext, str) else plaintext
+                                                       for plaintext in plaintexts), parallelism)
+
+        if return_bytes:
+            return ciphertexts
+
+        return [ciphertext.decode() for ciphertext in ciphertexts]
+
     @staticmethod
     def decrypt(ciphertext: str | bytes, return_bytes: bool = True, key: str = None) -> bytes | str | None:
         """
@@ -66,24 +664,63 @@ class Cryptography:
         :return: Plaintext Message
         """
 
-        if ("encryption_key" not in st.session_state
-                or st.session_state["encryption_key"] is None
-                or len(st.session_state["encryption_key"]) == 0) and not key:
+        key = Cryptography.resolve_key(key)
+
+        if not key:
             # if there are no keys loaded, do not continue
             return None
 
-        # decode the input text into a bytes object
-        decoded_ciphertext = b64decode(ciphertext)
-
-        enc_key = b64decode(key if key else st.session_state["encryption_key"])
-        cipher_algo = Cipher(AES(enc_key), CBC(Cryptography.INITIAL_VECTOR), backend=default_backend())
-        padding_algo = PKCS7(128).unpadder()
-
-        decryptor = cipher_algo.decryptor()
-        plaintext = decryptor.update(decoded_ciphertext) + decryptor.finalize()
-        unpadded_plaintext = padding_algo.update(plaintext) + padding_algo.finalize()
+        unpadded_plaintext = KEY_RING.decrypt(key, ciphertext)
 
         if return_bytes:
             return unpadded_plaintext
 
         return unpadded_plaintext.decode()
+
+    @staticmethod
+    def decrypt_stream(ciphertext: str | bytes, key: str = None) -> Iterator[bytes] | None:
+        """
+        Decrypts an encrypted message chunk by chunk, and returns the chunks of the plaintext. Joining the chunks
+        gives the same plaintext as decrypt(). The key is resolved when this method is called, so the chunks may be
+        consumed from any thread.
+
+        :param ciphertext: Ciphertext Message to be decrypted
+        :param key: Key to override key stored in session state
+        :return: Iterator of chunks of the plaintext, or None if there are no keys loaded
+        """
+
+        key = Cryptography.resolve_key(key)
+
+        if not key:
+            # if there are no keys loaded, do not continue
+            return None
+
+        return KEY_RING.decrypt_stream(key, ciphertext)
+
+    @staticmethod
+    def decrypt_many(ciphertexts: Iterable[str | bytes], return_bytes: bool = True, key: str = None,
+                     parallelism: Parallelism | None = None) -> list[bytes | str] | None:
+        """
+        Decrypts a batch of encrypted messages, on worker threads or worker processes if the batch is large enough,
+        and returns the plaintexts in the same order as the messages. If any message cannot be decrypted, its error
+        is raised.
+
+        :param ciphertexts: Ciphertext Messages to be decrypted
+        :param return_bytes: If True, the plaintexts will be returned as bytes objects.
+        :param key: Key to override key stored in session state
+        :param parallelism: Parallelism to decrypt the batch with, or None to choose it from the size of the batch
+        :return: List of Plaintext Messages, or None if there are no keys loaded
+        """
+
+        key = Cryptography.resolve_key(key)
+
+        if not key:
+            # if there are no keys loaded, do not continue
+            return None
+
+        plaintexts = CIPHER_POOL.map("decrypt", key, ciphertexts, parallelism)
+
+        if return_bytes:
+            return plaintexts
+
+        return [plaintext.decode() for plaintext in plaintexts]
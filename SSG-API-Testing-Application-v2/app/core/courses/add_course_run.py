@@ -9,12 +9,14 @@ from app.core.models.course_runs import AddRunInfo
 from app.core.abc.abstract import AbstractRequest
 from app.core.constants import HttpMethod, OptionalSelector
 from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.retry import RetryPolicy, CONNECT_ONLY_RETRY
 
 
 class AddCourseRun(AbstractRequest):
     """Class used for adding a course run."""
 
     _TYPE: HttpMethod = HttpMethod.POST
+    _RETRY_POLICY: RetryPolicy = CONNECT_ONLY_RETRY
 
     def __init__(self, include_expired: OptionalSelector, runinfo: AddRunInfo):
         super().__init__()
@@ -40,6 +42,9 @@ class AddCourseRun(AbstractRequest):
         """
 
         self.req = HTTPRequestBuilder() \
+            .with_retry_policy(AddCourseRun._RETRY_POLICY) \
+            .with_compression() \
+            .with_streaming() \
             .with_endpoint(st.session_state["url"].value, direct_argument="/courses/courseRuns/publish")
 
         match include_expired:
@@ -9,12 +9,14 @@ from app.core.models.course_runs import EditRunInfo
 from app.core.abc.abstract import AbstractRequest
 from app.core.constants import HttpMethod, OptionalSelector
 from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.retry import RetryPolicy, CONNECT_ONLY_RETRY
 
 
 class EditCourseRun(AbstractRequest):
     """Class used for editing a course run."""
 
     _TYPE: HttpMethod = HttpMethod.POST
+    _RETRY_POLICY: RetryPolicy = CONNECT_ONLY_RETRY
 
     def __init__(self, runId: str, include_expired: OptionalSelector, runinfo: EditRunInfo):
         super().__init__()
@@ -41,6 +43,7 @@ class EditCourseRun(AbstractRequest):
         """
 
         self.req = HTTPRequestBuilder() \
+            .with_retry_policy(EditCourseRun._RETRY_POLICY) \
             .with_endpoint(st.session_state["url"].value, direct_argument=f"/courses/courseRuns/edit/{runId}") \
             .with_header("accept", "application/json") \
             .with_header("Content-Type", "application/json")
@@ -6,6 +6,7 @@ import requests
 import streamlit as st
 
 from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.retry import RetryPolicy, IDEMPOTENT_RETRY
 from app.core.abc.abstract import AbstractRequest
 from app.core.constants import HttpMethod, OptionalSelector
 
@@ -14,6 +15,7 @@ class ViewCourseRun(AbstractRequest):
     """Class used for viewing course runs."""
 
     _TYPE: HttpMethod = HttpMethod.GET
+    _RETRY_POLICY: RetryPolicy = IDEMPOTENT_RETRY
 
     def __init__(self, runId: str, include_expired: OptionalSelector):
         super().__init__()
@@ -39,6 +41,9 @@ class ViewCourseRun(AbstractRequest):
         """
 
         self.req = HTTPRequestBuilder() \
+            .with_retry_policy(ViewCourseRun._RETRY_POLICY) \
+            .with_cache() \
+            .with_hedging() \
             .with_endpoint(st.session_state["url"].value, direct_argument=f"/courses/courseRuns/id/{runId}") \
             .with_header("accept", "application/json") \
             .with_header("Content-Type", "application/json")
@@ -6,6 +6,7 @@ import requests
 import streamlit as st
 
 from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.retry import RetryPolicy, IDEMPOTENT_RETRY
 from app.core.abc.abstract import AbstractRequest
 from app.core.constants import HttpMethod, Month, OptionalSelector
 
@@ -16,6 +17,7 @@ class ViewCourseSessions(AbstractRequest):
     """Class used for viewing course sessions."""
 
     _TYPE: HttpMethod = HttpMethod.GET
+    _RETRY_POLICY: RetryPolicy = IDEMPOTENT_RETRY
 
     def __init__(self, runId: str, crn: str, session_month: Optional[Month], session_year: Optional[int],
                  include_expired: OptionalSelector):
@@ -46,6 +48,8 @@ class ViewCourseSessions(AbstractRequest):
         """
 
         self.req = HTTPRequestBuilder() \
+            .with_retry_policy(ViewCourseSessions._RETRY_POLICY) \
+            .with_cache() \
             .with_endpoint(st.session_state["url"].value, direct_argument=f"/courses/runs/{runId}/sessions") \
             .with_header("accept", "application/json") \
             .with_header("Content-Type", "application/json") \
@@ -6,12 +6,14 @@ from app.core.abc.abstract import AbstractRequest
 from app.core.constants import HttpMethod
 from app.core.models.credit import CancelClaimsInfo
 from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.retry import RetryPolicy, CONNECT_ONLY_RETRY
 
 
 class CancelClaims(AbstractRequest):
     """Class used for cancelling a claim"""
 
     _TYPE: HttpMethod.POST = HttpMethod.POST
+    _RETRY_POLICY: RetryPolicy = CONNECT_ONLY_RETRY
 
     def __init__(self, claimId: str, cancel_claim: CancelClaimsInfo):
         super().__init__()
@@ -33,6 +35,7 @@ class CancelClaims(AbstractRequest):
         """
 
         self.req = HTTPRequestBuilder() \
+            .with_retry_policy(CancelClaims._RETRY_POLICY) \
             .with_endpoint(st.session_state["url"].value, direct_argument=f"/skillsFutureCredits/claims/{claimId}") \
             .with_header("accept", "application/json") \
             .with_body(cancel_claim.payload())
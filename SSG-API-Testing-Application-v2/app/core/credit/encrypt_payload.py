@@ -6,12 +6,14 @@ from app.core.abc.abstract import AbstractRequest
 from app.core.constants import HttpMethod
 from app.core.models.credit import EncryptPayloadInfo
 from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.retry import RetryPolicy, IDEMPOTENT_RETRY
 
 
 class EncryptPayload(AbstractRequest):
     """Class used for cancelling a claim"""
 
     _TYPE: HttpMethod.POST = HttpMethod.POST
+    _RETRY_POLICY: RetryPolicy = IDEMPOTENT_RETRY
 
     def __init__(self, encrypt: EncryptPayloadInfo):
         super().__init__()
@@ -32,6 +34,7 @@ class EncryptPayload(AbstractRequest):
         """
 
         self.req = HTTPRequestBuilder() \
+            .with_retry_policy(EncryptPayload._RETRY_POLICY) \
             .with_endpoint(st.session_state["url"].value,
                            direct_argument="skillsFutureCredits/claims/encryptRequests") \
             .with_header("accept", "application/json") \
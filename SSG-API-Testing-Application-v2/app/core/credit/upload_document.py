@@ -6,12 +6,14 @@ from app.core.abc.abstract import AbstractRequest
 from app.core.constants import HttpMethod
 from app.core.models.credit import UploadDocumentInfo
 from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.retry import RetryPolicy, CONNECT_ONLY_RETRY
 
 
 class UploadDocument(AbstractRequest):
     """Class used for uploading the supporting documents for a claim"""
 
     _TYPE: HttpMethod.POST = HttpMethod.POST
+    _RETRY_POLICY: RetryPolicy = CONNECT_ONLY_RETRY
 
     def __init__(self, claimId: str, upload_doc: UploadDocumentInfo):
         super().__init__()
@@ -33,6 +35,9 @@ class UploadDocument(AbstractRequest):
         """
 
         self.req = HTTPRequestBuilder() \
+            .with_retry_policy(UploadDocument._RETRY_POLICY) \
+            .with_compression() \
+            .with_streaming() \
             .with_endpoint(st.session_state["url"].value,
                            direct_argument=f"/skillsFutureCredits/claims/{claimId}/supportingdocuments") \
             .with_header("accept", "application/json") \
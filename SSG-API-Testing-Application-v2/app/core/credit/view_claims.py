@@ -5,12 +5,14 @@ import streamlit as st
 from app.core.abc.abstract import AbstractRequest
 from app.core.constants import HttpMethod
 from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.retry import RetryPolicy, IDEMPOTENT_RETRY
 
 
 class ViewClaims(AbstractRequest):
     """Class used for viewing the details of a claim"""
 
     _TYPE: HttpMethod.GET = HttpMethod.GET
+    _RETRY_POLICY: RetryPolicy = IDEMPOTENT_RETRY
 
     def __init__(self, nric: str, claimId: str):
         super().__init__()
@@ -32,6 +34,8 @@ class ViewClaims(AbstractRequest):
         """
 
         self.req = HTTPRequestBuilder() \
+            .with_retry_policy(ViewClaims._RETRY_POLICY) \
+            .with_cache() \
             .with_endpoint(st.session_state["url"].value, direct_argument=f"/skillsFutureCredits/claims/{claimId}") \
             .with_header("accept", "application/json") \
             .with_param("nric", nric)
@@ -5,12 +5,14 @@ from app.core.constants import HttpMethod
 from app.core.models.enrolment import CreateEnrolmentInfo
 from app.core.abc.abstract import AbstractRequest
 from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.retry import RetryPolicy, CONNECT_ONLY_RETRY
 
 
 class CreateEnrolment(AbstractRequest):
     """Class used for creating an enrolment for a course run"""
 
     _TYPE: HttpMethod = HttpMethod.POST
+    _RETRY_POLICY: RetryPolicy = CONNECT_ONLY_RETRY
 
     def __init__(self, enrolment_info: CreateEnrolmentInfo):
         super().__init__()
@@ -32,6 +34,7 @@ class CreateEnrolment(AbstractRequest):
         """
 
         self.req = HTTPRequestBuilder() \
+            .with_retry_policy(CreateEnrolment._RETRY_POLICY) \
             .with_endpoint(st.session_state["url"].value, direct_argument="/tpg/enrolments") \
             .with_header("accept", "application/json") \
             .with_header("Content-Type", "application/json") \
@@ -5,12 +5,14 @@ from app.core.constants import HttpMethod
 from app.core.models.enrolment import SearchEnrolmentInfo
 from app.core.abc.abstract import AbstractRequest
 from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.retry import RetryPolicy, IDEMPOTENT_RETRY
 
 
 class SearchEnrolment(AbstractRequest):
     """Class used for searching for an enrolment for a course run"""
 
     _TYPE: HttpMethod = HttpMethod.POST
+    _RETRY_POLICY: RetryPolicy = IDEMPOTENT_RETRY
 
     def __init__(self, enrolment_info: SearchEnrolmentInfo):
         super().__init__()
@@ -32,6 +34,7 @@ class SearchEnrolment(AbstractRequest):
         """
 
         self.req = HTTPRequestBuilder() \
+            .with_retry_policy(SearchEnrolment._RETRY_POLICY) \
             .with_endpoint(st.session_state["url"].value,
                            direct_argument=f"/tpg/enrolments/search") \
             .with_header("accept", "application/json") \
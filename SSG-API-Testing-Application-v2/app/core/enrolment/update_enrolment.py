@@ -5,12 +5,14 @@ from app.core.constants import HttpMethod
 from app.core.models.enrolment import UpdateEnrolmentInfo
 from app.core.abc.abstract import AbstractRequest
 from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.retry import RetryPolicy, CONNECT_ONLY_RETRY
 
 
 class UpdateEnrolment(AbstractRequest):
     """Class used for updating an enrolment for a course run"""
 
     _TYPE: HttpMethod = HttpMethod.POST
+    _RETRY_POLICY: RetryPolicy = CONNECT_ONLY_RETRY
 
     def __init__(self, enrolment_reference_num: str, update_enrolment_info: UpdateEnrolmentInfo):
         super().__init__()
@@ -31,6 +33,7 @@ class UpdateEnrolment(AbstractRequest):
         """
 
         self.req = HTTPRequestBuilder() \
+            .with_retry_policy(UpdateEnrolment._RETRY_POLICY) \
             .with_endpoint(st.session_state["url"].value,
                            direct_argument=f"/tpg/enrolments/details/{enrolment_reference_num}") \
             .with_header("accept", "application/json") \
@@ -5,12 +5,14 @@ from app.core.constants import HttpMethod
 from app.core.models.enrolment import UpdateEnrolmentFeeCollectionInfo
 from app.core.abc.abstract import AbstractRequest
 from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.retry import RetryPolicy, CONNECT_ONLY_RETRY
 
 
 class UpdateEnrolmentFeeCollection(AbstractRequest):
     """Class used for creating an enrolment for a course run"""
 
     _TYPE: HttpMethod = HttpMethod.POST
+    _RETRY_POLICY: RetryPolicy = CONNECT_ONLY_RETRY
 
     def __init__(self, enrolment_reference_num: str,
                  update_enrolment_fee_collection_info: UpdateEnrolmentFeeCollectionInfo):
@@ -34,6 +36,7 @@ class UpdateEnrolmentFeeCollection(AbstractRequest):
         """
 
         self.req = HTTPRequestBuilder() \
+            .with_retry_policy(UpdateEnrolmentFeeCollection._RETRY_POLICY) \
             .with_endpoint(st.session_state["url"].value,
                            direct_argument=f"/tpg/enrolments/feeCollections"
                                            f"/{enrolment_reference_num}") \
@@ -4,12 +4,14 @@ import streamlit as st
 from app.core.abc.abstract import AbstractRequest
 from app.core.constants import HttpMethod
 from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.retry import RetryPolicy, IDEMPOTENT_RETRY
 
 
 class ViewEnrolment(AbstractRequest):
     """Class used for creating an enrolment for a course run"""
 
     _TYPE: HttpMethod = HttpMethod.GET
+    _RETRY_POLICY: RetryPolicy = IDEMPOTENT_RETRY
 
     def __init__(self, enrolment_reference_num: str):
         super().__init__()
@@ -30,6 +32,9 @@ class ViewEnrolment(AbstractRequest):
         """
 
         self.req = HTTPRequestBuilder() \
+            .with_retry_policy(ViewEnrolment._RETRY_POLICY) \
+            .with_cache() \
+            .with_hedging() \
             .with_endpoint(st.session_state["url"].value,
                            direct_argument=f"/tpg/enrolments/details/"
                                            f"{enrolment_reference_num}") \
@@ -10,11 +10,20 @@ import logging
 import apscheduler.schedulers
 from apscheduler.schedulers.background import BackgroundScheduler
 
+from app.utils.session_pool import SESSION_POOL
+from app.utils.warmup import WARMER
+
 SCHEDULER = BackgroundScheduler()
 
 # this ID is used to uniquely identify the cleanup process on the system
 UNIQUE_JOB_ID = "ssg"
 
+# this ID is used to uniquely identify the process that closes pooled sessions of ended Streamlit sessions
+POOL_SWEEP_JOB_ID = "ssg-pool-sweep"
+
+# this ID is used to uniquely identify the process that keeps the warm pooled connections open
+WARMUP_JOB_ID = "ssg-warmup-heartbeat"
+
 
 def start_schedule():
     """
@@ -27,6 +36,8 @@ def start_schedule():
         # a unique job ID is used to prevent it from creating multiple cron jobs if the application is rerun
         # or if multiple people connect to the application at the same time
         SCHEDULER.add_job(_clean_temp, "interval", days=7, id=UNIQUE_JOB_ID, replace_existing=True)
+        SCHEDULER.add_job(_sweep_pools, "interval", minutes=5, id=POOL_SWEEP_JOB_ID, replace_existing=True)
+        SCHEDULER.add_job(_heartbeat, "interval", seconds=30, id=WARMUP_JOB_ID, replace_existing=True)
         try:
             SCHEDULER.start()
         except apscheduler.schedulers.SchedulerAlreadyRunningError as e:
@@ -48,3 +59,15 @@ def _clean_temp():
                 logging.log(logging.INFO, f"Removed temporary file: {filename}")
             except OSError:
                 logging.log(logging.WARNING, f"Failed to remove temporary file: {filename}")
+
+
+def _sweep_pools():
+    """Closes the pooled HTTP sessions that are no longer used by any active Streamlit session"""
+
+    SESSION_POOL.sweep()
+
+
+def _heartbeat():
+    """Re-opens the warm pooled connections that the servers have closed"""
+
+    WARMER.heartbeat()
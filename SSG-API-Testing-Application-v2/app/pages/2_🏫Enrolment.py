@@ -283,7 +283,7 @@ with create:
                     handle_request(ce, require_encryption=True)
 
                 with response:
-                    handle_response(lambda: ce.execute(), require_decryption=True)
+                    handle_response(lambda: ce.execute(), require_decryption=True, builder=ce.req)
 
 
 with update:
@@ -429,7 +429,7 @@ with update:
                     handle_request(ue, require_encryption=True)
 
                 with response:
-                    handle_response(lambda: ue.execute(), require_decryption=True)
+                    handle_response(lambda: ue.execute(), require_decryption=True, builder=ue.req)
 
 
 with cancel:
@@ -474,7 +474,7 @@ with cancel:
                     handle_request(cancel_en, require_encryption=True)
 
                 with response:
-                    handle_response(lambda: cancel_en.execute(), require_decryption=True)
+                    handle_response(lambda: cancel_en.execute(), require_decryption=True, builder=cancel_en.req)
 
 
 with search:
@@ -669,7 +669,7 @@ with search:
                     handle_request(se, require_encryption=True)
 
                 with response:
-                    handle_response(lambda: se.execute(), require_decryption=True)
+                    handle_response(lambda: se.execute(), require_decryption=True, builder=se.req)
 
 
 with view:
@@ -702,7 +702,7 @@ with view:
                 handle_request(ve)
 
             with response:
-                handle_response(lambda: ve.execute(), require_decryption=True)
+                handle_response(lambda: ve.execute(), require_decryption=True, builder=ve.req)
 
 
 with update_fee:
@@ -751,4 +751,4 @@ with update_fee:
                     handle_request(eufc, require_encryption=True)
 
                 with response:
-                    handle_response(lambda: eufc.execute(), require_decryption=True)
+                    handle_response(lambda: eufc.execute(), require_decryption=True, builder=eufc.req)
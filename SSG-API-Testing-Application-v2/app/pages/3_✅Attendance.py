@@ -105,7 +105,7 @@ with view:
 
             with response:
                 LOGGER.info("Executing request...")
-                handle_response(lambda: vc.execute(), require_decryption=True)
+                handle_response(lambda: vc.execute(), require_decryption=True, builder=vc.req)
 
 
 with upload:
@@ -187,7 +187,7 @@ with create:
 
                 with response:
                     LOGGER.info("Executing request...")
-                    handle_response(lambda: ec.execute(), require_decryption=True)
+                    handle_response(lambda: ec.execute(), require_decryption=True, builder=ec.req)
 
 
 with update_void:
@@ -293,7 +293,7 @@ with update_void:
 
                 with response:
                     LOGGER.info("Executing request...")
-                    handle_response(lambda: uva.execute(), require_decryption=True)
+                    handle_response(lambda: uva.execute(), require_decryption=True, builder=uva.req)
 
 
 with find:
@@ -423,7 +423,7 @@ with find:
 
                 with response:
                     LOGGER.info("Executing request...")
-                    handle_response(lambda: sa.execute(), require_decryption=True)
+                    handle_response(lambda: sa.execute(), require_decryption=True, builder=sa.req)
 
 
 with view:
@@ -462,4 +462,4 @@ with view:
 
             with response:
                 LOGGER.info("Executing request...")
-                handle_response(lambda: va.execute(), require_decryption=True)
+                handle_response(lambda: va.execute(), require_decryption=True, builder=va.req)
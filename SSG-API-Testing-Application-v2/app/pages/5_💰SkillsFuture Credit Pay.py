@@ -148,7 +148,7 @@ with encryption:
                     handle_request(enc, require_encryption=True)
 
                 with response:
-                    handle_response(lambda: enc.execute(), require_decryption=True)
+                    handle_response(lambda: enc.execute(), require_decryption=True, builder=enc.req)
 
     st.divider()
     st.subheader("Form POST Encrypted Payload")
@@ -211,7 +211,7 @@ with decryption:
                     handle_request(dec, require_encryption=True)
 
                 with response:
-                    handle_response(lambda: dec.execute(), require_decryption=True)
+                    handle_response(lambda: dec.execute(), require_decryption=True, builder=dec.req)
 
 with upload:
     st.header("Upload Supporting Documents")
@@ -311,7 +311,7 @@ with upload:
                     handle_request(ud, require_encryption=True)
 
                 with response:
-                    handle_response(lambda: ud.execute(), require_decryption=True)
+                    handle_response(lambda: ud.execute(), require_decryption=True, builder=ud.req)
 
 with view:
     st.header("View Claim Details")
@@ -352,7 +352,7 @@ with view:
                 handle_request(vc)
 
             with response:
-                handle_response(lambda: vc.execute(), require_decryption=True)
+                handle_response(lambda: vc.execute(), require_decryption=True, builder=vc.req)
 
 with cancel:
     st.header("Cancel Claim")
@@ -406,4 +406,4 @@ with cancel:
                     handle_request(cc)
 
                 with response:
-                    handle_response(lambda: cc.execute(), require_decryption=True)
+                    handle_response(lambda: cc.execute(), require_decryption=True, builder=cc.req)
@@ -2,6 +2,7 @@ import unittest
 import requests
 
 from app.core.abc.abstract import AbstractRequest, AbstractRequestInfo
+from app.core.constants import HttpMethod
 
 
 class TestAbstract(unittest.TestCase):
@@ -46,6 +47,39 @@ class TestAbstract(unittest.TestCase):
         except Exception as ex:
             self.fail(ex)
 
+    def test_execute_async(self):
+        """Tests that execute_async() dispatches to the asynchronous method matching the type of the request."""
+
+        class Builder:
+            def get_async(self):
+                return "get"
+
+            def post_encrypted_async(self):
+                return "post"
+
+        class ConcreteRequest(AbstractRequest):
+            def __init__(self, method):
+                self._TYPE = method
+                self.req = Builder()
+
+            def __repr__(self):
+                pass
+
+            def __str__(self):
+                pass
+
+            def _prepare(self, *args, **kwargs):
+                pass
+
+            def execute(self) -> requests.Response:
+                pass
+
+        self.assertEqual(ConcreteRequest(HttpMethod.GET).execute_async(), "get")
+        self.assertEqual(ConcreteRequest(HttpMethod.POST).execute_async(), "post")
+
+        with self.assertRaises(NotImplementedError):
+            ConcreteRequest(None).execute_async()
+
     def test_concrete_abstract_request_info(self):
         """Tests to ensure that concrete instances of AbstractRequestInfo can be initialised."""
 
@@ -1,6 +1,11 @@
 import unittest
 
-from app.core.cipher.encrypt_decrypt import Cryptography
+from base64 import b64decode, b64encode
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from app.core.cipher.encrypt_decrypt import (CIPHER_POOL, CIPHERTEXT_MEMO, KEY_RING, CipherKey, CipherPool,
+                                             CiphertextMemo, Cryptography, KeyRing, Parallelism)
 
 
 class TestEncryptDecrypt(unittest.TestCase):
@@ -31,3 +36,223 @@ class TestEncryptDecrypt(unittest.TestCase):
         decrypted = Cryptography.decrypt(encrypted, key=self.KEY)
 
         self.assertEqual(plaintext, decrypted)
+
+    def test_padding(self):
+        # messages that fill whole blocks are padded with a full block
+        for length in (0, 15, 16, 17, 32):
+            plaintext = b"A" * length
+            encrypted = Cryptography.encrypt(plaintext, key=self.KEY)
+
+            self.assertEqual(len(b64decode(encrypted)), (length // 16 + 1) * 16)
+            self.assertEqual(Cryptography.decrypt(encrypted, key=self.KEY), plaintext)
+
+        with self.assertRaises(ValueError):
+            Cryptography.decrypt(b64encode(b"A" * 16), key=self.KEY)
+
+
+class TestKeyRing(unittest.TestCase):
+    """
+    Test the KeyRing and CipherKey classes.
+    """
+
+    KEY = TestEncryptDecrypt.KEY
+
+    def test_key(self):
+        with self.assertRaises(ValueError):
+            CipherKey("not base64!")
+
+        with self.assertRaises(ValueError):
+            CipherKey(b64encode(b"A" * 16).decode())
+
+        with self.assertRaises(ValueError):
+            KeyRing(max_keys=0)
+
+    def test_reuse(self):
+        ring = KeyRing(max_keys=2)
+
+        self.assertIs(ring.key(self.KEY), ring.key(self.KEY))
+        self.assertEqual(ring.stats(), {"keys": 1, "hits": 1, "misses": 1})
+        self.assertEqual(ring.decrypt(self.KEY, ring.encrypt(self.KEY, b"Hello, World!")), b"Hello, World!")
+
+        # the least recently used key is dropped
+        other, another = b64encode(b"B" * 32).decode(), b64encode(b"C" * 32).decode()
+        ring.key(other)
+        ring.key(self.KEY)
+        ring.key(another)
+
+        self.assertEqual(list(ring._keys), [self.KEY, another])
+
+    def test_threads(self):
+        ring = KeyRing()
+        expected = ring.encrypt(self.KEY, b"Hello, World!")
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: ring.decrypt(self.KEY, ring.encrypt(self.KEY, b"Hello, World!")),
+                                        range(200)))
+
+        self.assertEqual(results, [b"Hello, World!"] * 200)
+        self.assertEqual(ring.encrypt(self.KEY, b"Hello, World!"), expected)
+
+    def test_shared(self):
+        KEY_RING.clear()
+        Cryptography.encrypt("Hello, World!", key=self.KEY)
+        Cryptography.decrypt(b'FqhnvlhHlHszFIi0AVhqzQ==', key=self.KEY)
+
+        self.assertEqual(KEY_RING.stats()["keys"], 1)
+
+    def test_encrypt_stream(self):
+        plaintext = bytes(range(256)) * 40
+
+        for size in (1, 7, 16, 100, 4096, len(plaintext)):
+            chunks = [plaintext[i:i + size] for i in range(0, len(plaintext), size)]
+            self.assertEqual(b"".join(Cryptography.encrypt_stream(chunks, key=self.KEY)),
+                             Cryptography.encrypt(plaintext, key=self.KEY))
+
+        self.assertEqual(b"".join(Cryptography.encrypt_stream([], key=self.KEY)),
+                         Cryptography.encrypt(b"", key=self.KEY))
+
+    def test_decrypt_stream(self):
+        plaintext = bytes(range(256)) * 40
+        ciphertext = Cryptography.encrypt(plaintext, key=self.KEY).decode()
+        key = KEY_RING.key(self.KEY)
+
+        for size in (4, 8, 100, 4096, len(ciphertext)):
+            chunks = list(key.decrypt_stream(ciphertext, chunk_size=size))
+            self.assertEqual(b"".join(chunks), plaintext)
+
+        # characters outside of the Base64 alphabet are ignored, as they are by decrypt()
+        wrapped = "\n".join(ciphertext[i:i + 76] for i in range(0, len(ciphertext), 76))
+        self.assertEqual(b"".join(key.decrypt_stream(wrapped.encode(), chunk_size=64)), plaintext)
+        self.assertEqual(b"".join(Cryptography.decrypt_stream(ciphertext, key=self.KEY)), plaintext)
+
+        with self.assertRaises(ValueError):
+            b"".join(key.decrypt_stream(b64encode(b"A" * 16)))
+
+        with self.assertRaises(ValueError):
+            b"".join(key.decrypt_stream(""))
+
+
+class TestCipherPool(unittest.TestCase):
+    """
+    Test the CipherPool class, and the batch methods of the Cryptography class.
+    """
+
+    KEY = TestEncryptDecrypt.KEY
+
+    def test_init(self):
+        with self.assertRaises(ValueError):
+            CipherPool(workers=0)
+
+        with self.assertRaises(ValueError):
+            CipherPool().map("sign", self.KEY, [b"Hello, World!"])
+
+    def test_plan(self):
+        pool = CipherPool(workers=4)
+
+        self.assertEqual(pool.plan(100, 100 * 200), Parallelism.INLINE)
+        self.assertEqual(pool.plan(1, 64 * 1024 * 1024), Parallelism.INLINE)
+        self.assertEqual(pool.plan(20, 20 * 1024 * 1024), Parallelism.THREADS)
+        self.assertEqual(pool.plan(10000, 10000 * 200), Parallelism.PROCESSES)
+        self.assertEqual(pool.plan(10000, 10000 * 1024 * 1024), Parallelism.THREADS)
+
+        # a single worker never pays off
+        self.assertEqual(CipherPool(workers=1).plan(10000, 10000 * 200), Parallelism.INLINE)
+
+    def test_map(self):
+        pool = CipherPool(workers=3)
+        messages = [f"message {i}".encode() * (i % 7) for i in range(50)]
+        expected = [Cryptography.encrypt(message, key=self.KEY) for message in messages]
+
+        try:
+            for parallelism in Parallelism:
+                ciphertexts = pool.map("encrypt", self.KEY, iter(messages), parallelism)
+                self.assertEqual(ciphertexts, expected)
+                self.assertEqual(pool.map("decrypt", self.KEY, ciphertexts, parallelism), messages)
+
+                with self.assertRaises(ValueError):
+                    pool.map("decrypt", self.KEY, ciphertexts[:10] + [b64encode(b"A" * 16)], parallelism)
+        finally:
+            pool.shutdown()
+
+        self.assertEqual(pool.map("encrypt", self.KEY, []), [])
+        self.assertEqual(pool.stats()["processes"], 3)
+
+    def test_many(self):
+        plaintexts = ["Hello, World!", b"Goodbye!"] * 5
+        ciphertexts = Cryptography.encrypt_many(plaintexts, return_bytes=False, key=self.KEY)
+
+        self.assertEqual(ciphertexts[0], "FqhnvlhHlHszFIi0AVhqzQ==")
+        self.assertEqual(Cryptography.decrypt_many(ciphertexts, key=self.KEY), [b"Hello, World!", b"Goodbye!"] * 5)
+        self.assertEqual(Cryptography.decrypt_many(ciphertexts, return_bytes=False, key=self.KEY,
+                                                   parallelism=Parallelism.THREADS),
+                         ["Hello, World!", "Goodbye!"] * 5)
+
+        with patch.object(Cryptography, "resolve_key", return_value=None):
+            self.assertIsNone(Cryptography.decrypt_many(ciphertexts))
+
+            with self.assertRaises(AttributeError):
+                Cryptography.encrypt_many(plaintexts)
+
+        self.assertGreater(CIPHER_POOL.stats()["messages"], 0)
+
+
+class TestCiphertextMemo(unittest.TestCase):
+    """
+    Test the CiphertextMemo class.
+    """
+
+    KEY = TestEncryptDecrypt.KEY
+    OTHER_KEY = b64encode(b"B" * 32).decode()
+
+    def test_init(self):
+        with self.assertRaises(ValueError):
+            CiphertextMemo(max_entries=0)
+
+        with self.assertRaises(ValueError):
+            CiphertextMemo(max_bytes=0)
+
+    def test_encrypt(self):
+        memo = CiphertextMemo()
+        expected = Cryptography.encrypt(b"Hello, World!", key=self.OTHER_KEY)
+
+        with patch.object(KEY_RING, "encrypt", wraps=KEY_RING.encrypt) as encrypt:
+            ciphertext = memo.encrypt(self.KEY, b"Hello, World!")
+            self.assertEqual(ciphertext, b'FqhnvlhHlHszFIi0AVhqzQ==')
+            self.assertIs(memo.encrypt(self.KEY, b"Hello, World!"), ciphertext)
+
+            # the same message encrypted with another key is a different entry
+            self.assertEqual(memo.encrypt(self.OTHER_KEY, b"Hello, World!"), expected)
+
+        self.assertEqual(encrypt.call_count, 2)
+        self.assertEqual(memo.stats(), {"entries": 2, "bytes": 48, "hits": 1, "misses": 2})
+        self.assertNotEqual(CiphertextMemo.fingerprint(self.KEY), CiphertextMemo.fingerprint(self.OTHER_KEY))
+
+        memo.clear()
+        self.assertEqual(memo.stats()["bytes"], 0)
+
+    def test_bounded(self):
+        memo = CiphertextMemo(max_entries=2, max_bytes=64)
+
+        for message in (b"a", b"b", b"c"):
+            memo.encrypt(self.KEY, message)
+
+        # the least recently used ciphertext is dropped
+        self.assertEqual(memo.stats()["entries"], 2)
+        memo.encrypt(self.KEY, b"a")
+        self.assertEqual(memo.stats()["misses"], 4)
+
+        # ciphertexts larger than the memo are returned but never held
+        self.assertEqual(memo.encrypt(self.KEY, b"A" * 64), Cryptography.encrypt(b"A" * 64, key=self.KEY))
+        self.assertEqual(memo.stats()["entries"], 2)
+
+        memo.encrypt(self.KEY, b"A" * 40)
+        self.assertEqual(memo.stats(), {"entries": 1, "bytes": 64, "hits": 0, "misses": 6})
+
+    def test_shared(self):
+        CIPHERTEXT_MEMO.clear()
+        hits = CIPHERTEXT_MEMO.stats()["hits"]
+        first = Cryptography.encrypt("Hello, World!", key=self.KEY, memoize=True)
+        second = Cryptography.encrypt("Hello, World!", return_bytes=False, key=self.KEY, memoize=True)
+
+        self.assertEqual(first.decode(), second)
+        self.assertEqual(CIPHERTEXT_MEMO.stats()["hits"], hits + 1)
@@ -0,0 +1,295 @@
+"""
+This file contains a local HTTP server that tests can send requests to, instead of sending them to the SSG API.
+"""
+
+import datetime
+import gzip
+import ipaddress
+import json
+import os
+import ssl
+import tempfile
+import threading
+import time
+
+import h2.config
+import h2.connection
+import h2.events
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.utils.circuit_breaker import CIRCUIT_BREAKERS
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Handler that replies to every request with a JSON summary of the request it received."""
+
+    protocol_version = "HTTP/1.1"
+
+    def _read_chunked(self) -> bytes:
+        body = b""
+
+        while True:
+            size = int(self.rfile.readline().split(b";")[0], 16)
+
+            if size == 0:
+                # skip the trailers, which end with an empty line
+                while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                    pass
+
+                return body
+
+            body += self.rfile.read(size)
+            self.rfile.readline()
+
+    def _reply(self):
+        chunked = self.headers.get("Transfer-Encoding", "").lower() == "chunked"
+        length = int(self.headers.get("Content-Length", 0))
+        body = self._read_chunked() if chunked else self.rfile.read(length) if length > 0 else b""
+
+        self.server.hits += 1
+        time.sleep(self.server.delay)
+
+        if chunked and not self.server.chunked:
+            self.send_response(411)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if self.headers.get("Content-Encoding") == "gzip":
+            if not self.server.gzip:
+                self.send_response(415)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            body = gzip.decompress(body)
+
+        if self.server.etag is not None and self.headers.get("If-None-Match") == self.server.etag:
+            self.send_response(304)
+            self.send_header("ETag", self.server.etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        status = self.server.status
+        payload = json.dumps({
+            "method": self.command,
+            "path": self.path,
+            "body": body.decode(errors="replace"),
+            "hits": self.server.hits,
+            "content_encoding": self.headers.get("Content-Encoding"),
+            "chunked": chunked,
+        }).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+
+        if self.server.gzip and "gzip" in self.headers.get("Accept-Encoding", ""):
+            payload = gzip.compress(payload)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(payload)))
+
+        for key, value in self.server.extra_headers.items():
+            self.send_header(key, value)
+
+        if self.server.etag is not None:
+            self.send_header("ETag", self.server.etag)
+
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            # the client gave up on the request, e.g. because it timed out
+            pass
+
+    def do_GET(self):
+        self._reply()
+
+    def do_POST(self):
+        self._reply()
+
+    def log_message(self, format, *args):
+        # keep the test output clean
+        pass
+
+
+class LocalServer:
+    """
+    Context manager that runs a keep-alive HTTP/1.1 server on a random local port in a background thread.
+
+    The server replies with a JSON object containing the method, path and body of the request, together with the
+    number of requests it has received so far. If an ETag is given, conditional requests carrying the same ETag
+    are answered with 304 Not Modified. If a delay is given, the server waits for that many seconds before replying.
+    If gzip is enabled, the server accepts gzip-compressed bodies and compresses its replies for clients that accept
+    them; otherwise, compressed bodies are rejected with 415 Unsupported Media Type. If chunked is disabled, bodies
+    sent with chunked transfer encoding are rejected with 411 Length Required.
+    """
+
+    def __init__(self, status: int = 200, headers: dict = None, etag: str = None, delay: float = 0,
+                 gzip: bool = False, chunked: bool = True):
+        self.httpd = self._create_server()
+        self.httpd.daemon_threads = True
+        self.httpd.hits = 0
+        self.httpd.status = status
+        self.httpd.extra_headers = headers if headers is not None else {}
+        self.httpd.etag = etag
+        self.httpd.delay = delay
+        self.httpd.gzip = gzip
+        self.httpd.chunked = chunked
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def _create_server(self) -> ThreadingHTTPServer:
+        return ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    @property
+    def hits(self) -> int:
+        return self.httpd.hits
+
+    def __enter__(self):
+        # the port may have been used by an earlier server, whose failures must not trip the breakers of this one
+        CIRCUIT_BREAKERS.reset(self.url)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _self_signed_certificate() -> tuple[bytes, bytes]:
+    """Returns a PEM-encoded self-signed certificate for 127.0.0.1, and its private key."""
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (x509.CertificateBuilder()
+            .subject_name(name)
+            .issuer_name(name)
+            .public_key(key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - datetime.timedelta(minutes=1))
+            .not_valid_after(now + datetime.timedelta(days=1))
+            .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]),
+                           critical=False)
+            .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+            .sign(key, hashes.SHA256()))
+
+    return (cert.public_bytes(serialization.Encoding.PEM),
+            key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                              serialization.NoEncryption()))
+
+
+class _TLSServer(ThreadingHTTPServer):
+    """Server that speaks HTTP/2 on connections where ALPN selects it, and HTTP/1.1 on every other connection."""
+
+    def __init__(self, ssl_context: ssl.SSLContext):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.ssl_context = ssl_context
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    def finish_request(self, request, client_address):
+        try:
+            tls = self.ssl_context.wrap_socket(request, server_side=True)
+        except (ssl.SSLError, OSError):
+            return
+
+        with self.lock:
+            self.connections += 1
+
+        if tls.selected_alpn_protocol() == "h2":
+            self._serve_h2(tls)
+        else:
+            self.RequestHandlerClass(tls, client_address, self)
+
+    def _serve_h2(self, tls: ssl.SSLSocket):
+        conn = h2.connection.H2Connection(config=h2.config.H2Configuration(client_side=False))
+        conn.initiate_connection()
+        tls.sendall(conn.data_to_send())
+
+        while True:
+            try:
+                data = tls.recv(65535)
+            except OSError:
+                return
+
+            if not data:
+                return
+
+            for event in conn.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    with self.lock:
+                        self.hits += 1
+                        hits = self.hits
+
+                    headers = dict(event.headers)
+                    payload = json.dumps({"method": headers[b":method"].decode(),
+                                          "path": headers[b":path"].decode(),
+                                          "body": "",
+                                          "hits": hits}).encode()
+                    conn.send_headers(event.stream_id, [(":status", str(self.status)),
+                                                        ("content-type", "application/json"),
+                                                        ("content-length", str(len(payload)))])
+                    conn.send_data(event.stream_id, payload, end_stream=True)
+                elif isinstance(event, h2.events.ConnectionTerminated):
+                    return
+
+            tls.sendall(conn.data_to_send())
+
+
+class LocalTLSServer(LocalServer):
+    """
+    LocalServer that serves HTTPS with a self-signed certificate, whose PEM is available as ca_pem so that clients
+    can trust it. If http2 is True, HTTP/2 is offered through ALPN, and used on connections where the client selects
+    it.
+    """
+
+    def __init__(self, http2: bool = True, status: int = 200):
+        self.ca_pem, self._key_pem = _self_signed_certificate()
+        self._http2 = http2
+        super().__init__(status=status)
+
+    def _create_server(self) -> ThreadingHTTPServer:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.set_alpn_protocols(["h2", "http/1.1"] if self._http2 else ["http/1.1"])
+
+        with tempfile.TemporaryDirectory() as directory:
+            cert_path, key_path = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+
+            for path, pem in ((cert_path, self.ca_pem), (key_path, self._key_pem)):
+                with open(path, "wb") as f:
+                    f.write(pem)
+
+            context.load_cert_chain(cert_path, key_path)
+
+        return _TLSServer(context)
+
+    @property
+    def url(self) -> str:
+        return f"https://127.0.0.1:{self.httpd.server_address[1]}"
+
+    @property
+    def connections(self) -> int:
+        return self.httpd.connections
+
+    def client_context(self, http2: bool = True) -> ssl.SSLContext:
+        """Returns a client SSL context that trusts this server and, if http2 is True, offers HTTP/2."""
+
+        context = ssl.create_default_context(cadata=self.ca_pem.decode())
+
+        if http2:
+            context.set_alpn_protocols(["h2", "http/1.1"])
+
+        return context
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import unittest
+
+import httpx
+import requests
+
+from unittest.mock import patch
+
+from app.core.constants import Endpoints, HttpMethod
+from app.utils.async_http import (AsyncBridge, AsyncClientPool, to_requests_response, translate_error, gather_all,
+                                  run_sync, ASYNC_BRIDGE)
+from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.session_pool import SessionPool
+from app.utils.transport import PooledTransport
+from app.test.resources.utils.local_server import LocalServer, LocalTLSServer
+
+
+class TestAsyncHttp(unittest.TestCase):
+    """
+    Tests all the methods and classes within the async_http file.
+    """
+
+    def test_bridge(self):
+        bridge = AsyncBridge()
+
+        async def double(x):
+            await asyncio.sleep(0)
+            return x * 2
+
+        self.assertEqual(bridge.run(double(2)), 4)
+        self.assertEqual([f.result() for f in [bridge.submit(double(i)) for i in range(3)]], [0, 2, 4])
+
+        bridge.stop()
+        self.assertEqual(bridge.run(double(3)), 6)
+        bridge.stop()
+
+    def test_client_pool(self):
+        pool = AsyncClientPool()
+
+        async def clients():
+            c1 = pool.client("https://uat-api.ssg-wsg.sg/courses")
+            c2 = pool.client("https://uat-api.ssg-wsg.sg/tpg/enrolments")
+            c3 = pool.client("https://mock-api.ssg-wsg.sg/courses")
+            await pool.aclose()
+            return c1, c2, c3
+
+        c1, c2, c3 = ASYNC_BRIDGE.run(clients())
+        self.assertIs(c1, c2)
+        self.assertIsNot(c1, c3)
+        self.assertTrue(c1.is_closed)
+
+    def test_to_requests_response(self):
+        response = httpx.Response(201, headers={"X-Test": "value"}, content=b'{"a": 1}',
+                                  request=httpx.Request("GET", "https://mock-api.ssg-wsg.sg/courses"))
+        converted = to_requests_response(response)
+
+        self.assertIsInstance(converted, requests.Response)
+        self.assertEqual(converted.status_code, 201)
+        self.assertEqual(converted.headers["x-test"], "value")
+        self.assertEqual(converted.url, "https://mock-api.ssg-wsg.sg/courses")
+        self.assertEqual(converted.json(), {"a": 1})
+
+    def test_translate_error(self):
+        request = httpx.Request("GET", "https://mock-api.ssg-wsg.sg")
+
+        self.assertIsInstance(translate_error(httpx.ReadTimeout("", request=request)), requests.Timeout)
+        self.assertIsInstance(translate_error(httpx.ConnectError("", request=request)), requests.ConnectionError)
+        self.assertIsInstance(translate_error(httpx.UnsupportedProtocol("", request=request)),
+                              requests.exceptions.InvalidURL)
+
+    def test_send_async(self):
+        with LocalServer() as server:
+            builder = HTTPRequestBuilder().with_endpoint(server.url, direct_argument="/courses") \
+                                          .with_param("uen", "12345678A")
+
+            response = run_sync(builder._send_async(HttpMethod.GET, None, None, params=builder.params))
+            self.assertIsInstance(response, requests.Response)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["path"], "/courses?uen=12345678A")
+
+            responses = run_sync(gather_all(builder._send_async(HttpMethod.POST, None, None, json={"i": i})
+                                            for i in range(10)))
+            self.assertEqual([json.loads(r.json()["body"])["i"] for r in responses], list(range(10)))
+
+    def test_http2(self):
+        pool = AsyncClientPool()
+
+        with self.assertRaises(ValueError):
+            pool.use_http2(Endpoints.UAT, "yes")
+
+        pool.use_http2(Endpoints.UAT)
+        self.assertTrue(pool.http2(f"{Endpoints.UAT.value}/courses"))
+        self.assertFalse(pool.http2(f"{Endpoints.MOCK.value}/courses"))
+
+        pool.use_http2(Endpoints.UAT, False)
+        self.assertEqual(pool.stats()["http2"], [])
+
+    def _fan_out(self, server, http2: bool) -> list[requests.Response]:
+        pool = AsyncClientPool()
+        pool.use_http2(server.url)
+        builder = HTTPRequestBuilder().with_endpoint(server.url, direct_argument="/courses/runs/1/sessions") \
+                                      .with_transport(PooledTransport(client_pool=pool))
+
+        async def fan_out():
+            try:
+                return await gather_all(builder._send_async(HttpMethod.GET, None, None) for _ in range(10))
+            finally:
+                await pool.aclose()
+
+        with patch.object(SessionPool, "ssl_context", return_value=server.client_context(http2)):
+            responses = run_sync(fan_out())
+
+        self.assertTrue(all(response.status_code == 200 for response in responses))
+        self.assertEqual(pool.stats()["http_versions"], {"HTTP/2" if http2 else "HTTP/1.1": 10})
+        return responses
+
+    def test_http2_multiplexing(self):
+        with LocalTLSServer(http2=True) as server:
+            self._fan_out(server, http2=True)
+
+            # every request is multiplexed over a single connection
+            self.assertEqual(server.connections, 1)
+            self.assertEqual(server.hits, 10)
+
+    def test_http2_fallback(self):
+        with LocalTLSServer(http2=False) as server:
+            self._fan_out(server, http2=False)
+            self.assertEqual(server.hits, 10)
+
+    def test_send_async_error(self):
+        with LocalServer() as server:
+            url = server.url
+
+        with self.assertRaises(requests.ConnectionError):
+            run_sync(HTTPRequestBuilder().with_endpoint(url)._send_async(HttpMethod.GET, None, None))
+
+    def test_get_async(self):
+        builder = HTTPRequestBuilder()
+
+        with self.assertRaises(ValueError):
+            builder.get_async()
+
+        with self.assertRaises(ValueError):
+            builder.post_async()
+
+        with self.assertRaises(ValueError):
+            builder.post_encrypted_async()
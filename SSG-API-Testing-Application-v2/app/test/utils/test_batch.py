@@ -0,0 +1,129 @@
+import threading
+import time
+import unittest
+
+from unittest.mock import patch
+
+import requests
+
+from app.core.abc.abstract import AbstractRequest
+from app.core.cipher.encrypt_decrypt import Cryptography
+from app.utils.batch import BatchExecutor, BatchStatus
+from app.test.resources.utils.local_server import LocalServer
+
+
+class _DelayedRequest(AbstractRequest):
+    """Request that sleeps before returning a canned response, used to reorder completions."""
+
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self, delay: float, status: int = 200, body: bytes = b'{"ok": true}', raises: bool = False):
+        self.delay = delay
+        self.status = status
+        self.body = body
+        self.raises = raises
+
+    def __repr__(self):
+        return "DelayedRequest"
+
+    def __str__(self):
+        return self.__repr__()
+
+    def _prepare(self, *args, **kwargs):
+        pass
+
+    def execute(self) -> requests.Response:
+        with _DelayedRequest.lock:
+            _DelayedRequest.active += 1
+            _DelayedRequest.peak = max(_DelayedRequest.peak, _DelayedRequest.active)
+
+        try:
+            time.sleep(self.delay)
+
+            if self.raises:
+                raise requests.ConnectionError("connection refused")
+
+            response = requests.Response()
+            response.status_code = self.status
+            response._content = self.body
+            return response
+        finally:
+            with _DelayedRequest.lock:
+                _DelayedRequest.active -= 1
+
+
+class _LocalGet(_DelayedRequest):
+    """Request that sends a GET to the local test server."""
+
+    def __init__(self, url: str):
+        super().__init__(0)
+        self.url = url
+
+    def execute(self) -> requests.Response:
+        return requests.get(self.url)
+
+
+class TestBatch(unittest.TestCase):
+    """
+    Tests all the methods and classes within the batch file.
+    """
+
+    def setUp(self):
+        _DelayedRequest.peak = 0
+
+    def test_init(self):
+        with self.assertRaises(ValueError):
+            BatchExecutor(workers=0)
+
+        with self.assertRaises(ValueError):
+            BatchExecutor(workers="2")
+
+    def test_order_preserved(self):
+        delays = [0.05, 0.01, 0.04, 0.0, 0.02, 0.03]
+        results = BatchExecutor(workers=3).execute(_DelayedRequest(delay) for delay in delays)
+
+        self.assertEqual([result.index for result in results], list(range(len(delays))))
+        self.assertEqual([result.request.delay for result in results], delays)
+        self.assertTrue(all(result.status == BatchStatus.SUCCESS for result in results))
+        self.assertEqual(results[0].data, {"ok": True})
+        self.assertGreaterEqual(results[0].latency, 0.05)
+
+    def test_bounded_concurrency(self):
+        BatchExecutor(workers=2).execute([_DelayedRequest(0.02) for _ in range(8)])
+
+        self.assertLessEqual(_DelayedRequest.peak, 2)
+        self.assertGreaterEqual(_DelayedRequest.peak, 1)
+
+    def test_statuses(self):
+        results = BatchExecutor(workers=2).execute([
+            _DelayedRequest(0, status=200),
+            _DelayedRequest(0, status=400, body=b"bad request"),
+            _DelayedRequest(0, raises=True),
+        ])
+
+        self.assertEqual([result.status for result in results],
+                         [BatchStatus.SUCCESS, BatchStatus.HTTP_ERROR, BatchStatus.EXCEPTION])
+        self.assertEqual(results[1].status_code, 400)
+        self.assertEqual(results[1].data, "bad request")
+        self.assertIsInstance(results[2].error, requests.ConnectionError)
+        self.assertEqual(results[2].as_row()["status"], "Exception")
+
+    def test_local_server(self):
+        with LocalServer() as server:
+            results = BatchExecutor(workers=4).execute(_LocalGet(f"{server.url}/item/{i}") for i in range(12))
+
+        self.assertEqual([result.data["path"] for result in results], [f"/item/{i}" for i in range(12)])
+
+    def test_fields(self):
+        key = "u/fzxu+5FBlE7Wq7OWRMVbGB4snxf8xNyFZdTQ3tHBU="
+        body = b'{"data": {"enrolments": [{"referenceNumber": "ENR-1", "trainee": {"id": "S1"}}]}, "status": 200}'
+
+        with patch.object(Cryptography, "resolve_key", return_value=key):
+            results = BatchExecutor(workers=2, require_decryption=True, fields=["data.enrolments[*].referenceNumber"]) \
+                .execute([_DelayedRequest(0, body=Cryptography.encrypt(body, key=key)), _DelayedRequest(0, body=body)])
+
+        # only the projected fields are decoded, whether or not the payload was encrypted
+        self.assertEqual([result.data for result in results],
+                         [{"data": {"enrolments": [{"referenceNumber": "ENR-1"}]}}] * 2)
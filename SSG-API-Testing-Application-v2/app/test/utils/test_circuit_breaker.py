@@ -0,0 +1,226 @@
+import time
+import unittest
+
+from unittest.mock import patch
+
+import requests
+
+from app.core.constants import Endpoints, HttpMethod
+from app.utils.async_http import AsyncClientPool, run_sync
+from app.utils.circuit_breaker import (BreakerConfig, BreakerState, CircuitBreaker, CircuitBreakers, CircuitOpen,
+                                       is_failure, CIRCUIT_BREAKERS)
+from app.utils.compression import Compression
+from app.utils.http_utils import RATE_LIMITER, HTTPRequestBuilder
+from app.utils.rate_limiter import RateLimiter, RateLimitExceeded, RateLimitRule
+from app.utils.retry import NO_RETRY
+from app.utils.timeouts import Deadline
+from app.utils.transport import PooledTransport
+from app.test.resources.utils.local_server import LocalServer
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """
+    Tests all the methods and classes within the circuit_breaker file.
+    """
+
+    @staticmethod
+    def _response(status: int) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        return response
+
+    def test_config(self):
+        with self.assertRaises(ValueError):
+            BreakerConfig(window=0)
+
+        with self.assertRaises(ValueError):
+            BreakerConfig(failure_rate=0)
+
+        with self.assertRaises(ValueError):
+            BreakerConfig(open_for=-1)
+
+    def test_is_failure(self):
+        self.assertTrue(is_failure(error=requests.ConnectionError()))
+        self.assertTrue(is_failure(error=requests.exceptions.ReadTimeout()))
+        self.assertTrue(is_failure(response=self._response(503)))
+        self.assertFalse(is_failure(error=requests.exceptions.InvalidURL()))
+        self.assertFalse(is_failure(response=self._response(404)))
+        self.assertFalse(is_failure(response=self._response(200)))
+
+    def test_opens(self):
+        breaker = CircuitBreaker(("MOCK", "/courses"), BreakerConfig(window=4, min_calls=4, failure_rate=0.5))
+
+        for failed in (True, False, False):
+            breaker.allow()
+            breaker.record(failed)
+
+        self.assertEqual(breaker.state, BreakerState.CLOSED)
+
+        breaker.allow()
+        breaker.record(True)
+        self.assertEqual(breaker.state, BreakerState.OPEN)
+
+        with self.assertRaises(CircuitOpen) as ctx:
+            breaker.allow()
+
+        self.assertGreater(ctx.exception.retry_in, 0)
+        self.assertEqual(breaker.stats()["rejected"], 1)
+
+    def test_half_open(self):
+        breaker = CircuitBreaker(("MOCK", "/courses"), BreakerConfig(window=2, min_calls=2, open_for=0.1))
+
+        for _ in range(2):
+            breaker.allow()
+            breaker.record(True)
+
+        time.sleep(0.11)
+        self.assertEqual(breaker.state, BreakerState.HALF_OPEN)
+
+        # only one probe is let through at a time
+        breaker.allow()
+
+        with self.assertRaises(CircuitOpen):
+            breaker.allow()
+
+        breaker.record(True)
+        self.assertEqual(breaker.state, BreakerState.OPEN)
+
+        time.sleep(0.11)
+        breaker.allow()
+        breaker.record(False)
+        self.assertEqual(breaker.state, BreakerState.CLOSED)
+        self.assertEqual(breaker.stats()["calls"], 0)
+
+    def test_stuck_probe(self):
+        breaker = CircuitBreaker(("MOCK", "/courses"), BreakerConfig(window=1, min_calls=1, open_for=0.1))
+        breaker.allow()
+        breaker.record(True)
+
+        time.sleep(0.11)
+        breaker.allow()
+
+        # the probe never reports back, so another one is let through once the open period elapses again
+        time.sleep(0.11)
+        breaker.allow()
+
+    def test_release(self):
+        breaker = CircuitBreaker(("MOCK", "/courses"), BreakerConfig(window=1, min_calls=1, open_for=0.1))
+        breaker.allow()
+        breaker.record(True)
+
+        time.sleep(0.11)
+        breaker.allow()
+
+        # a probe that was never sent is given back, so another one is let through straight away
+        breaker.release()
+        breaker.allow()
+
+        with self.assertRaises(CircuitOpen):
+            breaker.allow()
+
+    def test_admit(self):
+        builder = HTTPRequestBuilder().with_endpoint("http://localhost:8080", direct_argument="/courses/runs/1")
+        breaker = CircuitBreaker(("localhost", "/courses"), BreakerConfig(window=1, min_calls=1, open_for=0.1))
+        limiter = RateLimiter(rules=[RateLimitRule(rate=1, burst=1)], max_wait=30)
+        breaker.allow()
+        breaker.record(True)
+
+        with patch("app.utils.http_utils.RATE_LIMITER", limiter):
+            # no token is spent on an attempt that the breaker rejects
+            with self.assertRaises(CircuitOpen):
+                builder._admit(breaker, None, None)
+
+            self.assertEqual(limiter.reserve(builder.endpoint), 0)
+            time.sleep(0.11)
+
+            # the limiter does not wait past the deadline, and the probe admitted for the attempt is given back
+            with self.assertRaises(RateLimitExceeded):
+                builder._admit(breaker, None, Deadline(0.5))
+
+            self.assertEqual(breaker.state, BreakerState.HALF_OPEN)
+            breaker.allow()
+
+    def test_registry(self):
+        breakers = CircuitBreakers()
+
+        enrolments = breakers.breaker(f"{Endpoints.UAT.value}/tpg/enrolments/details/1")
+        self.assertIs(enrolments, breakers.breaker(f"{Endpoints.UAT.value}/tpg/enrolments/search"))
+        self.assertIsNot(enrolments, breakers.breaker(f"{Endpoints.UAT.value}/tpg/assessments/search"))
+        self.assertIsNot(enrolments, breakers.breaker(f"{Endpoints.MOCK.value}/tpg/enrolments/search"))
+        self.assertEqual(breakers.breaker("http://localhost:8080/other/route").key,
+                         ("http://localhost:8080", "/other"))
+
+        breakers.configure(BreakerConfig(min_calls=1), Endpoints.UAT)
+        uat = breakers.breaker(f"{Endpoints.UAT.value}/courses/runs/1")
+        self.assertEqual(uat.config.min_calls, 1)
+        self.assertIsNot(enrolments, breakers.breaker(f"{Endpoints.UAT.value}/tpg/enrolments/search"))
+        self.assertEqual(breakers.breaker(f"{Endpoints.MOCK.value}/courses").config.min_calls, 10)
+
+        breakers.reset(f"{Endpoints.UAT.value}/courses")
+        self.assertEqual({stat["endpoint"] for stat in breakers.stats()}, {"MOCK", "http://localhost:8080"})
+
+        breakers.reset()
+        self.assertEqual(breakers.stats(), [])
+
+        breakers.breaker(f"{Endpoints.UAT.value}/courses/runs/1")
+        stats = breakers.stats()
+        self.assertIn({"endpoint": "UAT", "route_family": "/courses", "state": "Closed", "calls": 0,
+                       "failure_rate": 0.0, "rejected": 0, "retry_in": 0.0}, stats)
+
+    def test_fast_fail(self):
+        with LocalServer(status=503) as server:
+            builder = HTTPRequestBuilder().with_endpoint(server.url, direct_argument="/courses/runs/1") \
+                .with_retry_policy(NO_RETRY)
+            CIRCUIT_BREAKERS.breaker(builder.endpoint).config = BreakerConfig(window=2, min_calls=2)
+
+            for _ in range(2):
+                self.assertEqual(builder._dispatch(requests.Session(), None, HttpMethod.GET).status_code, 503)
+
+            with patch.object(RATE_LIMITER, "reserve", wraps=RATE_LIMITER.reserve) as reserve:
+                with self.assertRaises(CircuitOpen):
+                    builder._dispatch(requests.Session(), None, HttpMethod.GET)
+
+            reserve.assert_not_called()
+
+            with self.assertRaises(CircuitOpen):
+                run_sync(builder._send_async(HttpMethod.GET, None, None))
+
+            self.assertEqual(server.hits, 2)
+
+    def test_fallback_probe(self):
+        breaker = CircuitBreaker(("localhost", "/courses"), BreakerConfig(window=1, min_calls=1, open_for=0.1))
+        body = {"trainers": [{"photo": "A" * 4096}]}
+
+        with LocalServer() as server, patch.object(CIRCUIT_BREAKERS, "breaker", return_value=breaker):
+            builder = HTTPRequestBuilder().with_endpoint(server.url, direct_argument="/courses/runs/1") \
+                .with_compression()
+
+            breaker.allow()
+            breaker.record(True)
+            time.sleep(0.11)
+
+            # the probe is rejected with 415, and the breaker lets the uncompressed resend through
+            compression = Compression()
+            compression.enable(server.url)
+
+            with patch("app.utils.http_utils.COMPRESSION", compression):
+                self.assertEqual(builder._dispatch(requests.Session(), None, HttpMethod.POST, json=body).status_code,
+                                 200)
+
+            self.assertEqual(breaker.state, BreakerState.CLOSED)
+
+            breaker.allow()
+            breaker.record(True)
+            time.sleep(0.11)
+
+            pool = AsyncClientPool()
+            builder.with_transport(PooledTransport(client_pool=pool))
+            compression = Compression()
+            compression.enable(server.url)
+
+            with patch("app.utils.http_utils.COMPRESSION", compression):
+                self.assertEqual(run_sync(builder._send_async(HttpMethod.POST, None, json=body)).status_code, 200)
+
+            run_sync(pool.aclose())
+            self.assertEqual(breaker.state, BreakerState.CLOSED)
+            self.assertEqual(server.hits, 4)
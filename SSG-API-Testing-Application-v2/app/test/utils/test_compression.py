@@ -0,0 +1,173 @@
+import gzip
+import json
+import unittest
+
+from unittest.mock import patch
+
+import requests
+
+from app.core.constants import HttpMethod
+from app.utils.async_http import AsyncClientPool, run_sync
+from app.utils.compression import Compression
+from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.transport import CannedResponse, InMemoryTransport, PooledTransport
+from app.test.resources.utils.local_server import LocalServer
+
+
+class TestCompression(unittest.TestCase):
+    """
+    Tests all the methods and classes within the compression file.
+    """
+
+    URL = "https://in-memory.test/courses/courseRuns/publish"
+    BODY = {"trainers": [{"photo": "A" * 4096}]}
+
+    def test_init(self):
+        with self.assertRaises(ValueError):
+            Compression(min_size=-1)
+
+        with self.assertRaises(ValueError):
+            Compression(level=10)
+
+        self.assertIn("gzip", Compression.accept_encoding())
+
+    def test_enable(self):
+        compression = Compression()
+
+        with self.assertRaises(ValueError):
+            compression.enable(self.URL, "yes")
+
+        # bodies are not compressed unless compression is enabled for the origin
+        self.assertFalse(compression.enabled(self.URL))
+        self.assertFalse(compression.compress(self.URL, {"json": self.BODY}))
+
+        compression.enable("HTTPS://In-Memory.test")
+        self.assertTrue(compression.enabled(self.URL))
+        self.assertFalse(compression.enabled("https://other.test/courses/courseRuns/publish"))
+        self.assertTrue(compression.compress(self.URL, {"json": self.BODY}))
+
+        compression.enable(self.URL, False)
+        self.assertFalse(compression.compress(self.URL, {"json": self.BODY}))
+
+    def test_compress(self):
+        compression = Compression()
+        compression.enable(self.URL)
+        kwargs = {"json": self.BODY, "headers": {"accept": "application/json"}}
+
+        self.assertTrue(compression.compress(self.URL, kwargs))
+        self.assertNotIn("json", kwargs)
+        self.assertEqual(json.loads(gzip.decompress(kwargs["data"])), self.BODY)
+        self.assertEqual(kwargs["headers"], {"accept": "application/json",
+                                             "Content-Type": "application/json",
+                                             "Content-Encoding": "gzip"})
+
+        kwargs = {"data": {"a": "B" * 4096}}
+        self.assertTrue(compression.compress(self.URL, kwargs, body_key="content"))
+        self.assertEqual(gzip.decompress(kwargs["content"]), b"a=" + b"B" * 4096)
+        self.assertEqual(kwargs["headers"]["Content-Type"], "application/x-www-form-urlencoded")
+
+        # small bodies and requests without bodies are not compressed
+        self.assertFalse(compression.compress(self.URL, {"json": {"a": 1}}))
+        self.assertFalse(compression.compress(self.URL, {"params": {"a": 1}}))
+
+        stats = compression.stats()[0]
+        self.assertEqual(stats["compressed_requests"], 2)
+        self.assertGreater(stats["request_bytes_saved"], 8000)
+
+        # routes that reject compressed bodies are no longer compressed
+        compression.reject(self.URL)
+        self.assertFalse(compression.supported(self.URL))
+        self.assertFalse(compression.compress(self.URL, {"json": self.BODY}))
+        self.assertFalse(compression.stats()[0]["accepts_compressed_bodies"])
+
+    def test_request(self):
+        compression = Compression()
+
+        with patch("app.utils.http_utils.COMPRESSION", compression), LocalServer(gzip=True) as server:
+            compression.enable(server.url)
+            builder = HTTPRequestBuilder().with_endpoint(server.url, direct_argument="/courses/courseRuns/publish") \
+                .with_body(self.BODY) \
+                .with_compression()
+
+            with patch.object(HTTPRequestBuilder, "_session", return_value=requests.Session()):
+                response = builder._send(HttpMethod.POST, json=self.BODY)
+
+            self.assertEqual(response.json()["content_encoding"], "gzip")
+            self.assertEqual(json.loads(response.json()["body"]), self.BODY)
+            self.assertEqual(response.headers["Content-Encoding"], "gzip")
+
+            pool = AsyncClientPool()
+            builder.with_transport(PooledTransport(client_pool=pool))
+            response = run_sync(builder._send_async(HttpMethod.POST, None, json=self.BODY))
+            run_sync(pool.aclose())
+
+            self.assertEqual(response.json()["content_encoding"], "gzip")
+            self.assertEqual(json.loads(response.json()["body"]), self.BODY)
+
+        stats = compression.stats()[0]
+        self.assertEqual((stats["compressed_requests"], stats["compressed_responses"]), (2, 2))
+        self.assertGreater(stats["request_bytes_saved"], 8000)
+        self.assertGreater(stats["response_bytes_saved"], 8000)
+
+    def test_rejected(self):
+        compression = Compression()
+
+        with patch("app.utils.http_utils.COMPRESSION", compression), LocalServer() as server:
+            compression.enable(server.url)
+            builder = HTTPRequestBuilder().with_endpoint(server.url).with_compression()
+
+            with patch.object(HTTPRequestBuilder, "_session", return_value=requests.Session()):
+                response = builder._send(HttpMethod.POST, json=self.BODY)
+
+            # the request is sent again uncompressed
+            self.assertEqual(response.status_code, 200)
+            self.assertIsNone(response.json()["content_encoding"])
+            self.assertEqual(server.hits, 2)
+            self.assertFalse(compression.supported(server.url))
+
+            pool = AsyncClientPool()
+            builder.with_transport(PooledTransport(client_pool=pool))
+            response = run_sync(builder._send_async(HttpMethod.POST, None, json=self.BODY))
+            run_sync(pool.aclose())
+
+            # the route is already known to reject compressed bodies
+            self.assertIsNone(response.json()["content_encoding"])
+            self.assertEqual(server.hits, 3)
+
+    def test_rejected_bad_request(self):
+        compression = Compression()
+        compression.enable(self.URL)
+        transport = InMemoryTransport(responder=lambda request: CannedResponse(
+            status=400, body={"error": "Content-Encoding gzip is not supported"})
+            if request.headers.get("Content-Encoding") == "gzip" else InMemoryTransport.echo(request))
+
+        with patch("app.utils.http_utils.COMPRESSION", compression):
+            builder = HTTPRequestBuilder().with_transport(transport).with_endpoint(self.URL).with_compression()
+            response = builder._send(HttpMethod.POST, json=self.BODY)
+
+        # servers may reject compressed bodies with 400 Bad Request instead of 415 Unsupported Media Type
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.json()["body"]), self.BODY)
+        self.assertEqual(transport.requests, 2)
+        self.assertFalse(compression.supported(self.URL))
+
+    def test_bad_request(self):
+        compression = Compression()
+        compression.enable(self.URL)
+        invalid = CannedResponse(status=400, body={"error": "Invalid course run"})
+        transport = InMemoryTransport(responder=lambda request: invalid)
+
+        with patch("app.utils.http_utils.COMPRESSION", compression):
+            builder = HTTPRequestBuilder().with_transport(transport).with_endpoint(self.URL).with_compression()
+            response = builder._send(HttpMethod.POST, json=self.BODY)
+
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(transport.requests, 1)
+
+            response = run_sync(builder._send_async(HttpMethod.POST, None, json=self.BODY))
+
+        # an ordinary error is returned as it is, and the write is not sent again uncompressed
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(transport.requests, 2)
+        self.assertTrue(compression.supported(self.URL))
+        self.assertEqual(compression.stats()[0]["compressed_requests"], 2)
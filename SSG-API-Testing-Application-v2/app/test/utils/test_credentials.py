@@ -0,0 +1,53 @@
+import os
+import ssl
+import unittest
+
+from app.utils.credentials import ClientCredentials, default_ssl_context
+from app.test.resources.definitions import RESOURCES_PATH
+
+
+class TestCredentials(unittest.TestCase):
+    """
+    Tests all the methods and classes within the credentials file.
+    """
+
+    VALID_CERT_PATH = os.path.join(RESOURCES_PATH, "utils", "valid_cert.pem")
+    VALID_KEY_PATH = os.path.join(RESOURCES_PATH, "utils", "valid_key.pem")
+    INVALID_CERT_PATH = os.path.join(RESOURCES_PATH, "utils", "invalid_cert.pem")
+    INVALID_KEY_PATH = os.path.join(RESOURCES_PATH, "utils", "invalid_key.pem")
+
+    def test_load(self):
+        with open(self.VALID_CERT_PATH, "rb") as cert, open(self.VALID_KEY_PATH, "rb") as key:
+            credentials = ClientCredentials(cert.read(), key.read())
+
+        self.assertEqual(len(credentials.fingerprint), 64)
+        self.assertIsInstance(credentials.ssl_context, ssl.SSLContext)
+        self.assertEqual(credentials.ssl_context.verify_mode, ssl.CERT_REQUIRED)
+        self.assertNotIn("PRIVATE", repr(credentials))
+
+        # the pair is only parsed once per process
+        same = ClientCredentials.from_files(self.VALID_CERT_PATH, self.VALID_KEY_PATH)
+        self.assertEqual(credentials, same)
+        self.assertIs(credentials.ssl_context, same.ssl_context)
+        self.assertIsNot(credentials.ssl_context, default_ssl_context())
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            ClientCredentials("cert", "key")
+
+        with self.assertRaises(ValueError):
+            ClientCredentials.from_files(self.INVALID_CERT_PATH, self.INVALID_KEY_PATH)
+
+        with self.assertRaises(ValueError):
+            ClientCredentials.from_files(self.VALID_CERT_PATH, self.INVALID_KEY_PATH)
+
+        with self.assertRaises(ValueError):
+            ClientCredentials.from_files(self.VALID_KEY_PATH, self.VALID_CERT_PATH)
+
+    def test_http2_context(self):
+        credentials = ClientCredentials.from_files(self.VALID_CERT_PATH, self.VALID_KEY_PATH)
+
+        # HTTP/2 contexts are kept apart, as the protocols offered through ALPN are set on the context
+        self.assertIsNot(credentials.http2_ssl_context, credentials.ssl_context)
+        self.assertIs(credentials.http2_ssl_context, credentials.http2_ssl_context)
+        self.assertIsNot(default_ssl_context(http2=True), default_ssl_context())
@@ -0,0 +1,144 @@
+import socket
+import time
+import unittest
+
+from unittest.mock import Mock, patch
+
+from app.utils.dns_cache import DNS_CACHE, DNSCache
+
+
+class TestDNSCache(unittest.TestCase):
+    """
+    Tests all the methods and classes within the dns_cache file.
+    """
+
+    HOST = "api.cached.test"
+
+    def _cache(self, addresses: list, **kwargs) -> tuple[DNSCache, list]:
+        calls = []
+
+        def resolver(host, port, family=0, type=0, proto=0, flags=0):
+            calls.append(host)
+            result = addresses[min(len(calls), len(addresses)) - 1]
+
+            if isinstance(result, Exception):
+                raise result
+
+            return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (result, port))]
+
+        cache = DNSCache(hosts=[self.HOST], ttl_lookup=lambda host: None, **kwargs)
+        cache._resolver = resolver
+
+        return cache, calls
+
+    def test_init(self):
+        with self.assertRaises(ValueError):
+            DNSCache(default_ttl=0)
+
+        with self.assertRaises(ValueError):
+            DNSCache(refresh_ahead=1)
+
+        self.assertEqual(DNSCache.DEFAULT_HOSTS, ("uat-api.ssg-wsg.sg", "api.ssg-wsg.sg", "mock-api.ssg-wsg.sg"))
+
+    def test_hit(self):
+        cache, calls = self._cache(["10.0.0.1"])
+
+        first = cache.getaddrinfo(self.HOST.upper(), 443, 0, socket.SOCK_STREAM)
+        second = cache.getaddrinfo(self.HOST.encode(), 443, 0, socket.SOCK_STREAM)
+
+        self.assertEqual(first, second)
+        self.assertEqual(first[0][4], ("10.0.0.1", 443))
+        self.assertEqual(len(calls), 1)
+
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hosts"][0]["addresses"], ["10.0.0.1"])
+
+        # hosts that are not cached are always resolved
+        cache.getaddrinfo("other.test", 443)
+        cache.getaddrinfo("other.test", 443)
+        self.assertEqual(len(calls), 3)
+
+    def test_expiry(self):
+        cache, calls = self._cache(["10.0.0.1", "10.0.0.2"], default_ttl=0.05, min_ttl=0.01)
+
+        cache.getaddrinfo(self.HOST, 443)
+        time.sleep(0.06)
+
+        self.assertEqual(cache.getaddrinfo(self.HOST, 443)[0][4][0], "10.0.0.2")
+        self.assertEqual(cache.stats()["misses"], 2)
+
+    def test_refresh(self):
+        cache, calls = self._cache(["10.0.0.1", "10.0.0.2"], default_ttl=0.2, min_ttl=0.01, refresh_ahead=0.5)
+        cache.ttl_lookup = lambda host: 30
+
+        cache.getaddrinfo(self.HOST, 443)
+        time.sleep(0.12)
+
+        # the addresses are served from the cache while they are refreshed in the background
+        self.assertEqual(cache.getaddrinfo(self.HOST, 443)[0][4][0], "10.0.0.1")
+        time.sleep(0.1)
+
+        stats = cache.stats()
+        self.assertEqual(stats["refreshes"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hosts"][0]["ttl"], 30)
+        self.assertEqual(cache.getaddrinfo(self.HOST, 443)[0][4][0], "10.0.0.2")
+
+    def test_refresh_error(self):
+        cache, calls = self._cache(["10.0.0.1", "10.0.0.2"], default_ttl=0.2, min_ttl=0.01, refresh_ahead=0.5)
+        cache.ttl_lookup = Mock(side_effect=[RuntimeError("lookup failed"), 30])
+
+        cache.getaddrinfo(self.HOST, 443)
+        time.sleep(0.12)
+
+        # a refresh that fails with an unexpected error does not stop the addresses from being refreshed again
+        with patch("threading.excepthook"):
+            cache.getaddrinfo(self.HOST, 443)
+            time.sleep(0.02)
+
+        cache.getaddrinfo(self.HOST, 443)
+        time.sleep(0.05)
+
+        self.assertEqual(cache.ttl_lookup.call_count, 2)
+        self.assertEqual(cache.stats()["refreshes"], 1)
+        self.assertEqual(cache.getaddrinfo(self.HOST, 443)[0][4][0], "10.0.0.2")
+
+    def test_stale(self):
+        error = socket.gaierror(socket.EAI_AGAIN, "Temporary failure in name resolution")
+        cache, calls = self._cache(["10.0.0.1", error], default_ttl=0.05, min_ttl=0.01)
+
+        cache.getaddrinfo(self.HOST, 443)
+        time.sleep(0.06)
+
+        # the last known addresses are used while the resolver fails
+        self.assertEqual(cache.getaddrinfo(self.HOST, 443)[0][4][0], "10.0.0.1")
+        self.assertEqual(cache.stats()["stale_served"], 1)
+
+        cache, calls = self._cache(["10.0.0.1", error], default_ttl=0.05, min_ttl=0.01, max_stale=0)
+        cache.getaddrinfo(self.HOST, 443)
+        time.sleep(0.06)
+
+        with self.assertRaises(socket.gaierror):
+            cache.getaddrinfo(self.HOST, 443)
+
+        self.assertEqual(cache.stats()["errors"], 1)
+
+    def test_install(self):
+        # the HTTP layer installs the shared cache when it is imported
+        import app.utils.http_utils  # noqa: F401
+
+        self.assertEqual(socket.getaddrinfo, DNS_CACHE.getaddrinfo)
+
+        cache = DNSCache(hosts=["localhost"])
+        previous = socket.getaddrinfo
+        cache.install()
+
+        try:
+            socket.getaddrinfo("localhost", 80, 0, socket.SOCK_STREAM)
+            socket.getaddrinfo("localhost", 80, 0, socket.SOCK_STREAM)
+            self.assertEqual(cache.stats()["hits"], 1)
+        finally:
+            cache.uninstall()
+
+        self.assertEqual(socket.getaddrinfo, previous)
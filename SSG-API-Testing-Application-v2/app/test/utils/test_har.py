@@ -0,0 +1,206 @@
+import json
+import os
+import socket
+import tempfile
+import unittest
+
+from unittest.mock import patch
+
+import requests
+import streamlit as st
+
+from app.core.constants import HttpMethod
+from app.utils.async_http import AsyncClientPool, run_sync
+from app.utils.har import ConnectionTrace, HARRecorder, record_requests, session_recorder
+from app.utils.hedging import HedgeConfig, Hedger
+from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.middleware import MIDDLEWARE
+from app.utils.transport import InMemoryTransport, PooledTransport
+from app.test.resources.utils.local_server import LocalServer
+
+
+class TestHAR(unittest.TestCase):
+    """
+    Tests all the methods and classes within the har file.
+    """
+
+    def setUp(self):
+        ConnectionTrace.install()
+
+    def tearDown(self):
+        ConnectionTrace.uninstall()
+        MIDDLEWARE.clear()
+
+    def test_init(self):
+        with self.assertRaises(ValueError):
+            HARRecorder(max_entries=0)
+
+        with self.assertRaises(ValueError):
+            HARRecorder(flush_interval=-1)
+
+        with self.assertRaises(ValueError):
+            record_requests("yes")
+
+    def test_install(self):
+        getaddrinfo = socket.getaddrinfo
+        ConnectionTrace.install()
+        self.assertIs(socket.getaddrinfo, getaddrinfo)
+
+        ConnectionTrace.uninstall()
+        self.assertIsNot(socket.getaddrinfo, getaddrinfo)
+        ConnectionTrace.install()
+
+    def test_record(self):
+        recorder = HARRecorder()
+
+        with LocalServer() as server:
+            builder = HTTPRequestBuilder().with_endpoint(server.url, direct_argument="/courses") \
+                .with_param("page", 1) \
+                .with_body({"a": 1}) \
+                .with_middleware(recorder)
+
+            with patch.object(HTTPRequestBuilder, "_session", return_value=requests.Session()):
+                builder.get()
+                builder.post()
+
+        log = recorder.har()["log"]
+        self.assertEqual(log["version"], "1.2")
+        self.assertEqual(len(log["entries"]), 2)
+
+        entry = log["entries"][0]
+        self.assertEqual(entry["request"]["method"], "GET")
+        self.assertEqual(entry["request"]["url"], f"{server.url}/courses?page=1")
+        self.assertEqual(entry["request"]["queryString"], [{"name": "page", "value": "1"}])
+        self.assertEqual(entry["request"]["httpVersion"], "HTTP/1.1")
+        self.assertEqual(entry["response"]["status"], 200)
+        self.assertEqual(entry["response"]["content"]["size"], entry["response"]["bodySize"])
+        self.assertNotIn("text", entry["response"]["content"])
+
+        # a new connection was opened for the first request, which was not encrypted
+        timings = entry["timings"]
+        self.assertGreaterEqual(timings["connect"], 0)
+        self.assertEqual(timings["ssl"], -1)
+        self.assertTrue(all(timings[phase] >= 0 for phase in ("send", "wait", "receive")))
+        self.assertAlmostEqual(entry["time"], sum(value for value in timings.values() if value > 0), places=2)
+
+        # the connection was reused for the second request
+        entry = log["entries"][1]
+        self.assertEqual(entry["timings"]["connect"], -1)
+        self.assertEqual(entry["request"]["postData"], {"mimeType": "application/x-www-form-urlencoded", "text": ""})
+        self.assertEqual(entry["request"]["bodySize"], len("a=1"))
+
+    def test_bodies(self):
+        recorder = HARRecorder(bodies=True)
+
+        with LocalServer() as server:
+            builder = HTTPRequestBuilder().with_endpoint(server.url).with_middleware(recorder)
+
+            with patch.object(HTTPRequestBuilder, "_session", return_value=requests.Session()):
+                builder._send(HttpMethod.POST, data=b"\x1f\x8b\x00")
+
+        entry = recorder.har()["log"]["entries"][0]
+        self.assertEqual(entry["request"]["postData"]["text"], "H4sA")
+        self.assertEqual(entry["request"]["postData"]["_encoding"], "base64")
+        self.assertEqual(json.loads(entry["response"]["content"]["text"])["method"], "POST")
+
+    def test_async(self):
+        recorder = HARRecorder()
+
+        with LocalServer() as server:
+            pool = AsyncClientPool()
+            builder = HTTPRequestBuilder().with_endpoint(server.url) \
+                .with_middleware(recorder) \
+                .with_transport(PooledTransport(client_pool=pool))
+
+            run_sync(builder._send_async(HttpMethod.GET, None))
+            run_sync(pool.aclose())
+
+        # httpcore reports every phase of asynchronous requests
+        timings = recorder.har()["log"]["entries"][0]["timings"]
+        self.assertGreaterEqual(timings["connect"], 0)
+        self.assertGreater(timings["wait"], 0)
+        self.assertGreater(timings["send"], 0)
+
+    def test_error(self):
+        recorder = HARRecorder()
+        builder = HTTPRequestBuilder().with_endpoint("http://127.0.0.1:9").with_middleware(recorder)
+
+        with patch.object(HTTPRequestBuilder, "_session", return_value=requests.Session()):
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                builder._send(HttpMethod.POST)
+
+        entry = recorder.har()["log"]["entries"][0]
+        self.assertEqual(entry["response"]["status"], 0)
+        self.assertTrue(entry["response"]["_error"].startswith("ConnectionError"))
+
+    def test_flush(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "requests.har")
+            recorder = HARRecorder(path=path, max_entries=1, flush_interval=0)
+
+            with LocalServer() as server:
+                builder = HTTPRequestBuilder().with_endpoint(server.url).with_middleware(recorder)
+
+                with patch.object(HTTPRequestBuilder, "_session", return_value=requests.Session()):
+                    builder.get()
+                    builder.post()
+
+            recorder._writer.shutdown(wait=True)
+
+            with open(path) as f:
+                log = json.load(f)["log"]
+
+        # only the latest entries are kept
+        self.assertEqual([entry["request"]["method"] for entry in log["entries"]], ["POST"])
+        self.assertEqual(recorder.stats()["recorded"], 2)
+
+    def test_hedged(self):
+        recorder = HARRecorder()
+        hedger = Hedger(HedgeConfig(min_samples=5, min_delay=0))
+        url = "https://in-memory.test/courses/runs/1"
+
+        for _ in range(5):
+            hedger.observe(url, 0.1)
+
+        # the hedge is sent while the first attempt is still running, and the first attempt completes first
+        latencies = iter([0.3, 0.6])
+        transport = InMemoryTransport(latency=lambda: next(latencies, 0.0))
+
+        with patch("app.utils.http_utils.HEDGER", hedger):
+            builder = HTTPRequestBuilder().with_transport(transport) \
+                .with_endpoint(url) \
+                .with_hedging() \
+                .with_middleware(recorder)
+            builder.get()
+
+        self.assertEqual(hedger.stats()["hedged"], 1)
+
+        # the entry is that of the first attempt, whose response was used, rather than that of the hedge
+        entries = recorder.har()["log"]["entries"]
+        self.assertEqual(len(entries), 1)
+        self.assertGreaterEqual(entries[0]["time"], 280)
+
+    def test_record_requests(self):
+        session, other = {}, {}
+
+        with patch.object(st, "session_state", session):
+            self.assertIsNone(session_recorder())
+
+            recorder = record_requests(bodies=True)
+            self.assertIs(record_requests(bodies=True), recorder)
+            self.assertIs(session_recorder(), recorder)
+            self.assertEqual(HTTPRequestBuilder().middleware.middleware, (recorder,))
+
+        # other sessions do not record into the log of the session, and nothing is recorded for every session
+        with patch.object(st, "session_state", other):
+            self.assertIsNone(HTTPRequestBuilder().middleware)
+            self.assertIsNot(record_requests(), recorder)
+
+        self.assertEqual(MIDDLEWARE.middleware, ())
+
+        with patch.object(st, "session_state", session):
+            # stopping the recording keeps the log of the session, so that it can still be downloaded
+            self.assertIs(record_requests(False), recorder)
+            self.assertIsNone(session_recorder())
+            self.assertIsNone(HTTPRequestBuilder().middleware)
+            self.assertIsNone(recorder.stats()["path"])
@@ -0,0 +1,176 @@
+import threading
+import time
+import unittest
+
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from app.utils.hedging import HedgeConfig, Hedger
+from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.timeouts import Deadline
+from app.utils.transport import InMemoryTransport
+
+
+def _response(status: int = 200) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response.raw = MagicMock()
+    return response
+
+
+class TestHedging(unittest.TestCase):
+    """
+    Tests all the methods and classes within the hedging file.
+    """
+
+    URL = "https://in-memory.test/courses/runs/10026/sessions"
+
+    @staticmethod
+    def _hedger(samples: int = 5, latency: float = 0.02, **kwargs) -> Hedger:
+        hedger = Hedger(HedgeConfig(min_samples=samples, min_delay=0, **kwargs))
+
+        for _ in range(samples):
+            hedger.observe(TestHedging.URL, latency)
+
+        return hedger
+
+    def test_config(self):
+        with self.assertRaises(ValueError):
+            HedgeConfig(percentile=1)
+
+        with self.assertRaises(ValueError):
+            HedgeConfig(window=10, min_samples=20)
+
+        with self.assertRaises(ValueError):
+            HedgeConfig(max_tokens=0.5)
+
+        with self.assertRaises(ValueError):
+            Hedger(workers=1)
+
+    def test_route(self):
+        self.assertEqual(Hedger.route("https://API.test/courses/runs/10026/sessions?x=1"),
+                         "https://api.test/courses/runs/{id}/sessions")
+        self.assertEqual(Hedger.route("https://api.test/tpg/enrolments/details/ENR-2001-123456"),
+                         "https://api.test/tpg/enrolments/details/{id}")
+        self.assertEqual(Hedger.route("https://api.test"), "https://api.test/")
+
+    def test_delay(self):
+        hedger = Hedger(HedgeConfig(min_samples=10, min_delay=0.005))
+        self.assertIsNone(hedger.delay(self.URL))
+
+        for latency in range(1, 21):
+            hedger.observe(self.URL, latency / 1000)
+
+        # the 95th percentile of 1..20 ms, shared by every run of the route
+        self.assertEqual(hedger.delay(self.URL), 0.019)
+        self.assertEqual(hedger.delay(self.URL.replace("10026", "10027")), 0.019)
+
+        self.assertEqual(self._hedger(latency=0.001).delay(self.URL), 0.001)
+
+    def test_not_hedged(self):
+        hedger = Hedger()
+        response = _response()
+
+        # too few latencies have been observed
+        self.assertIs(hedger.run(self.URL, lambda: response), response)
+
+        hedger = self._hedger(latency=0.5)
+        self.assertIs(hedger.run(self.URL, lambda: response), response)
+        self.assertEqual(hedger.stats()["hedged"], 0)
+        self.assertEqual(hedger.stats()["requests"], 1)
+
+    def test_hedged(self):
+        hedger = self._hedger()
+        calls = []
+        slow = _response(201)
+        fast = _response(200)
+
+        def fn():
+            calls.append(1)
+
+            if len(calls) == 1:
+                time.sleep(0.3)
+                return slow
+
+            return fast
+
+        start = time.perf_counter()
+        self.assertIs(hedger.run(self.URL, fn), fast)
+        self.assertLess(time.perf_counter() - start, 0.25)
+        self.assertEqual(len(calls), 2)
+
+        stats = hedger.stats()
+        self.assertEqual((stats["hedged"], stats["hedges_won"]), (1, 1))
+        self.assertEqual(stats["routes"][0]["route"], "https://in-memory.test/courses/runs/{id}/sessions")
+
+        # the connection of the request that lost the race is released once it completes
+        time.sleep(0.4)
+        slow.raw.close.assert_called()
+
+    def test_errors(self):
+        hedger = self._hedger()
+        release = threading.Event()
+        response = _response()
+
+        def fails_slowly():
+            if not release.is_set():
+                release.set()
+                time.sleep(0.1)
+                raise requests.ConnectionError("Connection reset")
+
+            return response
+
+        # the hedge is used if the original request fails
+        self.assertIs(hedger.run(self.URL, fails_slowly), response)
+
+        def always_fails():
+            time.sleep(0.05)
+            raise requests.ConnectionError("Connection reset")
+
+        with self.assertRaises(requests.ConnectionError):
+            hedger.run(self.URL, always_fails)
+
+    def test_budget(self):
+        hedger = self._hedger(budget_ratio=0, max_tokens=1)
+
+        def fn():
+            time.sleep(0.05)
+            return _response()
+
+        hedger.run(self.URL, fn)
+        hedger.run(self.URL, fn)
+
+        stats = hedger.stats()
+        self.assertEqual((stats["hedged"], stats["denied_by_budget"]), (1, 1))
+
+        # the hedge cannot be sent before the deadline expires
+        hedger = self._hedger(latency=0.5)
+
+        with Deadline(0.1).scope():
+            hedger.run(self.URL, fn)
+
+        self.assertEqual(hedger.stats()["hedged"], 0)
+
+    def test_builder(self):
+        with self.assertRaises(ValueError):
+            HTTPRequestBuilder().with_hedging("yes")
+
+        latencies = iter([0.5])
+        transport = InMemoryTransport(latency=lambda: next(latencies, 0.0))
+        hedger = self._hedger()
+
+        with patch("app.utils.http_utils.HEDGER", hedger):
+            builder = HTTPRequestBuilder().with_transport(transport) \
+                .with_endpoint(self.URL) \
+                .with_hedging()
+
+            start = time.perf_counter()
+            self.assertEqual(builder.get().status_code, 200)
+            self.assertLess(time.perf_counter() - start, 0.4)
+            self.assertEqual(transport.requests, 2)
+            self.assertEqual(hedger.stats()["hedges_won"], 1)
+
+            # requests that are not hedged still have their latencies observed
+            HTTPRequestBuilder().with_transport(transport).with_endpoint(self.URL).get()
+            self.assertGreaterEqual(hedger.stats()["routes"][0]["samples"], 7)
@@ -1,6 +1,13 @@
+import json
 import unittest
 
+from unittest.mock import patch
+
+import requests
+
+from app.core.cipher.encrypt_decrypt import CIPHERTEXT_MEMO, KEY_RING, Cryptography
 from app.utils.http_utils import *
+from app.test.resources.utils.local_server import LocalServer
 
 
 class TestHttpUtils(unittest.TestCase):
@@ -115,3 +122,76 @@ class TestHttpUtils(unittest.TestCase):
                          .with_endpoint("https://www.google.com/")
                          .with_body({"data": "value"})
                          .repr(HttpMethod.GET), get2)
+
+    def test_encrypt_once(self):
+        key = "u/fzxu+5FBlE7Wq7OWRMVbGB4snxf8xNyFZdTQ3tHBU="
+        CIPHERTEXT_MEMO.clear()
+        hits = CIPHERTEXT_MEMO.stats()["hits"]
+
+        class _Request:
+            def __init__(self, builder: HTTPRequestBuilder):
+                self.req = builder
+
+            def __repr__(self):
+                return self.req.repr(HttpMethod.POST)
+
+        with LocalServer() as server:
+            request = _Request(HTTPRequestBuilder().with_endpoint(server.url).with_body({"data": "value"}))
+
+            with patch.object(Cryptography, "resolve_key", return_value=key), \
+                    patch.object(HTTPRequestBuilder, "_session", return_value=requests.Session()), \
+                    patch.object(KEY_RING, "encrypt", wraps=KEY_RING.encrypt) as encrypt:
+                handle_request(request, require_encryption=True)
+                response = request.req.post_encrypted()
+
+        # the payload previewed is the one sent, and it is only encrypted once
+        self.assertEqual(encrypt.call_count, 1)
+        self.assertEqual(json.loads(response.json()["body"]),
+                         Cryptography.encrypt(json.dumps({"data": "value"}), return_bytes=False, key=key))
+        self.assertEqual(CIPHERTEXT_MEMO.stats()["hits"], hits + 1)
+
+    def test_encrypt_once_streamed(self):
+        key = "u/fzxu+5FBlE7Wq7OWRMVbGB4snxf8xNyFZdTQ3tHBU="
+        body = {"documents": [{"content": "A" * 1_000_000}]}
+        size = len(json.dumps(body))
+        memo = CIPHERTEXT_MEMO.stats()
+        encrypt_stream = KEY_RING.encrypt_stream
+        encrypted = []
+
+        def counted(key: str, chunks):
+            def count():
+                for chunk in chunks:
+                    encrypted.append(len(chunk))
+                    yield chunk
+
+            return encrypt_stream(key, count())
+
+        class _Request:
+            def __init__(self, builder: HTTPRequestBuilder):
+                self.req = builder
+
+            def __repr__(self):
+                return self.req.repr(HttpMethod.POST)
+
+        with LocalServer() as server:
+            request = _Request(HTTPRequestBuilder().with_endpoint(server.url).with_body(body).with_streaming())
+
+            with patch.object(Cryptography, "resolve_key", return_value=key), \
+                    patch.object(HTTPRequestBuilder, "_session", return_value=requests.Session()), \
+                    patch.object(KEY_RING, "encrypt", wraps=KEY_RING.encrypt) as encrypt, \
+                    patch.object(KEY_RING, "encrypt_stream", side_effect=counted):
+                preview = request.req.preview_payload()
+                handle_request(request, require_encryption=True)
+                response = request.req.post_encrypted()
+
+        expected = Cryptography.encrypt(json.dumps(body), return_bytes=False, key=key)
+
+        # the preview only encrypts the start of the payload, which is then encrypted once while it is sent
+        self.assertEqual(preview, (expected[:HTTPRequestBuilder.PREVIEW_CHARS], True))
+        self.assertLess(sum(encrypted), size + 4 * HTTPRequestBuilder.PREVIEW_CHARS)
+        self.assertEqual(json.loads(response.json()["body"]), expected)
+        self.assertTrue(response.json()["chunked"])
+
+        # the ciphertext is never produced or held in full
+        encrypt.assert_not_called()
+        self.assertEqual(CIPHERTEXT_MEMO.stats()["bytes"], memo["bytes"])
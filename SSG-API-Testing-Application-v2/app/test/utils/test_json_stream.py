@@ -0,0 +1,110 @@
+import json
+import tracemalloc
+import unittest
+
+from app.core.cipher.encrypt_decrypt import Cryptography
+from app.utils.json_stream import ANY, decode_chunks, decrypt_json, iter_paths, parse_path, project
+from app.utils.timings import RequestTimings
+
+
+KEY = "u/fzxu+5FBlE7Wq7OWRMVbGB4snxf8xNyFZdTQ3tHBU="
+
+
+def _chunks(text: str, size: int):
+    return (text[i:i + size] for i in range(0, len(text), size))
+
+
+class TestJSONStream(unittest.TestCase):
+    """
+    Tests all the methods within the json_stream file.
+    """
+
+    DOCUMENT = {"data": {"enrolments": [{"referenceNumber": f"ENR-{i}",
+                                         "trainee": {"name": "Tan \"[ ]{ }\" é😀", "id": i},
+                                         "fees": {"discountAmount": 1.5e2, "collectionStatus": None},
+                                         "tags": [[], {}, True, False, -0.25]} for i in range(20)],
+                         "meta": {"total": 20}},
+                "status": 200}
+
+    def test_parse_path(self):
+        self.assertEqual(parse_path("data.enrolments[*].referenceNumber"), ("data", "enrolments", ANY,
+                                                                            "referenceNumber"))
+        self.assertEqual(parse_path("[0][1].a"), (0, 1, "a"))
+        self.assertEqual(parse_path(""), ())
+
+        for path in ("a..b", "a[x]", "a[", ".a"):
+            with self.assertRaises(ValueError):
+                parse_path(path)
+
+        with self.assertRaises(ValueError):
+            project(["{}"], [])
+
+    def test_project(self):
+        text = json.dumps(self.DOCUMENT)
+        expected = {"data": {"enrolments": [{"referenceNumber": f"ENR-{i}", "fees": {"collectionStatus": None}}
+                                            for i in range(20)],
+                             "meta": {"total": 20}}}
+
+        # values split across any number of chunks are parsed the same way
+        for size in (1, 3, 64, len(text)):
+            self.assertEqual(project(_chunks(text, size), ["data.enrolments[*].referenceNumber",
+                                                           "data.enrolments[*].fees.collectionStatus",
+                                                           "data.meta.total"]), expected)
+            self.assertEqual(project(_chunks(text, size), [""]), self.DOCUMENT)
+
+        # array items holding none of the values are kept as None to preserve indices
+        self.assertEqual(project([text], ["data.enrolments[1].trainee.name", "status"]),
+                         {"data": {"enrolments": [None, {"trainee": {"name": self.DOCUMENT["data"]["enrolments"][1]
+                                                                     ["trainee"]["name"]}}]},
+                          "status": 200})
+        self.assertIsNone(project([text], ["missing"]))
+        self.assertEqual(project(['{"a\\u0062": [1, 2]}'], ["ab[1]"]), {"ab": [None, 2]})
+
+    def test_iter_paths(self):
+        def produce():
+            yield '{"rows": [{"id": 1}, '
+            yield '{"id": 2}, '
+            raise AssertionError("The document was read past the rows needed!")
+
+        # values are yielded as soon as they are parsed, and the document is only read as far as needed
+        rows = iter_paths(produce(), ["rows[*].id"])
+        self.assertEqual(next(rows), (("rows", 0, "id"), 1))
+        self.assertEqual(next(rows), (("rows", 1, "id"), 2))
+
+    def test_invalid(self):
+        for text in ('{"a": 1} x', '{"a": ', '{"a" 1}', '{"a": [1, 2}', '{a: 1}', '{"b": {"c": [}', ""):
+            with self.assertRaises(json.JSONDecodeError):
+                project(_chunks(text, 2), ["a"])
+
+    def test_decode_chunks(self):
+        encoded = "é😀a".encode()
+        self.assertEqual("".join(decode_chunks(encoded[i:i + 1] for i in range(len(encoded)))), "é😀a")
+
+    def test_decrypt_json(self):
+        ciphertext = Cryptography.encrypt(json.dumps(self.DOCUMENT), key=KEY).decode()
+        timings = RequestTimings()
+
+        self.assertEqual(decrypt_json(ciphertext, key=KEY, timings=timings), self.DOCUMENT)
+        self.assertGreater(timings.get("decrypt"), 0)
+        self.assertGreater(timings.get("parse"), 0)
+        self.assertEqual(decrypt_json(ciphertext, ["status"], key=KEY), {"status": 200})
+
+        with self.assertRaises(ValueError):
+            decrypt_json(json.dumps(self.DOCUMENT), key=KEY)
+
+    def test_memory(self):
+        document = {"data": [{"referenceNumber": f"ENR-{i}", "trainee": {"name": "x" * 1000}} for i in range(8000)]}
+        ciphertext = Cryptography.encrypt(json.dumps(document), key=KEY).decode()
+        self.assertGreater(len(ciphertext), 8_000_000)
+
+        tracemalloc.start()
+
+        try:
+            rows = decrypt_json(ciphertext, ["data[*].referenceNumber"], key=KEY)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        # only the projected fields are ever held in memory, rather than the whole plaintext
+        self.assertEqual(len(rows["data"]), 8000)
+        self.assertLess(peak, 4_000_000)
@@ -0,0 +1,107 @@
+import time
+import unittest
+
+import requests
+
+from app.core.constants import Endpoints
+from app.utils.rate_limiter import TokenBucket, RateLimiter, RateLimitRule, RateLimitExceeded, parse_retry_after
+
+
+class TestRateLimiter(unittest.TestCase):
+    """
+    Tests all the methods and classes within the rate_limiter file.
+    """
+
+    @staticmethod
+    def _response(status: int, headers: dict = None) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers or {})
+        return response
+
+    def test_token_bucket(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(0, 1)
+
+        bucket = TokenBucket(rate=10, capacity=2)
+
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertAlmostEqual(bucket.reserve(), 0.1, delta=0.02)
+        self.assertEqual(bucket.reserve(max_wait=0.05), -1)
+
+        time.sleep(0.25)
+        self.assertEqual(bucket.reserve(), 0)
+
+    def test_token_bucket_block(self):
+        bucket = TokenBucket(rate=100, capacity=10)
+        bucket.block_for(0.5)
+
+        self.assertAlmostEqual(bucket.reserve(), 0.5, delta=0.05)
+
+    def test_rule_selection(self):
+        limiter = RateLimiter(rules=[RateLimitRule(rate=1, burst=1, endpoint=Endpoints.UAT),
+                                     RateLimitRule(rate=1, burst=5, endpoint=Endpoints.UAT,
+                                                   route_prefix="/tpg/enrolments")])
+
+        # the enrolments route has its own bucket with a larger burst
+        for _ in range(5):
+            self.assertEqual(limiter.reserve(f"{Endpoints.UAT.value}/tpg/enrolments/search", "12345678A"), 0)
+
+        self.assertEqual(limiter.reserve(f"{Endpoints.UAT.value}/courses/runs/1", "12345678A"), 0)
+        self.assertGreater(limiter.reserve(f"{Endpoints.UAT.value}/courses/runs/2", "12345678A"), 0)
+
+        # each UEN has its own bucket
+        self.assertEqual(limiter.reserve(f"{Endpoints.UAT.value}/courses/runs/1", "T99CC1234A"), 0)
+
+        # no rule applies to the other environments or to unknown hosts
+        self.assertEqual(limiter.reserve(f"{Endpoints.MOCK.value}/courses/runs/1", "12345678A"), 0)
+        self.assertEqual(limiter.reserve("http://localhost:8080/courses", "12345678A"), 0)
+
+        stats = limiter.stats()
+        self.assertEqual(stats["throttled"], 1)
+        self.assertEqual(len(stats["buckets"]), 3)
+
+    def test_max_wait(self):
+        limiter = RateLimiter(rules=[RateLimitRule(rate=1, burst=1)], max_wait=0.1)
+        limiter.acquire("http://localhost:8080/courses")
+
+        with self.assertRaises(RateLimitExceeded):
+            limiter.acquire("http://localhost:8080/courses")
+
+        self.assertEqual(limiter.stats()["rejected"], 1)
+
+        # a request may be given a shorter wait than the limiter allows, but never a longer one
+        limiter = RateLimiter(rules=[RateLimitRule(rate=10, burst=1)], max_wait=1)
+        limiter.acquire("http://localhost:8080/courses")
+
+        with self.assertRaises(RateLimitExceeded):
+            limiter.reserve("http://localhost:8080/courses", max_wait=0.01)
+
+        self.assertAlmostEqual(limiter.reserve("http://localhost:8080/courses", max_wait=5), 0.1, delta=0.02)
+
+    def test_configure(self):
+        limiter = RateLimiter(rules=[RateLimitRule(rate=1, burst=1)])
+        limiter.acquire("http://localhost:8080/courses")
+
+        limiter.configure(RateLimitRule(rate=1, burst=3))
+
+        for _ in range(3):
+            self.assertEqual(limiter.reserve("http://localhost:8080/courses"), 0)
+
+    def test_observe(self):
+        limiter = RateLimiter(rules=[RateLimitRule(rate=100, burst=100)])
+        url = f"{Endpoints.MOCK.value}/courses/runs/1"
+
+        limiter.observe(url, None, self._response(200, {"Retry-After": "5"}))
+        self.assertEqual(limiter.reserve(url), 0)
+
+        limiter.observe(url, None, self._response(429, {"Retry-After": "0.3"}))
+        self.assertAlmostEqual(limiter.reserve(url), 0.3, delta=0.05)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after(None, 1.0), 1.0)
+        self.assertEqual(parse_retry_after("2", 1.0), 2.0)
+        self.assertEqual(parse_retry_after("-2", 1.0), 0.0)
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", 1.0), 0.0)
+        self.assertEqual(parse_retry_after("soon", 1.0), 1.0)
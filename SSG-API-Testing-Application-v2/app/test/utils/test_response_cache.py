@@ -0,0 +1,224 @@
+import os
+import time
+import unittest
+
+from unittest.mock import patch
+
+import requests
+import streamlit as st
+
+from app.utils.credentials import ClientCredentials
+from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.response_cache import ResponseCache, CacheRule, CacheState, RESPONSE_CACHE, clone_response
+from app.test.resources.definitions import RESOURCES_PATH
+from app.test.resources.utils.local_server import LocalServer
+
+
+class TestResponseCache(unittest.TestCase):
+    """
+    Tests all the methods and classes within the response_cache file.
+    """
+
+    URL = "https://mock-api.ssg-wsg.sg/courses/courseRuns/id/1"
+    CERT_PATH = os.path.join(RESOURCES_PATH, "utils", "valid_cert.pem")
+    KEY_PATH = os.path.join(RESOURCES_PATH, "utils", "valid_key.pem")
+
+    @staticmethod
+    def _response(status: int, content: bytes = b"{}", headers: dict = None) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        response._content = content
+        response.headers.update(headers or {})
+        return response
+
+    def setUp(self):
+        RESPONSE_CACHE.clear()
+
+    def test_init(self):
+        with self.assertRaises(ValueError):
+            ResponseCache(max_bytes=-1)
+
+    def test_key(self):
+        key1 = ResponseCache.key("get", "HTTPS://Mock-API.ssg-wsg.sg/courses", {"b": 1, "a": "x"}, "12345678A")
+        key2 = ResponseCache.key("GET", "https://mock-api.ssg-wsg.sg/courses", {"a": "x", "b": 1}, "12345678A")
+
+        self.assertEqual(key1, key2)
+        self.assertNotEqual(key1, ResponseCache.key("GET", "https://mock-api.ssg-wsg.sg/courses", {"a": "x"},
+                                                    "12345678A"))
+        self.assertNotEqual(key1, ResponseCache.key("GET", "https://mock-api.ssg-wsg.sg/courses", {"a": "x", "b": 1},
+                                                    "T99CC1234A"))
+        self.assertNotEqual(key1, ResponseCache.key("GET", "https://uat-api.ssg-wsg.sg/courses", {"a": "x", "b": 1},
+                                                    "12345678A"))
+
+        # requests sent with other credentials, or with other headers that the response varies by, are kept apart
+        self.assertNotEqual(key1, ResponseCache.key("GET", "https://mock-api.ssg-wsg.sg/courses", {"a": "x", "b": 1},
+                                                    "12345678A", "fingerprint"))
+        self.assertNotEqual(key1, ResponseCache.key("GET", "https://mock-api.ssg-wsg.sg/courses", {"a": "x", "b": 1},
+                                                    "12345678A", headers={"x-api-version": "v2.0"}))
+        self.assertEqual(ResponseCache.key("GET", self.URL, headers={"Accept-Encoding": "gzip", "Authorization": "a"}),
+                         ResponseCache.key("GET", self.URL, headers={"accept-encoding": "gzip"}))
+
+    def test_rule_for(self):
+        cache = ResponseCache()
+
+        self.assertEqual(cache.rule_for(self.URL).pattern, "/courses/courseRuns/id/*")
+        self.assertEqual(cache.rule_for("https://mock-api.ssg-wsg.sg/courses/runs/1/sessions/attendance").pattern,
+                         "/courses/runs/*/sessions/attendance")
+        self.assertEqual(cache.rule_for("https://mock-api.ssg-wsg.sg/courses/runs/1/sessions").pattern,
+                         "/courses/runs/*/sessions")
+        self.assertIsNone(cache.rule_for("https://mock-api.ssg-wsg.sg/tpg/enrolments/search"))
+
+    def test_lookup(self):
+        cache = ResponseCache(rules=[CacheRule("/courses/*", ttl=0.1, stale_ttl=0.1)])
+        key = ResponseCache.key("GET", self.URL)
+
+        self.assertEqual(cache.lookup(key), (None, CacheState.MISS))
+
+        cache.update(key, self.URL, self._response(200, b'{"a": 1}'))
+        entry, state = cache.lookup(key)
+        self.assertEqual(state, CacheState.FRESH)
+        self.assertEqual(entry.response.json(), {"a": 1})
+
+        time.sleep(0.12)
+        self.assertEqual(cache.lookup(key)[1], CacheState.STALE)
+
+        time.sleep(0.1)
+        self.assertEqual(cache.lookup(key)[1], CacheState.EXPIRED)
+
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["stale_hits"], 1)
+        self.assertEqual(stats["misses"], 2)
+
+    def test_update(self):
+        cache = ResponseCache()
+        key = ResponseCache.key("GET", self.URL)
+
+        cache.update(key, self.URL, self._response(404))
+        self.assertEqual(cache.lookup(key)[1], CacheState.MISS)
+
+        cache.update(key, self.URL, self._response(200, headers={"Cache-Control": "no-store"}))
+        self.assertEqual(cache.lookup(key)[1], CacheState.MISS)
+
+        other = "https://mock-api.ssg-wsg.sg/tpg/enrolments/search"
+        cache.update(ResponseCache.key("GET", other), other, self._response(200))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+        cache.update(key, self.URL, self._response(200))
+        self.assertEqual(cache.stats()["entries"], 1)
+
+        # an error response evicts the cached response
+        cache.update(key, self.URL, self._response(500))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_eviction(self):
+        cache = ResponseCache(rules=[CacheRule("*", ttl=60)], max_bytes=10)
+        keys = [ResponseCache.key("GET", f"{self.URL}{i}") for i in range(3)]
+
+        cache.update(keys[0], self.URL, self._response(200, b"1234"))
+        cache.update(keys[1], self.URL, self._response(200, b"1234"))
+        cache.lookup(keys[0])
+        cache.update(keys[2], self.URL, self._response(200, b"1234"))
+
+        # the least recently used entry is evicted first
+        self.assertEqual(cache.lookup(keys[1])[1], CacheState.MISS)
+        self.assertEqual(cache.lookup(keys[0])[1], CacheState.FRESH)
+        self.assertEqual(cache.stats()["bytes"], 8)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+        cache.update(keys[1], self.URL, self._response(200, b"12345678901"))
+        self.assertEqual(cache.lookup(keys[1])[1], CacheState.MISS)
+
+    def test_revalidation(self):
+        cache = ResponseCache()
+        key = ResponseCache.key("GET", self.URL)
+        cached = self._response(200, b'{"a": 1}', {"ETag": '"v1"', "Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"})
+
+        self.assertEqual(ResponseCache.validators(None), {})
+
+        cache.update(key, self.URL, cached)
+        entry, _ = cache.lookup(key)
+        self.assertEqual(ResponseCache.validators(entry), {"If-None-Match": '"v1"',
+                                                           "If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT"})
+
+        response = cache.update(key, self.URL, self._response(304, b""), entry)
+        self.assertEqual(response.json(), {"a": 1})
+        self.assertEqual(response.headers["X-Cache"], "HIT")
+        self.assertEqual(cache.stats()["revalidated"], 1)
+
+    def test_clone_response(self):
+        response = self._response(200, b'{"a": 1}')
+        clone = clone_response(response, CacheState.STALE)
+        clone.headers["X-Test"] = "1"
+
+        self.assertEqual(clone.json(), {"a": 1})
+        self.assertEqual(clone.headers["X-Cache"], "STALE")
+        self.assertNotIn("X-Test", response.headers)
+
+    def test_with_cache(self):
+        with self.assertRaises(ValueError):
+            HTTPRequestBuilder().with_cache("yes")
+
+        self.assertFalse(HTTPRequestBuilder().cache)
+        self.assertTrue(HTTPRequestBuilder().with_cache().cache)
+
+    def test_get(self):
+        with (LocalServer(etag='"v1"') as server,
+              patch.object(HTTPRequestBuilder, "_session", return_value=requests.Session())):
+            builder = HTTPRequestBuilder() \
+                .with_endpoint(server.url, direct_argument="/courses/courseRuns/id/1") \
+                .with_cache()
+
+            first = builder.get()
+            second = builder.get()
+
+            self.assertEqual(first.json(), second.json())
+            self.assertEqual(second.headers["X-Cache"], "HIT")
+            self.assertEqual(server.hits, 1)
+
+            bypassed = builder.get(bypass_cache=True)
+            self.assertEqual(bypassed.json()["hits"], 2)
+            self.assertEqual(builder.get().json()["hits"], 2)
+
+            # expired entries are revalidated with a conditional request
+            key = builder._cache_key(None)
+            RESPONSE_CACHE.lookup(key)[0].stored_at -= 3600
+
+            revalidated = builder.get()
+            self.assertEqual(revalidated.json()["hits"], 2)
+            self.assertEqual(server.hits, 3)
+            self.assertEqual(RESPONSE_CACHE.stats()["revalidated"], 1)
+
+            # responses fetched with one set of client credentials are never served to another
+            credentials = ClientCredentials.from_files(self.CERT_PATH, self.KEY_PATH)
+
+            with patch.object(st, "session_state", {"credentials": credentials}):
+                self.assertEqual(builder.get().json()["hits"], 4)
+                self.assertEqual(builder.get().headers["X-Cache"], "HIT")
+
+            self.assertEqual(builder.get().json()["hits"], 2)
+
+    def test_get_stale(self):
+        with (LocalServer() as server,
+              patch.object(HTTPRequestBuilder, "_session", return_value=requests.Session())):
+            builder = HTTPRequestBuilder() \
+                .with_endpoint(server.url, direct_argument="/courses/courseRuns/id/1") \
+                .with_cache()
+
+            builder.get()
+            key = builder._cache_key(None)
+            entry = RESPONSE_CACHE.lookup(key)[0]
+            entry.stored_at -= entry.rule.ttl + 1
+
+            stale = builder.get()
+            self.assertEqual(stale.headers["X-Cache"], "STALE")
+            self.assertEqual(stale.json()["hits"], 1)
+
+            # the stale entry is refreshed in the background
+            for _ in range(50):
+                if RESPONSE_CACHE.lookup(key)[1] == CacheState.FRESH:
+                    break
+
+                time.sleep(0.02)
+
+            self.assertEqual(builder.get().json()["hits"], 2)
@@ -0,0 +1,143 @@
+import ssl
+import unittest
+
+import httpx
+import requests
+
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+from app.core.constants import HttpMethod
+from app.utils.async_http import run_sync, translate_error
+from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.retry import RetryPolicy, is_connect_error, IDEMPOTENT_RETRY, CONNECT_ONLY_RETRY, NO_RETRY
+from app.utils.session_pool import TLSHandshakeError
+from app.utils.transport import RequestsTransport
+from app.test.resources.utils.local_server import LocalServer, LocalTLSServer
+
+
+class TestRetry(unittest.TestCase):
+    """
+    Tests all the methods and classes within the retry file.
+    """
+
+    @staticmethod
+    def _response(status: int) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        return response
+
+    @staticmethod
+    def _connect_error() -> requests.ConnectionError:
+        reason = NewConnectionError(None, "Connection refused")
+        return requests.ConnectionError(MaxRetryError(None, "/", reason))
+
+    def test_init(self):
+        with self.assertRaises(ValueError):
+            RetryPolicy(max_attempts=0)
+
+        with self.assertRaises(ValueError):
+            RetryPolicy(budget=-1)
+
+    @staticmethod
+    def _tls_errors(url: str) -> tuple[Exception, Exception]:
+        errors = []
+
+        try:
+            RequestsTransport().session(url).get(url, timeout=5)
+        except requests.RequestException as ex:
+            errors.append(ex)
+
+        try:
+            try:
+                httpx.get(url, timeout=5)
+            except httpx.HTTPError as ex:
+                raise translate_error(ex) from ex
+        except requests.RequestException as ex:
+            errors.append(ex)
+
+        return errors[0], errors[1]
+
+    def test_is_connect_error(self):
+        self.assertTrue(is_connect_error(self._connect_error()))
+        self.assertTrue(is_connect_error(requests.exceptions.ConnectTimeout()))
+
+        # a failed TLS handshake counts, unless the certificate of the server failed verification
+        with LocalServer() as server:
+            sync_error, async_error = self._tls_errors(server.url.replace("http://", "https://"))
+
+        # the synchronous path reports the handshake error by its type, and the asynchronous path as a ConnectError
+        self.assertIsInstance(sync_error, requests.exceptions.SSLError)
+        self.assertIsInstance(sync_error.args[0].reason.args[0], TLSHandshakeError)
+        self.assertTrue(is_connect_error(sync_error))
+
+        self.assertIsInstance(async_error, requests.exceptions.SSLError)
+        self.assertIsInstance(async_error.__cause__, httpx.ConnectError)
+        self.assertTrue(is_connect_error(async_error))
+
+        with LocalTLSServer(http2=False) as server:
+            for error in self._tls_errors(server.url):
+                self.assertIsInstance(error, requests.exceptions.SSLError)
+                self.assertFalse(is_connect_error(error))
+
+        # TLS errors that were not raised during the handshake do not count
+        self.assertFalse(is_connect_error(requests.exceptions.SSLError()))
+        self.assertFalse(is_connect_error(requests.exceptions.SSLError(ssl.SSLError(1, "[SSL] decryption failed"))))
+        self.assertFalse(is_connect_error(requests.ConnectionError("Connection reset by peer")))
+        self.assertFalse(is_connect_error(requests.exceptions.ReadTimeout()))
+
+    def test_backoff(self):
+        policy = RetryPolicy(base_delay=1, max_delay=3)
+
+        for attempt in range(1, 10):
+            delay = policy.backoff(attempt)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(3, 2 ** (attempt - 1)))
+
+    def test_idempotent(self):
+        self.assertIsNotNone(IDEMPOTENT_RETRY.next_delay(1, 0, error=requests.exceptions.ReadTimeout()))
+        self.assertIsNotNone(IDEMPOTENT_RETRY.next_delay(1, 0, response=self._response(503)))
+        self.assertIsNone(IDEMPOTENT_RETRY.next_delay(1, 0, response=self._response(400)))
+        self.assertIsNone(IDEMPOTENT_RETRY.next_delay(3, 0, response=self._response(503)))
+
+    def test_connect_only(self):
+        self.assertIsNotNone(CONNECT_ONLY_RETRY.next_delay(1, 0, error=self._connect_error()))
+        self.assertIsNotNone(CONNECT_ONLY_RETRY.next_delay(1, 0, response=self._response(429)))
+        self.assertIsNone(CONNECT_ONLY_RETRY.next_delay(1, 0, error=requests.exceptions.ReadTimeout()))
+        self.assertIsNone(CONNECT_ONLY_RETRY.next_delay(1, 0, response=self._response(503)))
+
+        guarded = RetryPolicy(idempotent=False, idempotency_header="Idempotency-Key")
+        self.assertIsNotNone(guarded.next_delay(1, 0, error=requests.exceptions.ReadTimeout()))
+        self.assertIn("Idempotency-Key", guarded.idempotency_headers())
+        self.assertEqual(CONNECT_ONLY_RETRY.idempotency_headers(), {})
+
+    def test_budget(self):
+        policy = RetryPolicy(max_attempts=10, base_delay=1, max_delay=1, budget=0.5)
+
+        self.assertIsNone(policy.next_delay(1, 0.5, response=self._response(503)))
+        self.assertIsNone(NO_RETRY.next_delay(1, 0, error=self._connect_error()))
+
+    def test_with_retry_policy(self):
+        with self.assertRaises(ValueError):
+            HTTPRequestBuilder().with_retry_policy("policy")
+
+        builder = HTTPRequestBuilder()
+        self.assertIs(builder._policy(HttpMethod.GET), IDEMPOTENT_RETRY)
+        self.assertIs(builder._policy(HttpMethod.POST), CONNECT_ONLY_RETRY)
+        self.assertIs(builder.with_retry_policy(NO_RETRY)._policy(HttpMethod.GET), NO_RETRY)
+
+    def test_send_retries(self):
+        policy = RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=0.01)
+
+        with LocalServer(status=503) as server:
+            builder = HTTPRequestBuilder().with_endpoint(server.url).with_retry_policy(policy)
+            response = run_sync(builder._send_async(HttpMethod.GET, None, None))
+
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(server.hits, 3)
+
+        with LocalServer(status=503) as server:
+            builder = HTTPRequestBuilder().with_endpoint(server.url).with_retry_policy(CONNECT_ONLY_RETRY)
+            response = run_sync(builder._send_async(HttpMethod.POST, None, None, json="ciphertext"))
+
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(server.hits, 1)
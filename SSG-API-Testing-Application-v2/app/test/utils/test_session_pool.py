@@ -0,0 +1,97 @@
+import os
+import ssl
+import unittest
+
+from app.utils.credentials import ClientCredentials
+from app.utils.session_pool import SessionPool
+from app.test.resources.definitions import RESOURCES_PATH
+from app.test.resources.utils.local_server import LocalServer
+
+
+class TestSessionPool(unittest.TestCase):
+    """
+    Tests all the methods in the session_pool.py file.
+    """
+
+    VALID_CERT_PATH = os.path.join(RESOURCES_PATH, "utils", "valid_cert.pem")
+    VALID_KEY_PATH = os.path.join(RESOURCES_PATH, "utils", "valid_key.pem")
+
+    def test_init(self):
+        with self.assertRaises(ValueError):
+            SessionPool(pool_connections=0)
+
+        with self.assertRaises(ValueError):
+            SessionPool(pool_maxsize=-1)
+
+    def test_origin(self):
+        self.assertEqual(SessionPool.origin("https://UAT-API.ssg-wsg.sg/courses/runs?x=1"),
+                         "https://uat-api.ssg-wsg.sg")
+        self.assertEqual(SessionPool.origin("http://localhost:8080/a"), "http://localhost:8080")
+
+        with self.assertRaises(ValueError):
+            SessionPool.origin("uat-api.ssg-wsg.sg")
+
+    def test_fingerprint(self):
+        credentials = ClientCredentials.from_files(self.VALID_CERT_PATH, self.VALID_KEY_PATH)
+
+        self.assertEqual(SessionPool.fingerprint(None), "")
+        self.assertEqual(SessionPool.fingerprint(credentials), credentials.fingerprint)
+
+    def test_ssl_context(self):
+        credentials = ClientCredentials.from_files(self.VALID_CERT_PATH, self.VALID_KEY_PATH)
+        context = SessionPool.ssl_context(credentials)
+
+        self.assertIsInstance(context, ssl.SSLContext)
+        self.assertEqual(context.verify_mode, ssl.CERT_REQUIRED)
+        self.assertIs(context, SessionPool.ssl_context(credentials))
+        self.assertIsNot(context, SessionPool.ssl_context(None))
+
+    def test_session_reuse(self):
+        pool = SessionPool()
+
+        session1 = pool.session("https://uat-api.ssg-wsg.sg/courses")
+        session2 = pool.session("https://uat-api.ssg-wsg.sg/tpg/enrolments")
+        session3 = pool.session("https://mock-api.ssg-wsg.sg/courses")
+        session4 = pool.session("https://uat-api.ssg-wsg.sg/courses",
+                                ClientCredentials.from_files(self.VALID_CERT_PATH, self.VALID_KEY_PATH))
+
+        self.assertIs(session1, session2)
+        self.assertIsNot(session1, session3)
+        self.assertIsNot(session1, session4)
+
+        stats = pool.stats()
+        self.assertEqual(stats["sessions"], 3)
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 3)
+        pool.close_all()
+        self.assertEqual(pool.stats()["sessions"], 0)
+
+    def test_connection_reuse(self):
+        pool = SessionPool()
+
+        with LocalServer() as server:
+            for _ in range(5):
+                response = pool.session(server.url).get(f"{server.url}/courses")
+                self.assertEqual(response.status_code, 200)
+
+            stats = pool.stats()["pools"][0]
+            self.assertEqual(stats["requests"], 5)
+            self.assertEqual(stats["connections_opened"], 1)
+            self.assertEqual(stats["idle_connections"], 1)
+
+            self.assertTrue(pool.close(server.url))
+            self.assertFalse(pool.close(server.url))
+
+    def test_sweep(self):
+        pool = SessionPool()
+
+        pool.session("https://uat-api.ssg-wsg.sg", owner="a")
+        pool.session("https://uat-api.ssg-wsg.sg", owner="b")
+        pool.session("https://mock-api.ssg-wsg.sg", owner="a")
+        pool.session("https://api.ssg-wsg.sg")
+
+        self.assertEqual(pool.release("a"), 1)
+        self.assertEqual(pool.stats()["sessions"], 2)
+
+        self.assertEqual(pool.sweep(lambda owner: False), 1)
+        self.assertEqual(pool.stats()["sessions"], 1)
@@ -0,0 +1,178 @@
+import time
+import unittest
+
+from unittest.mock import patch
+
+import requests
+import streamlit as st
+
+from app.core.constants import Endpoints, HttpMethod
+from app.utils.async_http import AsyncClientPool, run_sync
+from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.middleware import MIDDLEWARE
+from app.utils.shadow import (SHADOW_TRAFFIC, ShadowTarget, ShadowTraffic, enable_shadow_traffic, is_read,
+                              shadow_target, structural_diff)
+from app.utils.transport import PooledTransport
+from app.test.resources.utils.local_server import LocalServer
+
+
+class TestShadow(unittest.TestCase):
+    """
+    Tests all the methods and classes within the shadow file.
+    """
+
+    def tearDown(self):
+        MIDDLEWARE.clear()
+
+    def _wait(self, shadow: ShadowTraffic, count: int) -> None:
+        deadline = time.monotonic() + 5
+
+        while len(shadow.comparisons()) < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_init(self):
+        with self.assertRaises(ValueError):
+            ShadowTraffic(workers=0)
+
+        with self.assertRaises(ValueError):
+            ShadowTraffic(history=0)
+
+    def test_is_read(self):
+        self.assertTrue(is_read(HttpMethod.GET, "https://api.ssg-wsg.sg/courses/runs/1"))
+        self.assertTrue(is_read(HttpMethod.POST, "https://api.ssg-wsg.sg/tpg/enrolments/search"))
+        self.assertFalse(is_read(HttpMethod.POST, "https://api.ssg-wsg.sg/tpg/enrolments"))
+
+    def test_structural_diff(self):
+        self.assertEqual(structural_diff({"a": [1, 2], "b": {"c": "x"}}, {"a": [3, 4], "b": {"c": "y"}}), [])
+        self.assertEqual(structural_diff({"a": 1}, {"a": 1.5}), [])
+        self.assertEqual(structural_diff({"a": 1, "b": 2}, {"a": 1, "c": 3}),
+                         ["$.b: missing from shadow", "$.c: missing from primary"])
+        self.assertEqual(structural_diff({"a": [{"b": 1}]}, {"a": [{"b": "1"}, {"b": "2"}]}),
+                         ["$.a: 1 != 2 items", "$.a[0].b: int != str"])
+        self.assertEqual(structural_diff({"a": True}, {"a": 1}), ["$.a: bool != int"])
+
+    def test_shadow(self):
+        with LocalServer() as primary, LocalServer(delay=0.05) as secondary:
+            shadow = ShadowTraffic(shadow=secondary.url)
+            builder = HTTPRequestBuilder().with_endpoint(primary.url, direct_argument="/courses/runs/1") \
+                .with_middleware(shadow)
+
+            with patch.object(HTTPRequestBuilder, "_session", return_value=requests.Session()):
+                response = builder.get()
+
+            # the primary response is returned without waiting for the shadow response
+            self.assertEqual(response.json()["path"], "/courses/runs/1")
+            self.assertEqual(shadow.comparisons(), [])
+
+            self._wait(shadow, 1)
+            self.assertEqual(secondary.hits, 1)
+
+            comparison = shadow.comparisons()[0]
+            self.assertTrue(comparison.matches)
+            self.assertEqual(comparison.route, f"{secondary.url}/courses/runs/{{id}}")
+            self.assertGreater(comparison.shadow_ms, comparison.primary_ms)
+
+            pool = AsyncClientPool()
+            builder.with_transport(PooledTransport(client_pool=pool))
+
+            with patch.object(HTTPRequestBuilder, "_credentials", return_value=None):
+                run_sync(builder.get_async())
+
+            run_sync(pool.aclose())
+
+            self._wait(shadow, 2)
+            self.assertEqual(secondary.hits, 2)
+
+            # writes are never mirrored
+            with patch.object(HTTPRequestBuilder, "_session", return_value=requests.Session()):
+                HTTPRequestBuilder().with_endpoint(primary.url).with_middleware(shadow).post()
+
+            time.sleep(0.1)
+            self.assertEqual(secondary.hits, 2)
+
+        stats = shadow.stats()
+        self.assertEqual((stats["compared"], stats["mismatched"], stats["skipped"]), (2, 0, 0))
+        self.assertIsNotNone(stats["shadow_p95_ms"])
+
+    def test_mismatch(self):
+        with LocalServer() as primary, LocalServer(status=500) as secondary:
+            shadow = ShadowTraffic(shadow=secondary.url)
+
+            with patch.object(HTTPRequestBuilder, "_session", return_value=requests.Session()):
+                HTTPRequestBuilder().with_endpoint(primary.url).with_middleware(shadow).get()
+
+            self._wait(shadow, 1)
+
+        comparison = shadow.comparisons()[0]
+        self.assertFalse(comparison.matches)
+        self.assertEqual((comparison.primary_status, comparison.shadow_status), (200, 500))
+        self.assertEqual(shadow.stats()["mismatched"], 1)
+
+        # failures of the shadow endpoint are recorded, but never affect the primary request
+        shadow = ShadowTraffic(shadow="http://127.0.0.1:9")
+
+        with LocalServer() as primary:
+            with patch.object(HTTPRequestBuilder, "_session", return_value=requests.Session()):
+                response = HTTPRequestBuilder().with_endpoint(primary.url).with_middleware(shadow).get()
+
+            self._wait(shadow, 1)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(shadow.comparisons()[0].error.startswith("Shadow failed"))
+
+    def test_bounded(self):
+        with LocalServer() as primary, LocalServer(delay=0.3) as secondary:
+            shadow = ShadowTraffic(shadow=secondary.url, workers=1)
+
+            with patch.object(HTTPRequestBuilder, "_session", return_value=requests.Session()):
+                for _ in range(3):
+                    HTTPRequestBuilder().with_endpoint(primary.url).with_middleware(shadow).get()
+
+            # requests sent while every worker is busy are not mirrored
+            self._wait(shadow, 1)
+            self.assertEqual(shadow.stats()["skipped"], 2)
+            self.assertEqual(secondary.hits, 1)
+
+    def test_session_state(self):
+        # without a shadow endpoint selected in the session state, requests are not mirrored
+        with LocalServer() as primary:
+            with patch.object(HTTPRequestBuilder, "_session", return_value=requests.Session()):
+                HTTPRequestBuilder().with_endpoint(primary.url).with_middleware(ShadowTraffic()).get()
+
+            self.assertEqual(primary.hits, 1)
+
+        enable_shadow_traffic()
+        enable_shadow_traffic()
+        self.assertEqual(MIDDLEWARE.middleware, (SHADOW_TRAFFIC,))
+
+        # the shadow environment, key and credentials of the session are read when the request is created
+        with patch.object(st, "session_state", {"shadow_url": Endpoints.UAT, "encryption_key": "key"}):
+            self.assertEqual(shadow_target(), ShadowTarget(origin=Endpoints.UAT.value, key="key"))
+            self.assertEqual(HTTPRequestBuilder().shadow, shadow_target())
+
+        with patch.object(st, "session_state", {"shadow_url": None}):
+            self.assertIsNone(shadow_target())
+
+        with self.assertRaises(ValueError):
+            HTTPRequestBuilder().with_shadow(Endpoints.UAT.value)
+
+    def test_target(self):
+        shadow = ShadowTraffic()
+
+        with LocalServer() as primary, LocalServer() as secondary:
+            builder = HTTPRequestBuilder().with_endpoint(primary.url) \
+                .with_middleware(shadow) \
+                .with_shadow(ShadowTarget(origin=secondary.url))
+            pool = AsyncClientPool()
+            builder.with_transport(PooledTransport(client_pool=pool))
+
+            # the hooks run without reading the session state, which the event loop sending the request cannot read
+            with patch.object(st, "session_state", {}), \
+                    patch.object(HTTPRequestBuilder, "_credentials", return_value=None):
+                run_sync(builder.get_async())
+
+            run_sync(pool.aclose())
+            self._wait(shadow, 1)
+
+            self.assertEqual(secondary.hits, 1)
+            self.assertTrue(shadow.comparisons()[0].matches)
@@ -0,0 +1,88 @@
+import threading
+import time
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import requests
+
+from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.single_flight import SingleFlight
+from app.test.resources.utils.local_server import LocalServer
+
+
+class TestSingleFlight(unittest.TestCase):
+    """
+    Tests all the methods and classes within the single_flight file.
+    """
+
+    def test_key(self):
+        key = SingleFlight.key("GET", "https://mock-api.ssg-wsg.sg/courses", {"a": 1}, {"Accept": "json"}, "12345678A")
+
+        self.assertEqual(key, SingleFlight.key("get", "https://MOCK-API.ssg-wsg.sg/courses", {"a": 1},
+                                               {"accept": "json"}, "12345678A"))
+        self.assertNotEqual(key, SingleFlight.key("GET", "https://mock-api.ssg-wsg.sg/courses", {"a": 1},
+                                                  {"Accept": "json", "x-api-version": "v1"}, "12345678A"))
+        self.assertNotEqual(key, SingleFlight.key("GET", "https://mock-api.ssg-wsg.sg/courses", {"a": 1},
+                                                  {"Accept": "json"}, "12345678A", scope=1))
+
+    def test_do(self):
+        flight = SingleFlight()
+        calls = []
+        started = threading.Event()
+
+        def call():
+            calls.append(1)
+            started.set()
+            time.sleep(0.2)
+            return object()
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            leader = executor.submit(flight.do, "key", call)
+            started.wait()
+            followers = [executor.submit(flight.do, "key", call) for _ in range(4)]
+            results = [leader.result()] + [f.result() for f in followers]
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(results[0][1])
+        self.assertTrue(all(result is results[0][0] and not leader for result, leader in results[1:]))
+        self.assertEqual(flight.stats(), {"in_flight": 0, "leaders": 1, "coalesced": 4})
+
+        # completed calls are not reused
+        self.assertTrue(flight.do("key", call)[1])
+        self.assertEqual(len(calls), 2)
+
+    def test_do_error(self):
+        flight = SingleFlight()
+        started = threading.Event()
+
+        def call():
+            started.set()
+            time.sleep(0.2)
+            raise ValueError("failed")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(flight.do, "key", call)
+            started.wait()
+            follower = executor.submit(flight.do, "key", call)
+
+            with self.assertRaises(ValueError):
+                leader.result()
+
+            with self.assertRaises(ValueError):
+                follower.result()
+
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+    def test_get(self):
+        with (LocalServer(delay=0.3) as server,
+              patch.object(HTTPRequestBuilder, "_session", return_value=requests.Session())):
+            builder = HTTPRequestBuilder().with_endpoint(server.url, direct_argument="/courses/runs/1")
+
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                responses = list(executor.map(lambda _: builder.get(), range(4)))
+
+            self.assertEqual(server.hits, 1)
+            self.assertTrue(all(response.json() == responses[0].json() for response in responses))
+            self.assertEqual(len({id(response) for response in responses}), 4)
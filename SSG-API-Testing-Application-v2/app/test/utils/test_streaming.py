@@ -0,0 +1,155 @@
+import gzip
+import json
+import tracemalloc
+import unittest
+
+from unittest.mock import patch
+
+import requests
+
+from app.core.cipher.encrypt_decrypt import CIPHERTEXT_MEMO, KEY_RING, Cryptography
+from app.utils.async_http import AsyncClientPool, run_sync
+from app.utils.compression import Compression
+from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.streaming import StreamingBody, json_chunks
+from app.utils.transport import PooledTransport
+from app.test.resources.utils.local_server import LocalServer
+
+
+class TestStreaming(unittest.TestCase):
+    """
+    Tests all the methods and classes within the streaming file.
+    """
+
+    KEY = "u/fzxu+5FBlE7Wq7OWRMVbGB4snxf8xNyFZdTQ3tHBU="
+    BODY = {"trainers": [{"name": "Trainer", "photo": "A" * 100_000, "ids": [1, 2.5, None, True]}]}
+
+    def _expected(self, body: dict) -> bytes:
+        return json.dumps(Cryptography.encrypt(json.dumps(body), return_bytes=False, key=self.KEY)).encode()
+
+    def test_json_chunks(self):
+        chunks = list(json_chunks(self.BODY, chunk_size=1000))
+
+        self.assertEqual(b"".join(chunks).decode(), json.dumps(self.BODY))
+        self.assertTrue(all(len(chunk) <= 1000 for chunk in chunks))
+
+        body = {"a": ["\u00e9\U0001F600\n\"" * 50, -1.5e300, float("nan")], 1: {True: None, 2.5: (1, 2)}, "": []}
+        self.assertEqual(b"".join(json_chunks(body, chunk_size=7)).decode(), json.dumps(body))
+
+        with self.assertRaises(ValueError):
+            list(json_chunks(self.BODY, chunk_size=0))
+
+    def test_encrypted_json(self):
+        body = StreamingBody.encrypted_json(self.BODY, key=self.KEY, chunk_size=1000)
+
+        # the body is produced again every time it is sent
+        self.assertEqual(body.buffer(), self._expected(self.BODY))
+        self.assertEqual(body.buffer(), self._expected(self.BODY))
+
+        with self.assertRaises(AttributeError):
+            StreamingBody.encrypted_json(self.BODY)
+
+    def test_memoized(self):
+        CIPHERTEXT_MEMO.clear()
+        Cryptography.encrypt(json.dumps(self.BODY), key=self.KEY, memoize=True)
+        body = StreamingBody.encrypted_json(self.BODY, key=self.KEY, chunk_size=1000)
+
+        # the payload was already encrypted in full, so the held ciphertext is sent instead of encrypting it again
+        with patch.object(KEY_RING, "encrypt_stream", wraps=KEY_RING.encrypt_stream) as encrypt_stream:
+            self.assertEqual(body.buffer(), self._expected(self.BODY))
+            self.assertTrue(all(len(chunk) <= 1000 for chunk in list(body)[1:-1]))
+
+            encrypt_stream.assert_not_called()
+
+            CIPHERTEXT_MEMO.clear()
+            self.assertEqual(body.buffer(), self._expected(self.BODY))
+            encrypt_stream.assert_called_once()
+
+    def test_gzip(self):
+        observed = []
+        body = StreamingBody.encrypted_json(self.BODY, key=self.KEY).gzip(observe=lambda *sizes: observed.append(sizes))
+
+        self.assertEqual(gzip.decompress(body.buffer()), self._expected(self.BODY))
+        self.assertEqual(observed[0][0], len(self._expected(self.BODY)))
+        self.assertLess(observed[0][1], observed[0][0])
+
+    def test_memory(self):
+        body = {"documents": [{"content": "A" * 4_000_000}, {"content": "B" * 4_000_000}]}
+        streamed = StreamingBody.encrypted_json(body, key=self.KEY)
+
+        tracemalloc.start()
+
+        try:
+            size = sum(len(chunk) for chunk in streamed)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        # the ciphertext is larger than the body, but only a few chunks are held in memory at once
+        self.assertGreater(size, 8_000_000)
+        self.assertLess(peak, 1_000_000)
+
+    def test_request(self):
+        with LocalServer() as server, patch.object(Cryptography, "resolve_key", return_value=self.KEY):
+            builder = HTTPRequestBuilder().with_endpoint(server.url).with_body(self.BODY).with_streaming()
+
+            with patch.object(HTTPRequestBuilder, "_session", return_value=requests.Session()):
+                response = builder.post_encrypted()
+
+            self.assertTrue(response.json()["chunked"])
+            self.assertEqual(response.json()["body"].encode(), self._expected(self.BODY))
+
+            pool = AsyncClientPool()
+            builder.with_transport(PooledTransport(client_pool=pool))
+
+            with patch.object(HTTPRequestBuilder, "_credentials", return_value=None):
+                response = run_sync(builder.post_encrypted_async())
+
+            run_sync(pool.aclose())
+
+            self.assertTrue(response.json()["chunked"])
+            self.assertEqual(response.json()["body"].encode(), self._expected(self.BODY))
+
+    def test_length_required(self):
+        with LocalServer(chunked=False) as server, patch.object(Cryptography, "resolve_key", return_value=self.KEY):
+            builder = HTTPRequestBuilder().with_endpoint(server.url).with_body(self.BODY).with_streaming()
+
+            with patch.object(HTTPRequestBuilder, "_session", return_value=requests.Session()):
+                response = builder.post_encrypted()
+
+            # the body is sent again in full
+            self.assertEqual(server.hits, 2)
+            self.assertFalse(response.json()["chunked"])
+            self.assertEqual(response.json()["body"].encode(), self._expected(self.BODY))
+
+            pool = AsyncClientPool()
+            builder.with_transport(PooledTransport(client_pool=pool))
+
+            with patch.object(HTTPRequestBuilder, "_credentials", return_value=None):
+                response = run_sync(builder.post_encrypted_async())
+
+            run_sync(pool.aclose())
+
+            self.assertEqual(server.hits, 4)
+            self.assertEqual(response.json()["body"].encode(), self._expected(self.BODY))
+
+    def test_compressed(self):
+        compression = Compression()
+
+        with patch("app.utils.http_utils.COMPRESSION", compression), LocalServer(gzip=True) as server, \
+                patch.object(Cryptography, "resolve_key", return_value=self.KEY):
+            compression.enable(server.url)
+            builder = HTTPRequestBuilder().with_endpoint(server.url) \
+                .with_body(self.BODY) \
+                .with_compression() \
+                .with_streaming()
+
+            with patch.object(HTTPRequestBuilder, "_session", return_value=requests.Session()):
+                response = builder.post_encrypted()
+
+            self.assertEqual(response.json()["content_encoding"], "gzip")
+            self.assertEqual(response.json()["body"].encode(), self._expected(self.BODY))
+
+        stats = compression.stats()[0]
+        self.assertEqual(stats["compressed_requests"], 1)
+        self.assertGreater(stats["request_bytes_saved"], 0)
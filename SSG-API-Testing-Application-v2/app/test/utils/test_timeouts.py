@@ -0,0 +1,158 @@
+import time
+import unittest
+
+import requests
+
+from urllib3.exceptions import ReadTimeoutError
+
+from app.core.abc.abstract import AbstractRequest
+from app.core.constants import HttpMethod
+from app.utils.async_http import run_sync
+from app.utils.batch import BatchExecutor, BatchStatus
+from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.retry import RetryPolicy
+from app.utils.timeouts import (Timeouts, TimeoutRule, Deadline, DeadlineExceeded, current_deadline, is_timeout,
+                                TIMEOUTS)
+from app.test.resources.utils.local_server import LocalServer
+
+
+class _SlowGet(AbstractRequest):
+    """Request that sends a GET to the local test server through the HTTPRequestBuilder retry loop."""
+
+    def __init__(self, url: str):
+        self.req = HTTPRequestBuilder().with_endpoint(url)
+
+    def __repr__(self):
+        return "SlowGet"
+
+    def __str__(self):
+        return self.__repr__()
+
+    def _prepare(self, *args, **kwargs):
+        pass
+
+    def execute(self) -> requests.Response:
+        return self.req._dispatch(requests.Session(), None, HttpMethod.GET)
+
+
+class TestTimeouts(unittest.TestCase):
+    """
+    Tests all the methods and classes within the timeouts file.
+    """
+
+    def tearDown(self):
+        TIMEOUTS.configure(TimeoutRule(connect=3.05, read=30))
+
+    def test_rule(self):
+        with self.assertRaises(ValueError):
+            TimeoutRule(connect=0, read=1)
+
+    def test_resolve(self):
+        timeouts = Timeouts(rules=[TimeoutRule(connect=1, read=10),
+                                   TimeoutRule(connect=1, read=20, method=HttpMethod.POST),
+                                   TimeoutRule(connect=1, read=5, route_prefix="/tpg/enrolments")])
+
+        self.assertEqual(timeouts.resolve(HttpMethod.GET, "https://mock-api.ssg-wsg.sg/courses/runs/1"), (1, 10))
+        self.assertEqual(timeouts.resolve(HttpMethod.POST, "https://mock-api.ssg-wsg.sg/courses/runs/1"), (1, 20))
+        self.assertEqual(timeouts.resolve(HttpMethod.POST, "https://mock-api.ssg-wsg.sg/tpg/enrolments"), (1, 5))
+        self.assertIsNone(Timeouts(rules=[]).resolve(HttpMethod.GET, "https://mock-api.ssg-wsg.sg"))
+
+        timeouts.configure(TimeoutRule(connect=2, read=15))
+        self.assertEqual(timeouts.resolve(HttpMethod.GET, "https://mock-api.ssg-wsg.sg/courses/runs/1"), (2, 15))
+
+    def test_is_timeout(self):
+        self.assertTrue(is_timeout(requests.exceptions.ReadTimeout()))
+        self.assertTrue(is_timeout(DeadlineExceeded()))
+        self.assertTrue(is_timeout(requests.ConnectionError(ReadTimeoutError(None, "/", "Read timed out."))))
+        self.assertFalse(is_timeout(requests.ConnectionError("Connection refused")))
+
+    def test_record_timeout(self):
+        timeouts = Timeouts(rules=[TimeoutRule(connect=1, read=5, route_prefix="/tpg")])
+        timeouts.record_timeout(HttpMethod.GET, "https://mock-api.ssg-wsg.sg/tpg/enrolments")
+        timeouts.record_timeout(HttpMethod.GET, "https://mock-api.ssg-wsg.sg/tpg/assessments")
+
+        self.assertEqual(timeouts.stats()["timeouts"], [{"method": "GET", "route_prefix": "/tpg", "count": 2}])
+
+    def test_deadline(self):
+        with self.assertRaises(ValueError):
+            Deadline(0)
+
+        deadline = Deadline(0.1)
+
+        self.assertTrue(all(timeout <= 0.1 for timeout in deadline.clamp((3, 30))))
+        self.assertEqual(Deadline(10).clamp((3, 30))[0], 3)
+        self.assertLessEqual(deadline.clamp(None)[0], 0.1)
+        self.assertTrue(deadline.allows(0.01))
+        self.assertFalse(deadline.allows(1))
+
+        time.sleep(0.11)
+        self.assertTrue(deadline.expired)
+
+        with self.assertRaises(DeadlineExceeded):
+            deadline.clamp((3, 30), "https://mock-api.ssg-wsg.sg")
+
+    def test_scope(self):
+        outer = Deadline(1)
+        later = Deadline(10)
+        earlier = Deadline(0.5)
+
+        self.assertIsNone(current_deadline())
+
+        with outer.scope():
+            with later.scope() as inner:
+                self.assertIs(inner, outer)
+                self.assertIs(current_deadline(), outer)
+
+            with earlier.scope():
+                self.assertIs(current_deadline(), earlier)
+
+            self.assertIs(current_deadline(), outer)
+
+        self.assertIsNone(current_deadline())
+
+    def test_read_timeout(self):
+        TIMEOUTS.configure(TimeoutRule(connect=1, read=0.1))
+
+        with LocalServer(delay=0.5) as server:
+            builder = HTTPRequestBuilder().with_endpoint(server.url, direct_argument="/slow") \
+                .with_retry_policy(RetryPolicy(max_attempts=1))
+
+            with self.assertRaises(requests.Timeout):
+                builder._dispatch(requests.Session(), None, HttpMethod.GET)
+
+            with self.assertRaises(requests.Timeout):
+                run_sync(builder._send_async(HttpMethod.GET, None, None))
+
+        self.assertTrue(any(row["count"] >= 2 for row in TIMEOUTS.stats()["timeouts"]))
+
+    def test_deadline_stops_retries(self):
+        policy = RetryPolicy(max_attempts=10, base_delay=0.2, max_delay=0.2)
+
+        with LocalServer(status=503) as server:
+            builder = HTTPRequestBuilder().with_endpoint(server.url).with_retry_policy(policy)
+
+            with Deadline(0.1).scope():
+                try:
+                    self.assertEqual(builder._dispatch(requests.Session(), None, HttpMethod.GET).status_code, 503)
+                except (requests.Timeout, requests.ConnectionError):
+                    # the jittered delay may have fit within the deadline, leaving little time for the next attempt
+                    pass
+
+            self.assertLess(server.hits, 10)
+
+            deadline = Deadline(0.01)
+            time.sleep(0.02)
+
+            with self.assertRaises(DeadlineExceeded):
+                run_sync(builder._send_async(HttpMethod.GET, None, None, deadline=deadline))
+
+    def test_batch_deadline(self):
+        with self.assertRaises(ValueError):
+            BatchExecutor(deadline=0)
+
+        with LocalServer(delay=0.3) as server:
+            start = time.perf_counter()
+            results = BatchExecutor(workers=2, deadline=0.2).execute(_SlowGet(server.url) for _ in range(4))
+
+        self.assertTrue(all(result.status == BatchStatus.TIMEOUT for result in results))
+        self.assertLess(time.perf_counter() - start, 1)
@@ -0,0 +1,121 @@
+import unittest
+
+from unittest.mock import patch
+
+import requests
+
+from app.core.cipher.encrypt_decrypt import Cryptography
+from app.core.constants import HttpMethod
+from app.utils.async_http import run_sync
+from app.utils.http_utils import HTTPRequestBuilder, handle_response
+from app.utils.timings import RequestTimings, current_timings, timed
+from app.test.resources.utils.local_server import LocalServer
+
+
+class TestTimings(unittest.TestCase):
+    """
+    Tests all the methods and classes within the timings file, and the timings recorded by handle_response().
+    """
+
+    def test_record(self):
+        timings = RequestTimings()
+
+        with self.assertRaises(ValueError):
+            timings.record("unknown", 1)
+
+        timings.record("send", 0.5)
+        timings.record("send", 0.25)
+        timings.record("first_byte", 0.1)
+
+        with timings.phase("render"):
+            pass
+
+        self.assertEqual(timings.get("send"), 0.75)
+        self.assertEqual(timings.get("decrypt"), 0)
+        self.assertGreaterEqual(timings.get("render"), 0)
+        self.assertAlmostEqual(timings.total, 0.75 + timings.get("render"))
+
+        row = timings.as_row()
+        self.assertEqual(list(row), [f"{phase}_ms" for phase in RequestTimings.PHASES] + ["total_ms"])
+        self.assertEqual(row["send_ms"], 750)
+
+    def test_scope(self):
+        timings = RequestTimings()
+
+        with timed("send"):
+            # no timings are in force, so nothing is recorded
+            pass
+
+        self.assertIsNone(current_timings())
+
+        with timings.scope():
+            self.assertIs(current_timings(), timings)
+
+            with timed("encrypt"):
+                pass
+
+        self.assertIsNone(current_timings())
+        self.assertIn("encrypt", timings.phases)
+
+    def test_dispatches_once(self):
+        calls = []
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"a": 1}'
+
+        def throwable():
+            calls.append(1)
+            return response
+
+        result = handle_response(throwable)
+
+        self.assertEqual(len(calls), 1)
+        self.assertIs(result.response, response)
+        self.assertEqual(result.data, {"a": 1})
+        self.assertIsNone(result.error)
+        self.assertTrue({"build", "parse", "render"}.issubset(result.timings.phases))
+
+    def test_decrypt_phases(self):
+        key = "u/fzxu+5FBlE7Wq7OWRMVbGB4snxf8xNyFZdTQ3tHBU="
+        response = requests.Response()
+        response.status_code = 200
+        response._content = Cryptography.encrypt(b'{"data": [{"id": 1, "name": "a"}], "status": 200}', key=key)
+
+        with patch.object(Cryptography, "resolve_key", return_value=key):
+            result = handle_response(lambda: response, require_decryption=True)
+            projected = handle_response(lambda: response, require_decryption=True, fields=["data[*].id"])
+
+        # decryption and parsing happen in one pass, but are still timed separately
+        self.assertEqual(result.data["status"], 200)
+        self.assertTrue({"decrypt", "parse"}.issubset(result.timings.phases))
+        self.assertEqual(projected.data, {"data": [{"id": 1}]})
+
+    def test_error(self):
+        def throwable():
+            raise requests.ConnectionError("Connection refused")
+
+        result = handle_response(throwable)
+
+        self.assertIsInstance(result.error, requests.ConnectionError)
+        self.assertIsNone(result.response)
+        self.assertIn("build", result.timings.phases)
+
+    def test_send_phases(self):
+        with LocalServer(delay=0.05) as server:
+            builder = HTTPRequestBuilder().with_endpoint(server.url, direct_argument="/courses/runs/1")
+
+            with patch.object(HTTPRequestBuilder, "_session", return_value=requests.Session()):
+                result = handle_response(lambda: builder.get())
+
+            self.assertEqual(server.hits, 1)
+            self.assertEqual(result.data["path"], "/courses/runs/1")
+            self.assertGreaterEqual(result.timings.get("send"), 0.05)
+            self.assertGreaterEqual(result.timings.get("first_byte"), 0.05)
+            self.assertLessEqual(result.timings.get("first_byte"), result.timings.get("send"))
+
+            timings = RequestTimings()
+            response = run_sync(builder._send_async(HttpMethod.GET, None, None, None, timings))
+
+            self.assertEqual(response.status_code, 200)
+            self.assertGreaterEqual(timings.get("first_byte"), 0.05)
+            self.assertLessEqual(timings.get("first_byte"), timings.get("send"))
@@ -0,0 +1,135 @@
+import time
+import unittest
+
+from unittest.mock import patch
+
+import httpx
+import requests
+
+from app.core.constants import HttpMethod
+from app.utils.async_http import gather_all, run_sync
+from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.retry import NO_RETRY
+from app.utils.timeouts import Deadline
+from app.utils.transport import (CannedResponse, InMemoryRequest, InMemoryTransport, PooledTransport,
+                                 RequestsTransport, default_transport, set_default_transport)
+from app.test.resources.utils.local_server import LocalServer
+
+
+class TestTransport(unittest.TestCase):
+    """
+    Tests all the methods and classes within the transport file.
+    """
+
+    URL = "https://mock-api.ssg-wsg.sg"
+
+    def test_with_transport(self):
+        with self.assertRaises(ValueError):
+            HTTPRequestBuilder().with_transport("requests")
+
+        with self.assertRaises(ValueError):
+            InMemoryTransport(latency=-1)
+
+        builder = HTTPRequestBuilder()
+        self.assertIsInstance(builder._transport(), PooledTransport)
+
+        transport = InMemoryTransport()
+        self.assertIs(builder.with_transport(transport)._transport(), transport)
+
+    def test_canned_response(self):
+        self.assertEqual(CannedResponse().content(), b"")
+        self.assertEqual(CannedResponse(body="text").content(), b"text")
+        self.assertEqual(CannedResponse(body={"a": 1}).content(), b'{"a": 1}')
+
+    def test_in_memory(self):
+        transport = InMemoryTransport() \
+            .route("/courses/runs/*", CannedResponse(body={"data": {"course": {"run": {"id": 1}}}})) \
+            .route("/tpg/enrolments", lambda request: CannedResponse(status=201, body={"method": request.method}))
+
+        builder = HTTPRequestBuilder().with_transport(transport) \
+            .with_endpoint(self.URL, direct_argument="/courses/runs/1")
+        response = builder.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["course"]["run"]["id"], 1)
+
+        builder = HTTPRequestBuilder().with_transport(transport) \
+            .with_endpoint(self.URL, direct_argument="/tpg/enrolments") \
+            .with_body({"a": 1})
+        self.assertEqual(builder.post().json(), {"method": "POST"})
+
+        response = run_sync(builder.post_async())
+        self.assertEqual(response.status_code, 201)
+
+        # requests that do not match any route are echoed back
+        builder = HTTPRequestBuilder().with_transport(transport).with_endpoint(self.URL, direct_argument="/other")
+        self.assertEqual(run_sync(builder.get_async()).json()["path"], "/other")
+        self.assertEqual(transport.requests, 4)
+
+    def test_latency(self):
+        transport = InMemoryTransport(latency=lambda: 0.05)
+        builder = HTTPRequestBuilder().with_transport(transport).with_endpoint(self.URL) \
+            .with_retry_policy(NO_RETRY)
+
+        start = time.perf_counter()
+        builder.get()
+        run_sync(builder.get_async())
+        self.assertGreaterEqual(time.perf_counter() - start, 0.1)
+
+        transport.latency = 0.5
+
+        with Deadline(0.05).scope():
+            with self.assertRaises(requests.Timeout):
+                builder.get()
+
+        with self.assertRaises(requests.Timeout):
+            run_sync(builder._send_async(HttpMethod.GET, None, None, Deadline(0.05)))
+
+    def test_default_transport(self):
+        transport = InMemoryTransport(responder=lambda request: CannedResponse(status=204))
+        previous = set_default_transport(transport)
+
+        try:
+            self.assertIs(default_transport(), transport)
+            self.assertEqual(HTTPRequestBuilder().with_endpoint(self.URL).get().status_code, 204)
+        finally:
+            set_default_transport(previous)
+
+        with self.assertRaises(ValueError):
+            set_default_transport(None)
+
+    def test_requests_transport(self):
+        transport = RequestsTransport()
+
+        with LocalServer() as server:
+            self.assertIsNot(transport.session(server.url), transport.session(server.url))
+
+            session = transport.session(server.url)
+            self.assertEqual(session.get(server.url).status_code, 200)
+
+            # the connection is closed as soon as the response has been read, and a new one is opened for the next
+            self.assertEqual(len(session.get_adapter(server.url).poolmanager.pools), 0)
+            self.assertEqual(session.get(server.url).json()["hits"], 2)
+
+            # asynchronous requests are sent with a new client each, which is closed once the response has been read
+            clients = []
+            client = transport.client
+            builder = HTTPRequestBuilder().with_endpoint(server.url).with_transport(transport)
+
+            with patch.object(HTTPRequestBuilder, "_credentials", return_value=None), \
+                    patch.object(transport, "client", side_effect=lambda *args: clients.append(client(*args))
+                                 or clients[-1]):
+                responses = run_sync(gather_all([builder.get_async(), builder.post_async()]))
+
+            self.assertEqual([response.status_code for response in responses], [200, 200])
+            self.assertEqual(server.hits, 4)
+            self.assertEqual(len(clients), 2)
+            self.assertTrue(all(client.is_closed for client in clients))
+
+    def test_in_memory_request(self):
+        request = InMemoryRequest(method="GET", url=f"{self.URL}/courses?x=1", headers={}, body=b"")
+        self.assertEqual(request.path, "/courses")
+        self.assertIsInstance(run_sync(_client(InMemoryTransport())), httpx.AsyncClient)
+
+
+async def _client(transport: InMemoryTransport) -> httpx.AsyncClient:
+    return transport.client(TestTransport.URL)
@@ -0,0 +1,68 @@
+import unittest
+
+from app.utils.session_pool import SessionPool
+from app.utils.warmup import ConnectionWarmer
+from app.test.resources.utils.local_server import LocalServer
+
+
+class TestWarmup(unittest.TestCase):
+    """
+    Tests all the methods and classes within the warmup file.
+    """
+
+    def test_init(self):
+        with self.assertRaises(ValueError):
+            ConnectionWarmer(connections=0)
+
+        with self.assertRaises(ValueError):
+            ConnectionWarmer(SessionPool(pool_maxsize=2), connections=3)
+
+    def test_warm(self):
+        pool = SessionPool()
+        warmer = ConnectionWarmer(pool, connections=2)
+
+        with LocalServer() as server:
+            warmer.warm(server.url).join()
+            self.assertIsNone(warmer.warm(f"{server.url}/courses"))
+
+            stats = pool.stats()["pools"][0]
+            self.assertEqual(stats["connections_opened"], 2)
+            self.assertEqual(stats["idle_connections"], 2)
+
+            # the first request reuses a warm connection instead of opening a new one
+            response = pool.session(server.url).get(f"{server.url}/courses")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(pool.stats()["pools"][0]["connections_opened"], 2)
+
+            self.assertEqual(warmer.heartbeat(), 0)
+            self.assertEqual(warmer.stats()[0]["heartbeats"], 1)
+
+            pool.close_all()
+            warmer.heartbeat()
+            self.assertEqual(warmer.stats(), [])
+
+    def test_heartbeat_reconnects(self):
+        pool = SessionPool()
+        warmer = ConnectionWarmer(pool, connections=2)
+
+        with LocalServer() as server:
+            warmer.warm(server.url).join()
+
+            # simulate the server closing the idle connections
+            connection_pools = pool.session(server.url).get_adapter(server.url).poolmanager.pools
+            for connection_pool in map(connection_pools.get, connection_pools.keys()):
+                for connection in list(connection_pool.pool.queue):
+                    if connection is not None:
+                        connection.close()
+
+            self.assertEqual(warmer.heartbeat(), 2)
+            self.assertEqual(warmer.stats()[0]["reconnects"], 2)
+
+        self.assertTrue(warmer.forget(server.url))
+        self.assertFalse(warmer.forget(server.url))
+
+    def test_failure(self):
+        warmer = ConnectionWarmer(SessionPool())
+        warmer.warm("http://localhost:1").join()
+
+        self.assertEqual(warmer.stats()[0]["failures"], 1)
@@ -16,37 +16,39 @@ sys.path.append(os.path.dirname(FILE_LOC))
 from app.definitions import ROOT  # noqa: E402
 from app.core.system.logger import Logger  # noqa: E402
 
-# initalise the logger
-LOGGER = Logger("")
-
-# start the coverage report
-cov = coverage.Coverage()
-cov.start()
-
-# define test directory
-TEST_DIR = os.path.join(ROOT, "test")
-LOGGER.info(f"Test directory specified: {TEST_DIR}")
-
-# create the test loader to discover all test files
-LOGGER.info(f"Loading test files...")
-loader = unittest.TestLoader()
-suite = loader.discover(TEST_DIR)
-
-# run the test suite containing all the discovered test files
-LOGGER.info("Running tests...")
-runner = unittest.TextTestRunner(stream=sys.stdout, verbosity=2, failfast=True)
-result = runner.run(suite)
-
-cov.stop()
-cov.xml_report()
-
-if len(result.errors) > 0:
-    LOGGER.error(f"Tests failed with {len(result.errors)} errors.")
-    raise Exception("Tests failed with errors.")
-
-if len(result.failures) > 0:
-    LOGGER.error(f"Tests failed with {len(result.failures)} failures.")
-    raise Exception("Tests failed with failures.")
-
-if len(result.errors) == 0 and len(result.failures) == 0:
-    LOGGER.info("All tests passed!")
+# worker processes, such as those of the cipher pool, import this file again, and must not run the tests themselves
+if __name__ == "__main__":
+    # initalise the logger
+    LOGGER = Logger("")
+
+    # start the coverage report
+    cov = coverage.Coverage()
+    cov.start()
+
+    # define test directory
+    TEST_DIR = os.path.join(ROOT, "test")
+    LOGGER.info(f"Test directory specified: {TEST_DIR}")
+
+    # create the test loader to discover all test files
+    LOGGER.info(f"Loading test files...")
+    loader = unittest.TestLoader()
+    suite = loader.discover(TEST_DIR)
+
+    # run the test suite containing all the discovered test files
+    LOGGER.info("Running tests...")
+    runner = unittest.TextTestRunner(stream=sys.stdout, verbosity=2, failfast=True)
+    result = runner.run(suite)
+
+    cov.stop()
+    cov.xml_report()
+
+    if len(result.errors) > 0:
+        LOGGER.error(f"Tests failed with {len(result.errors)} errors.")
+        raise Exception("Tests failed with errors.")
+
+    if len(result.failures) > 0:
+        LOGGER.error(f"Tests failed with {len(result.failures)} failures.")
+        raise Exception("Tests failed with failures.")
+
+    if len(result.errors) == 0 and len(result.failures) == 0:
+        LOGGER.info("All tests passed!")
@@ -0,0 +1,295 @@
+"""
+This file contains the asynchronous HTTP layer used by HTTPRequestBuilder, as well as the bridge that lets
+synchronous code (such as the Streamlit pages) run coroutines on a shared event loop.
+"""
+
+import asyncio
+import ssl
+import threading
+import weakref
+
+import httpx
+import requests
+
+from concurrent.futures import Future
+from typing import Any, Awaitable, Coroutine, Iterable
+
+from requests.exceptions import ConnectionError, ConnectTimeout, SSLError, InvalidURL, Timeout, RequestException
+from requests.structures import CaseInsensitiveDict
+
+from app.core.constants import Endpoints
+from app.core.system.logger import Logger
+from app.utils.credentials import ClientCredentials
+from app.utils.session_pool import SESSION_POOL, SessionPool
+
+
+LOGGER = Logger("Async HTTP")
+
+
+class AsyncBridge:
+    """
+    Class to run coroutines from synchronous code.
+
+    The bridge owns a single event loop that runs in a daemon thread. Coroutines submitted from any thread are
+    scheduled onto that loop, so the asynchronous clients created on it (and their pooled connections) survive
+    between Streamlit reruns instead of being torn down with a per-call asyncio.run().
+    """
+
+    def __init__(self):
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Returns the event loop of the bridge, starting it if it is not running yet."""
+
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="async-bridge", daemon=True)
+                self._thread.start()
+
+            return self._loop
+
+    def submit(self, coro: Coroutine) -> Future:
+        """
+        Schedules a coroutine on the event loop of the bridge without waiting for it.
+
+        :param coro: Coroutine to schedule
+        :return: concurrent.futures.Future resolving to the result of the coroutine
+        """
+
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine, timeout: float | None = None) -> Any:
+        """
+        Runs a coroutine on the event loop of the bridge and blocks until it completes.
+
+        :param coro: Coroutine to run
+        :param timeout: Maximum number of seconds to wait for the coroutine, or None to wait indefinitely
+        :return: Result of the coroutine
+        """
+
+        if self._thread is not None and threading.current_thread() is self._thread:
+            raise RuntimeError("AsyncBridge.run() cannot be called from within the bridge's own event loop!")
+
+        return self.submit(coro).result(timeout)
+
+    def stop(self) -> None:
+        """Stops the event loop of the bridge. The next submission starts a new one."""
+
+        with self._lock:
+            if self._loop is not None and not self._loop.is_closed():
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join()
+                self._loop.close()
+
+            self._loop = None
+            self._thread = None
+
+
+class AsyncClientPool:
+    """
+    Class to manage httpx.AsyncClient objects, keyed by the event loop they are used on, the origin of the endpoint
+    and the fingerprint of the client certificate.
+
+    Clients share their SSL contexts with the synchronous SessionPool, so a certificate pair is only ever loaded once
+    per process.
+
+    Requests to the API environments selected with use_http2() are sent over HTTP/2, which multiplexes concurrent
+    requests over a single connection instead of opening one connection per request in flight. HTTP/2 is offered
+    through ALPN when connecting, and the client transparently falls back to HTTP/1.1 if the server does not select
+    it.
+    """
+
+    def __init__(self, session_pool: SessionPool = SESSION_POOL, max_connections: int = 100,
+                 max_keepalive_connections: int = 20):
+        """
+        Initialises the client pool.
+
+        :param session_pool: SessionPool to source the SSL contexts from
+        :param max_connections: Maximum number of concurrent connections each client may open
+        :param max_keepalive_connections: Maximum number of idle connections each client keeps alive
+        """
+
+        self.session_pool = session_pool
+        self.limits = httpx.Limits(max_connections=max_connections,
+                                   max_keepalive_connections=max_keepalive_connections)
+        self._lock = threading.Lock()
+        self._http2: set[str] = set()
+        self._versions: dict[str, int] = {}
+
+        # clients are bound to the loop that they were first used on, so they are discarded with their loop
+        self._clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple[str, str, bool],
+                                                                                 httpx.AsyncClient]] = \
+            weakref.WeakKeyDictionary()
+
+    def use_http2(self, endpoint: Endpoints | str, enabled: bool = True) -> None:
+        """
+        Selects whether requests to an API environment are sent over HTTP/2. Clients that were created before the
+        change continue to be used by requests that are already in flight.
+
+        :param endpoint: API environment, or the URL of any other origin
+        :param enabled: Whether HTTP/2 should be used
+        """
+
+        if not isinstance(enabled, bool):
+            raise ValueError("Enabled must be a boolean!")
+
+        origin = SessionPool.origin(endpoint.value if isinstance(endpoint, Endpoints) else endpoint)
+
+        with self._lock:
+            if enabled:
+                self._http2.add(origin)
+            else:
+                self._http2.discard(origin)
+
+    def http2(self, url: str) -> bool:
+        """Returns True if requests to the origin of the URL are sent over HTTP/2."""
+
+        with self._lock:
+            return SessionPool.origin(url) in self._http2
+
+    async def _observe(self, response: httpx.Response) -> None:
+        # counts the protocol negotiated for each response, to show whether HTTP/2 is actually being used
+        with self._lock:
+            self._versions[response.http_version] = self._versions.get(response.http_version, 0) + 1
+
+    def client(self, url: str, credentials: ClientCredentials | None = None) -> httpx.AsyncClient:
+        """
+        Returns the client for the running event loop, the origin of the URL and the client credentials, creating
+        it if needed. This must be called from within a running event loop.
+
+        :param url: URL that the request is sent to
+        :param credentials: Client certificate and private key
+        :return: httpx.AsyncClient object
+        """
+
+        loop = asyncio.get_running_loop()
+        http2 = self.http2(url)
+        pool_key = (SessionPool.origin(url), SessionPool.fingerprint(credentials), http2)
+
+        with self._lock:
+            clients = self._clients.setdefault(loop, {})
+            client = clients.get(pool_key)
+
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(verify=SessionPool.ssl_context(credentials, http2), http2=http2,
+                                           limits=self.limits, event_hooks={"response": [self._observe]})
+                clients[pool_key] = client
+                LOGGER.info(f"Created asynchronous {'HTTP/2 ' if http2 else ''}client for {pool_key[0]}")
+
+            return client
+
+    async def aclose(self) -> None:
+        """Closes every client that belongs to the running event loop."""
+
+        with self._lock:
+            clients = list(self._clients.pop(asyncio.get_running_loop(), {}).values())
+
+        for client in clients:
+            await client.aclose()
+
+    def stats(self) -> dict:
+        """
+        Returns the origins that use HTTP/2 and the number of responses received over each HTTP version.
+
+        :return: Dictionary containing the HTTP/2 origins and the HTTP version counters
+        """
+
+        with self._lock:
+            return {
+                "http2": sorted(self._http2),
+                "clients": sum(len(clients) for clients in self._clients.values()),
+                "http_versions": dict(self._versions),
+            }
+
+
+def to_requests_response(response: httpx.Response) -> requests.Response:
+    """
+    Converts a httpx.Response into a requests.Response, so that responses from the asynchronous path can be
+    handled by the same code as responses from the synchronous path.
+
+    :param response: httpx.Response object with its body already read
+    :return: requests.Response object
+    """
+
+    converted = requests.Response()
+    converted.status_code = response.status_code
+    converted.headers = CaseInsensitiveDict(response.headers.items())
+    converted.url = str(response.url)
+    converted.reason = response.reason_phrase
+    converted.encoding = response.encoding
+    converted._content = response.content
+
+    try:
+        converted.elapsed = response.elapsed
+    except RuntimeError:
+        # the response was not produced by a client, so there is no elapsed time to copy over
+        pass
+
+    return converted
+
+
+def translate_error(ex: httpx.HTTPError | httpx.InvalidURL) -> RequestException:
+    """
+    Translates a httpx error into the matching requests error, so that handle_response() can report errors from the
+    asynchronous path in the same way as those from the synchronous path.
+
+    :param ex: httpx error raised while sending a request
+    :return: requests error to raise in its place
+    """
+
+    cause = ex.__cause__ or ex.__context__
+
+    if isinstance(ex, httpx.ConnectTimeout):
+        return ConnectTimeout(str(ex))
+
+    if isinstance(ex, httpx.TimeoutException):
+        return Timeout(str(ex))
+
+    if isinstance(ex, (httpx.InvalidURL, httpx.UnsupportedProtocol)):
+        return InvalidURL(str(ex))
+
+    if isinstance(cause, ssl.SSLError) or isinstance(getattr(cause, "__context__", None), ssl.SSLError):
+        return SSLError(str(ex))
+
+    if isinstance(ex, httpx.TransportError):
+        return ConnectionError(str(ex))
+
+    return RequestException(str(ex))
+
+
+async def gather_all(awaitables: Iterable[Awaitable[requests.Response]]) -> list[requests.Response | Exception]:
+    """
+    Awaits a collection of requests concurrently.
+
+    :param awaitables: Awaitables returned by AbstractRequest.execute_async() or HTTPRequestBuilder.*_async()
+    :return: List of responses, or the exceptions raised while sending them, in the order they were given
+    """
+
+    return list(await asyncio.gather(*awaitables, return_exceptions=True))
+
+
+def run_sync(awaitable: Awaitable, timeout: float | None = None) -> Any:
+    """
+    Runs an awaitable on the shared event loop and blocks until it completes. This is the entry point for running
+    asynchronous requests from the Streamlit pages, e.g.
+
+        handle_response(lambda: run_sync(request.execute_async()))
+
+    :param awaitable: Awaitable to run
+    :param timeout: Maximum number of seconds to wait, or None to wait indefinitely
+    :return: Result of the awaitable
+    """
+
+    async def _await():
+        return await awaitable
+
+    return ASYNC_BRIDGE.run(_await(), timeout)
+
+
+# the event loop and clients are shared by every Streamlit session running in this process
+ASYNC_BRIDGE = AsyncBridge()
+ASYNC_CLIENT_POOL = AsyncClientPool()
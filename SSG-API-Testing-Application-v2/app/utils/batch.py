@@ -0,0 +1,237 @@
+"""
+This file contains the BatchExecutor class, which is used to send many prepared requests with bounded concurrency.
+"""
+
+import json
+import threading
+import time
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Iterable, Iterator
+
+import requests
+
+from streamlit.runtime.scriptrunner import get_script_run_ctx, add_script_run_ctx
+
+from app.core.abc.abstract import AbstractRequest
+from app.core.cipher.encrypt_decrypt import Cryptography
+from app.core.system.logger import Logger
+from app.utils.json_stream import decrypt_json, project
+from app.utils.middleware import MIDDLEWARE
+from app.utils.timeouts import Deadline, is_timeout
+
+
+LOGGER = Logger("Batch Executor")
+
+
+class BatchStatus(Enum):
+    """Enum representing the outcome of a single request within a batch."""
+
+    SUCCESS = "Success"
+    HTTP_ERROR = "HTTP Error"
+    TIMEOUT = "Timeout"
+    EXCEPTION = "Exception"
+
+    def __str__(self):
+        return self.value
+
+
+@dataclass
+class BatchResult:
+    """Represents the outcome of a single request within a batch."""
+
+    index: int
+    request: AbstractRequest
+    status: BatchStatus
+    latency: float
+    status_code: int | None = None
+    response: requests.Response | None = None
+    data: Any = None
+    error: Exception | None = None
+
+    def as_row(self) -> dict:
+        """Returns a flattened summary of this result, suitable for st.dataframe()."""
+
+        return {
+            "index": self.index,
+            "request": type(self.request).__name__,
+            "status": str(self.status),
+            "status_code": self.status_code,
+            "latency_ms": round(self.latency * 1000, 2),
+            "error": str(self.error) if self.error is not None else None,
+        }
+
+
+class BatchExecutor:
+    """
+    Class used to execute a list or iterator of prepared AbstractRequest objects with a bounded number of worker
+    threads.
+
+    Requests are pulled from the iterable lazily, so at most a few requests per worker are in flight or waiting at
+    any one time, and results are yielded in the same order as the requests were given regardless of the order in
+    which they complete.
+    """
+
+    DEFAULT_WORKERS: int = 8
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, require_decryption: bool = False,
+                 deadline: float | None = None, fields: Iterable[str] | None = None):
+        """
+        Initialises the batch executor.
+
+        :param workers: Maximum number of requests to send concurrently
+        :param require_decryption: Whether the response payloads are encrypted and need to be decrypted before
+                                   they are decoded
+        :param deadline: Maximum number of seconds a batch may take, or None if batches have no deadline. Each
+                         request in the batch is given whatever is left of the deadline when it is sent
+        :param fields: Paths of the fields of the payloads to keep, such as data.enrolments[*].referenceNumber, or
+                       None to keep whole payloads. Only these fields are decoded, which saves memory on large batches
+        """
+
+        if not isinstance(workers, int) or workers < 1:
+            raise ValueError("Number of workers must be a positive integer!")
+
+        if deadline is not None and deadline <= 0:
+            raise ValueError("Deadline must be positive!")
+
+        self.workers = workers
+        self.require_decryption = require_decryption
+        self.deadline = deadline
+        self.fields = tuple(fields) if fields is not None else None
+
+    def _decode(self, response: requests.Response, builder: Any = None) -> Any:
+        """
+        Decodes the payload of a response, decrypting it first if required.
+
+        :param response: Response to decode
+        :param builder: HTTPRequestBuilder that sent the request, whose middleware runs on the decrypted payload
+        :return: Decoded JSON payload, or the response text if the payload is not JSON
+        """
+
+        text = response.text
+        decrypted = False
+
+        if self.require_decryption and response.status_code < 400:
+            try:
+                data = decrypt_json(text, self.fields)
+                decrypted = True
+            except json.decoder.JSONDecodeError:
+                # the payload was decrypted, but is not JSON
+                data = Cryptography.decrypt(text).decode()
+                decrypted = True
+            except Exception:
+                # the mock endpoint returns its payloads unencrypted
+                LOGGER.warning("Unable to decrypt the response! Decoding it as plaintext instead...")
+
+        if not decrypted:
+            try:
+                data = json.loads(text) if self.fields is None else project([text], self.fields)
+            except json.decoder.JSONDecodeError:
+                data = text
+
+        if decrypted:
+            for hook in (builder._hooks("post_decrypt") if builder is not None else MIDDLEWARE.hooks["post_decrypt"]):
+                data = hook(builder, response, data)
+
+        return data
+
+    def _run_one(self, index: int, request: AbstractRequest, deadline: Deadline | None = None) -> BatchResult:
+        """
+        Executes a single request and records its outcome.
+
+        :param index: Position of the request within the batch
+        :param request: Request to execute
+        :param deadline: Deadline of the batch, if any
+        :return: BatchResult object
+        """
+
+        start = time.perf_counter()
+
+        try:
+            if deadline is not None:
+                with deadline.scope():
+                    response = request.execute()
+            else:
+                response = request.execute()
+
+            latency = time.perf_counter() - start
+        except Exception as ex:
+            if is_timeout(ex):
+                LOGGER.error(f"Request {index} in batch timed out! Error: {ex}")
+                status = BatchStatus.TIMEOUT
+            else:
+                LOGGER.error(f"Request {index} in batch failed! Error: {ex}")
+                status = BatchStatus.EXCEPTION
+
+            return BatchResult(index=index, request=request, status=status, latency=time.perf_counter() - start,
+                               error=ex)
+
+        try:
+            data = self._decode(response, getattr(request, "req", None))
+        except Exception as ex:
+            data = None
+            LOGGER.warning(f"Unable to decode response of request {index} in batch! Error: {ex}")
+
+        return BatchResult(index=index,
+                           request=request,
+                           status=BatchStatus.SUCCESS if response.status_code < 400 else BatchStatus.HTTP_ERROR,
+                           latency=latency,
+                           status_code=response.status_code,
+                           response=response,
+                           data=data)
+
+    def iter_execute(self, batch: Iterable[AbstractRequest]) -> Iterator[BatchResult]:
+        """
+        Executes the requests and yields their results in order as soon as they are available.
+
+        :param batch: List or iterator of prepared requests
+        :return: Iterator of BatchResult objects
+        """
+
+        ctx = get_script_run_ctx(suppress_warning=True)
+        deadline = Deadline(self.deadline) if self.deadline is not None else None
+        pending: deque[Future] = deque()
+
+        with ThreadPoolExecutor(max_workers=self.workers,
+                                thread_name_prefix="batch",
+                                initializer=_attach_script_run_ctx,
+                                initargs=(ctx,)) as pool:
+            for index, request in enumerate(batch):
+                pending.append(pool.submit(self._run_one, index, request, deadline))
+
+                # keep the queue bounded so that a large iterator is not materialised all at once
+                if len(pending) >= self.workers * 2:
+                    yield pending.popleft().result()
+
+            while len(pending) > 0:
+                yield pending.popleft().result()
+
+    def execute(self, batch: Iterable[AbstractRequest]) -> list[BatchResult]:
+        """
+        Executes the requests and returns their results in order.
+
+        :param batch: List or iterator of prepared requests
+        :return: List of BatchResult objects
+        """
+
+        LOGGER.info(f"Executing batch with {self.workers} worker(s)...")
+        results = list(self.iter_execute(batch))
+        failed = sum(1 for result in results if result.status != BatchStatus.SUCCESS)
+        LOGGER.info(f"Batch of {len(results)} request(s) completed with {failed} failure(s)")
+
+        return results
+
+
+def _attach_script_run_ctx(ctx) -> None:
+    """
+    Attaches a Streamlit script run context to the current worker thread, so that the requests executed on it can
+    read the certificates and keys stored in the session state of the Streamlit session that started the batch.
+
+    :param ctx: Streamlit script run context to attach
+    """
+
+    if ctx is not None:
+        add_script_run_ctx(threading.current_thread(), ctx)
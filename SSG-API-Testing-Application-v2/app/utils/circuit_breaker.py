@@ -0,0 +1,324 @@
+"""
+This file contains the circuit breakers that HTTPRequestBuilder consults before every request, so that requests to an
+API environment that is failing are rejected immediately instead of waiting for the failure.
+"""
+
+import threading
+import time
+
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from urllib.parse import urlsplit
+
+import requests
+
+from requests.exceptions import ConnectionError, Timeout
+
+from app.core.constants import Endpoints
+from app.core.system.logger import Logger
+
+
+LOGGER = Logger("Circuit Breaker")
+
+
+class BreakerState(Enum):
+    """Enum representing the state of a circuit breaker."""
+
+    CLOSED = "Closed"
+    OPEN = "Open"
+    HALF_OPEN = "Half-Open"
+
+    def __str__(self):
+        return self.value
+
+
+class CircuitOpen(Exception):
+    """Raised when a request is rejected because the circuit breaker for its endpoint and route is open."""
+
+    def __init__(self, key: tuple, retry_in: float):
+        super().__init__(f"Circuit breaker for {key} is open! Requests will be let through again in "
+                         f"{retry_in:.2f}s.")
+        self.key = key
+        self.retry_in = retry_in
+
+
+@dataclass(frozen=True)
+class BreakerConfig:
+    """
+    Represents when a circuit breaker opens and how it recovers.
+
+    The breaker opens once at least min_calls of the last window calls have completed and the proportion of them
+    that failed reaches failure_rate. After open_for seconds, up to half_open_probes requests are let through to
+    probe the endpoint: the breaker closes if a probe succeeds, and opens again if a probe fails.
+    """
+
+    window: int = 20
+    min_calls: int = 10
+    failure_rate: float = 0.5
+    open_for: float = 30.0
+    half_open_probes: int = 1
+
+    def __post_init__(self):
+        if self.window < 1 or self.min_calls < 1 or self.half_open_probes < 1:
+            raise ValueError("Window, minimum calls and half-open probes must be positive!")
+
+        if not 0 < self.failure_rate <= 1:
+            raise ValueError("Failure rate must be within (0, 1]!")
+
+        if self.open_for < 0:
+            raise ValueError("Open duration cannot be negative!")
+
+
+def is_failure(error: Exception | None = None, response: requests.Response | None = None) -> bool:
+    """
+    Checks if the outcome of a request indicates that the endpoint is unhealthy. Client errors, such as malformed
+    inputs or 4xx responses, do not count as failures.
+
+    :param error: Error raised by the request, if any
+    :param response: Response returned by the request, if any
+    :return: True if the outcome counts as a failure
+    """
+
+    if error is not None:
+        return isinstance(error, (ConnectionError, Timeout))
+
+    return response is not None and response.status_code >= 500
+
+
+class CircuitBreaker:
+    """
+    Class representing a circuit breaker over a sliding window of the most recent calls.
+    """
+
+    def __init__(self, key: tuple, config: BreakerConfig):
+        """
+        Initialises a closed circuit breaker.
+
+        :param key: Key identifying the breaker, used in errors and logs
+        :param config: Configuration of the breaker
+        """
+
+        self.key = key
+        self.config = config
+        self._state = BreakerState.CLOSED
+        self._outcomes: deque[bool] = deque(maxlen=config.window)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    def _open(self, now: float) -> None:
+        self._state = BreakerState.OPEN
+        self._opened_at = now
+        self._probes = 0
+        LOGGER.warning(f"Circuit breaker for {self.key} opened! Rejecting requests for {self.config.open_for}s...")
+
+    def _close(self) -> None:
+        self._state = BreakerState.CLOSED
+        self._outcomes.clear()
+        self._probes = 0
+        LOGGER.info(f"Circuit breaker for {self.key} closed")
+
+    @property
+    def state(self) -> BreakerState:
+        with self._lock:
+            self._advance(time.monotonic())
+            return self._state
+
+    def _advance(self, now: float) -> None:
+        # probes that never reported back (e.g. because they were cancelled) are given up on after open_for seconds
+        if self._state == BreakerState.OPEN or (self._state == BreakerState.HALF_OPEN
+                                                and self._probes >= self.config.half_open_probes):
+            if now - self._opened_at >= self.config.open_for:
+                self._state = BreakerState.HALF_OPEN
+                self._opened_at = now
+                self._probes = 0
+
+    def allow(self) -> None:
+        """
+        Admits a request through the breaker.
+
+        :raises CircuitOpen: If the breaker is open, or is half-open and already has all of its probes in flight
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            self._advance(now)
+
+            if self._state == BreakerState.CLOSED:
+                return
+
+            if self._state == BreakerState.HALF_OPEN and self._probes < self.config.half_open_probes:
+                self._probes += 1
+                return
+
+            self._rejected += 1
+            retry_in = max(0.0, self._opened_at + self.config.open_for - now)
+
+        raise CircuitOpen(self.key, retry_in)
+
+    def release(self) -> None:
+        """
+        Gives back the admission of a request that was admitted through the breaker but was never sent, so that a
+        half-open breaker can let another probe through straight away.
+        """
+
+        with self._lock:
+            if self._state == BreakerState.HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def record(self, failed: bool) -> None:
+        """
+        Records the outcome of a request that was admitted through the breaker.
+
+        :param failed: Whether the request failed
+        """
+
+        with self._lock:
+            now = time.monotonic()
+
+            if self._state == BreakerState.HALF_OPEN:
+                if failed:
+                    self._open(now)
+                else:
+                    self._close()
+
+                return
+
+            if self._state == BreakerState.OPEN:
+                # a request admitted before the breaker opened has completed
+                return
+
+            self._outcomes.append(failed)
+            calls = len(self._outcomes)
+
+            if calls >= self.config.min_calls and sum(self._outcomes) / calls >= self.config.failure_rate:
+                self._open(now)
+
+    def stats(self) -> dict:
+        """Returns the state of the breaker and the outcomes in its window."""
+
+        with self._lock:
+            now = time.monotonic()
+            self._advance(now)
+            calls = len(self._outcomes)
+
+            return {
+                "state": str(self._state),
+                "calls": calls,
+                "failure_rate": round(sum(self._outcomes) / calls, 2) if calls > 0 else 0.0,
+                "rejected": self._rejected,
+                "retry_in": (round(max(0.0, self._opened_at + self.config.open_for - now), 2)
+                             if self._state == BreakerState.OPEN else 0.0),
+            }
+
+
+class CircuitBreakers:
+    """
+    Class holding one circuit breaker per API environment and route family.
+
+    A route family is the longest of the configured route prefixes that the path of the request starts with, or
+    the first segment of the path if none of them match. Requests to hosts that do not belong to any of the
+    Endpoints are keyed by their origin.
+    """
+
+    DEFAULT_FAMILIES: tuple[str, ...] = (
+        "/courses",
+        "/tpg/enrolments",
+        "/tpg/assessments",
+        "/skillsFutureCredits",
+    )
+
+    def __init__(self, config: BreakerConfig = BreakerConfig(), families: tuple[str, ...] = DEFAULT_FAMILIES):
+        """
+        Initialises the circuit breakers.
+
+        :param config: Default configuration of the breakers
+        :param families: Route prefixes that group routes into families
+        """
+
+        self.config = config
+        self.families = families
+        self._overrides: dict[Endpoints, BreakerConfig] = {}
+        self._breakers: dict[tuple[str, str], CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, config: BreakerConfig, endpoint: Endpoints | None = None) -> None:
+        """
+        Changes the configuration of the breakers. Breakers that the change applies to are reset.
+
+        :param config: New configuration
+        :param endpoint: API environment to configure, or None to change the default configuration
+        """
+
+        with self._lock:
+            if endpoint is None:
+                self.config = config
+                self._breakers = {k: v for k, v in self._breakers.items()
+                                  if any(k[0] == e.name for e in self._overrides)}
+            else:
+                self._overrides[endpoint] = config
+                self._breakers = {k: v for k, v in self._breakers.items() if k[0] != endpoint.name}
+
+    def _key(self, url: str) -> tuple[tuple[str, str], Endpoints | None]:
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}".lower()
+        endpoint = next((e for e in Endpoints if e.value == origin), None)
+        path = parts.path or "/"
+        family = max((f for f in self.families if path.startswith(f)), key=len, default=None)
+
+        if family is None:
+            family = "/" + path.lstrip("/").split("/", 1)[0]
+
+        return (endpoint.name if endpoint is not None else origin, family), endpoint
+
+    def reset(self, url: str | None = None) -> None:
+        """
+        Discards breakers, closing them.
+
+        :param url: URL whose endpoint should have its breakers discarded, or None to discard every breaker
+        """
+
+        with self._lock:
+            if url is None:
+                self._breakers.clear()
+                return
+
+            endpoint_key = self._key(url)[0][0]
+            self._breakers = {k: v for k, v in self._breakers.items() if k[0] != endpoint_key}
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        """
+        Returns the breaker for the endpoint and route family of a URL, creating it if needed.
+
+        :param url: URL of the request
+        :return: CircuitBreaker object
+        """
+
+        key, endpoint = self._key(url)
+
+        with self._lock:
+            breaker = self._breakers.get(key)
+
+            if breaker is None:
+                breaker = CircuitBreaker(key, self._overrides.get(endpoint, self.config))
+                self._breakers[key] = breaker
+
+            return breaker
+
+    def stats(self) -> list[dict]:
+        """
+        Returns the state of every breaker, for display on a dashboard.
+
+        :return: List of dictionaries describing each breaker
+        """
+
+        with self._lock:
+            breakers = list(self._breakers.items())
+
+        return [{"endpoint": key[0], "route_family": key[1], **breaker.stats()} for key, breaker in breakers]
+
+
+# breakers are shared by every Streamlit session running in this process, as they all call the same endpoints
+CIRCUIT_BREAKERS = CircuitBreakers()
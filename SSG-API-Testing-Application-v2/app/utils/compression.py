@@ -0,0 +1,258 @@
+"""
+This file contains the Compression class, which HTTPRequestBuilder uses to compress large request bodies and to
+measure how many bytes compression saves on the wire for each route.
+"""
+
+import gzip
+import json
+import threading
+
+from dataclasses import dataclass
+from urllib.parse import urlencode, urlsplit
+
+import requests
+
+from requests.utils import DEFAULT_ACCEPT_ENCODING
+from urllib3 import HTTPResponse
+
+from app.core.system.logger import Logger
+from app.utils.hedging import Hedger
+from app.utils.streaming import StreamingBody
+
+
+LOGGER = Logger("Compression")
+
+
+@dataclass
+class _RouteStats:
+    """Represents the bytes sent and received for a route, before and after compression."""
+
+    compressed_requests: int = 0
+    request_bytes: int = 0
+    request_wire_bytes: int = 0
+    compressed_responses: int = 0
+    response_bytes: int = 0
+    response_wire_bytes: int = 0
+    rejected: bool = False
+
+
+class Compression:
+    """
+    Class to compress request bodies and to measure the bytes saved by compression.
+
+    Responses are always negotiated: every request advertises the encodings that the HTTP clients can decode in its
+    Accept-Encoding header, and the clients decompress the responses incrementally as they are read.
+
+    Request bodies are only compressed for requests that opt in (see HTTPRequestBuilder.with_compression()) and are
+    sent to an origin that compression has been enabled for (see enable()), as not every server accepts compressed
+    bodies. Bodies smaller than min_size are sent as they are, as compressing them saves little and costs CPU time. If
+    the server rejects a compressed body (see rejected()), the request is sent again uncompressed and the bodies of
+    later requests to the same route are no longer compressed.
+    """
+
+    DEFAULT_MIN_SIZE: int = 1024
+    DEFAULT_LEVEL: int = 6
+
+    def __init__(self, min_size: int = DEFAULT_MIN_SIZE, level: int = DEFAULT_LEVEL):
+        """
+        Initialises the compression layer.
+
+        :param min_size: Minimum size in bytes of the bodies that are compressed
+        :param level: gzip compression level, from 1 (fastest) to 9 (smallest)
+        """
+
+        if min_size < 0:
+            raise ValueError("Minimum size cannot be negative!")
+
+        if not 1 <= level <= 9:
+            raise ValueError("Level must be between 1 and 9!")
+
+        self.min_size = min_size
+        self.level = level
+        self._lock = threading.Lock()
+        self._routes: dict[str, _RouteStats] = {}
+        self._origins: set[str] = set()
+
+    @staticmethod
+    def accept_encoding() -> str:
+        """Returns the value of the Accept-Encoding header, listing every encoding that the HTTP clients decode."""
+
+        return DEFAULT_ACCEPT_ENCODING
+
+    def _stats(self, url: str) -> _RouteStats:
+        # must be called with the lock held
+        route = Hedger.route(url)
+        stats = self._routes.get(route)
+
+        if stats is None:
+            stats = _RouteStats()
+            self._routes[route] = stats
+
+        return stats
+
+    @staticmethod
+    def _origin(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}".lower()
+
+    def enable(self, url: str, enabled: bool = True) -> None:
+        """
+        Enables or disables the compression of request bodies sent to the origin of a URL.
+
+        :param url: URL of the origin, such as the value of one of the Endpoints
+        :param enabled: Whether request bodies sent to the origin may be compressed
+        """
+
+        if not isinstance(enabled, bool):
+            raise ValueError("Enabled must be a boolean!")
+
+        with self._lock:
+            if enabled:
+                self._origins.add(Compression._origin(url))
+            else:
+                self._origins.discard(Compression._origin(url))
+
+    def enabled(self, url: str) -> bool:
+        """Returns whether compression of request bodies has been enabled for the origin of the URL."""
+
+        with self._lock:
+            return Compression._origin(url) in self._origins
+
+    def supported(self, url: str) -> bool:
+        """
+        Returns whether compression of request bodies has been enabled for the origin of the URL, and the server is
+        assumed to accept compressed bodies for its route.
+        """
+
+        with self._lock:
+            stats = self._routes.get(Hedger.route(url))
+            return Compression._origin(url) in self._origins and (stats is None or not stats.rejected)
+
+    @staticmethod
+    def rejected(response: requests.Response) -> bool:
+        """
+        Returns whether the server rejected a compressed request body. Servers reject them with 415 Unsupported Media
+        Type, or with 400 Bad Request if the response says that the Content-Encoding is not supported. Any other 400
+        is an ordinary error, such as a validation error, and is returned to the caller as it is.
+
+        :param response: Response to a request whose body was compressed
+        :return: True if the compressed body was rejected, False otherwise
+        """
+
+        if response.status_code == 415:
+            return True
+
+        return response.status_code == 400 and "content-encoding" in response.text.lower()
+
+    def reject(self, url: str) -> None:
+        """
+        Records that the server does not accept compressed bodies for the route of the URL.
+
+        :param url: URL of the request
+        """
+
+        with self._lock:
+            self._stats(url).rejected = True
+
+        LOGGER.warning(f"{Hedger.route(url)} does not accept compressed request bodies! Sending them uncompressed...")
+
+    def compress(self, url: str, kwargs: dict, body_key: str = "data") -> bool:
+        """
+        Compresses the body of a request with gzip if it is large enough, compression is enabled for its origin and
+        the route accepts compressed bodies. Streamed bodies are always compressed if the route accepts compressed
+        bodies, as they are only streamed if they are large.
+
+        :param url: URL of the request
+        :param kwargs: Keyword arguments passed on to the session or client. The body is read from their json or data
+                       argument, and the compressed body and its headers are written back into them
+        :param body_key: Name of the argument that the session or client reads raw bytes from, which is data for
+                         requests and content for httpx
+        :return: True if the body was compressed, False otherwise
+        """
+
+        if isinstance(kwargs.get("data"), StreamingBody):
+            # the size of a streamed body is not known in advance, so it is compressed while it is sent
+            if not self.supported(url):
+                return False
+
+            kwargs[body_key] = kwargs.pop("data").gzip(self.level,
+                                                       observe=lambda raw, wire: self._record_request(url, raw, wire))
+            kwargs["headers"] = {**kwargs.get("headers", {}), "Content-Encoding": "gzip"}
+            return True
+
+        if "json" in kwargs and kwargs["json"] is not None:
+            body = json.dumps(kwargs["json"]).encode()
+            content_type = "application/json"
+        elif isinstance(kwargs.get("data"), dict) and len(kwargs["data"]) > 0:
+            body = urlencode(kwargs["data"], doseq=True).encode()
+            content_type = "application/x-www-form-urlencoded"
+        else:
+            return False
+
+        if len(body) < self.min_size or not self.supported(url):
+            return False
+
+        compressed = gzip.compress(body, compresslevel=self.level)
+
+        if len(compressed) >= len(body):
+            return False
+
+        kwargs.pop("json", None)
+        kwargs.pop("data", None)
+        kwargs[body_key] = compressed
+        kwargs["headers"] = {**kwargs.get("headers", {}), "Content-Type": content_type, "Content-Encoding": "gzip"}
+
+        self._record_request(url, len(body), len(compressed))
+        return True
+
+    def _record_request(self, url: str, raw: int, wire: int) -> None:
+        """Records the size of a compressed request body, before and after it was compressed."""
+
+        with self._lock:
+            stats = self._stats(url)
+            stats.compressed_requests += 1
+            stats.request_bytes += raw
+            stats.request_wire_bytes += wire
+
+    def observe(self, url: str, response: requests.Response, wire_bytes: int | None = None) -> None:
+        """
+        Records the size of a compressed response, before and after it was decompressed.
+
+        :param url: URL of the request
+        :param response: Response received, with its body already read
+        :param wire_bytes: Number of bytes received on the wire, or None to read it from the raw response
+        """
+
+        if not response.headers.get("Content-Encoding"):
+            return
+
+        if wire_bytes is None:
+            if not isinstance(response.raw, HTTPResponse):
+                return
+
+            wire_bytes = response.raw.tell()
+
+        with self._lock:
+            stats = self._stats(url)
+            stats.compressed_responses += 1
+            stats.response_bytes += len(response.content)
+            stats.response_wire_bytes += wire_bytes
+
+    def stats(self) -> list[dict]:
+        """
+        Returns the bytes saved by compression for every route, for display on a dashboard.
+
+        :return: List of dictionaries describing each route
+        """
+
+        with self._lock:
+            return [{"route": route,
+                     "compressed_requests": stats.compressed_requests,
+                     "request_bytes_saved": stats.request_bytes - stats.request_wire_bytes,
+                     "compressed_responses": stats.compressed_responses,
+                     "response_bytes_saved": stats.response_bytes - stats.response_wire_bytes,
+                     "accepts_compressed_bodies": not stats.rejected} for route, stats in self._routes.items()]
+
+
+# statistics are shared by every Streamlit session running in this process
+COMPRESSION = Compression()
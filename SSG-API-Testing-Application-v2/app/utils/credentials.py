@@ -0,0 +1,176 @@
+"""
+This file contains the ClientCredentials class, which holds the client certificate and private key used for mTLS in
+memory, together with the SSL context built from them.
+"""
+
+import hashlib
+import os
+import ssl
+import tempfile
+import threading
+
+import certifi
+
+from app.core.system.logger import Logger
+
+
+LOGGER = Logger("Credentials")
+
+# SSL contexts are shared by every set of credentials with the same fingerprint, even across Streamlit sessions
+_CONTEXTS: dict[tuple[str, bool], ssl.SSLContext] = {}
+_CONTEXTS_LOCK = threading.Lock()
+
+# protocols offered through ALPN by contexts used for HTTP/2; servers that do not support HTTP/2 select HTTP/1.1
+_HTTP2_ALPN_PROTOCOLS = ["h2", "http/1.1"]
+
+
+def _new_context(http2: bool) -> ssl.SSLContext:
+    context = ssl.create_default_context(cafile=certifi.where())
+
+    if http2:
+        context.set_alpn_protocols(_HTTP2_ALPN_PROTOCOLS)
+
+    return context
+
+
+def _load_cert_chain(context: ssl.SSLContext, cert_pem: bytes, key_pem: bytes) -> None:
+    """
+    Loads a certificate and private key held in memory into an SSL context.
+
+    The ssl module can only load certificate chains from paths. On Linux, the PEMs are exposed through anonymous
+    in-memory files so that they never touch the disk; elsewhere, they are written into a private temporary directory
+    that is removed as soon as the chain is loaded.
+
+    :param context: SSL context to load the certificate chain into
+    :param cert_pem: PEM-encoded certificate
+    :param key_pem: PEM-encoded private key
+    """
+
+    if hasattr(os, "memfd_create") and os.path.isdir("/proc/self/fd"):
+        fds = [os.memfd_create("ssg-cert"), os.memfd_create("ssg-key")]
+
+        try:
+            for fd, pem in zip(fds, (cert_pem, key_pem)):
+                os.write(fd, pem)
+
+            context.load_cert_chain(certfile=f"/proc/self/fd/{fds[0]}", keyfile=f"/proc/self/fd/{fds[1]}")
+        finally:
+            for fd in fds:
+                os.close(fd)
+
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert_path = os.path.join(directory, "cert")
+        key_path = os.path.join(directory, "key")
+
+        for path, pem in ((cert_path, cert_pem), (key_path, key_pem)):
+            with open(path, "wb") as f:
+                f.write(pem)
+
+        context.load_cert_chain(certfile=cert_path, keyfile=key_path)
+
+
+class ClientCredentials:
+    """
+    Class representing a client certificate and private key pair held in memory.
+
+    The pair is parsed once, when the object is created, into an SSL context that is loaded with the CA bundle and
+    the certificate chain. Every transport uses this context, so the pair is never re-read or re-parsed per request.
+
+    HTTP/2 connections use a separate context, built the first time it is needed, as the protocols offered through
+    ALPN are set on the context and HTTP/1.1 connections must not offer HTTP/2.
+    """
+
+    def __init__(self, cert_pem: bytes, key_pem: bytes):
+        """
+        Initialises the credentials and verifies that the certificate and private key belong together.
+
+        :param cert_pem: PEM-encoded certificate
+        :param key_pem: PEM-encoded private key
+        :raises ValueError: If the certificate or private key is invalid, or if they do not match
+        """
+
+        if not isinstance(cert_pem, bytes) or not isinstance(key_pem, bytes):
+            raise ValueError("Certificate and private key must be bytes!")
+
+        digest = hashlib.sha256()
+        digest.update(hashlib.sha256(cert_pem).digest())
+        digest.update(hashlib.sha256(key_pem).digest())
+
+        self.fingerprint = digest.hexdigest()
+        self._pems = (cert_pem, key_pem)
+        self._context = ClientCredentials._context_for(self.fingerprint, cert_pem, key_pem, http2=False)
+
+    @staticmethod
+    def from_files(cert_path: str, key_path: str) -> "ClientCredentials":
+        """
+        Reads the credentials from a certificate file and a private key file.
+
+        :param cert_path: Path to the certificate file
+        :param key_path: Path to the private key file
+        :return: ClientCredentials object
+        """
+
+        with open(cert_path, "rb") as cert_file, open(key_path, "rb") as key_file:
+            return ClientCredentials(cert_file.read(), key_file.read())
+
+    @staticmethod
+    def _context_for(fingerprint: str, cert_pem: bytes, key_pem: bytes, http2: bool) -> ssl.SSLContext:
+        with _CONTEXTS_LOCK:
+            context = _CONTEXTS.get((fingerprint, http2))
+
+        if context is not None:
+            return context
+
+        context = _new_context(http2)
+
+        try:
+            _load_cert_chain(context, cert_pem, key_pem)
+        except ssl.SSLError as ex:
+            raise ValueError(f"Certificate and private key are not valid! Error: {ex}") from ex
+
+        LOGGER.info(f"Loaded client certificate {fingerprint[:16]}{' for HTTP/2' if http2 else ''}")
+
+        with _CONTEXTS_LOCK:
+            return _CONTEXTS.setdefault((fingerprint, http2), context)
+
+    @property
+    def ssl_context(self) -> ssl.SSLContext:
+        """Returns the SSL context loaded with the CA bundle and this certificate chain."""
+
+        return self._context
+
+    @property
+    def http2_ssl_context(self) -> ssl.SSLContext:
+        """Returns the SSL context loaded with the CA bundle and this certificate chain that offers HTTP/2."""
+
+        return ClientCredentials._context_for(self.fingerprint, *self._pems, http2=True)
+
+    def __eq__(self, other):
+        return isinstance(other, ClientCredentials) and other.fingerprint == self.fingerprint
+
+    def __hash__(self):
+        return hash(self.fingerprint)
+
+    def __repr__(self):
+        # never expose the key material
+        return f"ClientCredentials({self.fingerprint[:16]})"
+
+
+def default_ssl_context(http2: bool = False) -> ssl.SSLContext:
+    """
+    Returns the SSL context used for connections made without client credentials.
+
+    :param http2: Whether the context is used for HTTP/2 connections
+    :return: SSL context loaded with the CA bundle
+    """
+
+    with _CONTEXTS_LOCK:
+        context = _CONTEXTS.get(("", http2))
+
+        if context is None:
+            context = _new_context(http2)
+            _CONTEXTS[("", http2)] = context
+
+        return context
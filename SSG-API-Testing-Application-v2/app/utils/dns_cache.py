@@ -0,0 +1,252 @@
+"""
+This file contains the DNSCache class, which caches the addresses of the API hosts in process so that requests that
+open new connections do not have to wait for the resolver.
+"""
+
+import socket
+import threading
+import time
+
+from dataclasses import dataclass
+from typing import Callable, Iterable
+from urllib.parse import urlsplit
+
+from app.core.constants import Endpoints
+from app.core.system.logger import Logger
+
+try:
+    import dns.resolver
+except ImportError:
+    # TTLs are only known if dnspython is installed; the default TTL is used otherwise
+    dns = None
+
+
+LOGGER = Logger("DNS Cache")
+
+
+def _dns_ttl(host: str) -> float | None:
+    """
+    Returns the TTL of the address records of a host, or None if it cannot be looked up.
+
+    :param host: Host name
+    :return: TTL in seconds, or None
+    """
+
+    if dns is None:
+        return None
+
+    try:
+        return float(dns.resolver.resolve(host, "A", lifetime=2.0).rrset.ttl)
+    except Exception:
+        return None
+
+
+@dataclass
+class _CacheEntry:
+    """Represents the addresses of a host, as returned by getaddrinfo()."""
+
+    addresses: list
+    resolved_at: float
+    ttl: float
+    refreshing: bool = False
+
+    def age(self, now: float) -> float:
+        return now - self.resolved_at
+
+
+class DNSCache:
+    """
+    Class to cache the results of socket.getaddrinfo() for a fixed set of hosts.
+
+    Once installed, every lookup of a cached host in this process is served from the cache, including the lookups
+    made by requests, httpx and the connection warmer; lookups of any other host go to the resolver as usual.
+
+    Addresses are kept for the TTL of their records. The system resolver does not report TTLs, so they are looked up
+    with dnspython when addresses are refreshed in the background, if it is installed; until then, or if it is not
+    installed, default_ttl is used. Addresses are refreshed in the background once they have been used after
+    refresh_ahead of their TTL has passed, so that hosts in use never expire. If the resolver fails, the last addresses
+    that were resolved successfully are used for up to max_stale seconds past their expiry.
+    """
+
+    DEFAULT_HOSTS: tuple[str, ...] = tuple(urlsplit(endpoint.value).hostname for endpoint in Endpoints)
+    DEFAULT_TTL: float = 60.0
+
+    def __init__(self, hosts: Iterable[str] = DEFAULT_HOSTS, default_ttl: float = DEFAULT_TTL,
+                 refresh_ahead: float = 0.8, max_stale: float = 3600.0, min_ttl: float = 5.0,
+                 ttl_lookup: Callable[[str], float | None] = _dns_ttl):
+        """
+        Initialises the DNS cache.
+
+        :param hosts: Hosts to cache the addresses of
+        :param default_ttl: Number of seconds to keep addresses for if their TTL is not known
+        :param refresh_ahead: Fraction of the TTL after which addresses are refreshed in the background
+        :param max_stale: Maximum number of seconds past their expiry that addresses are used for if the resolver
+                          fails
+        :param min_ttl: Minimum number of seconds to keep addresses for, even if their TTL is shorter
+        :param ttl_lookup: Function returning the TTL of a host, or None if it is not known
+        """
+
+        if default_ttl <= 0 or min_ttl <= 0 or max_stale < 0:
+            raise ValueError("TTLs must be positive, and the maximum staleness cannot be negative!")
+
+        if not 0 < refresh_ahead < 1:
+            raise ValueError("Refresh ahead must be within (0, 1)!")
+
+        self.hosts = frozenset(host.lower() for host in hosts)
+        self.default_ttl = default_ttl
+        self.refresh_ahead = refresh_ahead
+        self.max_stale = max_stale
+        self.min_ttl = min_ttl
+        self.ttl_lookup = ttl_lookup
+        self._resolver = socket.getaddrinfo
+        self._lock = threading.Lock()
+        self._entries: dict[tuple, _CacheEntry] = {}
+        self._ttls: dict[str, float] = {}
+        self._hits = 0
+        self._misses = 0
+        self._refreshes = 0
+        self._stale = 0
+        self._errors = 0
+
+    def install(self) -> None:
+        """Serves the lookups of every cached host made in this process from the cache."""
+
+        with self._lock:
+            if socket.getaddrinfo == self.getaddrinfo:
+                return
+
+            self._resolver = socket.getaddrinfo
+            socket.getaddrinfo = self.getaddrinfo
+
+        LOGGER.info(f"Caching the addresses of {', '.join(sorted(self.hosts))}")
+
+    def uninstall(self) -> None:
+        """Stops serving lookups from the cache."""
+
+        with self._lock:
+            if socket.getaddrinfo == self.getaddrinfo:
+                socket.getaddrinfo = self._resolver
+
+    def _ttl(self, host: str) -> float:
+        with self._lock:
+            return self._ttls.get(host, self.default_ttl)
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0) -> list:
+        """
+        Drop-in replacement for socket.getaddrinfo() that serves the addresses of cached hosts from the cache.
+
+        :return: List of 5-tuples, as returned by socket.getaddrinfo()
+        """
+
+        name = host.decode() if isinstance(host, bytes) else host
+
+        if not isinstance(name, str) or name.lower() not in self.hosts:
+            return self._resolver(host, port, family, type, proto, flags)
+
+        name = name.lower()
+        key = (name, port, family, type, proto, flags)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            fresh = entry is not None and entry.age(now) < entry.ttl
+            refresh = fresh and not entry.refreshing and entry.age(now) >= entry.ttl * self.refresh_ahead
+
+            if fresh:
+                self._hits += 1
+                entry.refreshing = entry.refreshing or refresh
+            else:
+                self._misses += 1
+
+        if fresh:
+            if refresh:
+                threading.Thread(target=self._refresh, args=(key,), name="dns-refresh", daemon=True).start()
+
+            return list(entry.addresses)
+
+        try:
+            return self._store(key, self._resolver(host, port, family, type, proto, flags), self._ttl(name))
+        except OSError as ex:
+            if entry is None or entry.age(now) >= entry.ttl + self.max_stale:
+                with self._lock:
+                    self._errors += 1
+
+                raise
+
+            with self._lock:
+                self._stale += 1
+
+            LOGGER.warning(f"Unable to resolve {name}! Using its last known addresses instead. Error: {ex}")
+            return list(entry.addresses)
+
+    def _store(self, key: tuple, addresses: list, ttl: float) -> list:
+        with self._lock:
+            self._entries[key] = _CacheEntry(addresses=list(addresses), resolved_at=time.monotonic(),
+                                             ttl=max(self.min_ttl, ttl))
+
+        return list(addresses)
+
+    def _refresh(self, key: tuple) -> None:
+        """
+        Resolves the addresses of a host again in the background, and looks up their TTL.
+
+        :param key: Arguments to socket.getaddrinfo() that the addresses were resolved with
+        """
+
+        host = key[0]
+
+        try:
+            ttl = self.ttl_lookup(host)
+
+            if ttl is not None:
+                with self._lock:
+                    self._ttls[host] = ttl
+
+            self._store(key, self._resolver(*key), self._ttl(host))
+
+            with self._lock:
+                self._refreshes += 1
+        except OSError as ex:
+            with self._lock:
+                self._errors += 1
+
+            LOGGER.warning(f"Unable to refresh the addresses of {host}! Error: {ex}")
+        finally:
+            # if the refresh failed in any way, the addresses are refreshed again on a later lookup
+            with self._lock:
+                entry = self._entries.get(key)
+
+                if entry is not None:
+                    entry.refreshing = False
+
+    def clear(self) -> None:
+        """Removes every cached address."""
+
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns the number of lookups served from the cache, and the addresses cached for each host.
+
+        :return: Dictionary containing the counters and hosts
+        """
+
+        now = time.monotonic()
+
+        with self._lock:
+            return {"hits": self._hits,
+                    "misses": self._misses,
+                    "refreshes": self._refreshes,
+                    "stale_served": self._stale,
+                    "errors": self._errors,
+                    "hosts": [{"host": key[0],
+                               "port": key[1],
+                               "addresses": sorted({address[4][0] for address in entry.addresses}),
+                               "ttl": entry.ttl,
+                               "expires_in": round(entry.ttl - entry.age(now), 2)}
+                              for key, entry in self._entries.items()]}
+
+
+# addresses are shared by every Streamlit session running in this process
+DNS_CACHE = DNSCache()
@@ -0,0 +1,519 @@
+"""
+This file contains the HARRecorder middleware, which records every request sent by HTTPRequestBuilder as an entry of a
+HTTP Archive (HAR 1.2) log, so that slow requests can be inspected in any tool that reads HAR files.
+"""
+
+import base64
+import datetime
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urlencode
+
+import requests
+import streamlit as st
+import urllib3.connection
+
+from app.core.constants import HttpMethod
+from app.core.system.logger import Logger
+from app.utils.middleware import Middleware
+
+
+LOGGER = Logger("HAR Recorder")
+
+_CURRENT_TRACE: ContextVar["ConnectionTrace | None"] = ContextVar("trace", default=None)
+
+# attempts being recorded in the current context, by recorder
+_CURRENT_ATTEMPTS: ContextVar[dict | None] = ContextVar("attempts", default=None)
+
+
+class ConnectionTrace:
+    """
+    Class recording how long each network phase of a single attempt took, in the HAR timing phases: dns, connect,
+    ssl, send, wait and receive. Phases that are not recorded did not happen, or could not be measured.
+
+    The synchronous path records the dns, connect and ssl phases through the hooks installed by
+    ConnectionTrace.install(), as requests does not report them; the asynchronous path records every phase through
+    the trace extension of httpcore, see trace_connection().
+    """
+
+    _lock = threading.Lock()
+    _originals: dict[str, Any] = {}
+
+    def __init__(self):
+        self.phases: dict[str, float] = {}
+        self.http_version: str | None = None
+        self._started: dict[str, float] = {}
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + max(0.0, seconds)
+
+    def get(self, phase: str) -> float:
+        return self.phases.get(phase, 0.0)
+
+    def start(self, phase: str) -> None:
+        self._started[phase] = time.perf_counter()
+
+    def end(self, phase: str) -> None:
+        if phase in self._started:
+            self.add(phase, time.perf_counter() - self._started.pop(phase))
+
+    @staticmethod
+    def install() -> None:
+        """Hooks the address lookups and connections of the synchronous path, so that they can be traced."""
+
+        with ConnectionTrace._lock:
+            if ConnectionTrace._originals:
+                return
+
+            originals = {"getaddrinfo": socket.getaddrinfo,
+                         "_new_conn": urllib3.connection.HTTPConnection._new_conn,
+                         "connect": urllib3.connection.HTTPSConnection.connect}
+
+            def getaddrinfo(*args, **kwargs):
+                trace = _CURRENT_TRACE.get()
+
+                if trace is None:
+                    return originals["getaddrinfo"](*args, **kwargs)
+
+                start = time.perf_counter()
+
+                try:
+                    return originals["getaddrinfo"](*args, **kwargs)
+                finally:
+                    trace.add("dns", time.perf_counter() - start)
+
+            def _new_conn(connection):
+                trace = _CURRENT_TRACE.get()
+
+                if trace is None:
+                    return originals["_new_conn"](connection)
+
+                start, dns = time.perf_counter(), trace.get("dns")
+
+                try:
+                    return originals["_new_conn"](connection)
+                finally:
+                    trace.add("connect", time.perf_counter() - start - (trace.get("dns") - dns))
+
+            def connect(connection):
+                trace = _CURRENT_TRACE.get()
+
+                if trace is None:
+                    return originals["connect"](connection)
+
+                start, opened = time.perf_counter(), trace.get("dns") + trace.get("connect")
+
+                try:
+                    return originals["connect"](connection)
+                finally:
+                    trace.add("ssl", time.perf_counter() - start - (trace.get("dns") + trace.get("connect") - opened))
+
+            socket.getaddrinfo = getaddrinfo
+            urllib3.connection.HTTPConnection._new_conn = _new_conn
+            urllib3.connection.HTTPSConnection.connect = connect
+            ConnectionTrace._originals = originals
+
+    @staticmethod
+    def uninstall() -> None:
+        """Removes the hooks installed by install()."""
+
+        with ConnectionTrace._lock:
+            originals = ConnectionTrace._originals
+
+            if not originals:
+                return
+
+            socket.getaddrinfo = originals["getaddrinfo"]
+            urllib3.connection.HTTPConnection._new_conn = originals["_new_conn"]
+            urllib3.connection.HTTPSConnection.connect = originals["connect"]
+            ConnectionTrace._originals = {}
+
+
+# maps the steps reported by the trace extension of httpcore to the HAR timing phases
+_TRACE_PHASES: dict[str, str] = {"connect_tcp": "connect",
+                                 "start_tls": "ssl",
+                                 "send_request_headers": "send",
+                                 "send_request_body": "send",
+                                 "receive_response_headers": "wait",
+                                 "receive_response_body": "receive"}
+
+
+async def trace_connection(event: str, info: dict) -> None:
+    """
+    Callback for the trace extension of httpcore, which records the phases of an asynchronous request into the trace
+    in force in the current context, if any.
+
+    :param event: Name of the event, such as http11.receive_response_headers.started
+    :param info: Details of the event
+    """
+
+    trace = _CURRENT_TRACE.get()
+
+    if trace is None:
+        return
+
+    prefix, _, rest = event.partition(".")
+    step, _, state = rest.rpartition(".")
+    phase = _TRACE_PHASES.get(step)
+
+    if phase is None:
+        return
+
+    if prefix in ("http11", "http2"):
+        trace.http_version = "HTTP/1.1" if prefix == "http11" else "HTTP/2"
+
+    if state == "started":
+        trace.start(phase)
+    elif state in ("complete", "failed"):
+        trace.end(phase)
+
+
+def _pairs(items: dict) -> list[dict]:
+    return [{"name": str(name), "value": str(value)} for name, value in items.items()]
+
+
+def _text(body: Any) -> tuple[str, str | None]:
+    """
+    Returns a body as text for the log, encoding it with base64 if it is not valid UTF-8.
+
+    :return: 2-tuple of the text and its encoding, which is None if the text is not encoded
+    """
+
+    if isinstance(body, (bytes, bytearray)):
+        try:
+            return bytes(body).decode(), None
+        except UnicodeDecodeError:
+            return base64.b64encode(body).decode(), "base64"
+
+    return str(body), None
+
+
+@dataclass
+class _PendingEntry:
+    """Represents an attempt that has been sent, whose outcome has not been received yet."""
+
+    started: datetime.datetime
+    start: float
+    url: str
+    kwargs: dict
+    trace: ConnectionTrace = field(default_factory=ConnectionTrace)
+
+
+class HARRecorder(Middleware):
+    """
+    Middleware that records every request sent as an entry of a HAR 1.2 log.
+
+    Each entry holds the headers, query parameters and sizes of the request and of its response, and the time spent
+    in each network phase: looking up the address, connecting, negotiating TLS, sending the request, waiting for the
+    first byte of the response and receiving it. Only the final attempt of a request that was retried is recorded,
+    and only the attempt whose response was used of a request that was hedged.
+    The bodies are only recorded if bodies is True; the bodies of encrypted requests are recorded as the ciphertext
+    sent and received. Responses served from the response cache are not recorded, as they were never sent.
+
+    The most recent max_entries entries are kept. If a path is given, the log is also written to it in the background
+    after each entry, at most once every flush_interval seconds, so that the file always holds the latest entries.
+
+    Every Streamlit session records into a recorder of its own (see record_requests()), which is added to the
+    requests that the session creates.
+    """
+
+    VERSION: str = "1.2"
+    CREATOR: dict = {"name": "SSG API Testing Application", "version": "2"}
+
+    def __init__(self, path: str | None = None, max_entries: int = 500, bodies: bool = False,
+                 flush_interval: float = 1.0):
+        """
+        Initialises the recorder.
+
+        :param path: Path of the file to write the log to, or None to only keep it in memory
+        :param max_entries: Maximum number of entries to keep
+        :param bodies: Whether to record the bodies of requests and responses
+        :param flush_interval: Minimum number of seconds between writes of the log to the file
+        """
+
+        if max_entries < 1:
+            raise ValueError("Maximum number of entries must be positive!")
+
+        if flush_interval < 0:
+            raise ValueError("Flush interval cannot be negative!")
+
+        self.path = path
+        self.bodies = bodies
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._entries: deque[dict] = deque(maxlen=max_entries)
+        self._recorded = 0
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="har")
+        self._flush_scheduled = False
+        self._flushed = 0.0
+
+    def pre_send(self, builder: Any, method: HttpMethod, kwargs: dict) -> None:
+        pending = _PendingEntry(started=datetime.datetime.now(datetime.timezone.utc), start=time.perf_counter(),
+                                url=builder.endpoint, kwargs=dict(kwargs))
+
+        # the attempt is kept in the context it is sent from, so that concurrent attempts of a hedged request do not
+        # replace each other; it is replaced on every attempt, so only the final attempt is recorded
+        _CURRENT_ATTEMPTS.set({**(_CURRENT_ATTEMPTS.get() or {}), self: pending})
+        _CURRENT_TRACE.set(pending.trace)
+
+    def post_receive(self, builder: Any, method: HttpMethod, response: requests.Response) -> requests.Response:
+        self._complete(builder, method, response, None)
+        return response
+
+    def on_error(self, builder: Any, method: HttpMethod, error: Exception) -> None:
+        self._complete(builder, method, None, error)
+
+    def _complete(self, builder: Any, method: HttpMethod, response: requests.Response | None,
+                  error: Exception | None) -> None:
+        total = time.perf_counter()
+        _CURRENT_TRACE.set(None)
+
+        attempts = _CURRENT_ATTEMPTS.get() or {}
+        pending = attempts.get(self)
+        _CURRENT_ATTEMPTS.set({recorder: attempt for recorder, attempt in attempts.items() if recorder is not self})
+
+        if pending is None:
+            return
+
+        entry = self._entry(pending, method, response, error, total - pending.start)
+
+        with self._lock:
+            self._entries.append(entry)
+            self._recorded += 1
+            flush = self.path is not None and not self._flush_scheduled
+
+            if flush:
+                self._flush_scheduled = True
+
+        if flush:
+            self._writer.submit(self._flush_later)
+
+    def _timings(self, trace: ConnectionTrace, response: requests.Response | None, total: float) -> dict:
+        """
+        Returns the HAR timings of an attempt. The synchronous path only traces the dns, connect and ssl phases, so the
+        wait phase is derived from the time requests took to receive the headers, and the receive phase is the rest.
+
+        :param trace: Trace of the attempt
+        :param response: Response received, if any
+        :param total: Number of seconds from sending the attempt to receiving its response
+        :return: Dictionary of HAR timings in milliseconds, where -1 marks phases that did not happen
+        """
+
+        phases = dict(trace.phases)
+        opened = sum(phases.get(phase, 0.0) for phase in ("dns", "connect", "ssl", "send"))
+
+        if "wait" not in phases:
+            elapsed = response.elapsed.total_seconds() if response is not None else 0.0
+            phases["wait"] = max(0.0, (elapsed if 0 < elapsed <= total else total) - opened)
+
+        if "receive" not in phases:
+            phases["receive"] = max(0.0, total - opened - phases["wait"]) if response is not None else 0.0
+
+        return {"blocked": -1,
+                **{phase: round(phases[phase] * 1000, 3) if phase in phases else -1
+                   for phase in ("dns", "connect", "ssl")},
+                **{phase: round(phases.get(phase, 0.0) * 1000, 3) for phase in ("send", "wait", "receive")}}
+
+    def _post_data(self, kwargs: dict, headers: dict) -> tuple[dict | None, int]:
+        """Returns the postData of a request, and the size of its body in bytes."""
+
+        if kwargs.get("json") is not None:
+            body, mime = json.dumps(kwargs["json"]), "application/json"
+        else:
+            body = next((kwargs[key] for key in ("data", "content") if kwargs.get(key) is not None), None)
+            mime = next((value for name, value in headers.items() if name.lower() == "content-type"), "")
+
+            if body is None:
+                return None, 0
+
+            if isinstance(body, dict):
+                body, mime = urlencode(body), mime or "application/x-www-form-urlencoded"
+
+            if not isinstance(body, (str, bytes, bytearray)):
+                # streamed bodies are only produced while they are sent, so their size is not known
+                return {"mimeType": mime, "text": ""}, -1
+
+        size = len(body.encode() if isinstance(body, str) else body)
+        data = {"mimeType": mime}
+
+        if self.bodies:
+            data["text"], encoding = _text(body)
+
+            if encoding is not None:
+                data["_encoding"] = encoding
+        else:
+            data["text"] = ""
+
+        return data, size
+
+    def _entry(self, pending: _PendingEntry, method: HttpMethod, response: requests.Response | None,
+               error: Exception | None, total: float) -> dict:
+        kwargs = pending.kwargs
+        headers = dict(kwargs.get("headers") or {})
+        params = dict(kwargs.get("params") or {})
+        url = f"{pending.url}?{urlencode(params)}" if params else pending.url
+        timings = self._timings(pending.trace, response, total)
+        version = pending.trace.http_version
+
+        if response is not None and version is None:
+            raw_version = getattr(response.raw, "version", None)
+            version = {10: "HTTP/1.0", 11: "HTTP/1.1", 20: "HTTP/2"}.get(raw_version)
+
+        request = {"method": method.value,
+                   "url": url,
+                   "httpVersion": version or "HTTP/1.1",
+                   "cookies": [],
+                   "headers": _pairs(headers),
+                   "queryString": _pairs(params),
+                   "headersSize": -1,
+                   "bodySize": 0}
+
+        post_data, request["bodySize"] = self._post_data(kwargs, headers)
+
+        if post_data is not None:
+            request["postData"] = post_data
+
+        entry = {"startedDateTime": pending.started.isoformat(timespec="milliseconds"),
+                 "time": round(sum(value for value in timings.values() if value > 0), 3),
+                 "request": request,
+                 "cache": {},
+                 "timings": timings}
+
+        if response is None:
+            entry["response"] = {"status": 0, "statusText": "", "httpVersion": request["httpVersion"], "cookies": [],
+                                 "headers": [], "content": {"size": 0, "mimeType": ""}, "redirectURL": "",
+                                 "headersSize": -1, "bodySize": -1, "_error": f"{type(error).__name__}: {error}"}
+            return entry
+
+        content = {"size": len(response.content), "mimeType": response.headers.get("Content-Type", "")}
+        wire = response.raw.tell() if hasattr(response.raw, "tell") else None
+
+        if wire is not None and wire > 0:
+            content["compression"] = content["size"] - wire
+
+        if self.bodies:
+            content["text"], encoding = _text(response.content)
+
+            if encoding is not None:
+                content["encoding"] = encoding
+
+        entry["response"] = {"status": response.status_code,
+                             "statusText": response.reason or "",
+                             "httpVersion": request["httpVersion"],
+                             "cookies": [],
+                             "headers": _pairs(response.headers),
+                             "content": content,
+                             "redirectURL": response.headers.get("Location", ""),
+                             "headersSize": -1,
+                             "bodySize": wire if wire else -1}
+        return entry
+
+    def har(self) -> dict:
+        """Returns the log of the entries recorded, as a HAR 1.2 document."""
+
+        with self._lock:
+            entries = list(self._entries)
+
+        return {"log": {"version": HARRecorder.VERSION, "creator": HARRecorder.CREATOR, "entries": entries}}
+
+    def dumps(self) -> str:
+        """Returns the log of the entries recorded as a HAR file."""
+
+        return json.dumps(self.har(), indent=2)
+
+    def _flush_later(self) -> None:
+        time.sleep(max(0.0, self._flushed + self.flush_interval - time.monotonic()))
+
+        with self._lock:
+            self._flush_scheduled = False
+
+        self.flush()
+
+    def flush(self) -> None:
+        """Writes the log to the file, replacing its contents. The file is written atomically."""
+
+        if self.path is None:
+            return
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+
+        try:
+            with tempfile.NamedTemporaryFile("w", dir=directory, suffix=".har", delete=False) as f:
+                f.write(self.dumps())
+
+            os.replace(f.name, self.path)
+            self._flushed = time.monotonic()
+        except OSError as ex:
+            LOGGER.warning(f"Unable to write HAR file {self.path}! Error: {ex}")
+
+    def clear(self) -> None:
+        """Removes every entry recorded."""
+
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns the number of entries recorded and kept, and where the log is written to.
+
+        :return: Dictionary containing the counters and settings of the recorder
+        """
+
+        with self._lock:
+            return {"recorded": self._recorded,
+                    "kept": len(self._entries),
+                    "bodies": self.bodies,
+                    "path": self.path}
+
+
+def session_recorder() -> HARRecorder | None:
+    """
+    Returns the recorder of the current Streamlit session, if the session is recording its requests. This must be
+    called from the script thread of the session, e.g. when a request is created.
+
+    :return: HARRecorder object, or None if the session is not recording its requests
+    """
+
+    if not st.session_state.get("har_recording", False):
+        return None
+
+    return st.session_state.get("har_recorder")
+
+
+def record_requests(enabled: bool = True, bodies: bool = False) -> HARRecorder:
+    """
+    Starts or stops recording the requests sent by the current Streamlit session into its own HAR log. The log only
+    holds the requests of the session, and is only kept in memory, so that no session can read the headers and
+    bodies of the requests of another session.
+
+    :param enabled: Whether to record requests
+    :param bodies: Whether to record the bodies of requests and responses
+    :return: HARRecorder object of the session, which holds its log whether it is recording or not
+    """
+
+    if not isinstance(enabled, bool) or not isinstance(bodies, bool):
+        raise ValueError("Enabled and bodies must be booleans!")
+
+    recorder = st.session_state.get("har_recorder")
+
+    if recorder is None:
+        recorder = HARRecorder()
+        st.session_state["har_recorder"] = recorder
+
+    recorder.bodies = bodies
+    st.session_state["har_recording"] = enabled
+
+    if enabled:
+        ConnectionTrace.install()
+
+    return recorder
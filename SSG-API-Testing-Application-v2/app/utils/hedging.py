@@ -0,0 +1,312 @@
+"""
+This file contains the Hedger class, which HTTPRequestBuilder uses to hedge latency-critical GET requests: if a
+request has not completed within the usual latency of its route, an identical request is sent and whichever completes
+first is used.
+"""
+
+import contextvars
+import math
+import threading
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable
+from urllib.parse import urlsplit
+
+import requests
+
+from app.core.system.logger import Logger
+from app.utils.timeouts import current_deadline
+from app.utils.timings import RequestTimings, current_timings
+
+
+LOGGER = Logger("Hedger")
+
+
+@dataclass(frozen=True)
+class HedgeConfig:
+    """
+    Represents when requests are hedged, and how many hedged requests may be sent.
+
+    A request is hedged once it has been running for longer than the given percentile of the latencies of the last
+    window requests to its route, provided that at least min_samples latencies have been observed. The delay is never
+    shorter than min_delay, so that fast routes are not hedged on noise.
+
+    Hedged requests are paid for from a budget: every request that is not a hedge adds budget_ratio tokens to the
+    budget, up to max_tokens, and every hedge takes one token. At most budget_ratio hedges are therefore sent per
+    request in the long run, which caps the extra load that hedging puts on the API.
+    """
+
+    percentile: float = 0.95
+    window: int = 200
+    min_samples: int = 20
+    min_delay: float = 0.01
+    budget_ratio: float = 0.1
+    max_tokens: float = 10.0
+
+    def __post_init__(self):
+        if not 0 < self.percentile < 1:
+            raise ValueError("Percentile must be within (0, 1)!")
+
+        if self.window < 1 or self.min_samples < 1 or self.min_samples > self.window:
+            raise ValueError("Window and minimum samples must be positive, and the minimum samples cannot exceed "
+                             "the window!")
+
+        if self.min_delay < 0 or self.budget_ratio < 0 or self.max_tokens < 1:
+            raise ValueError("Minimum delay and budget ratio cannot be negative, and the budget must hold at least "
+                             "one token!")
+
+
+class Hedger:
+    """
+    Class to hedge requests.
+
+    Latencies are tracked per route, where the route is the origin and the path of the request with every path
+    segment that contains a digit (e.g. a course run ID or an enrolment reference number) replaced by a placeholder,
+    so that requests for different resources of the same kind share their latencies.
+
+    The original request and the hedge run on a shared pool of threads, so the hedge is sent over another pooled
+    connection while the original request is still waiting on its own. The response that completes first is returned;
+    the other request is cancelled if it has not started yet, and its response is discarded and its connection
+    released once it completes otherwise, as a blocking request cannot be interrupted.
+    """
+
+    DEFAULT_WORKERS: int = 16
+
+    def __init__(self, config: HedgeConfig = HedgeConfig(), workers: int = DEFAULT_WORKERS):
+        """
+        Initialises the hedger.
+
+        :param config: Configuration of the hedger
+        :param workers: Maximum number of requests that may be running on the threads of the hedger at once
+        """
+
+        if workers < 2:
+            raise ValueError("Workers must be at least 2!")
+
+        self.config = config
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._latencies: dict[str, deque[float]] = {}
+        self._tokens = config.max_tokens
+        self._pool: ThreadPoolExecutor | None = None
+        self._requests = 0
+        self._hedged = 0
+        self._won = 0
+        self._denied = 0
+
+    @staticmethod
+    def route(url: str) -> str:
+        """
+        Returns the route of a URL that latencies are tracked by.
+
+        :param url: URL of the request
+        :return: Origin and path of the URL, with every path segment that contains a digit replaced by {id}
+        """
+
+        parts = urlsplit(url)
+        path = "/".join("{id}" if any(c.isdigit() for c in segment) else segment
+                        for segment in parts.path.split("/"))
+
+        return f"{parts.scheme}://{parts.netloc}".lower() + (path or "/")
+
+    def observe(self, url: str, seconds: float) -> None:
+        """
+        Records the latency of a request.
+
+        :param url: URL of the request
+        :param seconds: Number of seconds the request took
+        """
+
+        route = Hedger.route(url)
+
+        with self._lock:
+            latencies = self._latencies.get(route)
+
+            if latencies is None:
+                latencies = deque(maxlen=self.config.window)
+                self._latencies[route] = latencies
+
+            latencies.append(seconds)
+
+    def delay(self, url: str) -> float | None:
+        """
+        Returns how long to wait for a request before hedging it.
+
+        :param url: URL of the request
+        :return: Number of seconds, or None if too few latencies have been observed for the route of the request
+        """
+
+        with self._lock:
+            latencies = sorted(self._latencies.get(Hedger.route(url), ()))
+
+        if len(latencies) < self.config.min_samples:
+            return None
+
+        # nearest-rank percentile
+        index = max(0, math.ceil(self.config.percentile * len(latencies)) - 1)
+        return max(self.config.min_delay, latencies[index])
+
+    def _earn(self) -> None:
+        with self._lock:
+            self._requests += 1
+            self._tokens = min(self.config.max_tokens, self._tokens + self.config.budget_ratio)
+
+    def _spend(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                self._denied += 1
+                return False
+
+            self._tokens -= 1
+            self._hedged += 1
+            return True
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hedge")
+
+            return self._pool
+
+    def _submit(self, fn: Callable[[], requests.Response]) -> tuple[Future, tuple[RequestTimings, contextvars.Context]]:
+        """
+        Runs a request on the threads of the hedger, in a copy of the context of the caller so that it runs under
+        the same deadline. Each request records its phases into timings of its own, and its state into a context of
+        its own, so that only the phases and state of the request that is used are kept.
+
+        :param fn: Function sending the request
+        :return: 2-tuple of the future of the request, and its timings and context
+        """
+
+        timings = RequestTimings()
+        context = contextvars.copy_context()
+
+        def run() -> requests.Response:
+            with timings.scope():
+                return fn()
+
+        return self._executor().submit(context.run, run), (timings, context)
+
+    def run(self, url: str, fn: Callable[[], requests.Response]) -> requests.Response:
+        """
+        Sends a request, and hedges it if it has not completed within the usual latency of its route and the budget
+        allows it.
+
+        :param url: URL of the request
+        :param fn: Function sending the request. It is called once more for the hedge, and must not read from the
+                   Streamlit session state as it runs on another thread
+        :return: Response of whichever request completed first
+        """
+
+        delay = self.delay(url)
+        self._earn()
+
+        if delay is None:
+            return fn()
+
+        deadline = current_deadline()
+
+        if deadline is not None and not deadline.allows(delay):
+            # the hedge could not be sent before the deadline expires
+            return fn()
+
+        primary, primary_state = self._submit(fn)
+        done, _ = wait([primary], timeout=delay)
+
+        if len(done) > 0 or not self._spend():
+            return self._settle(primary, *primary_state)
+
+        LOGGER.info(f"Request to {url} has been running for longer than {delay * 1000:.0f} ms! Hedging request...")
+        hedge, hedge_state = self._submit(fn)
+        pending = {primary: primary_state, hedge: hedge_state}
+        error = None
+
+        while len(pending) > 0:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                state = pending.pop(future)
+
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+
+                if future is hedge:
+                    with self._lock:
+                        self._won += 1
+
+                for loser in pending:
+                    Hedger._cancel(loser)
+
+                return self._settle(future, *state)
+
+        raise error
+
+    @staticmethod
+    def _settle(future: Future, timings: RequestTimings, context: contextvars.Context) -> requests.Response:
+        """
+        Returns the response of a request, and merges its phases into the timings in force in the current context.
+        The state that the request left in its context, such as the attempt that middleware is recording, is carried
+        over into the current context, as if the request had been sent from it.
+
+        :param future: Future of the request
+        :param timings: Timings of the request
+        :param context: Context that the request ran in
+        :return: Response of the request
+        """
+
+        response = future.result()
+        current = current_timings()
+
+        if current is not None:
+            # the send phase is already being recorded by the caller
+            for phase, seconds in timings.phases.items():
+                if phase != "send":
+                    current.record(phase, seconds)
+
+        for var, value in context.items():
+            if var.get(None) is not value:
+                var.set(value)
+
+        return response
+
+    @staticmethod
+    def _cancel(future: Future) -> None:
+        """Cancels a request that lost the race, or releases its connection once it completes."""
+
+        if future.cancel():
+            return
+
+        def release(completed: Future) -> None:
+            if completed.exception() is None:
+                completed.result().close()
+
+        future.add_done_callback(release)
+
+    def stats(self) -> dict:
+        """
+        Returns the number of requests hedged, and the hedging delay of every route observed.
+
+        :return: Dictionary containing the counters and routes
+        """
+
+        with self._lock:
+            samples = {route: len(latencies) for route, latencies in self._latencies.items()}
+            stats = {"requests": self._requests,
+                     "hedged": self._hedged,
+                     "hedges_won": self._won,
+                     "denied_by_budget": self._denied,
+                     "tokens": round(self._tokens, 2)}
+
+        stats["routes"] = [{"route": route,
+                            "samples": count,
+                            "hedge_after_ms": round(delay * 1000, 2) if (delay := self.delay(route)) is not None
+                            else None} for route, count in samples.items()]
+
+        return stats
+
+
+# latencies and the hedging budget are shared by every Streamlit session running in this process
+HEDGER = Hedger()
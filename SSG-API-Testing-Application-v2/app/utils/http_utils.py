@@ -2,29 +2,58 @@
 This file contains useful classes and methods used for creating and handling HTTP requests.
 """
 
-import binascii
+import asyncio
 import json
 import textwrap
+import threading
+import time
 
-import certifi
+import httpx
 import requests
 import streamlit as st
 
-from requests.exceptions import ConnectionError, HTTPError, SSLError, InvalidURL, InvalidHeader
+from contextlib import nullcontext
+from dataclasses import dataclass
+from requests.exceptions import (ConnectionError, HTTPError, SSLError, InvalidURL, InvalidHeader, RequestException,
+                                 Timeout)
 
 from app.core.system.logger import Logger
 from app.utils.streamlit_utils import init, http_code_handler
 from app.core.abc.abstract import AbstractRequest
 from app.core.constants import HttpMethod
 from app.core.cipher.encrypt_decrypt import Cryptography
-from typing import Self, Any, Callable
+from typing import Self, Any, Callable, Awaitable, Iterable
 from app.utils.string_utils import StringBuilder
+from app.utils.credentials import ClientCredentials
+from app.utils.session_pool import current_session_id
+from app.utils.async_http import to_requests_response, translate_error
+from app.utils.batch import BatchExecutor, BatchResult, BatchStatus
+from app.utils.rate_limiter import RATE_LIMITER, RateLimitExceeded
+from app.utils.retry import RetryPolicy, IDEMPOTENT_RETRY, CONNECT_ONLY_RETRY
+from app.utils.response_cache import RESPONSE_CACHE, ResponseCache, CacheEntry, CacheState, clone_response
+from app.utils.single_flight import SINGLE_FLIGHT, SingleFlight
+from app.utils.circuit_breaker import CIRCUIT_BREAKERS, CircuitBreaker, CircuitOpen, is_failure
+from app.utils.timeouts import TIMEOUTS, Deadline, DeadlineExceeded, current_deadline, is_timeout
+from app.utils.timings import RequestTimings, current_timings, timed
+from app.utils.transport import Transport, default_transport
+from app.utils.middleware import MIDDLEWARE, Middleware, MiddlewareChain
+from app.utils.hedging import HEDGER
+from app.utils.compression import COMPRESSION, Compression
+from app.utils.dns_cache import DNS_CACHE
+from app.utils.har import session_recorder, trace_connection
+from app.utils.shadow import ShadowTarget, shadow_target
+from app.utils.json_stream import decrypt_json
+from app.utils.streaming import StreamingBody
 
 
 # initiaise the session variables here
 init()
+DNS_CACHE.install()
 LOGGER = Logger("HTTP Request")
 
+# httpcore reports the network phases of asynchronous requests to this callback, for the HAR recorder
+TRACE_EXTENSIONS = {"trace": trace_connection}
+
 
 class HTTPRequestBuilder:
     """
@@ -34,6 +63,9 @@ class HTTPRequestBuilder:
     # specifies the max length to truncate text to and cause a text wrap
     WRAP_LEVEL: int = 72
 
+    # specifies the number of characters of a streamed payload that are encrypted to preview it
+    PREVIEW_CHARS: int = 4096
+
     # specifies the level of indent for any json.dumps() function calls below
     _INDENT_LEVEL: int = 4
 
@@ -46,6 +78,21 @@ class HTTPRequestBuilder:
         self.header = {"accept": "application/json"}
         self.params = {}
         self.body = {}
+        self.retry_policy = None
+        self.cache = False
+        self.hedge = False
+        self.compress = False
+        self.stream = False
+        self.transport = None
+        self.middleware = None
+
+        # the recorder and shadow environment are looked up now, as the request may be sent from a thread that cannot
+        # read the session state
+        self.shadow = shadow_target()
+        recorder = session_recorder()
+
+        if recorder is not None:
+            self.with_middleware(recorder)
 
     def __str__(self):
         """
@@ -173,21 +220,794 @@ class HTTPRequestBuilder:
 
         return self.with_header("x-api-version", version)
 
-    def get(self) -> requests.Response:
+    def with_retry_policy(self, policy: RetryPolicy) -> Self:
+        """
+        Sets the policy used to retry the request if it fails.
+
+        :param policy: RetryPolicy object
+        :return: This Builder instance
+        """
+
+        if not isinstance(policy, RetryPolicy):
+            raise ValueError("Retry policy must be a RetryPolicy!")
+
+        self.retry_policy = policy
+        return self
+
+    def with_cache(self, enabled: bool = True) -> Self:
+        """
+        Allows GET responses to be served from the response cache. This should only be enabled for read-only
+        resources, and only routes that have a rule in the response cache are actually cached.
+
+        :param enabled: Whether the response cache should be used
+        :return: This Builder instance
+        """
+
+        if not isinstance(enabled, bool):
+            raise ValueError("Enabled must be a boolean!")
+
+        self.cache = enabled
+        return self
+
+    def with_hedging(self, enabled: bool = True) -> Self:
+        """
+        Allows GET requests to be hedged: if the request has not completed within the usual latency of its route, an
+        identical request is sent and whichever completes first is used (see Hedger). This should only be enabled
+        for read-only requests where latency matters, as hedging adds load to the API.
+
+        :param enabled: Whether the request may be hedged
+        :return: This Builder instance
+        """
+
+        if not isinstance(enabled, bool):
+            raise ValueError("Enabled must be a boolean!")
+
+        self.hedge = enabled
+        return self
+
+    def with_compression(self, enabled: bool = True) -> Self:
+        """
+        Allows the body of the request to be compressed with gzip if it is large, if compression has been enabled for
+        the API endpoint, and if the server accepts compressed bodies for the route (see Compression). Responses are
+        decompressed regardless of this setting.
+
+        :param enabled: Whether the body may be compressed
+        :return: This Builder instance
+        """
+
+        if not isinstance(enabled, bool):
+            raise ValueError("Enabled must be a boolean!")
+
+        self.compress = enabled
+        return self
+
+    def with_streaming(self, enabled: bool = True) -> Self:
+        """
+        Streams the encrypted body of the request: the body is serialised, encrypted and Base64-encoded chunk by chunk
+        while it is sent with chunked transfer encoding, so that memory use does not grow with the size of the body.
+        If the server does not accept chunked bodies, the body is sent again in full.
+
+        As the body is encrypted while it is sent, the time spent encrypting it is counted in the send phase of the
+        request timings rather than in the encrypt phase.
+
+        :param enabled: Whether the encrypted body should be streamed
+        :return: This Builder instance
+        """
+
+        if not isinstance(enabled, bool):
+            raise ValueError("Enabled must be a boolean!")
+
+        self.stream = enabled
+        return self
+
+    def with_transport(self, transport: Transport) -> Self:
+        """
+        Sets the transport that the request is sent through, instead of the default transport (see
+        set_default_transport()).
+
+        :param transport: Transport object
+        :return: This Builder instance
+        """
+
+        if not isinstance(transport, Transport):
+            raise ValueError("Transport must be a Transport!")
+
+        self.transport = transport
+        return self
+
+    def with_shadow(self, shadow: ShadowTarget | None) -> Self:
+        """
+        Sets the shadow environment that the request is mirrored to if it only reads data (see ShadowTraffic),
+        instead of the one selected in the session state when the request was created.
+
+        :param shadow: ShadowTarget object, or None to not mirror the request
+        :return: This Builder instance
+        """
+
+        if shadow is not None and not isinstance(shadow, ShadowTarget):
+            raise ValueError("Shadow must be a ShadowTarget!")
+
+        self.shadow = shadow
+        return self
+
+    def with_middleware(self, middleware: Middleware) -> Self:
+        """
+        Adds middleware that runs around the dispatch of this request only, after the middleware registered for
+        every request (see MIDDLEWARE).
+
+        :param middleware: Middleware object
+        :return: This Builder instance
+        """
+
+        if not isinstance(middleware, Middleware):
+            raise ValueError("Middleware must be a Middleware!")
+
+        if self.middleware is None:
+            self.middleware = MiddlewareChain()
+
+        self.middleware.use(middleware)
+        return self
+
+    def _hooks(self, hook: str) -> tuple:
+        """
+        Returns the middleware hooks to run at a point of the request pipeline.
+
+        :param hook: Name of the hook, which must be one of MiddlewareChain.HOOKS
+        :return: Tuple of hooks, in the order that they should run
+        """
+
+        hooks = MIDDLEWARE.hooks[hook]
+        return hooks if self.middleware is None else hooks + self.middleware.hooks[hook]
+
+    def _build(self, method: HttpMethod) -> None:
+        """Runs the pre_build hooks of the middleware."""
+
+        for hook in self._hooks("pre_build"):
+            hook(self, method)
+
+    def _encrypt(self) -> str:
+        """
+        Runs the pre_encrypt hooks of the middleware, and encrypts the body of the request.
+
+        :return: Encrypted payload
+        """
+
+        body = self._pre_encrypt()
+
+        # the ciphertext is remembered, so a payload that has been previewed is not encrypted again when it is sent
+        with timed("encrypt"):
+            return Cryptography.encrypt(json.dumps(body), return_bytes=False, memoize=True)
+
+    def encrypted_payload(self) -> str:
+        """
+        Returns the encrypted payload of the request, exactly as post_encrypted() sends it. The payload is only
+        encrypted once, however many times it is previewed and sent, except that streamed payloads are encrypted again
+        while they are sent so that they are never held in memory in full.
+
+        :return: Encrypted payload
+        """
+
+        return self._encrypt()
+
+    def preview_payload(self) -> tuple[str, bool]:
+        """
+        Returns the encrypted payload of the request for display. Streamed payloads are only encrypted as far as the
+        first PREVIEW_CHARS characters of their ciphertext, as encrypting them in full would hold their ciphertext in
+        memory and encrypt them once more than sending them does.
+
+        :return: 2-tuple of the encrypted payload, or the start of it, and whether it was truncated
+        """
+
+        if not self.stream:
+            return self._encrypt(), False
+
+        limit = HTTPRequestBuilder.PREVIEW_CHARS
+        preview = b""
+
+        # the body is the ciphertext quoted as a JSON string, and producing it stops once enough has been encrypted
+        for chunk in StreamingBody.encrypted_json(self._pre_encrypt(), chunk_size=limit):
+            preview += chunk
+
+            if len(preview) > limit + 2:
+                return preview[1:limit + 1].decode(), True
+
+        return preview[1:-1].decode(), False
+
+    def _pre_encrypt(self) -> dict:
+        """Runs the pre_encrypt hooks of the middleware, and returns the body that they return."""
+
+        body = self.body
+
+        for hook in self._hooks("pre_encrypt"):
+            body = hook(self, body)
+
+        return body
+
+    def _encrypted(self, kwargs: dict) -> dict:
+        """
+        Adds the encrypted body of the request to the keyword arguments passed on to the session or client, as a
+        streamed body if streaming is enabled, or as the JSON payload otherwise.
+
+        :param kwargs: Keyword arguments of the request
+        :return: Keyword arguments including the encrypted body
+        """
+
+        if not self.stream:
+            return {**kwargs, "json": self._encrypt()}
+
+        return {**kwargs,
+                "data": StreamingBody.encrypted_json(self._pre_encrypt()),
+                "headers": {**kwargs.get("headers", {}), "Content-Type": "application/json"}}
+
+    @staticmethod
+    def _buffered(kwargs: dict) -> dict | None:
+        """
+        Returns the keyword arguments of a request with its streamed body produced in full, for servers that do not
+        accept chunked bodies.
+
+        :param kwargs: Keyword arguments of the request
+        :return: Keyword arguments with the whole body, or None if the body is not streamed
+        """
+
+        for key in ("data", "content"):
+            if isinstance(kwargs.get(key), StreamingBody):
+                return {**kwargs, key: kwargs[key].buffer()}
+
+        return None
+
+    @staticmethod
+    def _async_body(kwargs: dict) -> dict:
+        """
+        Returns the keyword arguments of a request for httpx, which takes raw bodies as the content of the request
+        and sends streamed bodies through their asynchronous view.
+
+        :param kwargs: Keyword arguments of the request
+        :return: Keyword arguments that httpx.AsyncClient accepts
+        """
+
+        body_key = next((key for key in ("data", "content")
+                         if isinstance(kwargs.get(key), (StreamingBody, bytes))), None)
+
+        if body_key is None:
+            return kwargs
+
+        body = kwargs[body_key]
+        return {**{name: value for name, value in kwargs.items() if name != body_key},
+                "content": body.aiter() if isinstance(body, StreamingBody) else body}
+
+    def _receive(self, method: HttpMethod, response: requests.Response) -> requests.Response:
+        """Runs the post_receive hooks of the middleware, and returns the response that they return."""
+
+        for hook in self._hooks("post_receive"):
+            response = hook(self, method, response)
+
+        return response
+
+    def _fail(self, method: HttpMethod, error: Exception) -> None:
+        """
+        Runs the on_error hooks of the middleware. Errors raised by the hooks are logged, so that they do not hide
+        the error that the request failed with.
+        """
+
+        for hook in self._hooks("on_error"):
+            try:
+                hook(self, method, error)
+            except Exception as ex:
+                LOGGER.warning(f"Middleware failed to handle error {error!r}! Error: {ex}")
+
+    def _transport(self) -> Transport:
+        """Returns the transport that the request is sent through."""
+
+        return self.transport if self.transport is not None else default_transport()
+
+    def _transport_credentials(self) -> ClientCredentials | None:
+        """
+        Returns the client credentials stored in the session state, if the transport of the request uses them.
+
+        :return: ClientCredentials object, or None if the transport does not use credentials
+        """
+
+        return HTTPRequestBuilder._credentials() if self._transport().uses_credentials else None
+
+    @staticmethod
+    def _credentials() -> ClientCredentials | None:
+        """
+        Returns the client certificate and private key stored in the session state.
+
+        :return: ClientCredentials object
+        """
+
+        if "credentials" not in st.session_state:
+            raise ValueError("No Key or Certificate files specified!")
+
+        return st.session_state["credentials"]
+
+    @staticmethod
+    def _uen() -> str | None:
+        """Returns the UEN stored in the session state, which requests are rate limited by."""
+
+        return st.session_state.get("uen")
+
+    def _session(self) -> requests.Session:
+        """
+        Returns the session of the transport for the endpoint and the client credentials stored in the session state.
+        With the default transport, this is the pooled keep-alive session.
+
+        :return: requests.Session object
+        """
+
+        return self._transport().session(self.endpoint, self._transport_credentials(), owner=current_session_id())
+
+    def _policy(self, method: HttpMethod) -> RetryPolicy:
+        """
+        Returns the retry policy of the request. If no policy is specified, GET requests are treated as idempotent
+        and POST requests are only retried if they fail before reaching the server.
+
+        :param method: HttpMethod of the request
+        :return: RetryPolicy object
+        """
+
+        if self.retry_policy is not None:
+            return self.retry_policy
+
+        return IDEMPOTENT_RETRY if method == HttpMethod.GET else CONNECT_ONLY_RETRY
+
+    def _timeout(self, method: HttpMethod, deadline: Deadline | None) -> tuple[float, float] | None:
+        """
+        Returns the connect and read timeouts of the next attempt, clamped to the time left before the deadline.
+
+        :param method: HttpMethod of the request
+        :param deadline: Deadline the request must complete by, if any
+        :return: 2-tuple of the connect and read timeouts, or None if the request should not time out
+        :raises DeadlineExceeded: If the deadline has already expired
+        """
+
+        timeout = TIMEOUTS.resolve(method, self.endpoint)
+
+        if deadline is None:
+            return timeout
+
+        try:
+            return deadline.clamp(timeout, self.endpoint)
+        except DeadlineExceeded:
+            TIMEOUTS.record_timeout(method, self.endpoint)
+            raise
+
+    @staticmethod
+    def _within(deadline: Deadline | None, delay: float | None) -> float | None:
+        """
+        Discards a retry delay if the deadline would expire before the retry could be sent.
+
+        :param deadline: Deadline the request must complete by, if any
+        :param delay: Number of seconds to wait before retrying, or None if the request should not be retried
+        :return: The delay, or None if the request should not be retried
+        """
+
+        if delay is None or deadline is None or deadline.allows(delay):
+            return delay
+
+        LOGGER.warning("Deadline would expire before the next attempt! Giving up on the request...")
+        return None
+
+    def _send(self, method: HttpMethod, encrypted: bool = False, **kwargs) -> requests.Response:
+        """
+        Sends a request to the endpoint with the pooled session, once the rate limiter admits it. Failed attempts
+        are retried according to the retry policy of the request.
+
+        :param method: HttpMethod of the request
+        :param encrypted: Whether the body should be encrypted and sent as the JSON payload of the request
+        :param kwargs: Keyword arguments passed on to requests.Session.request()
+        :return: requests.Response object
+        """
+
+        try:
+            session = self._session()
+
+            if encrypted:
+                kwargs = self._encrypted(kwargs)
+
+            with timed("send"):
+                response = self._dispatch(session, HTTPRequestBuilder._uen(), method, **kwargs)
+        except Exception as ex:
+            self._fail(method, ex)
+            raise
+
+        return self._receive(method, response)
+
+    def _admit(self, breaker: CircuitBreaker, uen: str | None, deadline: Deadline | None) -> float:
+        """
+        Admits an attempt through the circuit breaker of the endpoint and then through the rate limiter, so that no
+        token is spent on an attempt that the breaker rejects. The limiter never waits for longer than what is left
+        of the deadline.
+
+        :param breaker: Circuit breaker of the endpoint
+        :param uen: UEN the request is made on behalf of
+        :param deadline: Deadline the request must complete by, if any
+        :return: Number of seconds to wait before the attempt is sent
+        :raises CircuitOpen: If the breaker rejects the attempt
+        :raises RateLimitExceeded: If the attempt would have to wait for too long
+        """
+
+        breaker.allow()
+
+        try:
+            return RATE_LIMITER.reserve(self.endpoint, uen,
+                                        max(0.0, deadline.remaining()) if deadline is not None else None)
+        except RateLimitExceeded:
+            breaker.release()
+            raise
+
+    def _dispatch(self, session: requests.Session, uen: str | None, method: HttpMethod,
+                  **kwargs) -> requests.Response:
+        """
+        Runs the retry loop of _send() with a session that has already been resolved. This does not read from the
+        session state, so it may be called from threads other than the Streamlit script thread.
+
+        :param session: requests.Session object to send the request with
+        :param uen: UEN the request is made on behalf of
+        :param method: HttpMethod of the request
+        :param kwargs: Keyword arguments passed on to requests.Session.request()
+        :return: requests.Response object
+        """
+
+        policy = self._policy(method)
+        deadline = current_deadline()
+        breaker = CIRCUIT_BREAKERS.breaker(self.endpoint)
+        kwargs["headers"] = {"Accept-Encoding": Compression.accept_encoding(), **kwargs.get("headers", {}),
+                             **policy.idempotency_headers()}
+        plain = dict(kwargs)
+        compressed = self.compress and COMPRESSION.compress(self.endpoint, kwargs)
+        attempt = 0
+        spent = 0.0
+
+        while True:
+            attempt += 1
+            wait = self._admit(breaker, uen, deadline)
+
+            if wait > 0:
+                time.sleep(wait)
+
+            try:
+                timeout = self._timeout(method, deadline)
+            except DeadlineExceeded:
+                breaker.release()
+                raise
+
+            for hook in self._hooks("pre_send"):
+                hook(self, method, kwargs)
+
+            try:
+                sent = time.perf_counter()
+                response = session.request(method.value, self.endpoint, timeout=timeout, **kwargs)
+            except RequestException as ex:
+                breaker.record(is_failure(error=ex))
+
+                if is_timeout(ex):
+                    TIMEOUTS.record_timeout(method, self.endpoint)
+
+                delay = HTTPRequestBuilder._within(deadline, policy.next_delay(attempt, spent, error=ex))
+
+                if delay is None:
+                    raise
+
+                LOGGER.warning(f"Attempt {attempt} failed with error: {ex}. Retrying in {delay:.2f}s...")
+            else:
+                if method == HttpMethod.GET:
+                    HEDGER.observe(self.endpoint, time.perf_counter() - sent)
+
+                COMPRESSION.observe(self.endpoint, response)
+
+                resend = None
+
+                if compressed and Compression.rejected(response):
+                    COMPRESSION.reject(self.endpoint)
+                    resend, compressed = plain, False
+                elif response.status_code == 411 and HTTPRequestBuilder._buffered(kwargs) is not None:
+                    LOGGER.warning(f"{self.endpoint} does not accept chunked bodies! Sending the body in full...")
+                    resend = HTTPRequestBuilder._buffered(kwargs)
+
+                # the outcome is recorded before the body is sent again, so that a half-open breaker admits the resend
+                breaker.record(is_failure(response=response))
+
+                if resend is not None:
+                    kwargs = resend
+                    continue
+
+                RATE_LIMITER.observe(self.endpoint, uen, response)
+                delay = HTTPRequestBuilder._within(deadline, policy.next_delay(attempt, spent, response=response))
+
+                if delay is None:
+                    if current_timings() is not None:
+                        # requests stops the clock once the headers are received, before the body is read
+                        current_timings().record("first_byte", response.elapsed.total_seconds())
+
+                    return response
+
+                LOGGER.warning(f"Attempt {attempt} failed with HTTP code {response.status_code}. "
+                               f"Retrying in {delay:.2f}s...")
+
+            time.sleep(delay)
+            spent += delay
+
+    async def _send_async(self, method: HttpMethod, credentials: ClientCredentials | None, uen: str | None = None,
+                          deadline: Deadline | None = None, timings: RequestTimings | None = None,
+                          **kwargs) -> requests.Response:
+        """
+        Sends a request to the endpoint with the asynchronous client for the running event loop, once the rate
+        limiter admits it. Failed attempts are retried according to the retry policy of the request.
+
+        :param method: HttpMethod of the request
+        :param credentials: Client certificate and private key
+        :param uen: UEN the request is made on behalf of
+        :param deadline: Deadline the request must complete by. This is passed in explicitly as the event loop does
+                         not run in the context of the caller
+        :param timings: Timings to record the send and first_byte phases into. These are passed in explicitly for the
+                        same reason
+        :param kwargs: Keyword arguments passed on to httpx.AsyncClient.request()
+        :return: requests.Response object
+        """
+
+        try:
+            with timed("send", timings):
+                response = await self._attempt_async(method, credentials, uen, deadline, timings, **kwargs)
+        except Exception as ex:
+            self._fail(method, ex)
+            raise
+
+        return self._receive(method, response)
+
+    async def _attempt_async(self, method: HttpMethod, credentials: ClientCredentials | None, uen: str | None,
+                             deadline: Deadline | None, timings: RequestTimings | None,
+                             **kwargs) -> requests.Response:
+        """
+        Runs the retry loop of _send_async().
+
+        :param method: HttpMethod of the request
+        :param credentials: Client certificate and private key
+        :param uen: UEN the request is made on behalf of
+        :param deadline: Deadline the request must complete by
+        :param timings: Timings to record the first_byte phase into
+        :param kwargs: Keyword arguments passed on to httpx.AsyncClient.request()
+        :return: requests.Response object
+        """
+
+        policy = self._policy(method)
+        breaker = CIRCUIT_BREAKERS.breaker(self.endpoint)
+        kwargs["headers"] = {"Accept-Encoding": Compression.accept_encoding(), **kwargs.get("headers", {}),
+                             **policy.idempotency_headers()}
+        plain = dict(kwargs)
+        compressed = self.compress and COMPRESSION.compress(self.endpoint, kwargs, body_key="content")
+        attempt = 0
+        spent = 0.0
+
+        while True:
+            attempt += 1
+            wait = self._admit(breaker, uen, deadline)
+
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            try:
+                timeout = self._timeout(method, deadline)
+            except DeadlineExceeded:
+                breaker.release()
+                raise
+
+            if timeout is not None:
+                kwargs["timeout"] = httpx.Timeout(timeout[1], connect=timeout[0])
+
+            for hook in self._hooks("pre_send"):
+                hook(self, method, kwargs)
+
+            try:
+                try:
+                    client = self._transport().client(self.endpoint, credentials)
+                    sent = time.perf_counter()
+
+                    # the response is streamed so that the time to its first byte can be measured
+                    request = client.build_request(method.value, self.endpoint, extensions=TRACE_EXTENSIONS,
+                                                   **HTTPRequestBuilder._async_body(kwargs))
+                    raw = await client.send(request, stream=True)
+                    first_byte = time.perf_counter() - sent
+
+                    try:
+                        await raw.aread()
+                    finally:
+                        await raw.aclose()
+
+                    response = to_requests_response(raw)
+                    COMPRESSION.observe(self.endpoint, response, raw.num_bytes_downloaded)
+                except (httpx.HTTPError, httpx.InvalidURL) as ex:
+                    raise translate_error(ex) from ex
+            except RequestException as ex:
+                breaker.record(is_failure(error=ex))
+
+                if is_timeout(ex):
+                    TIMEOUTS.record_timeout(method, self.endpoint)
+
+                delay = HTTPRequestBuilder._within(deadline, policy.next_delay(attempt, spent, error=ex))
+
+                if delay is None:
+                    raise
+
+                LOGGER.warning(f"Attempt {attempt} failed with error: {ex}. Retrying in {delay:.2f}s...")
+            else:
+                resend = None
+
+                if compressed and Compression.rejected(response):
+                    COMPRESSION.reject(self.endpoint)
+                    resend, compressed = plain, False
+                elif response.status_code == 411 and HTTPRequestBuilder._buffered(kwargs) is not None:
+                    LOGGER.warning(f"{self.endpoint} does not accept chunked bodies! Sending the body in full...")
+                    resend = HTTPRequestBuilder._buffered(kwargs)
+
+                # the outcome is recorded before the body is sent again, so that a half-open breaker admits the resend
+                breaker.record(is_failure(response=response))
+
+                if resend is not None:
+                    kwargs = resend
+                    continue
+
+                RATE_LIMITER.observe(self.endpoint, uen, response)
+                delay = HTTPRequestBuilder._within(deadline, policy.next_delay(attempt, spent, response=response))
+
+                if delay is None:
+                    if timings is not None:
+                        timings.record("first_byte", first_byte)
+
+                    return response
+
+                LOGGER.warning(f"Attempt {attempt} failed with HTTP code {response.status_code}. "
+                               f"Retrying in {delay:.2f}s...")
+
+            await asyncio.sleep(delay)
+            spent += delay
+
+    def _cache_key(self, uen: str | None) -> tuple:
+        """
+        Returns the key of the GET request in the response cache. This reads the client credentials from the session
+        state, so it must be called from the Streamlit script thread.
+
+        :param uen: UEN the request is made on behalf of
+        :return: Cache key of the request
+        """
+
+        credentials = st.session_state.get("credentials")
+
+        return ResponseCache.key(HttpMethod.GET.value, self.endpoint, self.params, uen,
+                                 credentials.fingerprint if credentials is not None else "",
+                                 {"Accept-Encoding": Compression.accept_encoding(), **self.header})
+
+    def _fetch(self, session: requests.Session, uen: str | None, key: tuple | None,
+               entry: CacheEntry | None = None) -> requests.Response:
+        """
+        Sends a GET request to the endpoint, hedging it if hedging is enabled, and stores the response in the
+        response cache if caching is enabled.
+
+        :param session: requests.Session object to send the request with
+        :param uen: UEN the request is made on behalf of
+        :param key: Cache key of the request, or None if caching is disabled
+        :param entry: Cache entry to revalidate, if any
+        :return: requests.Response object
+        """
+
+        params = dict(self.params)
+        headers = {**self.header, **ResponseCache.validators(entry)}
+
+        if self.hedge:
+            response = HEDGER.run(self.endpoint,
+                                  lambda: self._dispatch(session, uen, HttpMethod.GET, params=dict(params),
+                                                         headers=dict(headers)))
+        else:
+            response = self._dispatch(session, uen, HttpMethod.GET, params=params, headers=headers)
+
+        if key is None:
+            return response
+
+        return RESPONSE_CACHE.update(key, self.endpoint, response, entry)
+
+    def _fetch_shared(self, session: requests.Session, uen: str | None, key: tuple | None,
+                      entry: CacheEntry | None = None) -> requests.Response:
+        """
+        Sends a GET request with _fetch(), unless an identical request is already in flight, in which case its
+        response is shared instead.
+
+        Pooled sessions are shared by every Streamlit session using the same client credentials for the same origin,
+        so the identity of the pooled session is used to ensure that responses are only shared between requests
+        sent with the same credentials.
+
+        :param session: requests.Session object to send the request with
+        :param uen: UEN the request is made on behalf of
+        :param key: Cache key of the request, or None if caching is disabled
+        :param entry: Cache entry to revalidate, if any
+        :return: requests.Response object
+        """
+
+        flight = SingleFlight.key(HttpMethod.GET.value, self.endpoint, self.params, self.header, uen, id(session))
+        deadline = current_deadline()
+
+        try:
+            response, leader = SINGLE_FLIGHT.do(flight, lambda: self._fetch(session, uen, key, entry),
+                                                deadline.remaining() if deadline is not None else None)
+        except TimeoutError:
+            raise DeadlineExceeded(self.endpoint) from None
+
+        return response if leader else clone_response(response)
+
+    def _get_cached(self, session: requests.Session, uen: str | None, key: tuple) -> requests.Response:
+        """
+        Serves a GET request from the response cache if possible, and sends it to the endpoint otherwise.
+
+        Fresh responses are returned without contacting the server. Stale responses are returned immediately while
+        they are revalidated on a background thread, and expired responses are revalidated before they are returned.
+        Revalidation uses the ETag and Last-Modified validators of the cached response, if the server supplied any.
+
+        :param session: requests.Session object to send the request with
+        :param uen: UEN the request is made on behalf of
+        :param key: Cache key of the request
+        :return: requests.Response object, with an X-Cache header if it was served from the cache
+        """
+
+        entry, state = RESPONSE_CACHE.lookup(key)
+
+        if state == CacheState.FRESH:
+            return clone_response(entry.response, CacheState.FRESH)
+
+        if state == CacheState.STALE:
+            if RESPONSE_CACHE.begin_refresh(key):
+                threading.Thread(target=self._revalidate, args=(session, uen, key, entry), daemon=True).start()
+
+            return clone_response(entry.response, CacheState.STALE)
+
+        return self._fetch_shared(session, uen, key, entry)
+
+    def _revalidate(self, session: requests.Session, uen: str | None, key: tuple, entry: CacheEntry) -> None:
+        """
+        Revalidates a stale cache entry in the background.
+
+        :param session: requests.Session object to send the request with
+        :param uen: UEN the request is made on behalf of
+        :param key: Cache key of the request
+        :param entry: Stale cache entry
+        """
+
+        try:
+            self._fetch_shared(session, uen, key, entry)
+        except Exception as ex:
+            LOGGER.warning(f"Unable to revalidate cached response for {self.endpoint}! Error: {ex}")
+        finally:
+            RESPONSE_CACHE.end_refresh(key)
+
+    def get(self, bypass_cache: bool = False) -> requests.Response:
         """
         Sends a GET request to the endpoint using the relevant certs stored in the session state.
 
+        If caching is enabled for this request (see with_cache()), the response may be served from the response
+        cache instead. Identical GET requests that are in flight at the same time share a single request to the
+        endpoint.
+
+        :param bypass_cache: Whether to skip the cache and always send the request. The response still replaces
+                             the cached response, so that later requests see the latest data
         :return: requests.Response object
         """
 
-        if "key_pem" not in st.session_state or "cert_pem" not in st.session_state:
-            raise ValueError("No Key or Certificate files specified!")
+        self._build(HttpMethod.GET)
 
-        return requests.get(self.endpoint,
-                            params=self.params,
-                            headers=self.header,
-                            verify=certifi.where(),
-                            cert=(st.session_state["cert_pem"], st.session_state["key_pem"]))
+        try:
+            session = self._session()
+            uen = HTTPRequestBuilder._uen()
+            key = self._cache_key(uen) if self.cache else None
+
+            with timed("send"):
+                if key is not None and not bypass_cache:
+                    response = self._get_cached(session, uen, key)
+                else:
+                    response = self._fetch_shared(session, uen, key)
+        except Exception as ex:
+            self._fail(HttpMethod.GET, ex)
+            raise
+
+        return self._receive(HttpMethod.GET, response)
 
     def post(self) -> requests.Response:
         """
@@ -196,15 +1016,12 @@ class HTTPRequestBuilder:
         :return: requests.Response object
         """
 
-        if "key_pem" not in st.session_state or "cert_pem" not in st.session_state:
-            raise ValueError("No Key or Certificate files specified!")
+        self._build(HttpMethod.POST)
 
-        return requests.post(self.endpoint,
-                             params=self.params,
-                             headers=self.header,
-                             data=self.body,
-                             verify=certifi.where(),
-                             cert=(st.session_state["cert_pem"], st.session_state["key_pem"]))
+        return self._send(HttpMethod.POST,
+                          params=self.params,
+                          headers=self.header,
+                          data=self.body)
 
     def post_encrypted(self) -> requests.Response:
         """
@@ -214,21 +1031,65 @@ class HTTPRequestBuilder:
         Make sure that you set return_bytes=False for Cryptography.encrypt() to decode the payload into a String;
         the json field does not allow you to pass in bytes objects.
 
-        cert can either be a single value representing the file path to a file that contains the private key and
-        certificate, or a 2-tuple (cert, key) representing the file path to a certificate and private key file
-        respectively.
+        The certificate and private key are loaded once into the SSL context of the pooled session for the endpoint
+        (see SessionPool), so they are not passed to requests on every call.
 
         :return: requests.Response object
         """
 
-        if "key_pem" not in st.session_state or "cert_pem" not in st.session_state:
-            raise ValueError("No Key or Certificate files specified!")
+        self._build(HttpMethod.POST)
+
+        return self._send(HttpMethod.POST,
+                          encrypted=True,
+                          params=self.params,
+                          headers=self.header)
+
+    def get_async(self) -> Awaitable[requests.Response]:
+        """
+        Asynchronous counterpart of get().
+
+        The credentials are read from the session state when this method is called rather than when the returned
+        awaitable is awaited, as the event loop may not run on the Streamlit script thread that owns the session
+        state.
+
+        :return: Awaitable resolving to a requests.Response object
+        """
+
+        self._build(HttpMethod.GET)
+
+        return self._send_async(HttpMethod.GET, self._transport_credentials(), HTTPRequestBuilder._uen(),
+                                current_deadline(), current_timings(),
+                                params=dict(self.params),
+                                headers=dict(self.header))
+
+    def post_async(self) -> Awaitable[requests.Response]:
+        """
+        Asynchronous counterpart of post().
+
+        :return: Awaitable resolving to a requests.Response object
+        """
+
+        self._build(HttpMethod.POST)
+
+        return self._send_async(HttpMethod.POST, self._transport_credentials(), HTTPRequestBuilder._uen(),
+                                current_deadline(), current_timings(),
+                                params=dict(self.params),
+                                headers=dict(self.header),
+                                data=dict(self.body))
+
+    def post_encrypted_async(self) -> Awaitable[requests.Response]:
+        """
+        Asynchronous counterpart of post_encrypted(). The payload is encrypted when this method is called.
+
+        :return: Awaitable resolving to a requests.Response object
+        """
 
-        return requests.post(self.endpoint,
-                             params=self.params,
-                             headers=self.header,
-                             json=Cryptography.encrypt(json.dumps(self.body), return_bytes=False),
-                             cert=(st.session_state["cert_pem"], st.session_state["key_pem"]))
+        self._build(HttpMethod.POST)
+        credentials = self._transport_credentials()
+        kwargs = self._encrypted({"params": dict(self.params), "headers": dict(self.header)})
+
+        return self._send_async(HttpMethod.POST, credentials, HTTPRequestBuilder._uen(),
+                                current_deadline(), current_timings(), **kwargs)
 
     def repr(self, req_type: HttpMethod) -> str:
         """
@@ -303,10 +1164,21 @@ def handle_request(rec_obj: AbstractRequest, require_encryption: bool = False) -
         st.subheader("Encrypted Request Payload")
         try:
             LOGGER.info("Encrypting Request Payload...")
-            # decode the object and wrap it to display it properly
-            ciphertext = Cryptography.encrypt(str(rec_obj)).decode()
+            builder = getattr(rec_obj, "req", None)
+
+            # the payload previewed is the one that is sent, which reuses its ciphertext rather than encrypting it again
+            if isinstance(builder, HTTPRequestBuilder):
+                ciphertext, truncated = builder.preview_payload()
+            else:
+                ciphertext, truncated = Cryptography.encrypt(str(rec_obj)).decode(), False
+
+            # wrap the ciphertext to display it properly
             st.code("\n".join(textwrap.wrap(ciphertext, width=HTTPRequestBuilder.WRAP_LEVEL)), language="text")
-        except binascii.Error:
+
+            if truncated:
+                st.caption("Only the start of the payload is shown, as the rest is encrypted while it is sent.")
+        except ValueError:
+            # invalid keys raise a binascii.Error if they are not Base64, or a ValueError if they are not 256 bits
             LOGGER.error("Encryption failed! Aborting request...")
             st.error("Unable to perform Encryption! Check your AES key to make sure that it is valid!", icon="🚨")
     else:
@@ -314,8 +1186,21 @@ def handle_request(rec_obj: AbstractRequest, require_encryption: bool = False) -
         st.code(repr(rec_obj), language="text")
 
 
+@dataclass
+class HandledResponse:
+    """Represents the outcome of a request executed by handle_response(), and the time taken by each of its phases."""
+
+    timings: RequestTimings
+    response: requests.Response | None = None
+    data: Any = None
+    error: Exception | None = None
+
+
 def handle_response(throwable: Callable[[], requests.Response],
-                    require_decryption: bool = False) -> dict:
+                    require_decryption: bool = False,
+                    deadline: float | None = None,
+                    fields: Iterable[str] | None = None,
+                    builder: HTTPRequestBuilder | None = None) -> HandledResponse:
     """
     Handles the potentially throwing request function and uses Streamlit to display or handle the error.
 
@@ -324,71 +1209,204 @@ def handle_response(throwable: Callable[[], requests.Response],
                       This function should also return the response object from the request.
     :param require_decryption: Boolean indicating whether decryption is required for the returned payload. If the
                                response should be decrypted, then a section will display the decrypted response.
+    :param deadline: Maximum number of seconds the request may take in total, including any retries, or None to
+                     only bound each attempt by its connect and read timeouts
+    :param fields: Paths of the fields of the decrypted payload to keep, such as data.enrolments[*].referenceNumber,
+                   or None to keep the whole payload. Only these fields are decoded and displayed
+    :param builder: HTTPRequestBuilder sending the request, whose middleware runs on the decrypted payload in addition
+                    to the middleware registered for every request
+    :return: HandledResponse object containing the response, its decoded payload and the timings of the request
     """
 
+    timings = RequestTimings()
+    result = HandledResponse(timings=timings)
+
     try:
         LOGGER.info("Executing request...")
-        response = throwable()
-        if not isinstance(throwable(), requests.Response):
+
+        # the request is only ever dispatched once; the HTTP layer records its encrypt and send phases into timings
+        with timings.scope(), (Deadline(deadline).scope() if deadline is not None else nullcontext()):
+            start = time.perf_counter()
+
+            try:
+                response = throwable()
+            finally:
+                timings.record("build", time.perf_counter() - start - timings.get("encrypt") - timings.get("send"))
+
+        if not isinstance(response, requests.Response):
             LOGGER.error("Function does not return the expected requests.Response object! Aborting request...")
             raise AssertionError("The request function does not return a valid HTTP response!")
 
-        http_code_handler(response.status_code)
+        result.response = response
+
+        with timings.phase("render"):
+            http_code_handler(response.status_code)
 
         if response.status_code >= 400:
             # is an error, no need to decrypt
             LOGGER.error(f"Request failed with HTTP request code {response.status_code}! Aborting request...")
-            st.header("Error Message")
+
             try:
-                data = json.loads(response.text)
-                st.code(Cryptography.decrypt(data["error"]).decode("utf-8"))
+                with timings.phase("parse"):
+                    data = json.loads(response.text)
+
+                with timings.phase("decrypt"):
+                    result.data = Cryptography.decrypt(data["error"]).decode("utf-8")
             except Exception:
                 # replace the unicode characters with the utf-8 encoded characters
-                st.code(response.text.replace(r"\u003D", "="))
-            return
-
-        LOGGER.info("Decrypting response...")
-        if require_decryption:
-            st.subheader("Encrypted Response")
-            st.code(response.text)
-            st.subheader("Decrypted Response")
+                result.data = response.text.replace(r"\u003D", "=")
+
+            with timings.phase("render"):
+                st.header("Error Message")
+                st.code(result.data)
+        elif require_decryption:
+            LOGGER.info("Decrypting response...")
+
             try:
-                data = Cryptography.decrypt(response.text).decode()
-                json_data = json.loads(data)
-                st.json(json_data)
+                # the payload is decrypted and parsed in one pass, which records both phases into timings
+                result.data = decrypt_json(response.text, fields, timings=timings)
+
+                hooks = builder._hooks("post_decrypt") if builder is not None else MIDDLEWARE.hooks["post_decrypt"]
+
+                for hook in hooks:
+                    result.data = hook(builder, response, result.data)
             except Exception as ex:
-                print(ex)
-                st.error("Unable to decrypt the response! It might be possible that the outputs are already "
-                         "decrypted (as with the Mock API endpoint)!", icon="🚨")
+                LOGGER.warning(f"Unable to decrypt the response! Error: {ex}")
+                result.error = ex
+
+            with timings.phase("render"):
+                st.subheader("Encrypted Response")
+                st.code(response.text)
+                st.subheader("Decrypted Response")
+
+                if result.error is None:
+                    st.json(result.data)
+                else:
+                    st.error("Unable to decrypt the response! It might be possible that the outputs are already "
+                             "decrypted (as with the Mock API endpoint)!", icon="🚨")
         else:
-            st.subheader("Response")
             try:
-                data = response.json()
-                st.json(data)
+                with timings.phase("parse"):
+                    result.data = response.json()
+
+                parsed = True
             except json.decoder.JSONDecodeError:
                 LOGGER.warning("Message is not JSON-serializable! Defaulting to plain text instead...")
-                st.code(response.text, language="text")
+                result.data = response.text
+                parsed = False
+
+            with timings.phase("render"):
+                st.subheader("Response")
+
+                if parsed:
+                    st.json(result.data)
+                else:
+                    st.code(result.data, language="text")
     except HTTPError as ex:
+        result.error = ex
         LOGGER.error(f"Request failed with HTTP exception! Error: {ex}. Aborting request...")
         st.error("Unable to make a HTTP request to the API endpoint! "
                  "Check your inputs and make sure that there are no mistakes in your inputs!")
     except InvalidURL as ex:
+        result.error = ex
         LOGGER.error(f"Request failed due to URL error. Error: {ex}. Aborting request...")
         st.error("Check that the URL you provided is a valid URL!")
     except InvalidHeader as ex:
+        result.error = ex
         LOGGER.error(f"Request failed due to HTTP header error. Error: {ex}. Aborting request...")
         st.error("Check that the headers you provided is valid!")
     except SSLError as ex:
         # there are some issues with the SSL keys
+        result.error = ex
         LOGGER.error(f"Unable to establish SSL connection with the server! Error: {ex}. Aborting request...")
         st.error("Check your SSL certificate and keys and ensure that they are valid!\n\n", icon="🚨")
+    except DeadlineExceeded as ex:
+        result.error = ex
+        LOGGER.error(f"Request did not complete before its deadline! Error: {ex}. Aborting request...")
+        st.error("The request did not complete within its deadline! The API endpoint may be slow or unavailable, "
+                 "try again later.", icon="⏱️")
+    except Timeout as ex:
+        # must be handled before ConnectionError, as connect timeouts are also connection errors
+        result.error = ex
+        LOGGER.error(f"Request timed out! Error: {ex}. Aborting request...")
+        st.error("The API endpoint took too long to respond! The API endpoint may be slow or unavailable, try "
+                 "again later.", icon="⏱️")
     except ConnectionError as ex:
         # the endpoint url is likely malformed here
+        result.error = ex
         LOGGER.error(f"There is an issue with the connection with the API endpoint! Error: {ex}. Aborting request...")
         st.error("Check the inputs that you have used for the API request and check that "
                  "they are valid!\n\nIt is likely that you have included a value that "
                  "causes the API request to query from a URL that does not exist or is "
                  "invalid!", icon="🚨")
+    except CircuitOpen as ex:
+        result.error = ex
+        LOGGER.error(f"Request was rejected by the circuit breaker! Error: {ex}. Aborting request...")
+        st.error(f"The API endpoint is currently failing, so requests to it are being held back! Try again in "
+                 f"{ex.retry_in:.0f} seconds.", icon="🚨")
+    except RateLimitExceeded as ex:
+        result.error = ex
+        LOGGER.error(f"Request was held back by the client-side rate limiter! Error: {ex}. Aborting request...")
+        st.error(f"Too many requests have been sent to the API recently! Try again in {ex.wait:.0f} seconds.",
+                 icon="🚨")
     except Exception as ex:
         # float it back to the user to handle
+        result.error = ex
         st.exception(ex)
+
+    display_timings(timings)
+    return result
+
+
+def display_timings(timings: RequestTimings) -> None:
+    """
+    Uses Streamlit to display the time taken by each phase of a request.
+
+    :param timings: Timings of the request
+    """
+
+    if len(timings.phases) == 0:
+        return
+
+    with st.expander(f"Timings ({timings.total * 1000:.0f} ms)"):
+        st.json(timings.as_row())
+
+
+def handle_batch(batch: Iterable[AbstractRequest], workers: int = BatchExecutor.DEFAULT_WORKERS,
+                 require_decryption: bool = False, deadline: float | None = None) -> list[BatchResult]:
+    """
+    Executes a batch of requests with a BatchExecutor and uses Streamlit to display a summary of the results.
+
+    :param batch: List or iterator of prepared requests
+    :param workers: Maximum number of requests to send concurrently
+    :param require_decryption: Boolean indicating whether the returned payloads should be decrypted
+    :param deadline: Maximum number of seconds the whole batch may take, or None if the batch has no deadline
+    :return: List of BatchResult objects, in the same order as the requests
+    """
+
+    LOGGER.info("Executing batch of requests...")
+    results = BatchExecutor(workers=workers, require_decryption=require_decryption, deadline=deadline).execute(batch)
+    failed = sum(1 for result in results if result.status != BatchStatus.SUCCESS)
+    timed_out = sum(1 for result in results if result.status == BatchStatus.TIMEOUT)
+
+    if timed_out > 0:
+        st.warning(f"**{timed_out}** of **{len(results)}** requests timed out!", icon="⏱️")
+
+    if failed > 0:
+        st.error(f"**{failed}** of **{len(results)}** requests failed!", icon="🚨")
+    else:
+        st.success(f"All **{len(results)}** requests completed successfully!", icon="✅")
+
+    st.subheader("Batch Results")
+    st.dataframe([result.as_row() for result in results], use_container_width=True)
+
+    for result in results:
+        with st.expander(f"Request {result.index}: {result.status}"):
+            if result.error is not None:
+                st.code(str(result.error), language="text")
+            elif isinstance(result.data, (dict, list)):
+                st.json(result.data)
+            else:
+                st.code(result.data, language="text")
+
+    return results
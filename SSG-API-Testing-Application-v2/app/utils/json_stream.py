@@ -0,0 +1,419 @@
+"""
+This file contains a pull parser for JSON documents that arrive chunk by chunk, such as the plaintext of a response that
+is being decrypted block by block. Only the fields on the paths requested are materialised; everything else is skipped
+over without being decoded.
+
+Paths are written as dot-separated keys with array indices or wildcards in brackets, for example
+data.enrolments[*].referenceNumber, and match every value at that position in the document.
+"""
+
+import codecs
+import json
+import re
+import time
+
+from typing import Any, Iterable, Iterator
+
+from app.core.cipher.encrypt_decrypt import Cryptography
+from app.utils.timings import RequestTimings
+
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# runs of anything but brackets, including whole strings, which may contain brackets
+_SKIP = re.compile(r'(?:[^"\[\]{}]++|"(?:[^"\\]++|\\.)*+")*+', re.DOTALL)
+# keys without escapes, followed by their colon
+_KEY = re.compile(r'"([^"\\]*)"[ \t\n\r]*:')
+# characters that may continue a number
+_NUMBER_TAIL = re.compile(r"[0-9.eE+\-]*")
+_SEGMENT = re.compile(r"(\.?)([^.\[\]]+)|\[(\*|\d+)]")
+_DECODER = json.JSONDecoder()
+
+
+class _Any:
+    """Path segment matching every item of an array."""
+
+    def __repr__(self):
+        return "[*]"
+
+
+ANY = _Any()
+
+
+class _PathNode:
+    """Node of the trie of the paths to project, holding the segments that follow it."""
+
+    __slots__ = ("children", "terminal")
+
+    def __init__(self):
+        self.children: dict[str | int | _Any, _PathNode] = {}
+        self.terminal = False
+
+
+def parse_path(path: str) -> tuple[str | int | _Any, ...]:
+    """
+    Splits a path into its segments.
+
+    :param path: Path such as data.enrolments[*].referenceNumber, or an empty string for the whole document
+    :return: Tuple of keys, array indices and ANY for wildcards
+    """
+
+    segments = []
+    position = 0
+
+    for match in _SEGMENT.finditer(path):
+        dot, key, index = match.groups()
+
+        # keys are separated by dots, except for the first segment
+        if match.start() != position or (key is not None and bool(dot) != (position > 0)):
+            break
+
+        segments.append(key if key is not None else ANY if index == "*" else int(index))
+        position = match.end()
+
+    if position != len(path):
+        raise ValueError(f"Invalid path: {path!r}!")
+
+    return tuple(segments)
+
+
+def compile_paths(paths: Iterable[str]) -> _PathNode:
+    """
+    Compiles the paths to project into a trie, so that every key read is matched against all the paths at once.
+
+    :param paths: Paths to project
+    :return: Root of the trie
+    """
+
+    root = _PathNode()
+
+    for path in paths:
+        node = root
+
+        for segment in parse_path(path):
+            node = node.children.setdefault(segment, _PathNode())
+
+        node.terminal = True
+
+    if not root.terminal and len(root.children) == 0:
+        raise ValueError("At least one path must be projected!")
+
+    return root
+
+
+def decode_chunks(chunks: Iterable[bytes], encoding: str = "utf-8") -> Iterator[str]:
+    """
+    Decodes chunks of bytes into text, including characters that are split across chunks.
+
+    :param chunks: Chunks of the encoded text
+    :param encoding: Encoding of the text
+    :return: Iterator of chunks of the text
+    """
+
+    decoder = codecs.getincrementaldecoder(encoding)()
+
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+
+        if text:
+            yield text
+
+    text = decoder.decode(b"", final=True)
+
+    if text:
+        yield text
+
+
+class _Reader:
+    """Buffers the chunks of a document, dropping the part that has been parsed whenever more is read."""
+
+    def __init__(self, chunks: Iterable[str]):
+        self._chunks = iter(chunks)
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self.buffer, self.pos)
+
+    def grow(self) -> bool:
+        """
+        Reads more of the document. The part of it that is left to parse is at least doubled, so that a value that
+        spans many chunks is only parsed a few times before it is complete.
+
+        :return: False if the document has been read in full
+        """
+
+        if self.eof:
+            return False
+
+        parts = [self.buffer[self.pos:]]
+        size = len(parts[0])
+        target = max(1, 2 * size)
+
+        while size < target:
+            chunk = next(self._chunks, None)
+
+            if chunk is None:
+                self.eof = True
+                break
+
+            parts.append(chunk)
+            size += len(chunk)
+
+        self.buffer = "".join(parts)
+        self.pos = 0
+        return len(parts) > 1
+
+    def peek(self) -> str:
+        """Skips whitespace, and returns the next character of the document."""
+
+        if self.pos < len(self.buffer) and self.buffer[self.pos] not in " \t\n\r":
+            return self.buffer[self.pos]
+
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+
+            if not self.grow():
+                raise self.error("Expecting value")
+
+    def take(self, expected: str) -> str:
+        """Consumes the next character of the document, which must be one of the expected characters."""
+
+        char = self.peek()
+
+        if char not in expected:
+            raise self.error(f"Expecting one of {expected!r}")
+
+        self.pos += 1
+        return char
+
+    def key(self) -> str:
+        """Decodes the next key of an object, and consumes the colon following it."""
+
+        if self.peek() != '"':
+            raise self.error("Expecting property name enclosed in double quotes")
+
+        match = _KEY.match(self.buffer, self.pos)
+
+        if match is not None:
+            self.pos = match.end()
+            return match.group(1)
+
+        key = self.value()
+        self.take(":")
+        return key
+
+    def value(self) -> Any:
+        """Decodes the next value of the document."""
+
+        self.peek()
+
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, self.pos)
+
+                # a number running up to the end of the buffer may continue in the next chunk, as 1. does in 1.5
+                if self.eof or type(value) not in (int, float) \
+                        or _NUMBER_TAIL.match(self.buffer, end).end() < len(self.buffer):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+
+            self.grow()
+
+    def skip(self) -> None:
+        """Skips over the next value of the document without decoding it, apart from scalars."""
+
+        if self.peek() not in "{[":
+            self.value()
+            return
+
+        depth = 0
+
+        while True:
+            self.pos = _SKIP.match(self.buffer, self.pos).end()
+
+            # the run ends at a bracket, or at a string or the buffer that continue in the next chunk
+            if self.pos == len(self.buffer) or self.buffer[self.pos] == '"':
+                if not self.grow():
+                    raise self.error("Unterminated value")
+
+                continue
+
+            depth += 1 if self.buffer[self.pos] in "{[" else -1
+            self.pos += 1
+
+            if depth == 0:
+                return
+
+
+def _walk(reader: _Reader, node: _PathNode, path: tuple) -> Iterator[tuple[tuple, Any]]:
+    """Parses the next value of the document, yielding the values within it that are on the paths of the node."""
+
+    if node.terminal:
+        yield path, reader.value()
+        return
+
+    char = reader.peek()
+
+    if char == "{":
+        reader.pos += 1
+
+        if reader.peek() == "}":
+            reader.pos += 1
+            return
+
+        while True:
+            key = reader.key()
+            child = node.children.get(key)
+
+            if child is not None:
+                yield from _walk(reader, child, path + (key,))
+            else:
+                reader.skip()
+
+            if reader.take(",}") == "}":
+                return
+    elif char == "[":
+        reader.pos += 1
+
+        if reader.peek() == "]":
+            reader.pos += 1
+            return
+
+        index = 0
+
+        while True:
+            child = node.children.get(index) or node.children.get(ANY)
+
+            if child is not None:
+                yield from _walk(reader, child, path + (index,))
+            else:
+                reader.skip()
+
+            index += 1
+
+            if reader.take(",]") == "]":
+                return
+    else:
+        reader.skip()
+
+
+def iter_paths(chunks: Iterable[str], paths: Iterable[str]) -> Iterator[tuple[tuple, Any]]:
+    """
+    Parses a JSON document chunk by chunk, and yields every value found on the paths given as soon as it has been
+    parsed, in the order they appear in the document. The chunks are only read as far as needed, so stopping early
+    also stops whatever is producing them, such as a decryptor.
+
+    :param chunks: Chunks of the JSON document
+    :param paths: Paths of the values to yield
+    :return: Iterator of 2-tuples of the path of each value, with wildcards replaced by array indices, and the value
+    """
+
+    reader = _Reader(chunks)
+    yield from _walk(reader, compile_paths(paths), ())
+
+    while True:
+        reader.pos = _WHITESPACE.match(reader.buffer, reader.pos).end()
+
+        if reader.pos < len(reader.buffer):
+            raise reader.error("Extra data")
+
+        if not reader.grow():
+            return
+
+
+def _insert(container: Any, path: tuple, value: Any) -> Any:
+    """Sets the value at a path of nested dictionaries and lists, creating them as needed."""
+
+    if container is None:
+        container = [] if isinstance(path[0], int) else {}
+
+    parent = container
+
+    for segment, following in zip(path, path[1:] + (None,)):
+        if isinstance(parent, list):
+            parent.extend([None] * (segment + 1 - len(parent)))
+
+        if following is None:
+            parent[segment] = value
+            break
+
+        child = parent[segment] if isinstance(parent, list) else parent.get(segment)
+
+        if child is None:
+            child = parent[segment] = [] if isinstance(following, int) else {}
+
+        parent = child
+
+    return container
+
+
+def project(chunks: Iterable[str], paths: Iterable[str]) -> Any:
+    """
+    Parses a JSON document chunk by chunk, keeping only the values on the paths given. The result has the same shape
+    as the document: array items that hold none of the values are kept as None, so that indices are preserved.
+
+    :param chunks: Chunks of the JSON document
+    :param paths: Paths of the values to keep
+    :return: Nested dictionaries and lists holding the values found, or None if none were found
+    """
+
+    result = None
+
+    for path, value in iter_paths(chunks, paths):
+        if len(path) == 0:
+            return value
+
+        result = _insert(result, path, value)
+
+    return result
+
+
+def decrypt_json(ciphertext: str, paths: Iterable[str] | None = None, key: str = None,
+                 timings: RequestTimings | None = None) -> Any:
+    """
+    Decrypts and decodes an encrypted JSON payload in a single pass, block by block, so that neither the decoded
+    ciphertext nor the padded plaintext are ever held in memory in full. If paths are given, only the fields on them
+    are decoded, and the plaintext itself is never held in full either.
+
+    :param ciphertext: Base64-encoded ciphertext of the payload
+    :param paths: Paths of the fields to keep, or None to decode the whole payload
+    :param key: Key to override key stored in session state
+    :param timings: RequestTimings to record the time spent decrypting and parsing into, if any
+    :return: Decoded payload
+    """
+
+    chunks = Cryptography.decrypt_stream(ciphertext, key=key)
+
+    if chunks is None:
+        raise AttributeError("No encryption key loaded!")
+
+    start = time.perf_counter()
+    decrypting = 0.0
+
+    def timed() -> Iterator[bytes]:
+        nonlocal decrypting
+
+        while True:
+            begin = time.perf_counter()
+            chunk = next(chunks, None)
+            decrypting += time.perf_counter() - begin
+
+            if chunk is None:
+                return
+
+            yield chunk
+
+    try:
+        text = decode_chunks(timed())
+        return json.loads("".join(text)) if paths is None else project(text, paths)
+    finally:
+        if timings is not None:
+            timings.record("decrypt", decrypting)
+            timings.record("parse", time.perf_counter() - start - decrypting)
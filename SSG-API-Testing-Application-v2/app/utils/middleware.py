@@ -0,0 +1,178 @@
+"""
+This file contains the middleware chain that HTTPRequestBuilder runs around the dispatch of every request, so that
+cross-cutting concerns such as metrics, tracing and redaction can be added without editing every request class.
+"""
+
+import threading
+
+from typing import Any
+
+import requests
+
+from app.core.constants import HttpMethod
+from app.core.system.logger import Logger
+
+
+LOGGER = Logger("Middleware")
+
+
+class Middleware:
+    """
+    Class representing a set of hooks run around the dispatch of a request. Subclasses override the hooks they need;
+    hooks that are not overridden are never called.
+
+    The hooks are, in the order that they run:
+
+    - pre_build: the request is about to be sent, and its headers, query parameters and body may still be changed
+    - pre_encrypt: the body of the request is about to be encrypted, for encrypted requests only
+    - pre_send: an attempt is about to be sent, with the keyword arguments passed on to the session or client
+    - post_receive: the final response of the request has been received, or served from the response cache
+    - post_decrypt: the payload of a response has been decrypted and parsed
+    - on_error: the request failed with an error, which is re-raised once every hook has run
+
+    The builder passed to the hooks is the HTTPRequestBuilder sending the request. Hooks run on whichever thread or
+    event loop sends the request, so they must not read from the Streamlit session state.
+    """
+
+    def pre_build(self, builder: Any, method: HttpMethod) -> None:
+        """
+        Called before the request is built.
+
+        :param builder: HTTPRequestBuilder sending the request
+        :param method: HttpMethod of the request
+        """
+
+        pass
+
+    def pre_encrypt(self, builder: Any, body: dict) -> dict:
+        """
+        Called before the body of the request is encrypted.
+
+        :param builder: HTTPRequestBuilder sending the request
+        :param body: Body to be encrypted
+        :return: Body to encrypt instead, or the same body
+        """
+
+        return body
+
+    def pre_send(self, builder: Any, method: HttpMethod, kwargs: dict) -> None:
+        """
+        Called before each attempt is sent, including retries.
+
+        :param builder: HTTPRequestBuilder sending the request
+        :param method: HttpMethod of the request
+        :param kwargs: Keyword arguments passed on to the session or client, which may be modified in place
+        """
+
+        pass
+
+    def post_receive(self, builder: Any, method: HttpMethod, response: requests.Response) -> requests.Response:
+        """
+        Called once the final response of the request has been received.
+
+        :param builder: HTTPRequestBuilder sending the request
+        :param method: HttpMethod of the request
+        :param response: Response received
+        :return: Response to return instead, or the same response
+        """
+
+        return response
+
+    def post_decrypt(self, builder: Any, response: requests.Response, data: Any) -> Any:
+        """
+        Called once the payload of a response has been decrypted and parsed.
+
+        :param builder: HTTPRequestBuilder that sent the request, or None if it is not known
+        :param response: Response that was decrypted
+        :param data: Decrypted payload
+        :return: Payload to use instead, or the same payload
+        """
+
+        return data
+
+    def on_error(self, builder: Any, method: HttpMethod, error: Exception) -> None:
+        """
+        Called when the request fails with an error.
+
+        :param builder: HTTPRequestBuilder sending the request
+        :param method: HttpMethod of the request
+        :param error: Error raised
+        """
+
+        pass
+
+
+class MiddlewareChain:
+    """
+    Class representing an ordered chain of middleware.
+
+    The hooks of the chain are resolved when middleware is added or removed rather than when a request is sent, into
+    a tuple of bound methods per hook that only holds the hooks that some middleware overrides. Running a hook that
+    no middleware overrides is therefore a lookup of an empty tuple, so the chain adds next to no overhead to requests
+    while it is empty. The tuples are replaced rather than modified, so requests can run the hooks without locking.
+    """
+
+    HOOKS: tuple[str, ...] = ("pre_build", "pre_encrypt", "pre_send", "post_receive", "post_decrypt", "on_error")
+
+    def __init__(self, *middleware: Middleware):
+        self._lock = threading.Lock()
+        self.middleware: tuple[Middleware, ...] = ()
+        self.hooks: dict[str, tuple] = {hook: () for hook in MiddlewareChain.HOOKS}
+
+        for item in middleware:
+            self.use(item)
+
+    def _resolve(self) -> None:
+        self.hooks = {hook: tuple(getattr(item, hook) for item in self.middleware
+                                  if getattr(type(item), hook) is not getattr(Middleware, hook))
+                      for hook in MiddlewareChain.HOOKS}
+
+    def use(self, middleware: Middleware) -> "MiddlewareChain":
+        """
+        Adds middleware to the end of the chain. Hooks run in the order that their middleware was added.
+
+        :param middleware: Middleware to add
+        :return: This chain
+        """
+
+        if not isinstance(middleware, Middleware):
+            raise ValueError("Middleware must be a Middleware!")
+
+        with self._lock:
+            self.middleware = self.middleware + (middleware,)
+            self._resolve()
+
+        LOGGER.info(f"Added middleware {type(middleware).__name__}")
+        return self
+
+    def remove(self, middleware: Middleware) -> bool:
+        """
+        Removes middleware from the chain.
+
+        :param middleware: Middleware to remove
+        :return: True if the middleware was in the chain, False otherwise
+        """
+
+        with self._lock:
+            if middleware not in self.middleware:
+                return False
+
+            self.middleware = tuple(item for item in self.middleware if item is not middleware)
+            self._resolve()
+
+        return True
+
+    def clear(self) -> None:
+        """Removes every middleware from the chain."""
+
+        with self._lock:
+            self.middleware = ()
+            self._resolve()
+
+    def __len__(self):
+        return len(self.middleware)
+
+
+# middleware registered here runs for every request sent by this process, in addition to any middleware added to
+# individual requests with HTTPRequestBuilder.with_middleware()
+MIDDLEWARE = MiddlewareChain()
@@ -0,0 +1,332 @@
+"""
+This file contains the client-side rate limiter that HTTPRequestBuilder passes every request through before it is
+dispatched to the API.
+"""
+
+import threading
+import time
+
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+
+from app.core.constants import Endpoints
+from app.core.system.logger import Logger
+
+
+LOGGER = Logger("Rate Limiter")
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request would have to wait longer than permitted for the rate limiter to admit it."""
+
+    def __init__(self, key: tuple, wait: float):
+        super().__init__(f"Rate limit for {key} exceeded! The request would have to wait {wait:.2f}s to be sent.")
+        self.key = key
+        self.wait = wait
+
+
+class TokenBucket:
+    """
+    Class representing a token bucket that refills at a constant rate up to its capacity.
+
+    Tokens are reserved rather than waited for: reserve() always takes the tokens, allowing the balance to go
+    negative, and returns how long the caller must wait before it is allowed to proceed. This lets synchronous and
+    asynchronous callers share the same bucket and sleep in whichever way suits them.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialises the bucket with a full balance of tokens.
+
+        :param rate: Number of tokens added to the bucket every second
+        :param capacity: Maximum number of tokens the bucket can hold, i.e. the largest permitted burst
+        """
+
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("Rate and capacity must be positive!")
+
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def tokens(self) -> float:
+        """Returns the number of tokens currently in the bucket."""
+
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+    def reserve(self, tokens: float = 1, max_wait: float | None = None) -> float:
+        """
+        Takes tokens from the bucket and returns the time the caller must wait before using them.
+
+        :param tokens: Number of tokens to take
+        :param max_wait: Maximum number of seconds the caller is willing to wait. If the wait would be longer, no
+                         tokens are taken and a negative value is returned
+        :return: Number of seconds to wait, or -1 if the wait would exceed max_wait
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            deficit = tokens - self._tokens
+            wait = max(deficit / self.rate if deficit > 0 else 0.0, self._blocked_until - now)
+
+            if max_wait is not None and wait > max_wait:
+                return -1
+
+            self._tokens -= tokens
+            return wait
+
+    def block_for(self, seconds: float) -> None:
+        """
+        Prevents the bucket from admitting any request for a period of time, e.g. after the server responds with
+        429 Too Many Requests.
+
+        :param seconds: Number of seconds to block the bucket for
+        """
+
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """
+    Represents the rate permitted for requests to an API environment and, optionally, a route prefix.
+
+    Rules without an endpoint apply to every environment, and rules without a route prefix apply to every route.
+    When several rules match a request, the one with the longest route prefix is used.
+    """
+
+    rate: float
+    burst: float
+    endpoint: Endpoints | None = None
+    route_prefix: str = ""
+
+    def matches(self, endpoint: Endpoints | None, path: str) -> bool:
+        return (self.endpoint is None or self.endpoint == endpoint) and path.startswith(self.route_prefix)
+
+
+class RateLimiter:
+    """
+    Class to throttle requests on the client side with one token bucket per API environment, UEN and route prefix.
+
+    Requests to hosts that do not belong to any of the Endpoints are only throttled by rules without an endpoint.
+    """
+
+    DEFAULT_RULES: tuple[RateLimitRule, ...] = (
+        RateLimitRule(rate=10, burst=20, endpoint=Endpoints.PRODUCTION),
+        RateLimitRule(rate=10, burst=20, endpoint=Endpoints.UAT),
+        RateLimitRule(rate=20, burst=40, endpoint=Endpoints.MOCK),
+    )
+
+    # how long to block a bucket for if the server responds with 429 but does not send a Retry-After header
+    DEFAULT_RETRY_AFTER: float = 1.0
+
+    def __init__(self, rules: tuple[RateLimitRule, ...] | list[RateLimitRule] = DEFAULT_RULES,
+                 max_wait: float | None = 30.0):
+        """
+        Initialises the rate limiter.
+
+        :param rules: Rules that define the permitted rates
+        :param max_wait: Maximum number of seconds a request may wait for the limiter before RateLimitExceeded is
+                         raised, or None to wait indefinitely
+        """
+
+        self._rules = list(rules)
+        self.max_wait = max_wait
+        self._buckets: dict[tuple, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._throttled = 0
+        self._rejected = 0
+
+    def configure(self, rule: RateLimitRule) -> None:
+        """
+        Adds a rule to the limiter, replacing any existing rule for the same endpoint and route prefix. Buckets
+        that were created for the replaced rule are discarded.
+
+        :param rule: Rule to add
+        """
+
+        with self._lock:
+            self._rules = [r for r in self._rules
+                           if (r.endpoint, r.route_prefix) != (rule.endpoint, rule.route_prefix)]
+            self._rules.append(rule)
+            self._buckets = {k: v for k, v in self._buckets.items()
+                             if k[2] != rule.route_prefix
+                             or (rule.endpoint is not None and k[0] != rule.endpoint.name)}
+
+    @staticmethod
+    def _resolve(url: str) -> tuple[Endpoints | None, str]:
+        """
+        Resolves a URL into the API environment it belongs to and the path of the route.
+
+        :param url: URL of the request
+        :return: 2-tuple of the Endpoints value (or None) and the path
+        """
+
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}".lower()
+        endpoint = next((e for e in Endpoints if e.value == origin), None)
+
+        return endpoint, parts.path or "/"
+
+    def _bucket(self, url: str, uen: str | None) -> tuple[tuple, TokenBucket] | None:
+        """
+        Returns the bucket that throttles the request, creating it if needed.
+
+        :param url: URL of the request
+        :param uen: UEN the request is made on behalf of
+        :return: 2-tuple of the bucket key and the bucket, or None if no rule applies to the request
+        """
+
+        endpoint, path = RateLimiter._resolve(url)
+
+        with self._lock:
+            matching = [rule for rule in self._rules if rule.matches(endpoint, path)]
+
+            if len(matching) == 0:
+                return None
+
+            rule = max(matching, key=lambda r: (len(r.route_prefix), r.endpoint is not None))
+            key = (endpoint.name if endpoint is not None else None, uen or "", rule.route_prefix)
+            bucket = self._buckets.get(key)
+
+            if bucket is None:
+                bucket = TokenBucket(rule.rate, rule.burst)
+                self._buckets[key] = bucket
+
+            return key, bucket
+
+    def reserve(self, url: str, uen: str | None = None, max_wait: float | None = None) -> float:
+        """
+        Reserves a slot for a request and returns how long the request must wait before it is sent.
+
+        :param url: URL of the request
+        :param uen: UEN the request is made on behalf of
+        :param max_wait: Maximum number of seconds this request may wait, such as what is left of its deadline, if
+                         it is shorter than the max_wait of the limiter
+        :return: Number of seconds to wait
+        :raises RateLimitExceeded: If the request would have to wait for longer than max_wait
+        """
+
+        found = self._bucket(url, uen)
+
+        if found is None:
+            return 0.0
+
+        if max_wait is not None and self.max_wait is not None:
+            max_wait = min(max_wait, self.max_wait)
+        elif max_wait is None:
+            max_wait = self.max_wait
+
+        key, bucket = found
+        wait = bucket.reserve(1, max_wait)
+
+        if wait < 0:
+            with self._lock:
+                self._rejected += 1
+
+            raise RateLimitExceeded(key, bucket.reserve(0))
+
+        if wait > 0:
+            with self._lock:
+                self._throttled += 1
+
+            LOGGER.info(f"Throttling request to {key} for {wait:.2f}s")
+
+        return wait
+
+    def acquire(self, url: str, uen: str | None = None, max_wait: float | None = None) -> None:
+        """
+        Blocks until the rate limiter admits the request.
+
+        :param url: URL of the request
+        :param uen: UEN the request is made on behalf of
+        :param max_wait: Maximum number of seconds this request may wait, if it is shorter than the max_wait of the
+                         limiter
+        :raises RateLimitExceeded: If the request would have to wait for longer than max_wait
+        """
+
+        wait = self.reserve(url, uen, max_wait)
+
+        if wait > 0:
+            time.sleep(wait)
+
+    def observe(self, url: str, uen: str | None, response: requests.Response) -> None:
+        """
+        Inspects a response and blocks the bucket of the request if the server indicated that it is being throttled.
+
+        :param url: URL of the request
+        :param uen: UEN the request is made on behalf of
+        :param response: Response to inspect
+        """
+
+        if response.status_code != 429:
+            return
+
+        found = self._bucket(url, uen)
+
+        if found is None:
+            return
+
+        key, bucket = found
+        retry_after = parse_retry_after(response.headers.get("Retry-After"), RateLimiter.DEFAULT_RETRY_AFTER)
+        LOGGER.warning(f"Server throttled requests to {key}! Holding requests back for {retry_after:.2f}s")
+        bucket.block_for(retry_after)
+
+    def stats(self) -> dict:
+        """
+        Returns statistics about the buckets of the limiter.
+
+        :return: Dictionary containing the throttle counters and the balance of every bucket
+        """
+
+        with self._lock:
+            buckets = list(self._buckets.items())
+            stats = {"throttled": self._throttled, "rejected": self._rejected}
+
+        stats["buckets"] = [{"endpoint": key[0], "uen": key[1], "route_prefix": key[2],
+                             "tokens": round(bucket.tokens, 2), "capacity": bucket.capacity}
+                            for key, bucket in buckets]
+        return stats
+
+
+def parse_retry_after(value: str | None, default: float) -> float:
+    """
+    Parses the value of a Retry-After header, which may either be a number of seconds or a HTTP date.
+
+    :param value: Value of the header
+    :param default: Value to return if the header is missing or malformed
+    :return: Number of seconds to wait
+    """
+
+    if value is None:
+        return default
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+# buckets are shared by every Streamlit session running in this process, as they all share the same API limits
+RATE_LIMITER = RateLimiter()
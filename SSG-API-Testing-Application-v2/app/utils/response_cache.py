@@ -0,0 +1,344 @@
+"""
+This file contains the in-process cache used by HTTPRequestBuilder to serve repeated GET requests for read-only
+resources without sending them to the API again.
+"""
+
+import threading
+import time
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from fnmatch import fnmatchcase
+from urllib.parse import urlencode, urlsplit
+
+import requests
+
+from app.core.system.logger import Logger
+
+
+LOGGER = Logger("Response Cache")
+
+
+class CacheState(Enum):
+    """Enum representing the state of a cache lookup."""
+
+    MISS = "MISS"
+    FRESH = "HIT"
+    STALE = "STALE"
+    EXPIRED = "EXPIRED"
+
+    def __str__(self):
+        return self.value
+
+
+@dataclass(frozen=True)
+class CacheRule:
+    """
+    Represents how long the responses of the routes matching a glob pattern may be cached for.
+
+    Responses are served from the cache for ttl seconds. For a further stale_ttl seconds, the stale response is
+    still served immediately while it is revalidated in the background.
+    """
+
+    pattern: str
+    ttl: float
+    stale_ttl: float = 0.0
+
+
+@dataclass
+class CacheEntry:
+    """Represents a cached response and the validators needed to revalidate it."""
+
+    response: requests.Response
+    stored_at: float
+    rule: CacheRule
+    size: int
+
+    @property
+    def etag(self) -> str | None:
+        return self.response.headers.get("ETag")
+
+    @property
+    def last_modified(self) -> str | None:
+        return self.response.headers.get("Last-Modified")
+
+    def state(self, now: float) -> CacheState:
+        age = now - self.stored_at
+
+        if age < self.rule.ttl:
+            return CacheState.FRESH
+
+        if age < self.rule.ttl + self.rule.stale_ttl:
+            return CacheState.STALE
+
+        return CacheState.EXPIRED
+
+
+def clone_response(response: requests.Response, cache_state: CacheState | None = None) -> requests.Response:
+    """
+    Returns a copy of a response, so that callers cannot modify the copy held in the cache.
+
+    :param response: Response to copy
+    :param cache_state: If provided, the state of the cache is recorded in the X-Cache header of the copy
+    :return: Copy of the response
+    """
+
+    clone = requests.Response()
+    clone.status_code = response.status_code
+    clone.headers = requests.structures.CaseInsensitiveDict(response.headers)
+    clone.url = response.url
+    clone.reason = response.reason
+    clone.encoding = response.encoding
+    clone.elapsed = response.elapsed
+    clone._content = response.content
+
+    if cache_state is not None:
+        clone.headers["X-Cache"] = str(cache_state)
+
+    return clone
+
+
+class ResponseCache:
+    """
+    Class representing a least-recently-used cache of responses, bounded by the total size of the cached bodies.
+
+    Responses are keyed by the HTTP method, URL, query parameters, UEN and client credentials of the request, as well
+    as the request headers that the response varies by, and are only cached for routes that match one of the rules of
+    the cache.
+    """
+
+    DEFAULT_RULES: tuple[CacheRule, ...] = (
+        CacheRule("/courses/courseRuns/id/*", ttl=60, stale_ttl=240),
+        CacheRule("/courses/runs/*/sessions/attendance", ttl=15, stale_ttl=45),
+        CacheRule("/courses/runs/*/sessions", ttl=60, stale_ttl=240),
+        CacheRule("/tpg/enrolments/details/*", ttl=30, stale_ttl=90),
+        CacheRule("/tpg/assessments/details/*", ttl=30, stale_ttl=90),
+        CacheRule("/skillsFutureCredits/claims/*", ttl=15, stale_ttl=45),
+    )
+
+    DEFAULT_MAX_BYTES: int = 32 * 1024 * 1024
+
+    # request headers that change the response, so that requests that differ in them are cached separately
+    VARY_HEADERS: tuple[str, ...] = ("accept", "accept-encoding", "x-api-version")
+
+    def __init__(self, rules: tuple[CacheRule, ...] | list[CacheRule] = DEFAULT_RULES,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialises the cache.
+
+        :param rules: Rules that define which routes are cached and for how long. The first matching rule is used,
+                      so more specific patterns should come first
+        :param max_bytes: Maximum total size of the cached response bodies
+        """
+
+        if max_bytes < 0:
+            raise ValueError("Max bytes cannot be negative!")
+
+        self.rules = list(rules)
+        self.max_bytes = max_bytes
+
+        self._entries: OrderedDict[tuple, CacheEntry] = OrderedDict()
+        self._refreshing: set[tuple] = set()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "revalidated": 0, "evictions": 0}
+
+    @staticmethod
+    def key(method: str, url: str, params: dict | None = None, uen: str | None = None, fingerprint: str = "",
+            headers: dict | None = None) -> tuple:
+        """
+        Returns the canonical cache key of a request. Query parameters are sorted so that their order does not
+        matter, and the scheme and host are lower-cased as they are case-insensitive. Of the headers, only those in
+        VARY_HEADERS are part of the key, and their names are matched case-insensitively.
+
+        :param method: HTTP method of the request
+        :param url: URL of the request, including the API endpoint it is sent to
+        :param params: Query parameters of the request
+        :param uen: UEN the request is made on behalf of
+        :param fingerprint: Fingerprint of the client credentials the request is sent with
+        :param headers: Headers of the request
+        :return: Tuple representing the request
+        """
+
+        parts = urlsplit(url)
+        canonical_url = f"{parts.scheme.lower()}://{parts.netloc.lower()}{parts.path}"
+        query = urlencode(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+        lowered = {str(k).lower(): str(v) for k, v in (headers or {}).items()}
+        vary = tuple(lowered.get(name, "") for name in ResponseCache.VARY_HEADERS)
+
+        return method.upper(), canonical_url, query, uen or "", fingerprint, vary
+
+    def rule_for(self, url: str) -> CacheRule | None:
+        """
+        Returns the rule that applies to the route of a URL.
+
+        :param url: URL of the request
+        :return: Matching CacheRule, or None if the route should not be cached
+        """
+
+        path = urlsplit(url).path
+
+        return next((rule for rule in self.rules if fnmatchcase(path, rule.pattern)), None)
+
+    def lookup(self, key: tuple) -> tuple[CacheEntry | None, CacheState]:
+        """
+        Looks up a request in the cache.
+
+        :param key: Cache key of the request
+        :return: 2-tuple of the cache entry (if any) and the state of the entry
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self._stats["misses"] += 1
+                return None, CacheState.MISS
+
+            self._entries.move_to_end(key)
+            state = entry.state(time.monotonic())
+
+            if state == CacheState.FRESH:
+                self._stats["hits"] += 1
+            elif state == CacheState.STALE:
+                self._stats["stale_hits"] += 1
+            else:
+                self._stats["misses"] += 1
+
+            return entry, state
+
+    @staticmethod
+    def validators(entry: CacheEntry | None) -> dict[str, str]:
+        """
+        Returns the conditional request headers that revalidate a cache entry.
+
+        :param entry: Cache entry to revalidate
+        :return: Dictionary of headers, which is empty if the server did not supply any validators
+        """
+
+        headers = {}
+
+        if entry is None:
+            return headers
+
+        if entry.etag is not None:
+            headers["If-None-Match"] = entry.etag
+
+        if entry.last_modified is not None:
+            headers["If-Modified-Since"] = entry.last_modified
+
+        return headers
+
+    def update(self, key: tuple, url: str, response: requests.Response,
+               entry: CacheEntry | None = None) -> requests.Response:
+        """
+        Updates the cache with the response of a request.
+
+        A 304 Not Modified response refreshes the entry that was revalidated, and the cached response is returned in
+        its place. Successful responses are stored, and any other response evicts the stale entry.
+
+        :param key: Cache key of the request
+        :param url: URL of the request
+        :param response: Response returned by the server
+        :param entry: Cache entry that the request revalidated, if any
+        :return: Response to return to the caller
+        """
+
+        if response.status_code == 304 and entry is not None:
+            with self._lock:
+                entry.stored_at = time.monotonic()
+                self._stats["revalidated"] += 1
+
+            LOGGER.info(f"Cached response for {url} is still valid")
+            return clone_response(entry.response, CacheState.FRESH)
+
+        rule = self.rule_for(url)
+
+        if rule is None or response.status_code != 200 or "no-store" in response.headers.get("Cache-Control", ""):
+            self.invalidate(key)
+            return response
+
+        size = len(response.content)
+
+        if size > self.max_bytes:
+            self.invalidate(key)
+            return response
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+
+            if previous is not None:
+                self._bytes -= previous.size
+
+            self._entries[key] = CacheEntry(response=clone_response(response), stored_at=time.monotonic(),
+                                            rule=rule, size=size)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self._stats["evictions"] += 1
+                LOGGER.info(f"Evicted cached response for {evicted_key[1]}")
+
+        return response
+
+    def invalidate(self, key: tuple) -> None:
+        """
+        Removes a request from the cache.
+
+        :param key: Cache key of the request
+        """
+
+        with self._lock:
+            entry = self._entries.pop(key, None)
+
+            if entry is not None:
+                self._bytes -= entry.size
+
+    def clear(self) -> None:
+        """Removes every response from the cache."""
+
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def begin_refresh(self, key: tuple) -> bool:
+        """
+        Marks a stale entry as being revalidated in the background.
+
+        :param key: Cache key of the request
+        :return: True if the caller should revalidate the entry, False if it is already being revalidated
+        """
+
+        with self._lock:
+            if key in self._refreshing:
+                return False
+
+            self._refreshing.add(key)
+            return True
+
+    def end_refresh(self, key: tuple) -> None:
+        """
+        Marks the background revalidation of an entry as completed.
+
+        :param key: Cache key of the request
+        """
+
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def stats(self) -> dict:
+        """
+        Returns statistics about the usage of the cache.
+
+        :return: Dictionary containing the hit/miss counters and the size of the cache
+        """
+
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+
+# cached responses are shared by every Streamlit session running in this process; they are keyed by the client
+# credentials as well as the UEN, so that a response is only served to sessions that could have fetched it themselves
+RESPONSE_CACHE = ResponseCache()
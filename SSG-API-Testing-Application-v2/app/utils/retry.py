@@ -0,0 +1,185 @@
+"""
+This file contains the retry policies that HTTPRequestBuilder uses to decide whether, and when, a failed request
+should be sent again.
+"""
+
+import random
+import ssl
+import uuid
+
+from dataclasses import dataclass
+
+import httpx
+import requests
+
+from requests.exceptions import ConnectionError, ConnectTimeout, ProxyError, SSLError, Timeout
+from urllib3.exceptions import NewConnectionError, NameResolutionError
+
+from app.core.system.logger import Logger
+from app.utils.session_pool import TLSHandshakeError
+
+
+LOGGER = Logger("Retry")
+
+
+def _ssl_error(ex: BaseException) -> ssl.SSLError | None:
+    """
+    Finds the ssl error that a requests or httpx error was raised from, if any.
+
+    :param ex: Error raised while sending the request
+    :return: ssl.SSLError object, or None if the error was not caused by one
+    """
+
+    seen = set()
+
+    while ex is not None and id(ex) not in seen:
+        if isinstance(ex, ssl.SSLError):
+            return ex
+
+        seen.add(id(ex))
+        # requests wraps the urllib3 error as its first argument, which in turn records the reason it was raised
+        reason = getattr(ex, "reason", None)
+        wrapped = ex.args[0] if len(ex.args) > 0 else None
+        ex = next((e for e in (ex.__cause__, ex.__context__, reason, wrapped) if isinstance(e, BaseException)), None)
+
+    return None
+
+
+def is_connect_error(ex: Exception) -> bool:
+    """
+    Checks if an error was raised while the connection to the server was being established, i.e. before any part of
+    the request could have reached the server. Such requests are always safe to send again.
+
+    TLS errors only count if they were raised during the handshake, as they may otherwise have been raised after the
+    request was sent: the synchronous path reports handshake errors as TLSHandshakeError (see SessionPool), and the
+    asynchronous path as httpx.ConnectError. Certificates that fail verification do not count either, as sending the
+    request again would fail in the same way.
+
+    :param ex: Error raised while sending the request
+    :return: True if the error happened in the connect phase, False otherwise
+    """
+
+    if isinstance(ex, (ConnectTimeout, ProxyError)):
+        return True
+
+    tls_error = _ssl_error(ex)
+
+    if isinstance(tls_error, ssl.SSLCertVerificationError):
+        return False
+
+    if isinstance(ex.__cause__, (httpx.ConnectError, httpx.ConnectTimeout)):
+        # raised by the asynchronous path, which translates httpx errors into requests errors
+        return True
+
+    if tls_error is not None or isinstance(ex, SSLError):
+        return isinstance(tls_error, TLSHandshakeError)
+
+    if isinstance(ex, ConnectionError):
+        # requests wraps the urllib3 error, which records why the connection could not be established
+        reason = getattr(ex.args[0], "reason", None) if len(ex.args) > 0 else None
+        return isinstance(reason, (NewConnectionError, NameResolutionError))
+
+    return False
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Represents how a request should be retried when it fails.
+
+    Retries are spaced out with capped exponential backoff and full jitter, and are bounded both by the number of
+    attempts and by the total time spent backing off (the retry budget) for one call.
+
+    Idempotent requests are retried on any transient failure. Other requests are only retried on failures that
+    happen before the request reaches the server, unless an idempotency header is configured, in which case the
+    same idempotency key is sent with every attempt so that the server can discard duplicates.
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 0.25
+    max_delay: float = 4.0
+    budget: float = 10.0
+    idempotent: bool = True
+    idempotency_header: str | None = None
+    retry_statuses: frozenset[int] = frozenset({429, 502, 503, 504})
+
+    def __post_init__(self):
+        if self.max_attempts < 1:
+            raise ValueError("Max attempts must be at least 1!")
+
+        if self.base_delay < 0 or self.max_delay < 0 or self.budget < 0:
+            raise ValueError("Delays and budget cannot be negative!")
+
+    @property
+    def retries_freely(self) -> bool:
+        """Returns True if requests under this policy may be retried even after they have reached the server."""
+
+        return self.idempotent or self.idempotency_header is not None
+
+    def idempotency_headers(self) -> dict[str, str]:
+        """
+        Returns the headers to attach to every attempt of one call.
+
+        :return: Dictionary containing a fresh idempotency key, or an empty dictionary if none is configured
+        """
+
+        if self.idempotency_header is None:
+            return {}
+
+        return {self.idempotency_header: str(uuid.uuid4())}
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Returns a jittered delay to wait before the next attempt.
+
+        :param attempt: Number of attempts made so far, starting from 1
+        :return: Number of seconds to wait
+        """
+
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+    def next_delay(self, attempt: int, spent: float, error: Exception | None = None,
+                   response: requests.Response | None = None) -> float | None:
+        """
+        Decides whether a failed attempt should be retried.
+
+        :param attempt: Number of attempts made so far, starting from 1
+        :param spent: Number of seconds already spent backing off during this call
+        :param error: Error raised by the attempt, if any
+        :param response: Response returned by the attempt, if any
+        :return: Number of seconds to wait before retrying, or None if the attempt should not be retried
+        """
+
+        if attempt >= self.max_attempts:
+            return None
+
+        if error is not None:
+            transient = isinstance(error, (ConnectionError, Timeout))
+            retryable = is_connect_error(error) or (self.retries_freely and transient)
+        elif response is not None:
+            # a 429 means that the server turned the request away without processing it
+            retryable = (response.status_code in self.retry_statuses
+                         and (self.retries_freely or response.status_code == 429))
+        else:
+            retryable = False
+
+        if not retryable:
+            return None
+
+        delay = self.backoff(attempt)
+
+        if spent + delay > self.budget:
+            LOGGER.warning("Retry budget exhausted! Giving up on the request...")
+            return None
+
+        return delay
+
+
+# policy for requests that do not change any state on the server, e.g. views and searches
+IDEMPOTENT_RETRY = RetryPolicy()
+
+# policy for requests that create or change records, which must not be sent twice
+CONNECT_ONLY_RETRY = RetryPolicy(idempotent=False)
+
+# policy for requests that should never be retried
+NO_RETRY = RetryPolicy(max_attempts=1)
@@ -0,0 +1,363 @@
+"""
+This file contains the connection pooling layer used by HTTPRequestBuilder to reuse keep-alive mTLS connections
+between requests.
+"""
+
+import ssl
+import threading
+
+import requests
+
+from dataclasses import dataclass, field
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from urllib.parse import urlsplit
+
+from app.core.system.logger import Logger
+from app.utils.credentials import ClientCredentials, default_ssl_context
+
+
+LOGGER = Logger("Session Pool")
+
+
+class TLSHandshakeError(ssl.SSLError):
+    """
+    Error raised in place of an ssl.SSLError that was raised while the TLS handshake of a new connection was being
+    negotiated, i.e. before any part of a request could have been sent over it. Certificates that fail verification
+    are still reported as ssl.SSLCertVerificationError.
+    """
+
+    pass
+
+
+class _HTTPSConnection(HTTPSConnection):
+    """HTTPSConnection that reports the TLS errors raised while it connects as TLSHandshakeError."""
+
+    def connect(self) -> None:
+        try:
+            super().connect()
+        except ssl.SSLCertVerificationError:
+            raise
+        except ssl.SSLError as ex:
+            raise TLSHandshakeError(*ex.args) from ex
+
+
+class _HTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _HTTPSConnection
+
+
+# connection pool classes that the pool managers of _SSLContextAdapter create for each scheme
+_POOL_CLASSES: dict[str, type] = {"http": HTTPConnectionPool, "https": _HTTPSConnectionPool}
+
+
+class _SSLContextAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that mounts a prebuilt SSL context onto its pool manager, so that the certificate chain and CA bundle
+    are loaded once per pool instead of once per connection. TLS errors raised while a connection is established are
+    reported as TLSHandshakeError, so that they can be told apart from those raised once requests are sent.
+    """
+
+    def __init__(self, ssl_context: ssl.SSLContext | None, **kwargs):
+        self._ssl_context = ssl_context
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self._ssl_context is not None:
+            kwargs["ssl_context"] = self._ssl_context
+
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = _POOL_CLASSES
+
+    def proxy_manager_for(self, *args, **kwargs):
+        if self._ssl_context is not None:
+            kwargs["ssl_context"] = self._ssl_context
+
+        manager = super().proxy_manager_for(*args, **kwargs)
+        manager.pool_classes_by_scheme = _POOL_CLASSES
+        return manager
+
+
+@dataclass
+class _PoolEntry:
+    """Represents one pooled requests.Session and the Streamlit sessions that are using it."""
+
+    session: requests.Session
+    adapter: _SSLContextAdapter
+    owners: set[str] = field(default_factory=set)
+    requests_served: int = 0
+
+
+class SessionPool:
+    """
+    Class to manage keep-alive requests.Session objects, keyed by the origin of the endpoint and the fingerprint of
+    the client credentials used to connect to it.
+
+    Each session is mounted with an adapter that holds a prebuilt SSL context, so only the first request to an origin
+    pays for the mTLS handshake; subsequent requests reuse the pooled connection.
+    """
+
+    # default number of per-host connection pools and connections kept alive in each pool
+    DEFAULT_POOL_CONNECTIONS: int = 4
+    DEFAULT_POOL_MAXSIZE: int = 10
+
+    def __init__(self, pool_connections: int = DEFAULT_POOL_CONNECTIONS, pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                 pool_block: bool = False):
+        """
+        Initialises the session pool.
+
+        :param pool_connections: Number of per-host connection pools to cache in each session
+        :param pool_maxsize: Maximum number of connections to keep alive in each connection pool
+        :param pool_block: Whether the pool should block for a free connection when it is exhausted instead of
+                           opening an additional, non-pooled connection
+        """
+
+        if not isinstance(pool_connections, int) or pool_connections < 1:
+            raise ValueError("Pool connections must be a positive integer!")
+
+        if not isinstance(pool_maxsize, int) or pool_maxsize < 1:
+            raise ValueError("Pool max size must be a positive integer!")
+
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+
+        self._lock = threading.RLock()
+        self._entries: dict[tuple[str, str], _PoolEntry] = {}
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def origin(url: str) -> str:
+        """
+        Returns the origin (scheme, host and port) of a URL, which is what connections are pooled by.
+
+        :param url: URL to extract the origin from
+        :return: Origin of the URL
+        """
+
+        parts = urlsplit(url)
+
+        if not parts.scheme or not parts.netloc:
+            raise ValueError("URL must contain a scheme and a host!")
+
+        return f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+
+    @staticmethod
+    def fingerprint(credentials: ClientCredentials | None) -> str:
+        """
+        Returns the fingerprint that pooled sessions made with a set of client credentials are keyed by.
+
+        :param credentials: Client certificate and private key, or None if no certificates are used
+        :return: Hex digest representing the credentials, or an empty string if no certificates are used
+        """
+
+        return credentials.fingerprint if credentials is not None else ""
+
+    @staticmethod
+    def ssl_context(credentials: ClientCredentials | None, http2: bool = False) -> ssl.SSLContext:
+        """
+        Returns the SSL context for a set of client credentials. The context is built once, when the credentials are
+        loaded, and is shared by all connections made with them, including those made by other pools.
+
+        :param credentials: Client certificate and private key, or None if no certificates are used
+        :param http2: Whether the context is used for HTTP/2 connections
+        :return: SSL context loaded with the CA bundle and, if given, the client certificate chain
+        """
+
+        if credentials is None:
+            return default_ssl_context(http2)
+
+        return credentials.http2_ssl_context if http2 else credentials.ssl_context
+
+    def session(self, url: str, credentials: ClientCredentials | None = None,
+                owner: str | None = None) -> requests.Session:
+        """
+        Returns the pooled session for the origin of the URL and the client credentials, creating it if needed.
+
+        :param url: URL that the request is sent to
+        :param credentials: Client certificate and private key
+        :param owner: ID of the Streamlit session using the pooled session. Pooled sessions are closed by sweep()
+                      once all of their owners have ended
+        :return: Keep-alive requests.Session object
+        """
+
+        pool_key = (SessionPool.origin(url), SessionPool.fingerprint(credentials))
+
+        with self._lock:
+            entry = self._entries.get(pool_key)
+
+            if entry is None:
+                self._misses += 1
+                adapter = _SSLContextAdapter(SessionPool.ssl_context(credentials),
+                                             pool_connections=self.pool_connections,
+                                             pool_maxsize=self.pool_maxsize,
+                                             pool_block=self.pool_block)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                entry = _PoolEntry(session=session, adapter=adapter)
+                self._entries[pool_key] = entry
+                LOGGER.info(f"Created pooled session for {pool_key[0]}")
+            else:
+                self._hits += 1
+
+            if owner is not None:
+                entry.owners.add(owner)
+
+            entry.requests_served += 1
+            return entry.session
+
+    def peek(self, url: str, credentials: ClientCredentials | None = None) -> requests.Session | None:
+        """
+        Returns the pooled session for the origin of the URL and the client credentials if it exists, without
+        creating it or counting it as a request.
+
+        :param url: URL that the request is sent to
+        :param credentials: Client certificate and private key
+        :return: Keep-alive requests.Session object, or None if there is no pooled session
+        """
+
+        with self._lock:
+            entry = self._entries.get((SessionPool.origin(url), SessionPool.fingerprint(credentials)))
+
+        return entry.session if entry is not None else None
+
+    def close(self, url: str, credentials: ClientCredentials | None = None) -> bool:
+        """
+        Closes the pooled session for the origin of the URL and the client credentials.
+
+        :param url: URL whose pooled session should be closed
+        :param credentials: Client certificate and private key
+        :return: True if a pooled session was closed, False otherwise
+        """
+
+        pool_key = (SessionPool.origin(url), SessionPool.fingerprint(credentials))
+
+        with self._lock:
+            entry = self._entries.pop(pool_key, None)
+
+        if entry is None:
+            return False
+
+        entry.session.close()
+        return True
+
+    def close_all(self) -> None:
+        """Closes every pooled session."""
+
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+
+        for entry in entries:
+            entry.session.close()
+
+    def release(self, owner: str) -> int:
+        """
+        Removes a Streamlit session from the owners of every pooled session and closes any pooled session that no
+        longer has an owner.
+
+        :param owner: ID of the Streamlit session that has ended
+        :return: Number of pooled sessions closed
+        """
+
+        return self.sweep(lambda session_id: session_id != owner)
+
+    def sweep(self, is_active=None) -> int:
+        """
+        Closes the pooled sessions whose owning Streamlit sessions have all ended. Pooled sessions that were never
+        claimed by a Streamlit session are left alone.
+
+        :param is_active: Function that accepts a Streamlit session ID and returns True if that session is still
+                          active. Defaults to querying the Streamlit runtime
+        :return: Number of pooled sessions closed
+        """
+
+        if is_active is None:
+            is_active = _is_active_streamlit_session
+
+        closed = []
+
+        with self._lock:
+            for pool_key, entry in list(self._entries.items()):
+                if len(entry.owners) == 0:
+                    continue
+
+                entry.owners = {owner for owner in entry.owners if is_active(owner)}
+
+                if len(entry.owners) == 0:
+                    closed.append(self._entries.pop(pool_key))
+
+        for entry in closed:
+            entry.session.close()
+
+        if len(closed) > 0:
+            LOGGER.info(f"Closed {len(closed)} pooled session(s) with no active Streamlit sessions")
+
+        return len(closed)
+
+    def stats(self) -> dict:
+        """
+        Returns statistics about the pooled sessions and the connections held within them.
+
+        :return: Dictionary containing the pool-wide hit/miss counters and per-origin connection statistics
+        """
+
+        with self._lock:
+            pools = []
+
+            for (origin, fingerprint), entry in self._entries.items():
+                # the pool manager's container does not support iteration, so look up each pool by its key instead
+                pools_by_key = entry.adapter.poolmanager.pools
+                connection_pools = [pool for pool in map(pools_by_key.get, pools_by_key.keys()) if pool is not None]
+                pools.append({
+                    "origin": origin,
+                    "fingerprint": fingerprint[:16],
+                    "owners": len(entry.owners),
+                    "requests": entry.requests_served,
+                    "connections_opened": sum(pool.num_connections for pool in connection_pools),
+                    # free slots in the pool queue are filled with None until a connection is returned to it
+                    "idle_connections": sum(1 for pool in connection_pools if pool.pool is not None
+                                            for conn in list(pool.pool.queue) if conn is not None),
+                })
+
+            return {
+                "sessions": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "pool_connections": self.pool_connections,
+                "pool_maxsize": self.pool_maxsize,
+                "pools": pools,
+            }
+
+
+def _is_active_streamlit_session(session_id: str) -> bool:
+    """
+    Checks if a Streamlit session is still connected to the Streamlit runtime.
+
+    :param session_id: ID of the Streamlit session
+    :return: True if the session is still active or if the runtime cannot be queried, False otherwise
+    """
+
+    if not Runtime.exists():
+        return True
+
+    return Runtime.instance().is_active_session(session_id)
+
+
+def current_session_id() -> str | None:
+    """
+    Returns the ID of the Streamlit session that is running the current script thread.
+
+    :return: Streamlit session ID, or None if the code is not executed by a Streamlit script thread
+    """
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else None
+
+
+# pooled sessions are shared by every Streamlit session running in this process
+SESSION_POOL = SessionPool()
@@ -0,0 +1,399 @@
+"""
+This file contains the ShadowTraffic middleware, which mirrors read requests to a second API environment and compares
+its latency and responses against those of the environment that the user is connected to.
+"""
+
+import json
+import math
+import threading
+import time
+import weakref
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable
+from urllib.parse import urlsplit, urlunsplit
+
+import httpx
+import requests
+import streamlit as st
+
+from app.core.cipher.encrypt_decrypt import Cryptography
+from app.core.constants import Endpoints, HttpMethod
+from app.core.system.logger import Logger
+from app.utils.credentials import ClientCredentials
+from app.utils.hedging import Hedger
+from app.utils.middleware import MIDDLEWARE, Middleware
+
+
+LOGGER = Logger("Shadow Traffic")
+
+
+def is_read(method: HttpMethod, url: str) -> bool:
+    """
+    Checks if a request only reads data. Besides GET requests, the search endpoints are read-only POST requests.
+
+    :param method: HttpMethod of the request
+    :param url: URL of the request
+    :return: True if the request only reads data
+    """
+
+    return method == HttpMethod.GET or urlsplit(url).path.rstrip("/").endswith("/search")
+
+
+def structural_diff(primary: Any, shadow: Any, path: str = "$") -> list[str]:
+    """
+    Compares the structure of two decoded JSON documents: the keys of objects, the types of values and the lengths of
+    arrays. Scalar values themselves are not compared, as environments hold different data.
+
+    :param primary: Document returned by the primary environment
+    :param shadow: Document returned by the shadow environment
+    :param path: JSONPath of the documents, used in the differences reported
+    :return: List of differences, which is empty if the documents have the same structure
+    """
+
+    if type(primary) is not type(shadow) and not (isinstance(primary, (int, float))
+                                                  and isinstance(shadow, (int, float))
+                                                  and not isinstance(primary, bool)
+                                                  and not isinstance(shadow, bool)):
+        return [f"{path}: {type(primary).__name__} != {type(shadow).__name__}"]
+
+    if isinstance(primary, dict):
+        differences = [f"{path}.{key}: missing from shadow" for key in primary if key not in shadow]
+        differences += [f"{path}.{key}: missing from primary" for key in shadow if key not in primary]
+
+        for key in primary:
+            if key in shadow:
+                differences += structural_diff(primary[key], shadow[key], f"{path}.{key}")
+
+        return differences
+
+    if isinstance(primary, list):
+        differences = [] if len(primary) == len(shadow) else [f"{path}: {len(primary)} != {len(shadow)} items"]
+
+        for index, (left, right) in enumerate(zip(primary, shadow)):
+            differences += structural_diff(left, right, f"{path}[{index}]")
+
+        return differences
+
+    return []
+
+
+def _decode(response: requests.Response, key: str | None) -> Any:
+    """
+    Decodes the payload of a response, decrypting it first if it is not JSON.
+
+    :param response: Response to decode
+    :param key: Encryption key to decrypt the payload with
+    :return: Decoded payload, or the response text if it cannot be decoded
+    """
+
+    try:
+        return response.json()
+    except json.decoder.JSONDecodeError:
+        pass
+
+    try:
+        return json.loads(Cryptography.decrypt(response.text, key=key).decode()) if key else response.text
+    except Exception:
+        return response.text
+
+
+def _requests_kwargs(kwargs: dict) -> dict:
+    """
+    Converts the arguments of a request sent with httpx to those of the same request sent with requests.
+
+    :param kwargs: Keyword arguments of the request
+    :return: Keyword arguments that requests accepts
+    """
+
+    kwargs = dict(kwargs)
+
+    if "content" in kwargs:
+        kwargs["data"] = kwargs.pop("content")
+
+    if isinstance(kwargs.get("timeout"), httpx.Timeout):
+        kwargs["timeout"] = (kwargs["timeout"].connect, kwargs["timeout"].read)
+
+    return kwargs
+
+
+@dataclass
+class ShadowComparison:
+    """Represents the outcome of a request sent to both the primary and the shadow environments."""
+
+    method: str
+    route: str
+    primary_status: int | None
+    shadow_status: int | None
+    primary_ms: float
+    shadow_ms: float | None
+    differences: list[str] = field(default_factory=list)
+    error: str | None = None
+
+    @property
+    def matches(self) -> bool:
+        return self.error is None and self.primary_status == self.shadow_status and len(self.differences) == 0
+
+    def as_row(self) -> dict:
+        """Returns the comparison as a flat dictionary, for display or export."""
+
+        return {"method": self.method,
+                "route": self.route,
+                "primary_status": self.primary_status,
+                "shadow_status": self.shadow_status,
+                "primary_ms": round(self.primary_ms, 2),
+                "shadow_ms": round(self.shadow_ms, 2) if self.shadow_ms is not None else None,
+                "matches": self.matches,
+                "differences": "; ".join(self.differences),
+                "error": self.error}
+
+
+@dataclass(frozen=True)
+class ShadowTarget:
+    """Represents the shadow environment that the read requests of a Streamlit session are mirrored to."""
+
+    origin: str
+    key: str | None = None
+    credentials: ClientCredentials | None = None
+
+
+def shadow_target() -> ShadowTarget | None:
+    """
+    Returns the shadow environment selected in the session state of the current Streamlit session, with the key and
+    credentials of the session. This must be called from the script thread of the session, e.g. when a request is
+    created, as the requests are mirrored from threads and event loops that cannot read the session state.
+
+    :return: ShadowTarget object, or None if the session has not selected a shadow environment
+    """
+
+    shadow = st.session_state.get("shadow_url")
+
+    if not isinstance(shadow, Endpoints):
+        return None
+
+    return ShadowTarget(origin=shadow.value,
+                        key=st.session_state.get("encryption_key") or None,
+                        credentials=st.session_state.get("credentials"))
+
+
+@dataclass
+class _ShadowRun:
+    """Represents a request that is being mirrored to the shadow environment."""
+
+    url: str
+    credentials: ClientCredentials | None
+    key: str | None
+    started: float = 0.0
+    future: Future | None = None
+
+
+class ShadowTraffic(Middleware):
+    """
+    Middleware that mirrors read requests to a shadow environment.
+
+    When a read request is sent to the primary environment, an identical request is sent to the same route of the
+    shadow environment at the same time, on a thread of this middleware. Only the response of the primary environment
+    is returned; once both responses have been received, their latencies, status codes and the structural differences
+    between their decoded payloads are recorded. Responses served from the response cache are not mirrored.
+
+    The shadow environment is the shadow target of the request, which is the environment selected in the session state
+    of the Streamlit session that created it (see HTTPRequestBuilder.with_shadow()), unless an origin is given when
+    the middleware is created. The hooks only read the request, never the session state. At most workers requests are
+    mirrored at once, and read requests sent while they are all busy are not mirrored, which caps the load put on the
+    shadow environment.
+    """
+
+    DEFAULT_WORKERS: int = 4
+    DEFAULT_HISTORY: int = 200
+
+    def __init__(self, shadow: str | None = None, workers: int = DEFAULT_WORKERS, history: int = DEFAULT_HISTORY,
+                 reads: Callable[[HttpMethod, str], bool] = is_read):
+        """
+        Initialises the middleware.
+
+        :param shadow: Origin of the shadow environment for every request, or None to use the shadow target of each
+                       request
+        :param workers: Maximum number of requests mirrored at once
+        :param history: Number of comparisons to keep
+        :param reads: Function checking if a request only reads data, given its method and URL
+        """
+
+        if workers < 1 or history < 1:
+            raise ValueError("Workers and history must be positive!")
+
+        self.shadow = shadow
+        self.workers = workers
+        self.reads = reads
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(workers)
+        self._runs: weakref.WeakKeyDictionary[Any, _ShadowRun] = weakref.WeakKeyDictionary()
+        self._comparisons: deque[ShadowComparison] = deque(maxlen=history)
+        self._pool: ThreadPoolExecutor | None = None
+        self._skipped = 0
+
+    def _origin(self, builder: Any) -> str | None:
+        """Returns the origin of the shadow environment of the request being sent, if any."""
+
+        if self.shadow is not None:
+            return self.shadow
+
+        return builder.shadow.origin if builder.shadow is not None else None
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="shadow")
+
+            return self._pool
+
+    def pre_build(self, builder: Any, method: HttpMethod) -> None:
+        origin = self._origin(builder)
+
+        if origin is None or not self.reads(method, builder.endpoint):
+            return
+
+        parts = urlsplit(builder.endpoint)
+        shadow = urlsplit(origin)
+
+        if (parts.scheme, parts.netloc) == (shadow.scheme, shadow.netloc):
+            return
+
+        target = builder.shadow
+        credentials = target.credentials if target is not None and builder._transport().uses_credentials else None
+
+        with self._lock:
+            self._runs[builder] = _ShadowRun(url=urlunsplit((shadow.scheme, shadow.netloc, parts.path, parts.query,
+                                                            parts.fragment)),
+                                             credentials=credentials,
+                                             key=target.key if target is not None else None)
+
+    def pre_send(self, builder: Any, method: HttpMethod, kwargs: dict) -> None:
+        with self._lock:
+            run = self._runs.get(builder)
+
+            if run is None or run.future is not None:
+                # only the first attempt is mirrored
+                return
+
+            if not self._slots.acquire(blocking=False):
+                self._skipped += 1
+                self._runs.pop(builder, None)
+                return
+
+            run.started = time.perf_counter()
+
+        run.future = self._executor().submit(self._send, builder, run, method, dict(kwargs))
+
+    def _send(self, builder: Any, run: _ShadowRun, method: HttpMethod,
+              kwargs: dict) -> tuple[requests.Response, float]:
+        """
+        Sends a mirrored request to the shadow environment.
+
+        :return: 2-tuple of the response and the number of milliseconds it took
+        """
+
+        try:
+            start = time.perf_counter()
+            session = builder._transport().session(run.url, run.credentials)
+            response = session.request(method.value, run.url, **_requests_kwargs(kwargs))
+
+            return response, (time.perf_counter() - start) * 1000
+        finally:
+            self._slots.release()
+
+    def post_receive(self, builder: Any, method: HttpMethod, response: requests.Response) -> requests.Response:
+        self._complete(builder, method, response, None)
+        return response
+
+    def on_error(self, builder: Any, method: HttpMethod, error: Exception) -> None:
+        self._complete(builder, method, None, error)
+
+    def _complete(self, builder: Any, method: HttpMethod, response: requests.Response | None,
+                  error: Exception | None) -> None:
+        """Compares the outcome of the primary request with that of the mirrored request, once it completes."""
+
+        with self._lock:
+            run = self._runs.pop(builder, None)
+
+        if run is None or run.future is None:
+            return
+
+        primary_ms = (time.perf_counter() - run.started) * 1000
+        route = Hedger.route(run.url)
+        run.future.add_done_callback(lambda future: self._compare(run, method, route, response, error, primary_ms,
+                                                                  future))
+
+    def _compare(self, run: _ShadowRun, method: HttpMethod, route: str, response: requests.Response | None,
+                 error: Exception | None, primary_ms: float, future: Future) -> None:
+        comparison = ShadowComparison(method=method.value, route=route,
+                                      primary_status=response.status_code if response is not None else None,
+                                      shadow_status=None, primary_ms=primary_ms, shadow_ms=None)
+
+        try:
+            shadow, comparison.shadow_ms = future.result()
+            comparison.shadow_status = shadow.status_code
+
+            if error is not None:
+                comparison.error = f"Primary failed: {error}"
+            else:
+                comparison.differences = structural_diff(_decode(response, run.key), _decode(shadow, run.key))
+        except Exception as ex:
+            comparison.error = f"Shadow failed: {ex}"
+
+        if not comparison.matches:
+            LOGGER.warning(f"Shadow response for {method.value} {route} does not match the primary response! "
+                           f"Status: {comparison.primary_status} != {comparison.shadow_status}, "
+                           f"Differences: {'; '.join(comparison.differences) or comparison.error or '-'}")
+
+        with self._lock:
+            self._comparisons.append(comparison)
+
+    def comparisons(self) -> list[ShadowComparison]:
+        """Returns the comparisons recorded, from the oldest to the newest."""
+
+        with self._lock:
+            return list(self._comparisons)
+
+    def stats(self) -> dict:
+        """
+        Returns a summary of the comparisons recorded, for display on a dashboard.
+
+        :return: Dictionary containing the counters and the latencies of both environments
+        """
+
+        comparisons = self.comparisons()
+
+        def p95(latencies: list[float]) -> float | None:
+            if len(latencies) == 0:
+                return None
+
+            latencies = sorted(latencies)
+            return round(latencies[max(0, math.ceil(0.95 * len(latencies)) - 1)], 2)
+
+        with self._lock:
+            skipped = self._skipped
+
+        return {"compared": len(comparisons),
+                "mismatched": sum(1 for comparison in comparisons if not comparison.matches),
+                "skipped": skipped,
+                "primary_p95_ms": p95([comparison.primary_ms for comparison in comparisons]),
+                "shadow_p95_ms": p95([comparison.shadow_ms for comparison in comparisons
+                                      if comparison.shadow_ms is not None]),
+                "recent": [comparison.as_row() for comparison in comparisons[-10:]]}
+
+
+SHADOW_TRAFFIC = ShadowTraffic()
+_REGISTER_LOCK = threading.Lock()
+
+
+def enable_shadow_traffic() -> None:
+    """
+    Registers the shared ShadowTraffic middleware for every request, if it is not registered already. Requests are
+    only mirrored for Streamlit sessions that have selected a shadow environment, so registering it once is enough.
+    """
+
+    with _REGISTER_LOCK:
+        if SHADOW_TRAFFIC not in MIDDLEWARE.middleware:
+            MIDDLEWARE.use(SHADOW_TRAFFIC)
@@ -0,0 +1,110 @@
+"""
+This file contains the single-flight layer that HTTPRequestBuilder uses to coalesce identical requests that are in
+flight at the same time, even if they were made by different Streamlit sessions.
+"""
+
+import threading
+
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, TypeVar
+
+from app.core.system.logger import Logger
+from app.utils.response_cache import ResponseCache
+
+
+LOGGER = Logger("Single Flight")
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Class to ensure that only one call is in flight for any key at a time.
+
+    The first caller for a key (the leader) runs the call, and any caller that arrives with the same key while the
+    call is running (a follower) waits for it and receives its result, or its error, instead of running the call
+    again. Once the call completes, the key is forgotten, so the next caller runs the call afresh.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future] = {}
+        self._leaders = 0
+        self._coalesced = 0
+
+    @staticmethod
+    def key(method: str, url: str, params: dict | None, headers: dict | None, uen: str | None,
+            scope: Hashable = None) -> tuple:
+        """
+        Returns the fingerprint of a request. Requests with the same fingerprint must receive the same response.
+
+        :param method: HTTP method of the request
+        :param url: URL of the request
+        :param params: Query parameters of the request
+        :param headers: Headers of the request
+        :param uen: UEN the request is made on behalf of
+        :param scope: Any other value that must match for requests to be coalesced, e.g. the identity of the
+                      credentials the request is sent with
+        :return: Tuple representing the request
+        """
+
+        canonical_headers = tuple(sorted((str(k).lower(), str(v)) for k, v in (headers or {}).items()))
+
+        return ResponseCache.key(method, url, params, uen) + (canonical_headers, scope)
+
+    def do(self, key: Hashable, fn: Callable[[], T], timeout: float | None = None) -> tuple[T, bool]:
+        """
+        Runs a call, or waits for the identical call that is already in flight.
+
+        :param key: Key identifying the call
+        :param fn: Function that runs the call
+        :param timeout: Maximum number of seconds a follower waits for the call, or None to wait indefinitely. The
+                        call itself is not bound by this timeout
+        :return: 2-tuple of the result of the call and whether this caller ran the call. Followers receive the
+                 same object as the leader, so callers should copy mutable results before handing them out
+        :raises TimeoutError: If this caller is a follower and the call does not complete in time
+        """
+
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self._leaders += 1
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            LOGGER.info("Identical request already in flight, waiting for its response...")
+            return future.result(timeout), False
+
+        try:
+            result = fn()
+        except BaseException as ex:
+            self._forget(key)
+            future.set_exception(ex)
+            raise
+
+        self._forget(key)
+        future.set_result(result)
+        return result, True
+
+    def _forget(self, key: Hashable) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns statistics about the calls made through this object.
+
+        :return: Dictionary containing the number of calls in flight, the number of calls run, and the number of
+                 calls that were coalesced into a call already in flight
+        """
+
+        with self._lock:
+            return {"in_flight": len(self._calls), "leaders": self._leaders, "coalesced": self._coalesced}
+
+
+# calls are coalesced across every Streamlit session running in this process
+SINGLE_FLIGHT = SingleFlight()
@@ -0,0 +1,204 @@
+"""
+This file contains the StreamingBody class, which produces the body of a request chunk by chunk while it is being
+sent, so that large encrypted payloads never have to be held in memory in full.
+"""
+
+import hashlib
+import json
+import zlib
+
+from json.encoder import encode_basestring_ascii
+
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator
+
+from app.core.cipher.encrypt_decrypt import CIPHERTEXT_MEMO, Cryptography
+
+
+# number of bytes that bodies are produced in
+CHUNK_SIZE: int = 64 * 1024
+
+
+def _iterencode(obj: Any, slice_size: int) -> Iterator[str]:
+    """
+    Serialises an object into JSON like json.dumps(), except that long strings are escaped a slice at a time rather
+    than in one piece, so that no part produced is much longer than slice_size.
+
+    :param obj: Object to serialise
+    :param slice_size: Number of characters of a string to escape at a time
+    :return: Iterator of parts of the JSON document
+    """
+
+    if isinstance(obj, str):
+        # characters are escaped one by one, so escaping a string in slices gives the same result
+        yield '"'
+
+        for start in range(0, len(obj), slice_size):
+            yield encode_basestring_ascii(obj[start:start + slice_size])[1:-1]
+
+        yield '"'
+    elif isinstance(obj, dict):
+        yield "{"
+
+        for index, (key, value) in enumerate(obj.items()):
+            yield (", " if index > 0 else "") + encode_basestring_ascii(key if isinstance(key, str)
+                                                                        else json.dumps(key)) + ": "
+            yield from _iterencode(value, slice_size)
+
+        yield "}"
+    elif isinstance(obj, (list, tuple)):
+        yield "["
+
+        for index, value in enumerate(obj):
+            if index > 0:
+                yield ", "
+
+            yield from _iterencode(value, slice_size)
+
+        yield "]"
+    else:
+        yield json.dumps(obj)
+
+
+def json_chunks(obj: Any, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Serialises an object into JSON incrementally. Joining the chunks gives the same document as json.dumps(), but
+    only about one chunk of it is held in memory at a time, however long the strings within the object are.
+
+    :param obj: Object to serialise
+    :param chunk_size: Number of bytes to produce at a time. Chunks are at most this large
+    :return: Iterator of chunks of the JSON document, which is ASCII-encoded as non-ASCII characters are escaped
+    """
+
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be positive!")
+
+    buffer = bytearray()
+
+    # escaping a character produces at most 12 characters, such as \ud83d\ude00
+    for part in _iterencode(obj, max(1, chunk_size // 12)):
+        buffer += part.encode()
+
+        while len(buffer) >= chunk_size:
+            yield bytes(buffer[:chunk_size])
+            del buffer[:chunk_size]
+
+    if buffer:
+        yield bytes(buffer)
+
+
+class StreamingBody:
+    """
+    Class representing a request body that is produced chunk by chunk while it is sent, with chunked transfer
+    encoding as its length is not known in advance.
+
+    The body is produced again from the start every time it is iterated over, so requests sending it may be retried.
+    requests sends it when it is passed as data; httpx needs the asynchronous view returned by aiter().
+    """
+
+    def __init__(self, produce: Callable[[], Iterable[bytes]]):
+        """
+        Initialises the body.
+
+        :param produce: Function returning the chunks of the body, which is called every time the body is sent
+        """
+
+        self._produce = produce
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self._produce():
+            if chunk:
+                yield chunk
+
+    def aiter(self) -> "_AsyncStreamingBody":
+        """Returns a view of the body that httpx sends with an asynchronous client."""
+
+        return _AsyncStreamingBody(self)
+
+    def buffer(self) -> bytes:
+        """Produces the whole body at once, for servers that do not accept chunked bodies."""
+
+        return b"".join(self)
+
+    def gzip(self, level: int = 6, observe: Callable[[int, int], None] | None = None) -> "StreamingBody":
+        """
+        Returns a body that compresses this body with gzip while it is sent.
+
+        :param level: Compression level, from 0 to 9
+        :param observe: Function called with the number of bytes before and after compression, once the body has
+                        been sent in full
+        :return: Compressed StreamingBody
+        """
+
+        def produce() -> Iterator[bytes]:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            raw = wire = 0
+
+            for chunk in self:
+                raw += len(chunk)
+                compressed = compressor.compress(chunk)
+                wire += len(compressed)
+                yield compressed
+
+            compressed = compressor.flush()
+            wire += len(compressed)
+            yield compressed
+
+            if observe is not None:
+                observe(raw, wire)
+
+        return StreamingBody(produce)
+
+    @staticmethod
+    def encrypted_json(body: Any, key: str = None, chunk_size: int = CHUNK_SIZE) -> "StreamingBody":
+        """
+        Returns a body that serialises an object into JSON, encrypts it, and sends the Base64-encoded ciphertext as a
+        JSON string, all while it is sent. The body is the same as json.dumps(Cryptography.encrypt(json.dumps(body))).
+        If the ciphertext of the payload is held in CIPHERTEXT_MEMO, it is sent as it is instead of being encrypted
+        again.
+
+        :param body: Object to serialise and encrypt
+        :param key: Key to override key stored in session state
+        :param chunk_size: Number of bytes of JSON to encrypt at a time
+        :return: StreamingBody object
+        """
+
+        # the key is resolved now, as the body may be sent from a thread that cannot read the session state
+        key = Cryptography.resolve_key(key)
+
+        if key is None:
+            raise AttributeError("No encryption key loaded!")
+
+        digest = hashlib.sha256()
+
+        for chunk in json_chunks(body, chunk_size):
+            digest.update(chunk)
+
+        def produce() -> Iterator[bytes]:
+            # Base64 never needs escaping, so the ciphertext is quoted as is
+            yield b'"'
+
+            # a payload that was already encrypted in full, e.g. to preview it, is sent without encrypting it again
+            ciphertext = CIPHERTEXT_MEMO.get(key, digest.digest())
+
+            if ciphertext is not None:
+                view = memoryview(ciphertext)
+
+                for start in range(0, len(view), chunk_size):
+                    yield bytes(view[start:start + chunk_size])
+            else:
+                yield from Cryptography.encrypt_stream(json_chunks(body, chunk_size), key=key)
+
+            yield b'"'
+
+        return StreamingBody(produce)
+
+
+class _AsyncStreamingBody:
+    """Asynchronous view of a StreamingBody, which is not iterable so that httpx streams it asynchronously."""
+
+    def __init__(self, body: StreamingBody):
+        self.body = body
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for chunk in self.body:
+            yield chunk
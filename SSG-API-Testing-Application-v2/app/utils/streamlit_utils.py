@@ -5,8 +5,22 @@ This file contains utility functions and values to initialise Streamlit session
 import streamlit as st
 
 from typing import Union
+from app.core.cipher.encrypt_decrypt import CIPHER_POOL, CIPHERTEXT_MEMO, KEY_RING
 from app.core.system.logger import Logger
 from app.utils.string_utils import StringBuilder
+from app.utils.session_pool import SESSION_POOL
+from app.utils.warmup import WARMER
+from app.utils.async_http import ASYNC_CLIENT_POOL
+from app.utils.rate_limiter import RATE_LIMITER
+from app.utils.response_cache import RESPONSE_CACHE
+from app.utils.single_flight import SINGLE_FLIGHT
+from app.utils.timeouts import TIMEOUTS
+from app.utils.circuit_breaker import CIRCUIT_BREAKERS
+from app.utils.hedging import HEDGER
+from app.utils.compression import COMPRESSION
+from app.utils.dns_cache import DNS_CACHE
+from app.utils.shadow import SHADOW_TRAFFIC
+from app.utils.har import record_requests
 
 
 LOGGER = Logger(__name__)
@@ -25,15 +39,15 @@ def init() -> None:
     if "encryption_key" not in st.session_state:
         st.session_state["encryption_key"] = ""
 
-    if "cert_pem" not in st.session_state:
-        st.session_state["cert_pem"] = None
-
-    if "key_pem" not in st.session_state:
-        st.session_state["key_pem"] = None
+    if "credentials" not in st.session_state:
+        st.session_state["credentials"] = None
 
     if "url" not in st.session_state:
         st.session_state["url"] = None
 
+    if "shadow_url" not in st.session_state:
+        st.session_state["shadow_url"] = None
+
 
 # this is an experimental feature, should it become part of the mainstream API, make sure to deprecate the use
 # of this decorator and replace it with the new syntax
@@ -55,11 +69,71 @@ def display_config() -> None:
     st.header("Encryption Key:")
     st.code(st.session_state["encryption_key"] if st.session_state["encryption_key"] else "-")
 
-    st.header("Certificate Key:")
-    st.code(st.session_state["cert_pem"] if st.session_state["cert_pem"] else "-")
+    st.header("Certificate and Private Key:")
+    st.code(st.session_state["credentials"].fingerprint if st.session_state["credentials"] else "-")
+
+    st.header("Connection Pool:")
+    st.json(SESSION_POOL.stats(), expanded=False)
+
+    st.header("Warm Connections:")
+    st.json(WARMER.stats(), expanded=False)
+
+    st.header("Asynchronous Clients:")
+    st.json(ASYNC_CLIENT_POOL.stats(), expanded=False)
+
+    st.header("Rate Limiter:")
+    st.json(RATE_LIMITER.stats(), expanded=False)
+
+    st.header("Response Cache:")
+    st.json(RESPONSE_CACHE.stats(), expanded=False)
+
+    st.header("Single Flight:")
+    st.json(SINGLE_FLIGHT.stats(), expanded=False)
+
+    st.header("Timeouts:")
+    st.json(TIMEOUTS.stats(), expanded=False)
+
+    st.header("Circuit Breakers:")
+    st.json(CIRCUIT_BREAKERS.stats(), expanded=False)
+
+    st.header("Hedged Requests:")
+    st.json(HEDGER.stats(), expanded=False)
+
+    st.header("Compression:")
+
+    if st.session_state.get("url") is not None:
+        # compression is enabled for every Streamlit session, as it depends on what the API endpoint accepts
+        endpoint = st.session_state["url"]
+        compress = st.toggle(f"Compress large request bodies sent to {endpoint.name}",
+                             value=COMPRESSION.enabled(endpoint.value))
+        COMPRESSION.enable(endpoint.value, compress)
+
+    st.json(COMPRESSION.stats(), expanded=False)
+
+    st.header("DNS Cache:")
+    st.json(DNS_CACHE.stats(), expanded=False)
+
+    st.header("Cipher Keys:")
+    st.json(KEY_RING.stats(), expanded=False)
+
+    st.header("Ciphertext Memo:")
+    st.json(CIPHERTEXT_MEMO.stats(), expanded=False)
+
+    st.header("Cipher Pool:")
+    st.json(CIPHER_POOL.stats(), expanded=False)
+
+    st.header("Shadow Traffic:")
+    st.json(SHADOW_TRAFFIC.stats(), expanded=False)
 
-    st.header("Private Key:")
-    st.code(st.session_state["key_pem"] if st.session_state["key_pem"] else "-")
+    st.header("Request Recording:")
+    # the widgets keep their values for each Streamlit session, and each session only records its own requests
+    recording = st.toggle("Record the requests of this session into a HAR file", key="har_recording_toggle")
+    bodies = st.toggle("Include the bodies of requests and responses", key="har_bodies_toggle",
+                       disabled=not recording)
+    recorder = record_requests(recording, bodies)
+    st.json(recorder.stats(), expanded=False)
+    st.download_button("Download HAR File", data=recorder.dumps(), file_name="requests.har",
+                       mime="application/json")
 
 
 def http_code_handler(code: Union[int, str]) -> None:
@@ -130,4 +204,4 @@ def validation_error_handler(errors: list[str], warnings: list[str]) -> bool:
 def does_not_have_keys() -> bool:
     """Returns true if both private key and cert keys are present."""
 
-    return st.session_state["key_pem"] is None or st.session_state["cert_pem"] is None
+    return st.session_state["credentials"] is None
@@ -0,0 +1,249 @@
+"""
+This file contains the timeouts that HTTPRequestBuilder applies to every request, and the deadlines that bound how
+long a request, or a batch of requests, may take in total.
+"""
+
+import threading
+import time
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator
+from urllib.parse import urlsplit
+
+from requests.exceptions import ConnectionError, Timeout
+from urllib3.exceptions import ReadTimeoutError
+
+from app.core.constants import HttpMethod
+from app.core.system.logger import Logger
+
+
+LOGGER = Logger("Timeouts")
+
+
+class DeadlineExceeded(Timeout):
+    """Raised when a request cannot be sent or completed before the deadline it is running under expires."""
+
+    def __init__(self, url: str | None = None):
+        super().__init__(f"Deadline exceeded before the request to {url} could complete!")
+        self.url = url
+
+
+def is_timeout(ex: Exception) -> bool:
+    """
+    Checks if an error was raised because a request timed out. requests raises a ConnectionError rather than a
+    Timeout if the read timeout expires while the body of the response is being read, so that case is checked too.
+
+    :param ex: Error raised while sending the request
+    :return: True if the request timed out
+    """
+
+    if isinstance(ex, Timeout):
+        return True
+
+    return isinstance(ex, ConnectionError) and len(ex.args) > 0 and isinstance(ex.args[0], ReadTimeoutError)
+
+
+@dataclass(frozen=True)
+class TimeoutRule:
+    """
+    Represents the connect and read timeouts for requests with an HTTP method and, optionally, a route prefix.
+
+    Rules without a method apply to every method, and rules without a route prefix apply to every route. When
+    several rules match a request, the one with the longest route prefix is used.
+    """
+
+    connect: float
+    read: float
+    method: HttpMethod | None = None
+    route_prefix: str = ""
+
+    def __post_init__(self):
+        if self.connect <= 0 or self.read <= 0:
+            raise ValueError("Timeouts must be positive!")
+
+    def matches(self, method: HttpMethod, path: str) -> bool:
+        return (self.method is None or self.method == method) and path.startswith(self.route_prefix)
+
+
+class Timeouts:
+    """
+    Class holding the timeout rules of the HTTP layer, and counting the requests that timed out under each rule.
+    """
+
+    DEFAULT_RULES: tuple[TimeoutRule, ...] = (
+        TimeoutRule(connect=3.05, read=30),
+        TimeoutRule(connect=3.05, read=60, method=HttpMethod.POST),
+    )
+
+    def __init__(self, rules: tuple[TimeoutRule, ...] | list[TimeoutRule] = DEFAULT_RULES):
+        """
+        Initialises the timeouts.
+
+        :param rules: Rules that define the timeouts of each method and route
+        """
+
+        self._rules = list(rules)
+        self._lock = threading.Lock()
+        self._timeouts: dict[tuple[str, str], int] = {}
+
+    def configure(self, rule: TimeoutRule) -> None:
+        """
+        Adds a rule, replacing any existing rule for the same method and route prefix.
+
+        :param rule: Rule to add
+        """
+
+        with self._lock:
+            self._rules = [r for r in self._rules if (r.method, r.route_prefix) != (rule.method, rule.route_prefix)]
+            self._rules.append(rule)
+
+    def _rule(self, method: HttpMethod, url: str) -> TimeoutRule | None:
+        path = urlsplit(url).path or "/"
+
+        with self._lock:
+            matching = [rule for rule in self._rules if rule.matches(method, path)]
+
+        if len(matching) == 0:
+            return None
+
+        return max(matching, key=lambda r: (len(r.route_prefix), r.method is not None))
+
+    def resolve(self, method: HttpMethod, url: str) -> tuple[float, float] | None:
+        """
+        Returns the timeouts of a request.
+
+        :param method: HttpMethod of the request
+        :param url: URL of the request
+        :return: 2-tuple of the connect and read timeouts in seconds, or None if no rule applies to the request
+        """
+
+        rule = self._rule(method, url)
+
+        return (rule.connect, rule.read) if rule is not None else None
+
+    def record_timeout(self, method: HttpMethod, url: str) -> None:
+        """
+        Records that a request timed out.
+
+        :param method: HttpMethod of the request
+        :param url: URL of the request
+        """
+
+        rule = self._rule(method, url)
+        key = (method.value, rule.route_prefix if rule is not None else "")
+
+        with self._lock:
+            self._timeouts[key] = self._timeouts.get(key, 0) + 1
+
+        LOGGER.warning(f"{method.value} request to {url} timed out!")
+
+    def stats(self) -> dict:
+        """
+        Returns the timeout rules and the number of requests that timed out under each of them.
+
+        :return: Dictionary containing the rules and timeout counters
+        """
+
+        with self._lock:
+            return {
+                "rules": [{"method": rule.method.value if rule.method is not None else None,
+                           "route_prefix": rule.route_prefix, "connect": rule.connect, "read": rule.read}
+                          for rule in self._rules],
+                "timeouts": [{"method": method, "route_prefix": prefix, "count": count}
+                             for (method, prefix), count in self._timeouts.items()],
+            }
+
+
+_CURRENT_DEADLINE: ContextVar["Deadline | None"] = ContextVar("deadline", default=None)
+
+
+class Deadline:
+    """
+    Class representing a point in time by which a request, or a group of requests, must complete.
+
+    A deadline applies to every request sent from within its scope(). The timeouts of each request are clamped to
+    the time remaining, and requests are not retried if the deadline would expire before the retry is sent. Note
+    that the read timeout bounds each read from the socket rather than the whole response, so a request that keeps
+    trickling data may still overrun its deadline slightly.
+    """
+
+    def __init__(self, seconds: float):
+        """
+        Initialises a deadline that expires a number of seconds from now.
+
+        :param seconds: Number of seconds until the deadline expires
+        """
+
+        if seconds <= 0:
+            raise ValueError("Deadline must be positive!")
+
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Returns the number of seconds until the deadline expires, or 0 if it has expired."""
+
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() == 0
+
+    def clamp(self, timeout: tuple[float, float] | None, url: str | None = None) -> tuple[float, float]:
+        """
+        Clamps the timeouts of a request to the time remaining.
+
+        :param timeout: 2-tuple of the connect and read timeouts, or None if the request has no timeouts
+        :param url: URL of the request, used in the error message
+        :return: 2-tuple of the clamped connect and read timeouts
+        :raises DeadlineExceeded: If the deadline has already expired
+        """
+
+        remaining = self.remaining()
+
+        if remaining == 0:
+            raise DeadlineExceeded(url)
+
+        if timeout is None:
+            return remaining, remaining
+
+        return min(timeout[0], remaining), min(timeout[1], remaining)
+
+    def allows(self, delay: float) -> bool:
+        """
+        Checks if there is time left to wait for a delay and then send another request.
+
+        :param delay: Number of seconds to wait
+        :return: True if the deadline expires after the delay
+        """
+
+        return delay < self.remaining()
+
+    @contextmanager
+    def scope(self) -> Iterator["Deadline"]:
+        """
+        Applies this deadline to every request sent from within the context. If a deadline that expires earlier is
+        already in force, it continues to apply instead.
+
+        :return: The deadline in force within the context
+        """
+
+        outer = _CURRENT_DEADLINE.get()
+        inner = outer if outer is not None and outer.expires_at <= self.expires_at else self
+        token = _CURRENT_DEADLINE.set(inner)
+
+        try:
+            yield inner
+        finally:
+            _CURRENT_DEADLINE.reset(token)
+
+
+def current_deadline() -> Deadline | None:
+    """Returns the deadline in force in the current context, if any."""
+
+    return _CURRENT_DEADLINE.get()
+
+
+# timeouts are shared by every Streamlit session running in this process
+TIMEOUTS = Timeouts()
@@ -0,0 +1,119 @@
+"""
+This file contains the RequestTimings class, which breaks down the time taken to execute a request into the phases
+of the request pipeline.
+"""
+
+import time
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+
+_CURRENT_TIMINGS: ContextVar["RequestTimings | None"] = ContextVar("timings", default=None)
+
+
+class RequestTimings:
+    """
+    Class recording how long each phase of a request took.
+
+    The phases are, in order:
+
+    - build: preparing the request, excluding the time spent encrypting and sending it
+    - encrypt: encrypting the payload of the request
+    - send: sending the request and receiving the response, including any retries
+    - first_byte: time to the first byte of the response of the final attempt, which is part of the send phase
+    - decrypt: decrypting the response
+    - parse: parsing the response into JSON
+    - render: displaying the response
+
+    The HTTP layer records the encrypt, send and first_byte phases into the timings in force in the current context,
+    see scope().
+    """
+
+    PHASES: tuple[str, ...] = ("build", "encrypt", "send", "first_byte", "decrypt", "parse", "render")
+
+    def __init__(self):
+        self.phases: dict[str, float] = {}
+
+    def record(self, phase: str, seconds: float) -> None:
+        """
+        Adds time to a phase.
+
+        :param phase: Name of the phase, which must be one of PHASES
+        :param seconds: Number of seconds to add
+        """
+
+        if phase not in RequestTimings.PHASES:
+            raise ValueError(f"Unknown phase {phase}!")
+
+        self.phases[phase] = self.phases.get(phase, 0.0) + max(0.0, seconds)
+
+    def get(self, phase: str) -> float:
+        """Returns the number of seconds spent in a phase, or 0 if the phase did not run."""
+
+        return self.phases.get(phase, 0.0)
+
+    @contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        """
+        Adds the time spent within the context to a phase.
+
+        :param phase: Name of the phase, which must be one of PHASES
+        """
+
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start)
+
+    @contextmanager
+    def scope(self) -> Iterator["RequestTimings"]:
+        """Records the phases of every request sent from within the context into these timings."""
+
+        token = _CURRENT_TIMINGS.set(self)
+
+        try:
+            yield self
+        finally:
+            _CURRENT_TIMINGS.reset(token)
+
+    @property
+    def total(self) -> float:
+        """Returns the total number of seconds taken. The first_byte phase is excluded as it is part of send."""
+
+        return sum(seconds for phase, seconds in self.phases.items() if phase != "first_byte")
+
+    def as_row(self) -> dict:
+        """Returns the timings in milliseconds, suitable for st.dataframe() or for exporting."""
+
+        return {**{f"{phase}_ms": round(self.get(phase) * 1000, 2) for phase in RequestTimings.PHASES},
+                "total_ms": round(self.total * 1000, 2)}
+
+
+def current_timings() -> RequestTimings | None:
+    """Returns the timings in force in the current context, if any."""
+
+    return _CURRENT_TIMINGS.get()
+
+
+@contextmanager
+def timed(phase: str, timings: RequestTimings | None = None) -> Iterator[None]:
+    """
+    Adds the time spent within the context to a phase of the given timings, or of the timings in force in the current
+    context. Nothing is recorded if there are no timings.
+
+    :param phase: Name of the phase
+    :param timings: Timings to record into, or None to use the timings in force in the current context
+    """
+
+    timings = timings if timings is not None else current_timings()
+
+    if timings is None:
+        yield
+        return
+
+    with timings.phase(phase):
+        yield
@@ -0,0 +1,408 @@
+"""
+This file contains the transports that HTTPRequestBuilder sends requests through, including an in-memory transport
+that serves canned or generated responses without opening any sockets.
+"""
+
+import asyncio
+import fnmatch
+import json
+import threading
+import time
+import weakref
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Callable
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+
+from requests.adapters import BaseAdapter
+from requests.exceptions import ReadTimeout
+from requests.structures import CaseInsensitiveDict
+
+from app.core.system.logger import Logger
+from app.utils.async_http import ASYNC_CLIENT_POOL, AsyncClientPool
+from app.utils.credentials import ClientCredentials
+from app.utils.session_pool import SESSION_POOL, SessionPool, _SSLContextAdapter
+
+
+LOGGER = Logger("Transport")
+
+
+class Transport(ABC):
+    """
+    Abstract class representing how HTTPRequestBuilder sends requests.
+
+    A transport supplies the requests.Session that the synchronous path sends requests with, and the
+    httpx.AsyncClient that the asynchronous path sends requests with. Everything else in the request pipeline, such
+    as rate limiting, retries, circuit breaking and caching, applies regardless of the transport used.
+    """
+
+    # whether the transport connects to the API with the client credentials stored in the session state
+    uses_credentials: bool = True
+
+    @abstractmethod
+    def session(self, url: str, credentials: ClientCredentials | None = None,
+                owner: str | None = None) -> requests.Session:
+        """
+        Returns the session to send a synchronous request with.
+
+        :param url: URL that the request is sent to
+        :param credentials: Client certificate and private key
+        :param owner: ID of the Streamlit session sending the request
+        :return: requests.Session object
+        """
+
+        pass
+
+    @abstractmethod
+    def client(self, url: str, credentials: ClientCredentials | None = None) -> httpx.AsyncClient:
+        """
+        Returns the client to send an asynchronous request with. This must be called from within a running event
+        loop.
+
+        :param url: URL that the request is sent to
+        :param credentials: Client certificate and private key
+        :return: httpx.AsyncClient object
+        """
+
+        pass
+
+
+class PooledTransport(Transport):
+    """Transport that sends requests over the keep-alive connections of the session and client pools."""
+
+    def __init__(self, session_pool: SessionPool = SESSION_POOL, client_pool: AsyncClientPool = ASYNC_CLIENT_POOL):
+        self.session_pool = session_pool
+        self.client_pool = client_pool
+
+    def session(self, url: str, credentials: ClientCredentials | None = None,
+                owner: str | None = None) -> requests.Session:
+        return self.session_pool.session(url, credentials, owner=owner)
+
+    def client(self, url: str, credentials: ClientCredentials | None = None) -> httpx.AsyncClient:
+        return self.client_pool.client(url, credentials)
+
+
+class _OneShotSession(requests.Session):
+    """
+    requests.Session that closes its connections as soon as each response has been read, so that no connection is
+    left open once the session is no longer used.
+    """
+
+    def request(self, *args, **kwargs) -> requests.Response:
+        try:
+            return super().request(*args, **kwargs)
+        finally:
+            # streamed responses are still being read from their connection, which is released once they are closed
+            if not kwargs.get("stream"):
+                self.close()
+
+
+class _ClosingStream(httpx.AsyncByteStream):
+    """Body of a streamed response that closes the client it was received with once the body is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, client: httpx.AsyncClient):
+        self._stream = stream
+        self._client = client
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            await self._client.aclose()
+
+
+class _OneShotAsyncClient(httpx.AsyncClient):
+    """
+    httpx.AsyncClient that closes its connections as soon as a response has been read, the asynchronous counterpart
+    of _OneShotSession. Streamed responses close the client once they are closed.
+    """
+
+    async def send(self, request: httpx.Request, *, stream: bool = False, **kwargs) -> httpx.Response:
+        try:
+            response = await super().send(request, stream=stream, **kwargs)
+        except BaseException:
+            await self.aclose()
+            raise
+
+        if not stream:
+            await self.aclose()
+            return response
+
+        response.stream = _ClosingStream(response.stream, self)
+        return response
+
+
+class RequestsTransport(Transport):
+    """
+    Transport that sends every request with a new requests.Session or httpx.AsyncClient, and hence over a new
+    connection. This is how requests were sent before connections were pooled, and is kept as a baseline for
+    benchmarks. The connection is closed once the response has been read, so a retried request also opens a new
+    connection.
+    """
+
+    def session(self, url: str, credentials: ClientCredentials | None = None,
+                owner: str | None = None) -> requests.Session:
+        session = _OneShotSession()
+        adapter = _SSLContextAdapter(SessionPool.ssl_context(credentials))
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        return session
+
+    def client(self, url: str, credentials: ClientCredentials | None = None) -> httpx.AsyncClient:
+        return _OneShotAsyncClient(verify=SessionPool.ssl_context(credentials))
+
+
+@dataclass
+class CannedResponse:
+    """Represents a response served by the InMemoryTransport."""
+
+    status: int = 200
+    body: Any = None
+    headers: dict[str, str] = field(default_factory=dict)
+
+    def content(self) -> bytes:
+        """Returns the body of the response as bytes, serialising it as JSON if it is not a string or bytes."""
+
+        if self.body is None:
+            return b""
+
+        if isinstance(self.body, bytes):
+            return self.body
+
+        if isinstance(self.body, str):
+            return self.body.encode()
+
+        return json.dumps(self.body).encode()
+
+
+@dataclass(frozen=True)
+class InMemoryRequest:
+    """Represents a request received by the InMemoryTransport."""
+
+    method: str
+    url: str
+    headers: dict[str, str]
+    body: bytes
+
+    @property
+    def path(self) -> str:
+        return urlsplit(self.url).path or "/"
+
+
+class InMemoryTransport(Transport):
+    """
+    Transport that serves responses from memory, for benchmarking and load testing the request pipeline without
+    any network access.
+
+    Responses are served from the first route whose pattern matches the path of the request, where patterns use
+    fnmatch syntax. Routes may serve a canned response, or generate one from the request. Requests that do not match
+    any route are answered by the default responder, which echoes the request back as JSON.
+
+    Every response is delayed by the configured latency, which may be a number of seconds or a function returning
+    one (e.g. to add jitter). If the latency exceeds the read timeout of the request, the request times out as it
+    would over the network.
+    """
+
+    uses_credentials = False
+
+    def __init__(self, latency: float | Callable[[], float] = 0.0,
+                 responder: Callable[[InMemoryRequest], CannedResponse] | None = None):
+        """
+        Initialises the in-memory transport.
+
+        :param latency: Number of seconds to delay each response by, or a function returning that number
+        :param responder: Function generating the responses to requests that do not match any route. Defaults to
+                          echoing the request back
+        """
+
+        if not callable(latency) and latency < 0:
+            raise ValueError("Latency cannot be negative!")
+
+        self.latency = latency
+        self.responder = responder if responder is not None else InMemoryTransport.echo
+        self.requests = 0
+        self._routes: list[tuple[str, CannedResponse | Callable[[InMemoryRequest], CannedResponse]]] = []
+        self._lock = threading.Lock()
+        self._session: requests.Session | None = None
+        self._clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = \
+            weakref.WeakKeyDictionary()
+
+    @staticmethod
+    def echo(request: InMemoryRequest) -> CannedResponse:
+        """Responder that echoes the method, path and body of the request back as JSON."""
+
+        return CannedResponse(body={"method": request.method,
+                                    "path": request.path,
+                                    "body": request.body.decode(errors="replace")})
+
+    def route(self, pattern: str,
+              response: CannedResponse | Callable[[InMemoryRequest], CannedResponse]) -> "InMemoryTransport":
+        """
+        Adds a route. Routes are matched in the order that they were added.
+
+        :param pattern: fnmatch pattern matched against the path of the request
+        :param response: Canned response to serve, or a function generating the response from the request
+        :return: This transport
+        """
+
+        with self._lock:
+            self._routes.append((pattern, response))
+
+        return self
+
+    def respond(self, request: InMemoryRequest) -> CannedResponse:
+        """
+        Returns the response to a request, without any latency.
+
+        :param request: Request received
+        :return: CannedResponse object
+        """
+
+        with self._lock:
+            self.requests += 1
+            handler = next((response for pattern, response in self._routes if fnmatch.fnmatch(request.path, pattern)),
+                           self.responder)
+
+        return handler(request) if callable(handler) else handler
+
+    def delay(self) -> float:
+        """Returns the number of seconds to delay the next response by."""
+
+        return max(0.0, self.latency() if callable(self.latency) else self.latency)
+
+    def session(self, url: str, credentials: ClientCredentials | None = None,
+                owner: str | None = None) -> requests.Session:
+        with self._lock:
+            if self._session is None:
+                self._session = requests.Session()
+                self._session.mount("https://", _InMemoryAdapter(self))
+                self._session.mount("http://", _InMemoryAdapter(self))
+
+            return self._session
+
+    def client(self, url: str, credentials: ClientCredentials | None = None) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            client = self._clients.get(loop)
+
+            if client is None:
+                client = httpx.AsyncClient(transport=_InMemoryAsyncTransport(self))
+                self._clients[loop] = client
+
+            return client
+
+
+def _read_timeout(timeout: Any) -> float | None:
+    """Returns the read timeout from the timeout passed to a requests adapter."""
+
+    if isinstance(timeout, tuple):
+        return timeout[1]
+
+    return timeout
+
+
+class _InMemoryAdapter(BaseAdapter):
+    """requests adapter that answers requests through an InMemoryTransport."""
+
+    def __init__(self, transport: InMemoryTransport):
+        super().__init__()
+        self.transport = transport
+
+    def send(self, request: requests.PreparedRequest, stream: bool = False, timeout: Any = None, verify: Any = True,
+             cert: Any = None, proxies: Any = None) -> requests.Response:
+        body = request.body if request.body is not None else b""
+        canned = self.transport.respond(InMemoryRequest(method=request.method,
+                                                        url=request.url,
+                                                        headers=dict(request.headers),
+                                                        body=body.encode() if isinstance(body, str) else body))
+        delay = self.transport.delay()
+        read_timeout = _read_timeout(timeout)
+
+        if read_timeout is not None and delay > read_timeout:
+            time.sleep(read_timeout)
+            raise ReadTimeout(f"In-memory request to {request.url} timed out!", request=request)
+
+        time.sleep(delay)
+
+        response = requests.Response()
+        response.status_code = canned.status
+        response.headers = CaseInsensitiveDict({"Content-Type": "application/json", **canned.headers})
+        response._content = canned.content()
+        response.url = request.url
+        response.request = request
+        response.reason = "In-Memory"
+        response.encoding = "utf-8"
+        response.connection = self
+
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+class _InMemoryAsyncTransport(httpx.AsyncBaseTransport):
+    """httpx transport that answers requests through an InMemoryTransport."""
+
+    def __init__(self, transport: InMemoryTransport):
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        canned = self.transport.respond(InMemoryRequest(method=request.method,
+                                                        url=str(request.url),
+                                                        headers=dict(request.headers),
+                                                        body=await request.aread()))
+        delay = self.transport.delay()
+        read_timeout = request.extensions.get("timeout", {}).get("read")
+
+        if read_timeout is not None and delay > read_timeout:
+            await asyncio.sleep(read_timeout)
+            raise httpx.ReadTimeout(f"In-memory request to {request.url} timed out!", request=request)
+
+        await asyncio.sleep(delay)
+
+        return httpx.Response(canned.status,
+                              headers={"Content-Type": "application/json", **canned.headers},
+                              content=canned.content(),
+                              request=request)
+
+
+_DEFAULT_TRANSPORT: Transport = PooledTransport()
+_DEFAULT_TRANSPORT_LOCK = threading.Lock()
+
+
+def default_transport() -> Transport:
+    """Returns the transport used by requests that have not been given one with HTTPRequestBuilder.with_transport()."""
+
+    with _DEFAULT_TRANSPORT_LOCK:
+        return _DEFAULT_TRANSPORT
+
+
+def set_default_transport(transport: Transport) -> Transport:
+    """
+    Changes the transport used by requests that have not been given one, e.g. to run every request in memory.
+
+    :param transport: Transport to use
+    :return: Transport that was used previously, so that it can be restored
+    """
+
+    global _DEFAULT_TRANSPORT
+
+    if not isinstance(transport, Transport):
+        raise ValueError("Transport must be a Transport!")
+
+    with _DEFAULT_TRANSPORT_LOCK:
+        previous = _DEFAULT_TRANSPORT
+        _DEFAULT_TRANSPORT = transport
+
+    LOGGER.info(f"Default transport set to {type(transport).__name__}")
+    return previous
@@ -0,0 +1,218 @@
+"""
+This file contains the ConnectionWarmer class, which opens pooled mTLS connections to an endpoint ahead of the first
+request sent to it, and keeps them open while the endpoint is idle.
+"""
+
+import socket
+import threading
+import time
+
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+import requests
+
+from urllib3.exceptions import HTTPError
+
+from app.core.constants import HttpMethod
+from app.core.system.logger import Logger
+from app.utils.credentials import ClientCredentials
+from app.utils.session_pool import SESSION_POOL, SessionPool
+from app.utils.timeouts import TIMEOUTS
+
+
+LOGGER = Logger("Connection Warmer")
+
+
+@dataclass
+class _WarmTarget:
+    """Represents an origin and a set of client credentials whose pooled connections are kept warm."""
+
+    url: str
+    credentials: ClientCredentials | None
+    resolve_time: float = 0.0
+    connect_time: float = 0.0
+    heartbeats: int = 0
+    reconnects: int = 0
+    failures: int = 0
+
+
+class ConnectionWarmer:
+    """
+    Class to warm up the pooled connections of the SessionPool.
+
+    Warming up an origin resolves its host and opens a number of connections to it, performing the TCP and mTLS
+    handshakes, before returning them to the pooled session that the HTTP layer sends requests with. The first
+    request sent to the origin then reuses a connection instead of paying for the handshakes.
+
+    Servers close keep-alive connections that have been idle for too long, so heartbeat() should be called
+    periodically; it re-opens the connections that have been closed, so that the pool always holds warm connections.
+    Origins whose pooled sessions have been closed (e.g. because every Streamlit session using them has ended) are
+    no longer kept warm.
+    """
+
+    DEFAULT_CONNECTIONS: int = 2
+
+    def __init__(self, session_pool: SessionPool = SESSION_POOL, connections: int = DEFAULT_CONNECTIONS):
+        """
+        Initialises the connection warmer.
+
+        :param session_pool: SessionPool whose connections should be warmed
+        :param connections: Number of connections to keep warm per origin. This cannot exceed the maximum number of
+                            connections that the session pool keeps alive
+        """
+
+        if not isinstance(connections, int) or not 1 <= connections <= session_pool.pool_maxsize:
+            raise ValueError(f"Connections must be an integer between 1 and {session_pool.pool_maxsize}!")
+
+        self.session_pool = session_pool
+        self.connections = connections
+        self._targets: dict[tuple[str, str], _WarmTarget] = {}
+        self._lock = threading.Lock()
+
+    def warm(self, url: str, credentials: ClientCredentials | None = None,
+             owner: str | None = None) -> threading.Thread | None:
+        """
+        Warms up the connections to the origin of the URL on a background thread. Nothing is done if the origin is
+        already being kept warm with the same credentials.
+
+        :param url: URL of the endpoint that requests will be sent to
+        :param credentials: Client certificate and private key
+        :param owner: ID of the Streamlit session that requests will be sent from
+        :return: Thread warming up the connections, or None if the origin is already warm
+        """
+
+        key = (SessionPool.origin(url), SessionPool.fingerprint(credentials))
+
+        with self._lock:
+            if key in self._targets:
+                return None
+
+            target = _WarmTarget(url=key[0], credentials=credentials)
+            self._targets[key] = target
+
+        session = self.session_pool.session(target.url, credentials, owner=owner)
+        thread = threading.Thread(target=self._warm, args=(target, session), name="connection-warmer", daemon=True)
+        thread.start()
+
+        return thread
+
+    def _warm(self, target: _WarmTarget, session: requests.Session) -> None:
+        parts = urlsplit(target.url)
+        start = time.perf_counter()
+
+        try:
+            socket.getaddrinfo(parts.hostname, parts.port or (443 if parts.scheme == "https" else 80),
+                               type=socket.SOCK_STREAM)
+            target.resolve_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            self._connect(target, session)
+            target.connect_time = time.perf_counter() - start
+            LOGGER.info(f"Warmed up {self.connections} connection(s) to {target.url} in "
+                        f"{(target.resolve_time + target.connect_time) * 1000:.0f} ms")
+        except (OSError, HTTPError, requests.RequestException) as ex:
+            target.failures += 1
+            LOGGER.warning(f"Unable to warm up connections to {target.url}! Error: {ex}")
+
+    def _connect(self, target: _WarmTarget, session: requests.Session) -> int:
+        """
+        Ensures that the pooled session holds the configured number of open connections to the origin of a target.
+
+        :param target: Target to connect to
+        :param session: Pooled session of the target
+        :return: Number of connections that had to be opened
+        """
+
+        # the connection pool is looked up in the same way as when a request is sent, so that the warm connections
+        # are the ones that requests will be sent over
+        request = requests.Request(HttpMethod.GET.value, target.url).prepare()
+        settings = session.merge_environment_settings(target.url, {}, None, None, None)
+        pool = session.get_adapter(target.url).get_connection_with_tls_context(request, settings["verify"],
+                                                                               settings["proxies"], settings["cert"])
+        timeout = TIMEOUTS.resolve(HttpMethod.GET, target.url)
+
+        # idle connections are taken from the pool first, and connections that the server has closed are reset
+        connections = [pool._get_conn() for _ in range(self.connections)]
+        opened = 0
+
+        try:
+            for connection in connections:
+                if not connection.is_connected:
+                    if timeout is not None:
+                        connection.timeout = timeout[0]
+
+                    connection.connect()
+                    opened += 1
+        finally:
+            for connection in connections:
+                pool._put_conn(connection)
+
+        return opened
+
+    def heartbeat(self) -> int:
+        """
+        Re-opens the warm connections that have been closed since they were last checked, and stops keeping origins
+        warm once their pooled sessions have been closed.
+
+        :return: Number of connections re-opened
+        """
+
+        with self._lock:
+            targets = list(self._targets.values())
+
+        reopened = 0
+
+        for target in targets:
+            session = self.session_pool.peek(target.url, target.credentials)
+
+            if session is None:
+                self.forget(target.url, target.credentials)
+                continue
+
+            try:
+                opened = self._connect(target, session)
+            except (OSError, HTTPError, requests.RequestException) as ex:
+                target.failures += 1
+                LOGGER.warning(f"Unable to keep connections to {target.url} warm! Error: {ex}")
+                continue
+
+            target.heartbeats += 1
+            target.reconnects += opened
+            reopened += opened
+
+        return reopened
+
+    def forget(self, url: str, credentials: ClientCredentials | None = None) -> bool:
+        """
+        Stops keeping the connections to the origin of the URL warm.
+
+        :param url: URL of the endpoint
+        :param credentials: Client certificate and private key
+        :return: True if the origin was being kept warm, False otherwise
+        """
+
+        with self._lock:
+            return self._targets.pop((SessionPool.origin(url), SessionPool.fingerprint(credentials)), None) is not None
+
+    def stats(self) -> list[dict]:
+        """
+        Returns the origins being kept warm, for display on a dashboard.
+
+        :return: List of dictionaries describing each origin
+        """
+
+        with self._lock:
+            targets = list(self._targets.values())
+
+        return [{"origin": target.url,
+                 "fingerprint": SessionPool.fingerprint(target.credentials)[:16],
+                 "resolve_ms": round(target.resolve_time * 1000, 2),
+                 "connect_ms": round(target.connect_time * 1000, 2),
+                 "heartbeats": target.heartbeats,
+                 "reconnects": target.reconnects,
+                 "failures": target.failures} for target in targets]
+
+
+# warm connections are shared by every Streamlit session running in this process, as the pooled sessions are
+WARMER = ConnectionWarmer()